@@ -14,9 +14,11 @@ from __future__ import annotations
 import ast
 from functools import lru_cache
 from pathlib import Path
-from typing import Dict
+from typing import Dict, List
 
 
+LANGUAGES_DIR = Path(__file__).resolve().parent.parent / "languages"
+
 REGISTRY_PATH = (
     Path(__file__).resolve().parent.parent
     / "streamlit_app"
@@ -98,3 +100,15 @@ def get_class_prefix(language_code: str) -> str:
 def get_class_name(language_code: str) -> str:
     """Convenience: full analyzer class name (`{Prefix}Analyzer`)."""
     return f"{get_class_prefix(language_code)}Analyzer"
+
+
+def implemented_language_codes() -> List[str]:
+    """ISO codes of registered languages that have an analyzer under `languages/`.
+
+    The registry lists many more languages than are implemented; a language
+    counts once `languages/<folder>/<file>_analyzer.py` exists.
+    """
+    return [
+        code for folder, code in sorted(folder_to_code().items())
+        if (LANGUAGES_DIR / folder / f"{get_file_name(code)}_analyzer.py").exists()
+    ]
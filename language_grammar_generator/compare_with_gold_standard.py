@@ -398,26 +398,36 @@ class GoldStandardComparator:
             print(f"\n💥 COMPARISONS FAILED! {self.language_code.upper()} needs improvements to match gold standards.")
 
 
+def _compare_language(language_code: str, detailed: bool = False, reference_code: str = "zh") -> bool:
+    """Compare one language; module-level so it can run in a worker process."""
+    return GoldStandardComparator(language_code, detailed, reference_code=reference_code).compare_all()
+
+
 def main():
     parser = argparse.ArgumentParser(description="Compare language analyzer with gold standards")
-    parser.add_argument("--language", required=True, help="Language code to compare")
+    parser.add_argument("--language", help="Language code to compare")
     parser.add_argument("--detailed", action="store_true", help="Show detailed comparison results")
     parser.add_argument("--export-results", action="store_true", help="Export results to JSON file")
     parser.add_argument("--all-languages", action="store_true", help="Compare all languages")
     parser.add_argument("--reference", default="zh", help="Reference analyzer code (default: zh)")
 
     args = parser.parse_args()
+    if not args.language and not args.all_languages:
+        parser.error("--language is required unless --all-languages is given")
 
     if args.all_languages:
-        # Compare all language directories
-        languages_dir = Path("languages")
-        language_codes = [d.name for d in languages_dir.iterdir()
-                         if d.is_dir() and not d.name.startswith('.') and d.name not in ['chinese_simplified', 'hindi']]
-
+        # Compare every implemented language except the references, in parallel processes
+        from functools import partial
+        from language_grammar_generator.test_matrix import run_per_language
+        from language_grammar_generator._lang_helpers import implemented_language_codes
+
+        language_codes = [code for code in implemented_language_codes() if code not in ('zh', 'hi')]
+        check = partial(_compare_language, detailed=args.detailed, reference_code=args.reference)
+        outcomes = run_per_language(check, language_codes)
         results = {}
-        for lang_code in language_codes:
-            comparator = GoldStandardComparator(lang_code, args.detailed, reference_code=args.reference)
-            results[lang_code] = comparator.compare_all()
+        for lang_code, outcome in outcomes.items():
+            print(outcome['output'], end="")
+            results[lang_code] = outcome['passed']
 
         print("\n" + "=" * 70)
         print("ALL LANGUAGES COMPARISON SUMMARY")
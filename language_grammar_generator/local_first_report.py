@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+Language Grammar Generator - Local-First Tier Report
+
+Measures how many grammar API calls the local-first tier in GrammarProcessor
+avoids, and what it costs in accuracy, using the gold AI responses stored in
+each language's tests/conftest.py (SAMPLE_*_RESPONSE fixtures).
+
+For every fixture sentence the rule-based engine is run through
+analyzer.analyze_grammar_locally() and the confidence gate. Accuracy is the
+share of words whose coarse part of speech matches the gold response; sentences
+the gate rejects still go to Gemini, so only accepted sentences change output.
+
+USAGE:
+    python local_first_report.py
+    python local_first_report.py --language ru --threshold 0.85
+    python local_first_report.py --all-complexities --export-results
+"""
+
+import argparse
+import importlib
+import json
+import logging
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+for path in (PROJECT_ROOT, PROJECT_ROOT / "streamlit_app"):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
+
+from streamlit_app.services.generation.grammar_processor import (  # noqa: E402
+    BATCH_SIZE,
+    DEFAULT_LOCAL_CONFIDENCE_THRESHOLD,
+    GrammarProcessor,
+    is_local_analysis_confident,
+)
+
+
+def load_gold_fixtures(directory_name: str) -> List[Dict[str, Any]]:
+    """Load SAMPLE_*_RESPONSE gold responses from a language's test conftest."""
+    try:
+        conftest = importlib.import_module(f"languages.{directory_name}.tests.conftest")
+    except Exception:
+        return []
+
+    fixtures = []
+    for name in sorted(dir(conftest)):
+        if not (name.startswith("SAMPLE_") and name.endswith("RESPONSE")):
+            continue
+        try:
+            data = json.loads(getattr(conftest, name))
+        except (TypeError, ValueError):
+            continue
+        if not data.get("sentence") or not data.get("word_explanations"):
+            continue
+        complexity = next(
+            (level for level in ("beginner", "intermediate", "advanced") if level.upper() in name),
+            "beginner",
+        )
+        fixtures.append({"name": name, "complexity": complexity, **data})
+    return fixtures
+
+
+def _gold_roles(word_explanations: List[Any]) -> Dict[str, str]:
+    """Map normalized word -> gold role."""
+    roles = {}
+    for exp in word_explanations:
+        if isinstance(exp, dict):
+            word, role = exp.get("word", ""), exp.get("grammatical_role") or exp.get("role", "")
+        elif isinstance(exp, (list, tuple)) and len(exp) >= 2:
+            word, role = exp[0], exp[1]
+        else:
+            continue
+        roles[_normalize(word)] = role
+    return roles
+
+
+def _normalize(word: str) -> str:
+    return str(word).strip(".,!?;:\"'()[]«»…—-").lower()
+
+
+def role_agreement(local_explanations: List[List[Any]], gold: Dict[str, str],
+                   processor: GrammarProcessor) -> Optional[float]:
+    """Share of gold words whose coarse category the local analysis matches."""
+    local = {_normalize(exp[0]): exp[1] for exp in local_explanations if len(exp) >= 2}
+    scored = [word for word in gold if word]
+    if not scored:
+        return None
+    matches = sum(
+        1 for word in scored
+        if word in local
+        and processor._map_pos_to_category(str(local[word])) == processor._map_pos_to_category(str(gold[word]))
+    )
+    return matches / len(scored)
+
+
+def evaluate_language(language_code: str, threshold: float, complexities) -> Optional[Dict[str, Any]]:
+    """Run the local tier over one language's gold fixtures."""
+    from language_grammar_generator._lang_helpers import get_directory_name
+    from streamlit_app.language_analyzers.analyzer_registry import get_analyzer
+
+    fixtures = [f for f in load_gold_fixtures(get_directory_name(language_code)) if f["complexity"] in complexities]
+    analyzer = get_analyzer(language_code)
+    if not fixtures or analyzer is None:
+        return None
+
+    processor = GrammarProcessor()
+    rows = []
+    for fixture in fixtures:
+        analysis = analyzer.analyze_grammar_locally(fixture["sentence"], "", fixture["complexity"])
+        accepted = is_local_analysis_confident(analysis, threshold)
+        agreement = role_agreement(analysis.word_explanations, _gold_roles(fixture["word_explanations"]),
+                                   processor) if analysis else None
+        rows.append({
+            "fixture": fixture["name"],
+            "complexity": fixture["complexity"],
+            "confidence": round(analysis.confidence_score, 3) if analysis else None,
+            "accepted": accepted,
+            "agreement": round(agreement, 3) if agreement is not None else None,
+        })
+
+    total = len(rows)
+    accepted_rows = [row for row in rows if row["accepted"]]
+    calls_before = (total + BATCH_SIZE - 1) // BATCH_SIZE
+    calls_after = (total - len(accepted_rows) + BATCH_SIZE - 1) // BATCH_SIZE
+    scored_accepted = [row["agreement"] for row in accepted_rows if row["agreement"] is not None]
+    # Rejected sentences keep their Gemini result, i.e. full agreement with gold
+    accuracy_after = (
+        (sum(scored_accepted) + (total - len(scored_accepted))) / total if total else 1.0
+    )
+    return {
+        "language": language_code,
+        "sentences": total,
+        "local": len(accepted_rows),
+        "single_calls_avoided": len(accepted_rows),
+        "batch_calls_before": calls_before,
+        "batch_calls_after": calls_after,
+        "accuracy_after": round(accuracy_after, 3),
+        "details": rows,
+    }
+
+
+def print_report(results: List[Dict[str, Any]], detailed: bool) -> None:
+    """Print a summary table."""
+    print(f"{'lang':<6}{'sent':>6}{'local':>7}{'calls avoided':>15}{'batch calls':>14}{'accuracy':>10}")
+    totals = {"sentences": 0, "local": 0}
+    for result in results:
+        totals["sentences"] += result["sentences"]
+        totals["local"] += result["local"]
+        print(f"{result['language']:<6}{result['sentences']:>6}{result['local']:>7}"
+              f"{result['single_calls_avoided']:>15}"
+              f"{result['batch_calls_before']:>8} -> {result['batch_calls_after']:<3}"
+              f"{result['accuracy_after']:>9.3f}")
+        if detailed:
+            for row in result["details"]:
+                print(f"    {row['fixture']:<32} {row['complexity']:<13} conf={row['confidence']} "
+                      f"accepted={row['accepted']} agreement={row['agreement']}")
+    print(f"\nTotal: {totals['local']}/{totals['sentences']} sentences answered locally "
+          f"(accuracy is 1.000 when every sentence goes to Gemini)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Report API calls avoided by the local-first grammar tier")
+    parser.add_argument("--language", help="Language code (default: every language with gold fixtures)")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_LOCAL_CONFIDENCE_THRESHOLD,
+                        help="Confidence threshold for local results")
+    parser.add_argument("--all-complexities", action="store_true",
+                        help="Include intermediate and advanced fixtures (default: beginner only)")
+    parser.add_argument("--detailed", action="store_true", help="Show per-fixture results")
+    parser.add_argument("--export-results", action="store_true", help="Export results to JSON file")
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    from language_grammar_generator._lang_helpers import folder_to_code
+
+    complexities = ("beginner", "intermediate", "advanced") if args.all_complexities else ("beginner",)
+    codes = [args.language] if args.language else [
+        code for folder, code in sorted(folder_to_code().items())
+        if (PROJECT_ROOT / "languages" / folder / "tests" / "conftest.py").exists()
+    ]
+
+    results = [r for r in (evaluate_language(code, args.threshold, complexities) for code in codes) if r]
+    print_report(results, args.detailed)
+
+    if args.export_results:
+        with open("local_first_report.json", "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+        print("📄 Results exported to local_first_report.json")
+
+
+if __name__ == "__main__":
+    main()
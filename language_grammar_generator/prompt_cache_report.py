@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Language Grammar Generator - Prompt Cache Report
+
+Measures input tokens per sentence for batch grammar prompts before and after
+prompt-prefix factoring. Batch prompts are built with each language's real
+prompt builder and sent through a LocalContextCache, so no API key is needed.
+
+Before: every batch sends the full prompt.
+After:  the stable prefix is registered once per (language, complexity) and
+        each batch sends only its variable suffix with the cache handle.
+        Prefixes below the minimum cacheable size are still sent in full.
+
+Token counts are estimates (about 4 characters per token).
+
+USAGE:
+    python prompt_cache_report.py
+    python prompt_cache_report.py --language de --batches 25
+    python prompt_cache_report.py --all-complexities --min-prefix-tokens 0
+"""
+
+import argparse
+import json
+import logging
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+for path in (PROJECT_ROOT, PROJECT_ROOT / "streamlit_app"):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
+
+from streamlit_app.language_analyzers.prompt_cache import (  # noqa: E402
+    LocalContextCache,
+    estimate_tokens,
+)
+from streamlit_app.services.generation.grammar_processor import BATCH_SIZE  # noqa: E402
+from streamlit_app.shared_utils import GEMINI_CONTEXT_CACHE  # noqa: E402
+
+
+def sample_sentences(directory_name: str, count: int) -> List[str]:
+    """Gold fixture sentences for the language, padded with placeholders."""
+    from language_grammar_generator.local_first_report import load_gold_fixtures
+
+    sentences = [fixture["sentence"] for fixture in load_gold_fixtures(directory_name)]
+    while len(sentences) < count:
+        sentences.append(f"Sample sentence number {len(sentences) + 1} for the report.")
+    return sentences
+
+
+def _build_batch_prompt(analyzer, sentences: List[str], target_word: str, complexity: str) -> str:
+    builder = analyzer.prompt_builder
+    build = getattr(builder, "build_batch_prompt", None) or builder.build_batch_analysis_prompt
+    return build(sentences, target_word, complexity)
+
+
+def evaluate_language(language_code: str, complexities, batches: int, batch_size: int,
+                      min_prefix_tokens: int) -> Optional[Dict[str, Any]]:
+    """Simulate batches for one language and count input tokens."""
+    from language_grammar_generator._lang_helpers import get_directory_name
+    from streamlit_app.language_analyzers.analyzer_registry import get_analyzer
+
+    analyzer = get_analyzer(language_code)
+    if analyzer is None or not hasattr(analyzer, "prompt_builder"):
+        return None
+
+    pool = sample_sentences(get_directory_name(language_code), batch_size * batches)
+    cache = LocalContextCache()
+    rows = []
+    for complexity in complexities:
+        tokens_before = tokens_after = 0
+        for index in range(batches):
+            sentences = pool[index * batch_size:(index + 1) * batch_size]
+            prompt = _build_batch_prompt(analyzer, sentences, sentences[0].split()[0], complexity)
+            tokens_before += estimate_tokens(prompt)
+
+            prefix = getattr(prompt, "prefix", "")
+            registrations = cache.registrations
+            if estimate_tokens(prefix) >= min_prefix_tokens and cache.get_handle("report", prefix):
+                tokens_after += estimate_tokens(prompt.suffix)
+                if cache.registrations > registrations:
+                    tokens_after += estimate_tokens(prefix)
+            else:
+                tokens_after += estimate_tokens(prompt)
+
+        sentences_total = batches * batch_size
+        rows.append({
+            "complexity": complexity,
+            "prefix_tokens": estimate_tokens(getattr(prompt, "prefix", "")),
+            "tokens_per_sentence_before": round(tokens_before / sentences_total, 1),
+            "tokens_per_sentence_after": round(tokens_after / sentences_total, 1),
+        })
+
+    return {
+        "language": language_code,
+        "cache_registrations": cache.registrations,
+        "cache_hits": cache.hits,
+        "details": rows,
+    }
+
+
+def print_report(results: List[Dict[str, Any]], batches: int, batch_size: int) -> None:
+    """Print a summary table."""
+    print(f"{batches} batches x {batch_size} sentences per language and complexity\n")
+    print(f"{'lang':<7}{'complexity':<14}{'prefix tok':>11}{'tok/sent before':>17}{'after':>8}{'saved':>8}")
+    for result in results:
+        for row in result["details"]:
+            before, after = row["tokens_per_sentence_before"], row["tokens_per_sentence_after"]
+            saved = 1 - after / before if before else 0.0
+            print(f"{result['language']:<7}{row['complexity']:<14}{row['prefix_tokens']:>11}"
+                  f"{before:>17.1f}{after:>8.1f}{saved:>8.0%}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Report input tokens saved by prompt-prefix caching")
+    parser.add_argument("--language", help="Language code (default: every language with an analyzer)")
+    parser.add_argument("--batches", type=int, default=10, help="Batches to simulate per complexity")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE, help="Sentences per batch")
+    parser.add_argument("--min-prefix-tokens", type=int, default=GEMINI_CONTEXT_CACHE['min_prefix_tokens'],
+                        help="Smallest prefix the API will cache (0 to count every prefix)")
+    parser.add_argument("--all-complexities", action="store_true",
+                        help="Include intermediate and advanced (default: beginner only)")
+    parser.add_argument("--export-results", action="store_true", help="Export results to JSON file")
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    from language_grammar_generator._lang_helpers import folder_to_code
+
+    complexities = ("beginner", "intermediate", "advanced") if args.all_complexities else ("beginner",)
+    codes = [args.language] if args.language else [code for _, code in sorted(folder_to_code().items())]
+
+    results = [r for r in (evaluate_language(code, complexities, args.batches, args.batch_size,
+                                             args.min_prefix_tokens)
+                           for code in codes) if r]
+    print_report(results, args.batches, args.batch_size)
+
+    if args.export_results:
+        with open("prompt_cache_report.json", "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+        print("📄 Results exported to prompt_cache_report.json")
+
+
+if __name__ == "__main__":
+    main()
@@ -930,34 +930,25 @@ class Test{class_name}BatchProcessing:
 
 def main():
     parser = argparse.ArgumentParser(description="Run comprehensive tests for language analyzer")
-    parser.add_argument("--language", required=True, help="Language code to test")
+    parser.add_argument("--language", help="Language code to test")
     parser.add_argument("--coverage", action="store_true", help="Generate coverage report")
     parser.add_argument("--parallel", action="store_true", help="Run tests in parallel")
     parser.add_argument("--all-languages", action="store_true", help="Test all languages")
 
     args = parser.parse_args()
+    if not args.language and not args.all_languages:
+        parser.error("--language is required unless --all-languages is given")
 
     if args.all_languages:
-        # Test all language directories
-        languages_dir = Path("languages")
-        language_codes = [d.name for d in languages_dir.iterdir() if d.is_dir() and not d.name.startswith('.')]
-
-        results = {}
-        for lang_code in language_codes:
-            runner = TestRunner(lang_code, args.coverage, args.parallel)
-            results[lang_code] = runner.run_all_tests()
-
-        print("\n" + "=" * 70)
-        print("ALL LANGUAGES TEST SUMMARY")
-        print("=" * 70)
-
-        passed = [lang for lang, result in results.items() if result]
-        failed = [lang for lang, result in results.items() if not result]
-
-        if passed:
-            print(f"\nâœ… PASSED ({len(passed)}): {', '.join(passed)}")
-        if failed:
-            print(f"\nâŒ FAILED ({len(failed)}): {', '.join(failed)}")
+        # One pytest session for every suite of every language (see test_matrix.py)
+        from language_grammar_generator.test_matrix import print_matrix_summary, run_matrix
+        from language_grammar_generator._lang_helpers import implemented_language_codes
+
+        os.chdir(Path(__file__).resolve().parent.parent)
+        exit_code, report = run_matrix(implemented_language_codes(), workers="auto" if args.parallel else "0",
+                                       extra_args=["--cov=languages", "--cov-report=term"] if args.coverage else None)
+        print_matrix_summary(report)
+        sys.exit(exit_code)
 
     else:
         runner = TestRunner(args.language, args.coverage, args.parallel)
@@ -0,0 +1,354 @@
+#!/usr/bin/env python3
+"""
+Language Grammar Generator - Parallel Test Matrix
+
+Runs every test suite of every implemented language in ONE pytest session.
+run_all_tests.py starts a separate pytest process per suite and per language
+(8 suites x 16 languages = 128 interpreter starts, each re-importing the
+project); the matrix imports the project once, shares session-scoped
+fixtures across all languages and, when pytest-xdist is installed, spreads
+the test files over worker processes.
+
+The suites are the same ones run_all_tests.py runs, plus any other test file
+in a language's tests/ folder. Missing suite files are reported as missing
+rather than generated from templates.
+
+REPORTS (in --report-dir, default ./test_reports):
+- test_matrix.json - outcome counts and timings per language and suite
+- test_matrix.xml  - JUnit XML for CI
+
+USAGE:
+    python -m language_grammar_generator.test_matrix
+    python -m language_grammar_generator.test_matrix --languages es fr zh --workers 8
+    python -m language_grammar_generator.test_matrix --suites unit regression --with-validation
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from language_grammar_generator._lang_helpers import (
+    get_directory_name, get_file_name, implemented_language_codes,
+)
+
+DEFAULT_REPORT_DIR = "test_reports"
+
+# Suite name -> test files relative to the language folder, as run by run_all_tests.TestRunner
+SUITE_FILES = {
+    'unit': [
+        "tests/test_{file}_config.py",
+        "tests/test_{file}_prompt_builder.py",
+        "tests/test_{file}_response_parser.py",
+        "tests/test_{file}_validator.py",
+    ],
+    'integration': ["tests/test_integration.py"],
+    'batch_processing': ["test_{file}_batch.py"],
+    'content_generation': ["tests/test_content_generation.py"],
+    'system': ["tests/test_system.py"],
+    'performance': ["tests/test_performance.py"],
+    'gold_standard_comparison': ["tests/test_gold_standard_comparison.py"],
+    'regression': ["tests/test_regression.py"],
+}
+OTHER_SUITE = 'other'  # Remaining tests/test_*.py files of a language
+
+
+@dataclass
+class SuiteFiles:
+    """Test files of one suite for one language."""
+    language: str
+    suite: str
+    paths: List[Path] = field(default_factory=list)
+    missing: List[str] = field(default_factory=list)
+
+
+def collect_matrix(languages: List[str], suites: Optional[List[str]] = None,
+                   languages_dir: Path = PROJECT_ROOT / "languages") -> List[SuiteFiles]:
+    """
+    Resolve the test files for every (language, suite) pair.
+
+    Args:
+        languages: ISO language codes
+        suites: Suite names to include (all suites and OTHER_SUITE if None)
+        languages_dir: Folder holding one package per language
+
+    Returns:
+        One SuiteFiles per pair, in language then suite order
+    """
+    wanted = suites or list(SUITE_FILES) + [OTHER_SUITE]
+    matrix = []
+    for code in languages:
+        base = languages_dir / get_directory_name(code)
+        file_name = get_file_name(code)
+        claimed = set()
+        for suite, patterns in SUITE_FILES.items():
+            entry = SuiteFiles(code, suite)
+            for pattern in patterns:
+                relative = pattern.format(file=file_name)
+                path = base / relative
+                claimed.add(path)
+                if path.exists():
+                    entry.paths.append(path)
+                else:
+                    entry.missing.append(relative)
+            if suite in wanted:
+                matrix.append(entry)
+        if OTHER_SUITE in wanted:
+            others = sorted(p for p in (base / "tests").glob("test_*.py") if p not in claimed)
+            if others:
+                matrix.append(SuiteFiles(code, OTHER_SUITE, others))
+    return matrix
+
+
+class MatrixReporter:
+    """
+    pytest plugin that tallies outcomes and timings per (language, suite).
+
+    Test reports are attributed by file, so it works the same with or without
+    xdist workers (worker reports are replayed on the controlling process).
+    """
+
+    def __init__(self, matrix: List[SuiteFiles]):
+        self.rootpath = PROJECT_ROOT
+        self._owner: Dict[Path, Tuple[str, str]] = {}
+        self.results: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        for entry in matrix:
+            self.results[(entry.language, entry.suite)] = {
+                'passed': 0, 'failed': 0, 'skipped': 0, 'errors': 0,
+                'test_seconds': 0.0, 'started': None, 'finished': None,
+                'files': len(entry.paths), 'missing': list(entry.missing),
+            }
+            for path in entry.paths:
+                self._owner[path.resolve()] = (entry.language, entry.suite)
+        self.session_start = 0.0
+        self.session_seconds = 0.0
+
+    def _result_for(self, nodeid: str) -> Optional[Dict[str, Any]]:
+        owner = self._owner.get((self.rootpath / nodeid.split("::")[0]).resolve())
+        return self.results.get(owner) if owner else None
+
+    def pytest_configure(self, config):
+        self.rootpath = Path(str(config.rootpath))
+
+    def pytest_sessionstart(self, session):
+        self.session_start = time.time()
+
+    def pytest_collectreport(self, report):
+        if report.failed:
+            result = self._result_for(report.nodeid)
+            if result is not None:
+                result['errors'] += 1
+
+    def pytest_runtest_logreport(self, report):
+        result = self._result_for(report.nodeid)
+        if result is None:
+            return
+        result['test_seconds'] += report.duration
+        start, stop = getattr(report, 'start', None), getattr(report, 'stop', None)
+        if start is not None:
+            result['started'] = start if result['started'] is None else min(result['started'], start)
+            result['finished'] = stop if result['finished'] is None else max(result['finished'], stop)
+
+        if report.when == 'call':
+            result[report.outcome] += 1
+        elif report.failed:
+            result['errors'] += 1
+        elif report.skipped and report.when == 'setup':
+            result['skipped'] += 1
+
+    def pytest_sessionfinish(self, session, exitstatus):
+        self.session_seconds = time.time() - self.session_start
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Report grouped by language, with totals."""
+        languages: Dict[str, Dict[str, Any]] = {}
+        totals = {'passed': 0, 'failed': 0, 'skipped': 0, 'errors': 0}
+        for (language, suite), result in self.results.items():
+            started, finished = result['started'], result['finished']
+            ok = not result['failed'] and not result['errors'] and not result['missing']
+            languages.setdefault(language, {})[suite] = {
+                'status': 'passed' if ok else ('missing' if result['missing'] and not result['files'] else 'failed'),
+                'passed': result['passed'],
+                'failed': result['failed'],
+                'skipped': result['skipped'],
+                'errors': result['errors'],
+                'files': result['files'],
+                'missing': result['missing'],
+                'test_seconds': round(result['test_seconds'], 3),
+                'wall_seconds': round(finished - started, 3) if started is not None else 0.0,
+            }
+            for key in totals:
+                totals[key] += result[key]
+        return {
+            'session_seconds': round(self.session_seconds, 3),
+            'totals': totals,
+            'languages': languages,
+        }
+
+
+def xdist_available() -> bool:
+    try:
+        import xdist  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def run_matrix(languages: List[str], suites: Optional[List[str]] = None, workers: str = "auto",
+               report_dir: str = DEFAULT_REPORT_DIR, extra_args: Optional[List[str]] = None) -> Tuple[int, Dict[str, Any]]:
+    """
+    Run the test matrix in one pytest session and write the JSON and JUnit reports.
+
+    Args:
+        languages: ISO language codes
+        suites: Suite names (all if None)
+        workers: xdist worker count, "auto", or "0" to run in this process
+        report_dir: Folder for test_matrix.json and test_matrix.xml
+        extra_args: Additional pytest arguments
+
+    Returns:
+        (pytest exit code, report dict)
+    """
+    import pytest
+
+    matrix = collect_matrix(languages, suites)
+    paths = sorted({str(path) for entry in matrix for path in entry.paths})
+    report_path = Path(report_dir)
+    report_path.mkdir(parents=True, exist_ok=True)
+
+    args = paths + [
+        "-q", "--tb=short", "-p", "no:cacheprovider",
+        f"--rootdir={PROJECT_ROOT}",
+        f"--junitxml={report_path / 'test_matrix.xml'}",
+        "-o", "junit_suite_name=language_test_matrix",
+    ]
+    if workers != "0":
+        if xdist_available():
+            # Whole files per worker so module- and class-scoped fixtures are built once
+            args += ["-n", workers, "--dist", "loadfile"]
+        else:
+            print("⚠️ pytest-xdist not installed, running the matrix in a single process")
+    args += extra_args or []
+
+    reporter = MatrixReporter(matrix)
+    exit_code = int(pytest.main(args, plugins=[reporter]))
+    report = reporter.to_dict()
+    report['exit_code'] = exit_code
+
+    with open(report_path / "test_matrix.json", "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    return exit_code, report
+
+
+def _run_captured(check: Callable[[str], bool], language_code: str) -> Tuple[bool, float, str]:
+    """Run one per-language check, returning (passed, seconds, printed output)."""
+    output = io.StringIO()
+    start = time.time()
+    with contextlib.redirect_stdout(output):
+        try:
+            passed = bool(check(language_code))
+        except Exception as e:
+            print(f"❌ {language_code}: {e}")
+            passed = False
+    return passed, time.time() - start, output.getvalue()
+
+
+def run_per_language(check: Callable[[str], bool], languages: List[str],
+                     workers: Optional[int] = None) -> Dict[str, Dict[str, Any]]:
+    """
+    Run a per-language check (validation, gold standard comparison) in parallel processes.
+
+    Each language's printed output is captured and returned instead of being
+    interleaved on the console.
+
+    Args:
+        check: Picklable function taking a language code and returning pass/fail
+        languages: ISO language codes
+        workers: Process count (CPU count if None)
+
+    Returns:
+        {language_code: {passed, seconds, output}} in the order of languages
+    """
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {code: pool.submit(_run_captured, check, code) for code in languages}
+        results = {}
+        for code, future in futures.items():
+            passed, seconds, output = future.result()
+            results[code] = {'passed': passed, 'seconds': round(seconds, 3), 'output': output}
+    return results
+
+
+def validate_language(language_code: str) -> bool:
+    """validate_implementation.py check for one language."""
+    from language_grammar_generator.validate_implementation import ImplementationValidator
+    return ImplementationValidator(language_code).validate_all()
+
+
+def compare_language(language_code: str) -> bool:
+    """compare_with_gold_standard.py check for one language against the zh reference."""
+    from language_grammar_generator.compare_with_gold_standard import GoldStandardComparator
+    return GoldStandardComparator(language_code).compare_all()
+
+
+def print_matrix_summary(report: Dict[str, Any]) -> None:
+    """Print one line per language with failing suites spelled out."""
+    print("\n" + "=" * 70)
+    print("TEST MATRIX SUMMARY")
+    print("=" * 70)
+    for language, suites in report['languages'].items():
+        failing = [name for name, suite in suites.items() if suite['status'] == 'failed']
+        missing = [name for name, suite in suites.items() if suite['status'] == 'missing']
+        seconds = sum(suite['test_seconds'] for suite in suites.values())
+        status = "❌" if failing else ("⚠️" if missing else "✅")
+        detail = "".join(f" | {label}: {', '.join(names)}" for label, names in
+                         (("failed", failing), ("missing", missing)) if names)
+        print(f"{status} {language:<6} {seconds:7.2f}s{detail}")
+    totals = report['totals']
+    print(f"\n⏱️ Session: {report['session_seconds']:.2f}s | "
+          f"passed {totals['passed']}, failed {totals['failed']}, "
+          f"skipped {totals['skipped']}, errors {totals['errors']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run all language test suites in one parallel pytest session")
+    parser.add_argument("--languages", nargs="+", help="Language codes (default: every implemented language)")
+    parser.add_argument("--suites", nargs="+", choices=list(SUITE_FILES) + [OTHER_SUITE], help="Suites to run (default: all)")
+    parser.add_argument("--workers", default="auto", help="pytest-xdist workers, or 0 for a single process")
+    parser.add_argument("--report-dir", default=DEFAULT_REPORT_DIR, help="Folder for the JSON and JUnit reports")
+    parser.add_argument("--with-validation", action="store_true",
+                        help="Also run validate_implementation and the gold standard comparison per language")
+    args = parser.parse_args()
+
+    os.chdir(PROJECT_ROOT)  # The validators resolve languages/ relative to the working directory
+    languages = args.languages or implemented_language_codes()
+    exit_code, report = run_matrix(languages, args.suites, args.workers, args.report_dir)
+
+    if args.with_validation:
+        workers = None if args.workers in ("auto", "0") else int(args.workers)
+        for name, check in (('validation', validate_language), ('gold_standard', compare_language)):
+            results = run_per_language(check, languages, workers)
+            report[name] = {code: {k: v for k, v in result.items() if k != 'output'} for code, result in results.items()}
+            if any(not result['passed'] for result in results.values()):
+                exit_code = exit_code or 1
+        report['exit_code'] = exit_code
+        with open(Path(args.report_dir) / "test_matrix.json", "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+    print_matrix_summary(report)
+    print(f"📄 Reports written to {Path(args.report_dir) / 'test_matrix.json'} and test_matrix.xml")
+    sys.exit(exit_code)
+
+
+if __name__ == "__main__":
+    main()
@@ -495,21 +495,24 @@ class ImplementationValidator:
 
 def main():
     parser = argparse.ArgumentParser(description="Validate language analyzer implementation")
-    parser.add_argument("--language", required=True, help="Language code to validate")
+    parser.add_argument("--language", help="Language code to validate")
     parser.add_argument("--verbose", action="store_true", help="Verbose output")
     parser.add_argument("--all-languages", action="store_true", help="Validate all languages")
 
     args = parser.parse_args()
+    if not args.language and not args.all_languages:
+        parser.error("--language is required unless --all-languages is given")
 
     if args.all_languages:
-        # Validate all language directories
-        languages_dir = Path("languages")
-        language_codes = [d.name for d in languages_dir.iterdir() if d.is_dir() and not d.name.startswith('.')]
+        # Validate every implemented language in parallel processes, printing each report in order
+        from language_grammar_generator.test_matrix import run_per_language, validate_language
+        from language_grammar_generator._lang_helpers import implemented_language_codes
 
+        outcomes = run_per_language(validate_language, implemented_language_codes())
         results = {}
-        for lang_code in language_codes:
-            validator = ImplementationValidator(lang_code)
-            results[lang_code] = validator.validate_all()
+        for lang_code, outcome in outcomes.items():
+            print(outcome['output'], end="")
+            results[lang_code] = outcome['passed']
 
         print("\n" + "=" * 60)
         print("ALL LANGUAGES VALIDATION SUMMARY")
@@ -9,6 +9,7 @@ import yaml
 import os
 from pathlib import Path
 from typing import Dict, List, Any, Optional
+from streamlit_app.language_analyzers.language_data_cache import load_language_data
 
 class ArConfig:
     """
@@ -85,9 +86,8 @@ class ArConfig:
         """Load grammatical roles from external JSON file (fallback)"""
         config_path = Path(__file__).parent / "ar_config.json"
         if config_path.exists():
-            with open(config_path, 'r', encoding='utf-8') as f:
-                config = json.load(f)
-                return config.get('grammatical_roles', self._get_default_roles())
+            config = load_language_data(config_path)
+            return config.get('grammatical_roles', self._get_default_roles())
         return self._get_default_roles()
 
     def _get_default_roles(self) -> Dict[str, Dict[str, str]]:
@@ -160,9 +160,8 @@ class ArConfig:
         """Load color schemes from external configuration"""
         config_path = Path(__file__).parent / "ar_config.json"
         if config_path.exists():
-            with open(config_path, 'r', encoding='utf-8') as f:
-                config = json.load(f)
-                return config.get('color_schemes', self._get_default_color_schemes())
+            config = load_language_data(config_path)
+            return config.get('color_schemes', self._get_default_color_schemes())
         return self._get_default_color_schemes()
 
     def _get_default_color_schemes(self) -> Dict[str, Dict[str, str]]:
@@ -305,9 +304,8 @@ class ArConfig:
         """Load prompt templates from external configuration"""
         config_path = Path(__file__).parent / "ar_config.json"
         if config_path.exists():
-            with open(config_path, 'r', encoding='utf-8') as f:
-                config = json.load(f)
-                return config.get('prompt_templates', self._get_default_prompt_templates())
+            config = load_language_data(config_path)
+            return config.get('prompt_templates', self._get_default_prompt_templates())
         return self._get_default_prompt_templates()
 
     def _get_default_prompt_templates(self) -> Dict[str, str]:
@@ -343,8 +341,6 @@ Return ONLY valid JSON in this exact format:
             'batch': """
 You are an expert linguist specializing in Arabic grammar analysis. Your task is to analyze Arabic sentences and provide contextual word meanings.
 
-Sentences: {sentences}
-Target word: "{target_word}"
 Complexity level: {complexity}
 
 MANDATORY: Respond with VALID JSON only. No explanations, no markdown, no code blocks.
@@ -385,6 +381,9 @@ EXAMPLES:
 DO NOT add fields like "case", "person", "type", "other". ONLY use "word", "grammatical_role", "meaning".
 
 Grammatical roles: {grammatical_roles}
+
+Sentences: {sentences}
+Target word: "{target_word}"
 """,
             'sentence_generation': """
 You are an expert in Modern Standard Arabic.
@@ -489,8 +488,7 @@ Return only the formatted text.
         """Load YAML file with error handling"""
         try:
             if path.exists():
-                with open(path, 'r', encoding='utf-8') as f:
-                    return yaml.safe_load(f) or {}
+                return load_language_data(path) or {}
             else:
                 print(f"Warning: YAML file not found: {path}")
                 return {}
@@ -502,8 +500,7 @@ Return only the formatted text.
         """Load JSON file with error handling"""
         try:
             if path.exists():
-                with open(path, 'r', encoding='utf-8') as f:
-                    return json.load(f)
+                return load_language_data(path)
             else:
                 print(f"Warning: JSON file not found: {path}")
                 return {}
@@ -5,6 +5,7 @@
 import logging
 from typing import Dict, List, Any, Optional
 from .ar_config import ArConfig
+from streamlit_app.language_analyzers.prompt_cache import cacheable_batch_prompt
 
 logger = logging.getLogger(__name__)
 
@@ -35,6 +36,7 @@ class ArPromptBuilder:
 
         return prompt
 
+    @cacheable_batch_prompt
     def build_batch_prompt(self, sentences: List[str], target_word: str, complexity: str) -> str:
         """
         Build prompt for batch sentence analysis.
@@ -96,16 +96,14 @@ def mock_arabic_responses(test_data_dir):
         }
 
 @pytest.fixture
-def arabic_config():
+def arabic_config(config_factory):
     """Create Arabic config instance for testing"""
-    from ..domain.ar_config import ArConfig
-    return ArConfig()
+    return config_factory("ar")
 
 @pytest.fixture
-def arabic_analyzer(arabic_config):
+def arabic_analyzer(analyzer_factory, arabic_config):
     """Create Arabic analyzer instance for testing"""
-    from ..ar_analyzer import ArAnalyzer
-    return ArAnalyzer(config=arabic_config)
+    return analyzer_factory("ar", config=arabic_config)
 
 @pytest.fixture
 def arabic_prompt_builder(arabic_config):
@@ -15,6 +15,7 @@ from pathlib import Path
 from typing import Dict, List, Any, Optional
 from dataclasses import dataclass, field
 from .zh_types import AnalysisRequest, AnalysisResult, BatchAnalysisResult, ParsedWord, ParsedSentence, ParseResult, ValidationResult
+from streamlit_app.language_analyzers.language_data_cache import load_language_data
 
 logger = logging.getLogger(__name__)
 
@@ -80,12 +81,8 @@ Return ONLY valid JSON in this EXACT shape (no prose, no markdown fences):
 _BATCH_PROMPT = """\
 You are an expert linguist teaching Simplified Chinese to learners.
 
-Analyze the following Chinese sentences. Apply the SAME rules to every sentence.
+Analyze the Chinese sentences listed at the end. Apply the SAME rules to every sentence.
 
-Sentences (numbered):
-{{sentences}}
-
-Target word: {{target_word}}
 Complexity level: {{complexity}}
 
 **TOKENIZATION RULES (CRITICAL):**
@@ -102,7 +99,7 @@ Complexity level: {{complexity}}
     conjunction, interjection, determiner, other
   - "individual_meaning": rich, CONTEXT-SPECIFIC 1-2 sentence learner explanation
     of the word's role in THAT sentence. Never a generic dictionary entry.
-- Target word "{{target_word}}" gets the richest explanation in each sentence.
+- The target word gets the richest explanation in each sentence.
 - "overall_structure" / "key_features" must describe the sentence's specific pattern.
 
 Return ONLY valid JSON (no prose, no markdown fences):
@@ -126,6 +123,11 @@ Return ONLY valid JSON (no prose, no markdown fences):
 }
 
 CRITICAL: Return one batch_results entry per input sentence, in the same order.
+
+Sentences (numbered):
+{{sentences}}
+
+Target word: {{target_word}}
 """
 
 
@@ -161,16 +163,14 @@ class ZhConfig:
 
     def _load_yaml(self, path: Path) -> Dict[str, Any]:
         try:
-            with open(path, 'r', encoding='utf-8') as f:
-                return yaml.safe_load(f) or {}
+            return load_language_data(path) or {}
         except Exception as e:
             logger.error(f"Failed to load YAML file {path}: {e}")
             return {}
 
     def _load_json(self, path: Path) -> Dict[str, Any]:
         try:
-            with open(path, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            return load_language_data(path) or {}
         except Exception as e:
             logger.error(f"Failed to load JSON file {path}: {e}")
             return {}
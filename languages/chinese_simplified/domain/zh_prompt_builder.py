@@ -8,8 +8,9 @@ Handles ALL prompt generation:
 
 import logging
 from typing import List, Optional
-from jinja2 import Template, Environment, BaseLoader
+from jinja2 import Environment, BaseLoader
 from .zh_config import ZhConfig
+from streamlit_app.language_analyzers.prompt_cache import cacheable_batch_prompt, compile_template
 
 logger = logging.getLogger(__name__)
 
@@ -50,7 +51,7 @@ Complexity level: {complexity}
 Language: Chinese Simplified (Simplified characters only)"""
 
         # If a proper template exists in config, use it but still enrich
-        template = self.jinja_env.from_string(template_str)
+        template = compile_template(template_str)
         context = {
             "sentence": sentence,
             "target_word": target_word or "",
@@ -64,6 +65,7 @@ Language: Chinese Simplified (Simplified characters only)"""
         except Exception:
             return f"Analyze the following sentence: {sentence} (target word: {target_word}, complexity: {complexity})"
 
+    @cacheable_batch_prompt
     def build_batch_analysis_prompt(self, sentences: List[str], target_word: Optional[str], complexity: str) -> str:
         """Build a strong batch prompt for Chinese Simplified that forces rich, context-specific grammar explanations and forbids generic labels."""
         template_str = self.config.prompt_templates.get("batch", self.config.prompt_templates.get("single", ""))
@@ -100,7 +102,7 @@ Language: Chinese Simplified (use only Simplified characters)
 Return ONLY the structured explanations, no extra text."""
 
         # If a custom template exists in config, use it
-        template = self.jinja_env.from_string(template_str)
+        template = compile_template(template_str)
         sentences_text = "\n".join(f"{i+1}. {sent}" for i, sent in enumerate(sentences))
         context = {
             "sentences": sentences_text,
@@ -183,45 +183,18 @@ class ZhAnalyzer(BaseGrammarAnalyzer):
             prompt = self.prompt_builder.build_batch_analysis_prompt(sentences, primary_target, complexity)
             ai_response = self._call_ai(prompt, gemini_api_key)
 
-            results = self.response_parser.parse_batch_response(ai_response, sentences, complexity, primary_target)
-
-            grammar_analyses: List[GrammarAnalysis] = []
-            for result_dict, sentence, tw in zip(results, sentences, target_words):
-                if not isinstance(result_dict, dict):
-                    result_dict = self.fallbacks.create_fallback(sentence, complexity)
-
-                # Normalize the AI's explanation keys (sentence_structure / function_of_X)
-                result_dict = self._normalize_explanations(result_dict, target_word=tw)
-
-                validation = self.validator.validate_result(result_dict, sentence)
-                quality = self._safe_quality_check(result_dict)
-
-                base_conf = self._get_confidence(validation, default=result_dict.get('confidence', 0.5))
-                quality_score = quality.get('quality_score', 1.0) if isinstance(quality, dict) else 1.0
-                adjusted_conf = min(base_conf * quality_score, 1.0)
-
-                result_dict['confidence'] = adjusted_conf
-                result_dict['grammar_summary'] = self._build_grammar_summary(result_dict)
-                html_output = self._generate_html_output(result_dict, sentence, complexity)
-
-                grammar_analyses.append(GrammarAnalysis(
-                    sentence=sentence,
-                    target_word=tw or "",
-                    language_code=self.language_code,
-                    complexity_level=complexity,
-                    grammatical_elements=result_dict.get('elements', {}),
-                    explanations=result_dict.get('explanations', {}),
-                    color_scheme=self.get_color_scheme(complexity),
-                    html_output=html_output,
-                    confidence_score=adjusted_conf,
-                    word_explanations=result_dict.get('word_explanations', [])
-                ))
-            return grammar_analyses
+            return self._analyze_received_batch(ai_response, sentences, target_words, complexity)
 
         except Exception as e:
             logger.error(f"[zh v{_ZH_ANALYZER_VERSION}] Batch analysis failed: {e}", exc_info=True)
+            retried = self._retry_failed_batch(sentences, e, lambda subset: self.batch_analyze_grammar(
+                [sentences[i] for i in subset], [target_words[i] for i in subset], complexity, gemini_api_key))
+            # Fallback analyses for the sentences the retries did not recover
             fallback_analyses: List[GrammarAnalysis] = []
-            for sentence, tw in zip(sentences, target_words):
+            for sentence, tw, analysis in zip(sentences, target_words, retried):
+                if analysis is not None:
+                    fallback_analyses.append(analysis)
+                    continue
                 fb = self.fallbacks.create_fallback(sentence, complexity)
                 fb['grammar_summary'] = self._build_grammar_summary(fb)
                 html_output = self._generate_html_output(fb, sentence, complexity)
@@ -239,6 +212,49 @@ class ZhAnalyzer(BaseGrammarAnalyzer):
                 ))
             return fallback_analyses
 
+    def analyze_batch_response(self, ai_response: str, sentences: List[str], target_word: str,
+                               complexity: str) -> List[GrammarAnalysis]:
+        """Build one GrammarAnalysis per sentence from a batch response that has already been received.
+
+        ``target_word`` may be a single string or the per-sentence target_words list.
+        """
+        target_words = [target_word] * len(sentences) if isinstance(target_word, str) else list(target_word)
+        primary_target = target_words[0] if target_words else ""
+        results = self.response_parser.parse_batch_response(ai_response, sentences, complexity, primary_target)
+
+        grammar_analyses: List[GrammarAnalysis] = []
+        for result_dict, sentence, tw in zip(results, sentences, target_words):
+            if not isinstance(result_dict, dict):
+                result_dict = self.fallbacks.create_fallback(sentence, complexity)
+
+            # Normalize the AI's explanation keys (sentence_structure / function_of_X)
+            result_dict = self._normalize_explanations(result_dict, target_word=tw)
+
+            validation = self.validator.validate_result(result_dict, sentence)
+            quality = self._safe_quality_check(result_dict)
+
+            base_conf = self._get_confidence(validation, default=result_dict.get('confidence', 0.5))
+            quality_score = quality.get('quality_score', 1.0) if isinstance(quality, dict) else 1.0
+            adjusted_conf = min(base_conf * quality_score, 1.0)
+
+            result_dict['confidence'] = adjusted_conf
+            result_dict['grammar_summary'] = self._build_grammar_summary(result_dict)
+            html_output = self._generate_html_output(result_dict, sentence, complexity)
+
+            grammar_analyses.append(GrammarAnalysis(
+                sentence=sentence,
+                target_word=tw or "",
+                language_code=self.language_code,
+                complexity_level=complexity,
+                grammatical_elements=result_dict.get('elements', {}),
+                explanations=result_dict.get('explanations', {}),
+                color_scheme=self.get_color_scheme(complexity),
+                html_output=html_output,
+                confidence_score=adjusted_conf,
+                word_explanations=result_dict.get('word_explanations', [])
+            ))
+        return grammar_analyses
+
     # ===================================================================
     # HELPERS
     # ===================================================================
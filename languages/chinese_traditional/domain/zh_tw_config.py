@@ -36,6 +36,7 @@ from enum import Enum
 from pathlib import Path
 from typing import Dict, List, Any
 from dataclasses import dataclass
+from streamlit_app.language_analyzers.language_data_cache import load_language_data
 
 logger = logging.getLogger(__name__)
 
@@ -127,8 +128,6 @@ CRITICAL: Provide COMPREHENSIVE explanations for EVERY element, explaining relat
             "batch": """
 Analyze these Chinese Traditional sentences and provide detailed grammatical breakdowns for each.
 
-Sentences: {{sentences}}
-Target word: {{target_word}}
 Complexity level: {{complexity}}
 
 For EACH sentence, provide comprehensive analysis including:
@@ -158,6 +157,9 @@ Return a JSON object with exactly this structure:
 }
 
 CRITICAL: Provide COMPREHENSIVE explanations for ALL elements in EACH sentence.
+
+Sentences: {{sentences}}
+Target word: {{target_word}}
 """
         }
 
@@ -167,8 +169,7 @@ CRITICAL: Provide COMPREHENSIVE explanations for ALL elements in EACH sentence.
     def _load_yaml(self, path: Path) -> Dict[str, Any]:
         """Load YAML file with error handling."""
         try:
-            with open(path, 'r', encoding='utf-8') as f:
-                return yaml.safe_load(f) or {}
+            return load_language_data(path) or {}
         except Exception as e:
             logger.error(f"Failed to load YAML file {path}: {e}")
             return {}
@@ -176,8 +177,7 @@ CRITICAL: Provide COMPREHENSIVE explanations for ALL elements in EACH sentence.
     def _load_json(self, path: Path) -> Dict[str, Any]:
         """Load JSON file with error handling."""
         try:
-            with open(path, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            return load_language_data(path) or {}
         except Exception as e:
             logger.error(f"Failed to load JSON file {path}: {e}")
             return {}
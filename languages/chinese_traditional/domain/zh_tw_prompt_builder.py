@@ -30,9 +30,10 @@ TEMPLATE PHILOSOPHY:
 
 import logging
 from typing import Dict, Any, Optional, List
-from jinja2 import Template, Environment, BaseLoader
+from jinja2 import Environment, BaseLoader
 
 from .zh_tw_config import ZhTwConfig, ComplexityLevel
+from streamlit_app.language_analyzers.prompt_cache import cacheable_batch_prompt, compile_template
 
 logger = logging.getLogger(__name__)
 
@@ -96,7 +97,7 @@ class ZhTwPromptBuilder:
             logger.error("Single analysis template not found in config")
             return self._build_fallback_single_prompt(sentence, target_word, complexity)
 
-        template = self.jinja_env.from_string(template_str)
+        template = compile_template(template_str)
 
         context = {
             "sentence": sentence,
@@ -139,7 +140,7 @@ class ZhTwPromptBuilder:
             logger.error("Batch analysis template not found in config")
             return self._build_fallback_batch_prompt(sentences, target_word, complexity)
 
-        template = self.jinja_env.from_string(template_str)
+        template = compile_template(template_str)
 
         # Format sentences for template
         sentences_text = "\n".join(f"{i+1}. {sent}" for i, sent in enumerate(sentences))
@@ -265,7 +266,7 @@ CRITICAL: Provide COMPREHENSIVE explanations for ALL elements in EACH sentence.
             # Use template if available
             template_str = self.config.prompt_templates.get("batch", "")
             if template_str:
-                template = self.jinja_env.from_string(template_str)
+                template = compile_template(template_str)
                 context = {
                     'sentences': sentences,
                     'target_word': target_word,
@@ -280,6 +281,7 @@ CRITICAL: Provide COMPREHENSIVE explanations for ALL elements in EACH sentence.
             logger.error(f"Failed to build batch prompt: {e}")
             return self._build_fallback_batch_prompt(sentences, target_word, complexity)
 
+    @cacheable_batch_prompt
     def build_batch_prompt(self, sentences: list, target_word: str, complexity: str) -> str:
         """Build batch prompt - compatibility method that delegates to build_batch_analysis_prompt."""
         return self.build_batch_analysis_prompt(sentences, target_word, complexity)
\ No newline at end of file
@@ -0,0 +1,52 @@
+# Shared pytest fixtures for all language analyzer tests
+#
+# When the whole matrix runs in one session
+# (python -m language_grammar_generator.test_matrix) each analyzer and config
+# class is imported once per session instead of once per test. Instances are
+# still built fresh for every call, so a test that mutates its analyzer or
+# config cannot leak into the next one. The analyzer and config fixtures in each
+# language's tests/conftest.py delegate to these; other fixtures stay there.
+
+import importlib
+import os
+import sys
+
+import pytest
+
+# Same paths the per-language conftests add
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'streamlit_app'))
+
+
+def _load_class(language_code, module_suffix, class_suffix):
+    from language_grammar_generator._lang_helpers import get_class_prefix, get_directory_name, get_file_name
+    folder = get_directory_name(language_code)
+    file_name = get_file_name(language_code)
+    module = importlib.import_module(f"languages.{folder}.{module_suffix.format(file=file_name)}")
+    return getattr(module, f"{get_class_prefix(language_code)}{class_suffix}")
+
+
+@pytest.fixture(scope="session")
+def analyzer_factory():
+    """Factory building a new analyzer for a language code; the class is loaded once per session."""
+    classes = {}
+
+    def build(language_code, **kwargs):
+        if language_code not in classes:
+            classes[language_code] = _load_class(language_code, "{file}_analyzer", "Analyzer")
+        return classes[language_code](**kwargs)
+
+    return build
+
+
+@pytest.fixture(scope="session")
+def config_factory():
+    """Factory building a new configuration for a language code; the class is loaded once per session."""
+    classes = {}
+
+    def build(language_code):
+        if language_code not in classes:
+            classes[language_code] = _load_class(language_code, "domain.{file}_config", "Config")
+        return classes[language_code]()
+
+    return build
@@ -12,6 +12,7 @@ import yaml
 import logging
 from pathlib import Path
 from typing import Dict, List, Any, Optional
+from streamlit_app.language_analyzers.language_data_cache import load_language_data
 
 logger = logging.getLogger(__name__)
 
@@ -247,8 +248,7 @@ class EnConfig:
         """Load YAML file if it exists, return None on failure."""
         if path.exists():
             try:
-                with open(path, "r", encoding="utf-8") as f:
-                    return yaml.safe_load(f)
+                return load_language_data(path)
             except Exception as e:
                 logger.warning(f"Failed to load YAML {path}: {e}")
         return None
@@ -257,8 +257,7 @@ class EnConfig:
         """Load JSON file if it exists, return None on failure."""
         if path.exists():
             try:
-                with open(path, "r", encoding="utf-8") as f:
-                    return json.load(f)
+                return load_language_data(path)
             except Exception as e:
                 logger.warning(f"Failed to load JSON {path}: {e}")
         return None
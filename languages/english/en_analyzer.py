@@ -189,36 +189,18 @@ class EnAnalyzer(BaseGrammarAnalyzer):
                 sentences, target_word, complexity
             )
             ai_response = self._call_ai(prompt, gemini_api_key)
-            results = self.response_parser.parse_batch_response(
-                ai_response, sentences, complexity, target_word
-            )
-
-            grammar_analyses = []
-            for result, sentence in zip(results, sentences):
-                validated = self.validator.validate_result(result, sentence)
-                html_output = self._generate_html_output(validated, sentence, complexity)
-                grammar_analyses.append(
-                    GrammarAnalysis(
-                        sentence=sentence,
-                        target_word=target_word or "",
-                        language_code=self.language_code,
-                        complexity_level=complexity,
-                        grammatical_elements=validated.get("elements", {}),
-                        explanations=validated.get("explanations", {}),
-                        color_scheme=self.get_color_scheme(complexity),
-                        html_output=html_output,
-                        confidence_score=validated.get("confidence", 0.0),
-                        word_explanations=self._format_word_explanations(
-                            validated.get("word_explanations", [])
-                        ),
-                    )
-                )
-            return grammar_analyses
+            return self._analyze_received_batch(ai_response, sentences, target_word, complexity)
 
         except Exception as exc:
             logger.error(f"Batch analysis failed: {exc}")
+            retried = self._retry_failed_batch(sentences, exc, lambda subset: self.batch_analyze_grammar(
+                [sentences[i] for i in subset], target_word, complexity, gemini_api_key))
+            # Fallback analyses for the sentences the retries did not recover
             fallback_analyses = []
-            for sentence in sentences:
+            for sentence, analysis in zip(sentences, retried):
+                if analysis is not None:
+                    fallback_analyses.append(analysis)
+                    continue
                 fallback = self.en_fallbacks.create_fallback(sentence, complexity)
                 html_output = self._generate_html_output(fallback, sentence, complexity)
                 fallback_analyses.append(
@@ -239,6 +221,35 @@ class EnAnalyzer(BaseGrammarAnalyzer):
                 )
             return fallback_analyses
 
+    def analyze_batch_response(self, ai_response: str, sentences: List[str], target_word: str,
+                               complexity: str) -> List[GrammarAnalysis]:
+        """Build one GrammarAnalysis per sentence from a batch response that has already been received."""
+        results = self.response_parser.parse_batch_response(
+            ai_response, sentences, complexity, target_word
+        )
+
+        grammar_analyses = []
+        for result, sentence in zip(results, sentences):
+            validated = self.validator.validate_result(result, sentence)
+            html_output = self._generate_html_output(validated, sentence, complexity)
+            grammar_analyses.append(
+                GrammarAnalysis(
+                    sentence=sentence,
+                    target_word=target_word or "",
+                    language_code=self.language_code,
+                    complexity_level=complexity,
+                    grammatical_elements=validated.get("elements", {}),
+                    explanations=validated.get("explanations", {}),
+                    color_scheme=self.get_color_scheme(complexity),
+                    html_output=html_output,
+                    confidence_score=validated.get("confidence", 0.0),
+                    word_explanations=self._format_word_explanations(
+                        validated.get("word_explanations", [])
+                    ),
+                )
+            )
+        return grammar_analyses
+
     # ------------------------------------------------------------------
     # AI call — lazy import to support test mocking (per CLAUDE.md)
     # ------------------------------------------------------------------
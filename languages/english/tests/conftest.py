@@ -5,7 +5,6 @@ Pytest fixtures for English analyzer tests.
 import pytest
 from unittest.mock import MagicMock, patch
 
-from languages.english.domain.en_config import EnConfig
 from languages.english.domain.en_fallbacks import EnFallbacks
 from languages.english.domain.en_prompt_builder import EnPromptBuilder
 from languages.english.domain.en_response_parser import EnResponseParser
@@ -13,8 +12,8 @@ from languages.english.domain.en_validator import EnValidator
 
 
 @pytest.fixture
-def config():
-    return EnConfig()
+def config(config_factory):
+    return config_factory("en")
 
 
 @pytest.fixture
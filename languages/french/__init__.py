@@ -0,0 +1 @@
+# French language analyzer package
\ No newline at end of file
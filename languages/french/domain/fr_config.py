@@ -42,6 +42,7 @@ from pathlib import Path
 from typing import Dict, List, Any
 from dataclasses import dataclass
 from pydantic import BaseModel, Field
+from streamlit_app.language_analyzers.language_data_cache import load_language_data
 
 logger = logging.getLogger(__name__)
 
@@ -167,8 +168,6 @@ Important:
             "batch": """
 Analyze these French sentences and provide detailed grammatical breakdowns for each.
 
-Sentences: {{sentences}}
-Target word: {{target_word}}
 Complexity level: {{complexity}}
 
 Return a JSON object with exactly this structure:
@@ -202,6 +201,9 @@ Important:
 - Assign appropriate grammatical roles
 - Provide meaningful explanations
 - Use only valid JSON format
+
+Sentences: {{sentences}}
+Target word: {{target_word}}
 """
         }
         self.patterns = self._load_yaml(config_dir / "fr_patterns.yaml")
@@ -217,16 +219,14 @@ Important:
 
     def _load_yaml(self, path: Path) -> Dict[str, Any]:
         try:
-            with open(path, 'r', encoding='utf-8') as f:
-                return yaml.safe_load(f) or {}
+            return load_language_data(path) or {}
         except Exception as e:
             logger.error(f"Failed to load YAML file {path}: {e}")
             return {}
 
     def _load_json(self, path: Path) -> Dict[str, Any]:
         try:
-            with open(path, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            return load_language_data(path) or {}
         except Exception as e:
             logger.error(f"Failed to load JSON file {path}: {e}")
             return {}
@@ -36,8 +36,8 @@ INTEGRATION:
 
 import logging
 from typing import List
-from jinja2 import Template
 from .fr_config import FrConfig
+from streamlit_app.language_analyzers.prompt_cache import cacheable_batch_prompt, compile_template
 
 logger = logging.getLogger(__name__)
 
@@ -70,8 +70,8 @@ class FrPromptBuilder:
         4. Set up error handling for template rendering
         """
         self.config = config
-        self.single_template = Template(self.config.prompt_templates['single'])
-        self.batch_template = Template(self.config.prompt_templates['batch'])
+        self.single_template = compile_template(self.config.prompt_templates['single'])
+        self.batch_template = compile_template(self.config.prompt_templates['batch'])
 
     def build_single_prompt(self, sentence: str, target_word: str, complexity: str) -> str:
         """
@@ -108,6 +108,7 @@ Complexity: {complexity}
 Identify the grammatical role of each word and explain gender agreement, verb conjugations, and French-specific features.
 Return JSON with grammatical analysis."""
 
+    @cacheable_batch_prompt
     def build_batch_prompt(self, sentences: List[str], target_word: str, complexity: str) -> str:
         """
         Build prompt for batch French sentence analysis.
@@ -0,0 +1 @@
+# German language analyzer package
\ No newline at end of file
@@ -399,35 +399,43 @@ class DeAnalyzer(BaseGrammarAnalyzer):
                 logger.warning("AI API call failed for batch, using individual fallbacks")
                 return [self._create_fallback_analysis(sentence, target_word, complexity) for sentence in sentences]
 
-            # Parse batch response
-            batch_results = self.response_parser.parse_batch_response(
-                ai_response, sentences, complexity, target_word
-            )
-
-            # Validate and build analysis objects
-            analyses = []
-            for i, result in enumerate(batch_results):
-                try:
-                    # Validate result
-                    validated_result = self.validator.validate_result(result, sentences[i])
-
-                    # Build analysis
-                    analysis = self._build_analysis_result(
-                        sentences[i], target_word, complexity, validated_result
-                    )
-                    analyses.append(analysis)
-
-                except Exception as e:
-                    logger.error(f"Failed to process sentence {i+1}: {e}")
-                    analyses.append(self._create_fallback_analysis(sentences[i], target_word, complexity))
-
-            logger.info(f"Batch analysis completed: {len(analyses)} results")
-            return analyses
+            return self._analyze_received_batch(ai_response, sentences, target_word, complexity)
 
         except Exception as e:
             logger.error(f"Batch analysis failed: {e}")
-            # Return fallbacks for all sentences
-            return [self._create_fallback_analysis(sentence, target_word, complexity) for sentence in sentences]
+            retried = self._retry_failed_batch(sentences, e, lambda subset: self.batch_analyze_grammar(
+                [sentences[i] for i in subset], target_word, complexity, gemini_api_key))
+            # Fallbacks for the sentences the retries did not recover
+            return [analysis or self._create_fallback_analysis(sentence, target_word, complexity)
+                    for sentence, analysis in zip(sentences, retried)]
+
+    def analyze_batch_response(self, ai_response: str, sentences: List[str], target_word: str,
+                               complexity: str) -> List[GrammarAnalysis]:
+        """Build one GrammarAnalysis per sentence from a batch response that has already been received."""
+        # Parse batch response
+        batch_results = self.response_parser.parse_batch_response(
+            ai_response, sentences, complexity, target_word
+        )
+
+        # Validate and build analysis objects
+        analyses = []
+        for i, result in enumerate(batch_results):
+            try:
+                # Validate result
+                validated_result = self.validator.validate_result(result, sentences[i])
+
+                # Build analysis
+                analysis = self._build_analysis_result(
+                    sentences[i], target_word, complexity, validated_result
+                )
+                analyses.append(analysis)
+
+            except Exception as e:
+                logger.error(f"Failed to process sentence {i+1}: {e}")
+                analyses.append(self._create_fallback_analysis(sentences[i], target_word, complexity))
+
+        logger.info(f"Batch analysis completed: {len(analyses)} results")
+        return analyses
 
     def _create_fallback_analysis(self, sentence: str, target_word: str, complexity: str) -> GrammarAnalysis:
         """Create fallback analysis when batch processing fails"""
@@ -9,6 +9,7 @@ import yaml
 import os
 from pathlib import Path
 from typing import Dict, List, Any, Optional
+from streamlit_app.language_analyzers.language_data_cache import load_language_data
 
 class DeConfig:
     """
@@ -53,8 +54,7 @@ class DeConfig:
         """Load YAML configuration file"""
         try:
             if file_path.exists():
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    return yaml.safe_load(f)
+                return load_language_data(file_path)
         except Exception as e:
             print(f"Warning: Could not load {file_path}: {e}")
         return None
@@ -220,8 +220,6 @@ Grammatical roles: {{grammatical_roles}}
             'batch': """
 You are an expert linguist specializing in German grammar analysis.
 
-Sentences: {{sentences}}
-Target word: "{{target_word}}"
 Complexity level: "{{complexity}}"
 
 For EACH sentence, analyze EVERY word and provide:
@@ -259,6 +257,9 @@ REQUIRED JSON FORMAT:
 CRITICAL: Provide COMPREHENSIVE explanations for EVERY word in each sentence, explaining their specific functions and relationships in detail. Do NOT repeat word prefixes in the explanations.
 
 Grammatical roles: {{grammatical_roles}}
+
+Sentences: {{sentences}}
+Target word: "{{target_word}}"
 """,
 
         }
@@ -36,8 +36,8 @@ INTEGRATION:
 
 import logging
 from typing import List
-from jinja2 import Template
 from .hi_config import HiConfig
+from streamlit_app.language_analyzers.prompt_cache import cacheable_batch_prompt, compile_template
 
 logger = logging.getLogger(__name__)
 
@@ -69,8 +69,8 @@ class HiPromptBuilder:
         4. Set up error handling for template rendering
         """
         self.config = config
-        self.single_template = Template(self.config.prompt_templates['single'])
-        self.batch_template = Template(self.config.prompt_templates['batch'])
+        self.single_template = compile_template(self.config.prompt_templates['single'])
+        self.batch_template = compile_template(self.config.prompt_templates['batch'])
     
     def build_single_prompt(self, sentence: str, target_word: str, complexity: str) -> str:
         """Build prompt for single sentence analysis."""
@@ -89,6 +89,7 @@ class HiPromptBuilder:
             logger.error(f"Failed to build single prompt for '{sentence}': {e}")
             return f"Analyze this Hindi sentence: {sentence}\nTarget word: {target_word}\nComplexity: {complexity}\nProvide JSON response with grammatical analysis."
     
+    @cacheable_batch_prompt
     def build_batch_prompt(self, sentences: List[str], target_word: str, complexity: str) -> str:
         """Build prompt for batch analysis."""
         try:
@@ -7,8 +7,8 @@ Constructs AI prompts for Hungarian grammar analysis using Jinja2 templates.
 
 import logging
 from typing import List
-from jinja2 import Template
 from .hu_config import HuConfig
+from streamlit_app.language_analyzers.prompt_cache import cacheable_batch_prompt, compile_template
 
 logger = logging.getLogger(__name__)
 
@@ -18,8 +18,8 @@ class HuPromptBuilder:
 
     def __init__(self, config: HuConfig):
         self.config = config
-        self.single_template = Template(self.config.prompt_templates['single'])
-        self.batch_template = Template(self.config.prompt_templates['batch'])
+        self.single_template = compile_template(self.config.prompt_templates['single'])
+        self.batch_template = compile_template(self.config.prompt_templates['batch'])
 
     def build_single_prompt(self, sentence: str, target_word: str, complexity: str) -> str:
         """Build prompt for single Hungarian sentence analysis."""
@@ -47,6 +47,7 @@ Complexity: {complexity}
 Identify case markers, verb conjugation type, preverbs, postpositions, and possessive suffixes.
 Return JSON with grammatical analysis."""
 
+    @cacheable_batch_prompt
     def build_batch_prompt(self, sentences: List[str], target_word: str, complexity: str) -> str:
         """Build prompt for batch Hungarian sentence analysis."""
         try:
@@ -132,31 +132,18 @@ class HuAnalyzer(BaseGrammarAnalyzer):
         try:
             prompt = self.prompt_builder.build_batch_prompt(sentences, target_word, complexity)
             ai_response = self._call_ai(prompt, gemini_api_key)
-            results = self.response_parser.parse_batch_response(ai_response, sentences, complexity, target_word)
+            return self._analyze_received_batch(ai_response, sentences, target_word, complexity)
 
-            grammar_analyses = []
-            for result, sentence in zip(results, sentences):
-                validated_result = self.validator.validate_result(result, sentence)
-                html_output = self._generate_html_output(validated_result, sentence, complexity)
-
-                grammar_analyses.append(GrammarAnalysis(
-                    sentence=sentence,
-                    target_word=target_word or "",
-                    language_code=self.language_code,
-                    complexity_level=complexity,
-                    grammatical_elements=validated_result.get('elements', {}),
-                    explanations=validated_result.get('explanations', {}),
-                    color_scheme=self.get_color_scheme(complexity),
-                    html_output=html_output,
-                    confidence_score=validated_result.get('confidence', 0.0),
-                    word_explanations=validated_result.get('word_explanations', [])
-                ))
-
-            return grammar_analyses
         except Exception as e:
             logger.error(f"Batch analysis failed: {e}")
+            retried = self._retry_failed_batch(sentences, e, lambda subset: self.batch_analyze_grammar(
+                [sentences[i] for i in subset], target_word, complexity, gemini_api_key))
+            # Fallback analyses for the sentences the retries did not recover
             fallback_analyses = []
-            for sentence in sentences:
+            for sentence, analysis in zip(sentences, retried):
+                if analysis is not None:
+                    fallback_analyses.append(analysis)
+                    continue
                 fallback_result = self.hu_fallbacks.create_fallback(sentence, complexity)
                 html_output = self._generate_html_output(fallback_result, sentence, complexity)
                 fallback_analyses.append(GrammarAnalysis(
@@ -173,6 +160,31 @@ class HuAnalyzer(BaseGrammarAnalyzer):
                 ))
             return fallback_analyses
 
+    def analyze_batch_response(self, ai_response: str, sentences: List[str], target_word: str,
+                               complexity: str) -> List[GrammarAnalysis]:
+        """Build one GrammarAnalysis per sentence from a batch response that has already been received."""
+        results = self.response_parser.parse_batch_response(ai_response, sentences, complexity, target_word)
+
+        grammar_analyses = []
+        for result, sentence in zip(results, sentences):
+            validated_result = self.validator.validate_result(result, sentence)
+            html_output = self._generate_html_output(validated_result, sentence, complexity)
+
+            grammar_analyses.append(GrammarAnalysis(
+                sentence=sentence,
+                target_word=target_word or "",
+                language_code=self.language_code,
+                complexity_level=complexity,
+                grammatical_elements=validated_result.get('elements', {}),
+                explanations=validated_result.get('explanations', {}),
+                color_scheme=self.get_color_scheme(complexity),
+                html_output=html_output,
+                confidence_score=validated_result.get('confidence', 0.0),
+                word_explanations=validated_result.get('word_explanations', [])
+            ))
+
+        return grammar_analyses
+
     def _call_ai(self, prompt: str, gemini_api_key: str) -> str:
         """Call Google Gemini AI for Hungarian grammar analysis."""
         # LAZY IMPORT — critical for analyzer registry discovery
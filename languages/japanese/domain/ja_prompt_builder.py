@@ -7,8 +7,8 @@ Constructs AI prompts for Japanese grammar analysis using Jinja2 templates.
 
 import logging
 from typing import List
-from jinja2 import Template
 from .ja_config import JaConfig
+from streamlit_app.language_analyzers.prompt_cache import cacheable_batch_prompt, compile_template
 
 logger = logging.getLogger(__name__)
 
@@ -18,8 +18,8 @@ class JaPromptBuilder:
 
     def __init__(self, config: JaConfig):
         self.config = config
-        self.single_template = Template(self.config.prompt_templates['single'])
-        self.batch_template = Template(self.config.prompt_templates['batch'])
+        self.single_template = compile_template(self.config.prompt_templates['single'])
+        self.batch_template = compile_template(self.config.prompt_templates['batch'])
 
     def build_single_prompt(self, sentence: str, target_word: str, complexity: str) -> str:
         """Build prompt for single Japanese sentence analysis."""
@@ -48,6 +48,7 @@ Break the sentence into individual words/morphemes (Japanese has no spaces).
 Identify particles, verb forms, adjective types, and politeness levels.
 Return JSON with grammatical analysis."""
 
+    @cacheable_batch_prompt
     def build_batch_prompt(self, sentences: List[str], target_word: str, complexity: str) -> str:
         """Build prompt for batch Japanese sentence analysis."""
         try:
@@ -11,6 +11,7 @@ import logging
 from typing import List, Optional
 
 from .lv_config import LvConfig
+from streamlit_app.language_analyzers.prompt_cache import cacheable_batch_prompt
 
 logger = logging.getLogger(__name__)
 
@@ -40,6 +41,7 @@ class LvPromptBuilder:
             batch=False,
         )
 
+    @cacheable_batch_prompt
     def build_batch_prompt(
         self, sentences: List[str], target_word: str, complexity: str
     ) -> str:
@@ -105,16 +107,22 @@ class LvPromptBuilder:
             sentences_block = "\n".join(
                 f'{i+1}. "{s}"' for i, s in enumerate(sentences)
             )
+            # Sentences and target word go last so everything above them is a
+            # stable, cacheable prefix for this complexity level.
             sentence_instruction = (
-                f"Analyze ALL {len(sentences)} sentences below:\n{sentences_block}\n\n"
-                f'The target vocabulary word to highlight is: "{target_word}"\n\n'
+                "Analyze ALL of the numbered sentences listed at the end of this prompt.\n\n"
                 "Return a JSON ARRAY (one object per sentence) in the exact schema shown."
             )
+            sentences_section = (
+                f"\nSENTENCES TO ANALYZE ({len(sentences)}):\n{sentences_block}\n\n"
+                f'The target vocabulary word to highlight is: "{target_word}"\n'
+            )
             schema_note = (
                 "Return a JSON ARRAY with one object per sentence. "
                 "Each object must have exactly the keys shown in the schema below."
             )
         else:
+            sentences_section = ""
             sentence_instruction = (
                 f'Analyze this Latvian sentence: "{sentences[0]}"\n\n'
                 f'Target vocabulary word: "{target_word}"\n\n'
@@ -204,5 +212,5 @@ IMPORTANT:
   interjection=#FF69B4, verbal_noun=#DAA520, other=#808080
 - Confidence should be ≥ 0.85 for a complete, correct analysis.
 - Return ONLY valid JSON — no markdown, no prose before or after.
-"""
+{sentences_section}"""
         return prompt
@@ -5,7 +5,6 @@ Pytest fixtures for Latvian analyzer tests.
 import pytest
 from unittest.mock import MagicMock, patch
 
-from languages.latvian.domain.lv_config import LvConfig
 from languages.latvian.domain.lv_fallbacks import LvFallbacks
 from languages.latvian.domain.lv_prompt_builder import LvPromptBuilder
 from languages.latvian.domain.lv_response_parser import LvResponseParser
@@ -13,8 +12,8 @@ from languages.latvian.domain.lv_validator import LvValidator
 
 
 @pytest.fixture
-def config():
-    return LvConfig()
+def config(config_factory):
+    return config_factory("lv")
 
 
 @pytest.fixture
@@ -22,6 +22,7 @@ from enum import Enum
 from pathlib import Path
 from typing import Dict, List, Any
 from dataclasses import dataclass
+from streamlit_app.language_analyzers.language_data_cache import load_language_data
 
 logger = logging.getLogger(__name__)
 
@@ -132,8 +133,6 @@ Important:
 """,
             "batch": """Analyze these Malayalam sentences and provide detailed grammatical breakdowns for each.
 
-Sentences: {{sentences_text}}
-Target word: {{target_word}}
 Complexity level: {{complexity}}
 
 Malayalam is a Dravidian agglutinative language with SOV word order.
@@ -165,6 +164,9 @@ Important:
 - Note case markers and agglutinative suffixes
 - Provide meaningful explanations in English
 - Use only valid JSON format
+
+Sentences: {{sentences_text}}
+Target word: {{target_word}}
 """
         }
 
@@ -178,16 +180,14 @@ Important:
 
     def _load_yaml(self, path: Path) -> Dict[str, Any]:
         try:
-            with open(path, 'r', encoding='utf-8') as f:
-                return yaml.safe_load(f) or {}
+            return load_language_data(path) or {}
         except Exception as e:
             logger.error(f"Failed to load YAML file {path}: {e}")
             return {}
 
     def _load_json(self, path: Path) -> Dict[str, Any]:
         try:
-            with open(path, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            return load_language_data(path) or {}
         except Exception as e:
             logger.error(f"Failed to load JSON file {path}: {e}")
             return {}
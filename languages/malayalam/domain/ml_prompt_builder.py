@@ -7,8 +7,8 @@ Constructs AI prompts for Malayalam grammar analysis using Jinja2 templates.
 
 import logging
 from typing import List
-from jinja2 import Template
 from .ml_config import MlConfig
+from streamlit_app.language_analyzers.prompt_cache import cacheable_batch_prompt, compile_template
 
 logger = logging.getLogger(__name__)
 
@@ -18,8 +18,8 @@ class MlPromptBuilder:
 
     def __init__(self, config: MlConfig):
         self.config = config
-        self.single_template = Template(self.config.prompt_templates['single'])
-        self.batch_template = Template(self.config.prompt_templates['batch'])
+        self.single_template = compile_template(self.config.prompt_templates['single'])
+        self.batch_template = compile_template(self.config.prompt_templates['batch'])
 
     def build_single_prompt(self, sentence: str, target_word: str, complexity: str) -> str:
         """Build prompt for single Malayalam sentence analysis."""
@@ -48,6 +48,7 @@ Malayalam is a Dravidian agglutinative language with SOV word order.
 Identify case markers, verb tenses, postpositions, and grammatical roles.
 Return JSON with grammatical analysis."""
 
+    @cacheable_batch_prompt
     def build_batch_prompt(self, sentences: List[str], target_word: str, complexity: str) -> str:
         """Build prompt for batch Malayalam sentence analysis."""
         try:
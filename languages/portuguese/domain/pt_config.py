@@ -30,6 +30,7 @@ import logging
 import yaml
 from pathlib import Path
 from typing import Any, Dict, List, Optional
+from streamlit_app.language_analyzers.language_data_cache import load_language_data
 
 logger = logging.getLogger(__name__)
 
@@ -371,8 +372,7 @@ class PtConfig:
         """Load YAML file if it exists, return None on failure."""
         if path.exists():
             try:
-                with open(path, "r", encoding="utf-8") as f:
-                    return yaml.safe_load(f)
+                return load_language_data(path)
             except Exception as e:
                 logger.warning(f"Failed to load YAML {path}: {e}")
         return None
@@ -381,8 +381,7 @@ class PtConfig:
         """Load JSON file if it exists, return None on failure."""
         if path.exists():
             try:
-                with open(path, "r", encoding="utf-8") as f:
-                    return json.load(f)
+                return load_language_data(path)
             except Exception as e:
                 logger.warning(f"Failed to load JSON {path}: {e}")
         return None
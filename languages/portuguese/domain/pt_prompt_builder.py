@@ -21,6 +21,7 @@ import logging
 from typing import List, Optional
 
 from .pt_config import PtConfig
+from streamlit_app.language_analyzers.prompt_cache import cacheable_batch_prompt
 
 logger = logging.getLogger(__name__)
 
@@ -50,6 +51,7 @@ class PtPromptBuilder:
             batch=False,
         )
 
+    @cacheable_batch_prompt
     def build_batch_prompt(
         self, sentences: List[str], target_word: str, complexity: str
     ) -> str:
@@ -196,16 +198,22 @@ class PtPromptBuilder:
             sentences_block = "\n".join(
                 f'{i+1}. "{s}"' for i, s in enumerate(sentences)
             )
+            # Sentences and target word go last so everything above them is a
+            # stable, cacheable prefix for this complexity level.
             sentence_instruction = (
-                f"Analyze ALL {len(sentences)} sentences below:\n{sentences_block}\n\n"
-                f'The target vocabulary word to highlight is: "{target_word}"\n\n'
+                "Analyze ALL of the numbered sentences listed at the end of this prompt.\n\n"
                 "Return a JSON ARRAY (one object per sentence) in the exact schema shown."
             )
+            sentences_section = (
+                f"\nSENTENCES TO ANALYZE ({len(sentences)}):\n{sentences_block}\n\n"
+                f'The target vocabulary word to highlight is: "{target_word}"\n'
+            )
             schema_note = (
                 "Return a JSON ARRAY with one object per sentence. "
                 "Each object must have exactly the keys shown in the schema below."
             )
         else:
+            sentences_section = ""
             sentence_instruction = (
                 f'Analyze this Portuguese sentence: "{sentences[0]}"\n\n'
                 f'Target vocabulary word: "{target_word}"\n\n'
@@ -277,7 +285,7 @@ CRITICAL OUTPUT REQUIREMENTS:
   debitive=#D81B60, particle=#A1887F, other=#AAAAAA
 - Confidence should be ≥ 0.85 for a complete, correct analysis.
 - Return ONLY valid JSON — no markdown fences, no prose before or after.
-"""
+{sentences_section}"""
         return prompt
 
     # ------------------------------------------------------------------
@@ -22,7 +22,6 @@ if _PROJECT_ROOT not in sys.path:
 # ---------------------------------------------------------------------------
 # Domain component imports
 # ---------------------------------------------------------------------------
-from languages.portuguese.domain.pt_config import PtConfig
 from languages.portuguese.domain.pt_fallbacks import PtFallbacks
 from languages.portuguese.domain.pt_prompt_builder import PtPromptBuilder
 from languages.portuguese.domain.pt_response_parser import PtResponseParser
@@ -34,8 +33,8 @@ from languages.portuguese.domain.pt_validator import PtValidator
 # ---------------------------------------------------------------------------
 
 @pytest.fixture
-def config():
-    return PtConfig()
+def config(config_factory):
+    return config_factory("pt")
 
 
 @pytest.fixture
@@ -18,6 +18,7 @@ import yaml
 import logging
 from pathlib import Path
 from typing import Dict, List, Any, Optional
+from streamlit_app.language_analyzers.language_data_cache import load_language_data
 
 logger = logging.getLogger(__name__)
 
@@ -275,12 +276,11 @@ class RuConfig:
         """Load YAML file if it exists, return None on failure."""
         if path.exists():
             try:
-                with open(path, "r", encoding="utf-8") as f:
-                    data = yaml.safe_load(f)
-                    # Only accept non-empty mappings (the Phase-2 scaffolds
-                    # leave a near-empty placeholder file behind).
-                    if isinstance(data, dict) and data:
-                        return data
+                data = load_language_data(path)
+                # Only accept non-empty mappings (the Phase-2 scaffolds
+                # leave a near-empty placeholder file behind).
+                if isinstance(data, dict) and data:
+                    return data
             except Exception as e:
                 logger.warning(f"Failed to load YAML {path}: {e}")
         return None
@@ -289,10 +289,9 @@ class RuConfig:
         """Load JSON file if it exists, return None on failure."""
         if path.exists():
             try:
-                with open(path, "r", encoding="utf-8") as f:
-                    data = json.load(f)
-                    if isinstance(data, dict) and data:
-                        return data
+                data = load_language_data(path)
+                if isinstance(data, dict) and data:
+                    return data
             except Exception as e:
                 logger.warning(f"Failed to load JSON {path}: {e}")
         return None
@@ -5,7 +5,6 @@ Pytest fixtures for Russian analyzer tests.
 import pytest
 from unittest.mock import MagicMock, patch
 
-from languages.russian.domain.ru_config import RuConfig
 from languages.russian.domain.ru_fallbacks import RuFallbacks
 from languages.russian.domain.ru_prompt_builder import RuPromptBuilder
 from languages.russian.domain.ru_response_parser import RuResponseParser
@@ -13,8 +12,8 @@ from languages.russian.domain.ru_validator import RuValidator
 
 
 @pytest.fixture
-def config():
-    return RuConfig()
+def config(config_factory):
+    return config_factory("ru")
 
 
 @pytest.fixture
@@ -9,6 +9,7 @@ import yaml
 import os
 from pathlib import Path
 from typing import Dict, List, Any, Optional
+from streamlit_app.language_analyzers.language_data_cache import load_language_data
 
 class EsConfig:
     """
@@ -66,9 +67,8 @@ class EsConfig:
         """Load grammatical roles from external JSON file (fallback)"""
         config_path = Path(__file__).parent / "es_config.json"
         if config_path.exists():
-            with open(config_path, 'r', encoding='utf-8') as f:
-                config = json.load(f)
-                return config.get('grammatical_roles', self._get_default_roles())
+            config = load_language_data(config_path)
+            return config.get('grammatical_roles', self._get_default_roles())
         return self._get_default_roles()
 
     def _get_default_roles(self) -> Dict[str, Dict[str, str]]:
@@ -115,15 +115,13 @@ class EsConfig:
     def _load_yaml(self, path: Path) -> Optional[Dict]:
         """Load YAML file if it exists"""
         if path.exists():
-            with open(path, 'r', encoding='utf-8') as f:
-                return yaml.safe_load(f)
+            return load_language_data(path)
         return None
 
     def _load_json(self, path: Path) -> Optional[Dict]:
         """Load JSON file if it exists"""
         if path.exists():
-            with open(path, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            return load_language_data(path)
         return None
 
     def _load_color_schemes(self) -> Dict[str, Dict[str, str]]:
@@ -233,8 +231,6 @@ Grammatical roles: {{grammatical_roles}}
             'batch': """
 You are an expert linguist specializing in Spanish grammar analysis.
 
-Sentences: {{sentences}}
-Target word: "{{target_word}}"
 Complexity level: "{{complexity}}"
 
 For EACH sentence, analyze EVERY word and provide:
@@ -270,6 +266,9 @@ REQUIRED JSON FORMAT:
 CRITICAL: Provide COMPREHENSIVE explanations for EVERY word in each sentence, explaining their specific functions and relationships in detail. Do NOT repeat word prefixes in the explanations.
 
 Grammatical roles: {{grammatical_roles}}
+
+Sentences: {{sentences}}
+Target word: "{{target_word}}"
 """
         }
 
@@ -7,6 +7,7 @@ import logging
 from typing import Dict, List, Any, Optional
 from jinja2 import Template
 from .es_config import EsConfig
+from streamlit_app.language_analyzers.prompt_cache import cacheable_batch_prompt, compile_template
 
 logger = logging.getLogger(__name__)
 
@@ -31,8 +32,8 @@ class EsPromptBuilder:
         config_templates = self.config.prompt_templates
 
         return {
-            'single_analysis': Template(config_templates['single']),
-            'batch_analysis': Template(config_templates['batch']),
+            'single_analysis': compile_template(config_templates['single']),
+            'batch_analysis': compile_template(config_templates['batch']),
         }
 
     def build_single_prompt(self, sentence: str, target_word: str, complexity: str) -> str:
@@ -53,6 +54,7 @@ class EsPromptBuilder:
 
         return self.templates['single_analysis'].render(**context)
 
+    @cacheable_batch_prompt
     def build_batch_prompt(self, sentences: List[str], target_word: str, complexity: str) -> str:
         """
         Build prompt for batch sentence analysis.
@@ -10,13 +10,11 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', '..'))
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', '..', 'streamlit_app'))
 
 @pytest.fixture
-def spanish_config():
+def spanish_config(config_factory):
     """Fixture providing Spanish configuration for tests"""
-    from ..domain.es_config import EsConfig
-    return EsConfig()
+    return config_factory("es")
 
 @pytest.fixture
-def spanish_analyzer():
+def spanish_analyzer(analyzer_factory):
     """Fixture providing Spanish analyzer instance for tests"""
-    from ..es_analyzer import EsAnalyzer
-    return EsAnalyzer()
\ No newline at end of file
+    return analyzer_factory("es")
\ No newline at end of file
@@ -42,6 +42,7 @@ from pathlib import Path
 from typing import Dict, List, Any
 from dataclasses import dataclass
 from pydantic import BaseModel, Field
+from streamlit_app.language_analyzers.language_data_cache import load_language_data
 
 logger = logging.getLogger(__name__)
 
@@ -146,16 +147,14 @@ class TrConfig:
 
     def _load_yaml(self, path: Path) -> Dict[str, Any]:
         try:
-            with open(path, 'r', encoding='utf-8') as f:
-                return yaml.safe_load(f) or {}
+            return load_language_data(path) or {}
         except Exception as e:
             logger.error(f"Failed to load YAML file {path}: {e}")
             return {}
 
     def _load_json(self, path: Path) -> Dict[str, Any]:
         try:
-            with open(path, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            return load_language_data(path) or {}
         except Exception as e:
             logger.error(f"Failed to load JSON file {path}: {e}")
             return {}
@@ -222,10 +221,8 @@ Return JSON with analysis array containing word, grammatical_role, individual_me
 
     def _get_default_batch_template(self) -> str:
         """Default batch analysis template."""
-        return """Analyze these Turkish sentences:
-{{sentences}}
+        return """Analyze the Turkish sentences listed at the end of this prompt.
 
-Target word: {{target_word}}
 Complexity level: {{complexity}}
 
 TURKISH GRAMMAR ANALYSIS REQUIREMENTS:
@@ -234,7 +231,12 @@ TURKISH GRAMMAR ANALYSIS REQUIREMENTS:
 - Identify case markers and their functions
 - Use consistent grammatical roles: {{grammatical_roles_list}}
 
-Return JSON with batch_results array containing analysis for each sentence."""
+Return JSON with batch_results array containing analysis for each sentence.
+
+Sentences:
+{{sentences}}
+
+Target word: {{target_word}}"""
 
     def get_color_scheme(self, complexity: str) -> Dict[str, str]:
         """
@@ -39,6 +39,7 @@ import json
 from typing import Dict, List, Any
 from jinja2 import Template
 from .tr_config import TrConfig
+from streamlit_app.language_analyzers.prompt_cache import cacheable_batch_prompt, compile_template
 
 logger = logging.getLogger(__name__)
 
@@ -76,17 +77,17 @@ class TrPromptBuilder:
         single_path = os.path.join(template_dir, 'tr_single_prompt.j2')
         if os.path.exists(single_path):
             with open(single_path, 'r', encoding='utf-8') as f:
-                templates['single'] = Template(f.read())
+                templates['single'] = compile_template(f.read())
         else:
-            templates['single'] = Template(self._get_default_single_template())
+            templates['single'] = compile_template(self._get_default_single_template())
 
         # Batch template
         batch_path = os.path.join(template_dir, 'tr_batch_prompt.j2')
         if os.path.exists(batch_path):
             with open(batch_path, 'r', encoding='utf-8') as f:
-                templates['batch'] = Template(f.read())
+                templates['batch'] = compile_template(f.read())
         else:
-            templates['batch'] = Template(self._get_default_batch_template())
+            templates['batch'] = compile_template(self._get_default_batch_template())
 
         return templates
 
@@ -102,7 +103,7 @@ class TrPromptBuilder:
         - Complexity-appropriate detail level
         """
         try:
-            template = Template(self.config.prompt_templates["single"])
+            template = compile_template(self.config.prompt_templates["single"])
             context = {
                 'sentence': sentence,
                 'target_word': target_word,
@@ -119,6 +120,7 @@ class TrPromptBuilder:
             logger.error(f"Failed to build single prompt: {e}")
             return self._create_fallback_single_prompt(sentence, target_word, complexity)
 
+    @cacheable_batch_prompt
     def build_batch_prompt(self, sentences: List[str], target_word: str, complexity: str) -> str:
         """
         Build prompt for batch Turkish sentence analysis.
@@ -130,7 +132,7 @@ class TrPromptBuilder:
         - Efficient processing of multiple sentences
         """
         try:
-            template = Template(self.config.prompt_templates["batch"])
+            template = compile_template(self.config.prompt_templates["batch"])
             context = {
                 'sentences': '\n'.join(f'{i+1}. {sentence}' for i, sentence in enumerate(sentences)),
                 'target_word': target_word,
@@ -189,10 +191,8 @@ Return JSON with analysis array containing word, grammatical_role, individual_me
 
     def _get_default_batch_template(self) -> str:
         """Default batch analysis template."""
-        return """Analyze these Turkish sentences:
-{{sentences}}
+        return """Analyze the Turkish sentences listed at the end of this prompt.
 
-Target word: {{target_word}}
 Complexity level: {{complexity}}
 
 TURKISH GRAMMAR ANALYSIS REQUIREMENTS:
@@ -201,7 +201,12 @@ TURKISH GRAMMAR ANALYSIS REQUIREMENTS:
 - Identify case markers and their functions
 - Use consistent grammatical roles: {{grammatical_roles_list}}
 
-Return JSON with batch_results array containing analysis for each sentence."""
+Return JSON with batch_results array containing analysis for each sentence.
+
+Sentences:
+{{sentences}}
+
+Target word: {{target_word}}"""
 
     def _create_fallback_batch_prompt(self, sentences: List[str], target_word: str, complexity: str) -> str:
         """Create basic fallback prompt for batch sentences."""
@@ -14,6 +14,7 @@ from typing import Dict, List, Any, Optional, Union
 from pathlib import Path
 from dataclasses import dataclass
 from streamlit_app.shared_utils import get_gemini_api
+from streamlit_app.language_analyzers.language_data_cache import load_language_data
 
 from ..domain import (
     TrConfig,
@@ -104,12 +105,7 @@ class TurkishAnalyzerInfrastructure:
             config_path = self.config.get_config_file_path(config_type)
             if config_path and config_path.exists():
                 try:
-                    with open(config_path, 'r', encoding='utf-8') as f:
-                        if filename.endswith('.yaml'):
-                            import yaml
-                            configs[config_type] = yaml.safe_load(f)
-                        else:
-                            configs[config_type] = json.load(f)
+                    configs[config_type] = load_language_data(config_path)
                 except Exception as e:
                     print(f"Warning: Failed to load {config_type} config: {e}")
                     configs[config_type] = {}
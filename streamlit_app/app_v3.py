@@ -64,11 +64,12 @@ except (ImportError, KeyError) as e:
     def usage_bar(current, max_val): return ""
 
 try:
-    from state_manager import initialize_session_state, initialize_languages_config
+    from state_manager import initialize_session_state, initialize_languages_config, restore_generation_job
 except (ImportError, KeyError) as e:
     print(f"Warning: Could not import state_manager: {e}")
     def initialize_session_state(): pass
     def initialize_languages_config(): pass
+    def restore_generation_job(): pass
 
 try:
     from ui.sidebar import render_sidebar
@@ -88,11 +89,19 @@ except (ImportError, KeyError) as e:
     print(f"Warning: Could not import router: {e}")
     def route_to_page(page): pass
 
+# Process-wide metrics exporter (METRICS_PORT / METRICS_FILE); started once per process
+try:
+    from streamlit_app.services.generation.metrics import start_metrics_exporter
+    start_metrics_exporter()
+except Exception as e:
+    print(f"Warning: Could not start metrics exporter: {e}")
+
 # Initialize session state and languages config (only if in Streamlit context)
 try:
     # Check if we're in a Streamlit context
     if hasattr(st, 'session_state'):
         initialize_session_state()
+        restore_generation_job()
 except Exception as e:
     # If not in Streamlit context or initialization fails, skip
     print(f"Initialization skipped: {e}")
@@ -9,6 +9,8 @@ import base64
 import requests
 from typing import Optional, List
 
+from streamlit_app.services.generation.tracing import span
+
 # Load environment variables
 try:
     from dotenv import load_dotenv
@@ -37,6 +39,9 @@ from error_recovery import graceful_degradation, resilient_audio_generation
 # Import error recovery
 from error_recovery import graceful_degradation, resilient_audio_generation
 
+# Cached voice catalog (bundled snapshot until the first fetch)
+from voice_catalog import get_voice_catalog
+
 logger = logging.getLogger(__name__)
 
 # ============================================================================
@@ -132,6 +137,9 @@ def get_google_tts_voices_rest(language_code: str = None) -> List[dict]:
     """
     Get available Google Cloud Text-to-Speech voices using REST API.
 
+    The catalog is fetched once and cached (see voice_catalog); this call
+    only blocks when the cached catalog is missing or older than its TTL.
+
     Args:
         language_code: Optional BCP-47 language code filter (e.g., "en-US", "zh-CN")
 
@@ -143,58 +151,13 @@ def get_google_tts_voices_rest(language_code: str = None) -> List[dict]:
         logger.warning("No API key available for Google TTS")
         return []
 
-    # Map language codes for TTS compatibility
-    tts_language_map = {
-        "zh-TW": "cmn-CN",  # Chinese Traditional uses same voices as Simplified
-        "zh-tw": "cmn-CN",
-    }
-    if language_code and language_code in tts_language_map:
-        language_code = tts_language_map[language_code]
-
-    try:
-        # REST API endpoint for listing voices
-        url = "https://texttospeech.googleapis.com/v1/voices"
-        params = {"key": config["api_key"]}
-
-        response = requests.get(url, params=params, timeout=10)
-        response.raise_for_status()
-
-        data = response.json()
-        voices = data.get("voices", [])
-
-        if not voices:
-            logger.warning("No voices returned from Google TTS REST API")
-            return []
-
-        # Filter by language code if provided
-        if language_code:
-            filtered_voices = []
-            for voice in voices:
-                if language_code in voice.get("languageCodes", []):
-                    filtered_voices.append({
-                        'name': voice['name'],
-                        'language_codes': voice.get('languageCodes', []),
-                        'ssml_gender': voice.get('ssmlGender', 0),
-                        'natural_sample_rate_hertz': voice.get('naturalSampleRateHertz', 0)
-                    })
-            logger.info(f"Found {len(filtered_voices)} voices for language {language_code}")
-            return filtered_voices
-        else:
-            # Return all voices
-            logger.info(f"Found {len(voices)} total voices")
-            return [{
-                'name': voice['name'],
-                'language_codes': voice.get('languageCodes', []),
-                'ssml_gender': voice.get('ssmlGender', 0),
-                'natural_sample_rate_hertz': voice.get('naturalSampleRateHertz', 0)
-            } for voice in voices]
+    catalog = get_voice_catalog()
+    if not catalog.is_fresh():
+        catalog.refresh(config["api_key"])
 
-    except requests.exceptions.RequestException as e:
-        logger.error(f"Network error getting Google TTS voices: {e}")
-        return []
-    except Exception as exc:
-        logger.error(f"Unexpected error getting Google TTS voices via REST API: {exc}")
-        return []
+    voices = catalog.voices_for(language_code)
+    logger.info(f"Found {len(voices)} voices for language {language_code or 'all'}")
+    return voices
 
 async def generate_audio_google_rest_async(
     text: str,
@@ -255,25 +218,28 @@ async def generate_audio_google_rest_async(
         url = "https://texttospeech.googleapis.com/v1/text:synthesize"
         params = {"key": config["api_key"]}
 
-        response = requests.post(url, params=params, json=request_data, timeout=30)
-        response.raise_for_status()
+        with span("tts.synthesize", kind="client", voice=voice_name, chars=len(text.strip())) as call:
+            # Blocking HTTP runs on a worker thread so gathered syntheses overlap
+            response = await asyncio.to_thread(requests.post, url, params=params, json=request_data, timeout=30)
+            response.raise_for_status()
 
-        data = response.json()
-        audio_content_base64 = data.get("audioContent")
+            data = response.json()
+            audio_content_base64 = data.get("audioContent")
 
-        if not audio_content_base64:
-            logger.error("No audio content received from Google TTS REST API")
-            return False
+            if not audio_content_base64:
+                logger.error("No audio content received from Google TTS REST API")
+                return False
 
-        # Decode base64 audio content and save to file
-        try:
-            audio_content = base64.b64decode(audio_content_base64)
-        except Exception as e:
-            logger.error(f"Failed to decode base64 audio content: {e}")
-            return False
+            # Decode base64 audio content and save to file
+            try:
+                audio_content = base64.b64decode(audio_content_base64)
+            except Exception as e:
+                logger.error(f"Failed to decode base64 audio content: {e}")
+                return False
 
-        with open(output_path, "wb") as out:
-            out.write(audio_content)
+            with open(output_path, "wb") as out:
+                out.write(audio_content)
+            call.set("bytes", len(audio_content))
 
         logger.info(f"Google TTS REST synthesis completed for voice: {voice_name}")
         return True
@@ -616,8 +582,11 @@ def get_google_voices_for_language(language_name: str) -> tuple[List[str], bool,
     if not bcp47_code:
         return ["D (Female, Neural2)"], True  # Default fallback
 
-    # Get all voices for this language using REST API
-    voices = get_google_tts_voices_rest(bcp47_code)
+    # Answer from the cached catalog so page renders never wait on the voices API;
+    # a missing or stale catalog is refreshed in the background for the next render
+    catalog = get_voice_catalog()
+    catalog.refresh_if_stale(get_google_tts_config()["api_key"])
+    voices = catalog.voices_for(bcp47_code)
 
     # If no voices found (likely due to auth issues), provide language-specific fallbacks
     if not voices:
@@ -779,7 +748,8 @@ def get_google_voices_for_language(language_name: str) -> tuple[List[str], bool,
         descriptive_name = f"{display_name} ({gender_str})"
         display_to_voice_map[descriptive_name] = voice_name
 
-    return formatted_voices if formatted_voices else ["Emma (Female)"], False, display_to_voice_map
+    # Bundled snapshot voices are real, but warn when the live catalog could not be fetched
+    return formatted_voices if formatted_voices else ["Emma (Female)"], catalog.refresh_failed, display_to_voice_map
 
 def _voice_for_language(language: str) -> str:
     """
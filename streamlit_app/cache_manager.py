@@ -10,6 +10,8 @@ import logging
 from dataclasses import dataclass
 from datetime import datetime, timedelta
 
+from streamlit_app.services.generation.metrics import watch_cache
+
 logger = logging.getLogger(__name__)
 
 @dataclass
@@ -59,6 +61,7 @@ class CacheManager:
 
         # Load persistent cache on startup
         self._load_persistent_cache()
+        watch_cache(self)
 
         logger.info(f"CacheManager initialized with cache dir: {cache_dir}")
 
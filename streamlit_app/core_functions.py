@@ -6,6 +6,7 @@ Imports functions from specialized modules while maintaining backward compatibil
 """
 
 import logging
+import shutil
 from pathlib import Path
 from typing import List, Dict, Any, Optional, Callable
 import streamlit as st
@@ -72,7 +73,7 @@ except ImportError as e:
 
 # Import from deck_exporter module
 try:
-    from streamlit_app.deck_exporter import create_apkg_export
+    from streamlit_app.deck_exporter import create_apkg_export, IncrementalApkgWriter
     logger.info("Successfully imported from deck_exporter")
 except ImportError as e:
     logger.warning(f"Failed to import from deck_exporter: {e}. Using fallback implementations.")
@@ -92,6 +93,29 @@ except ImportError as e:
     logger.warning(f"Failed to import grammar processor: {e}. Grammar analysis will be unavailable.")
     get_grammar_processor = None
 
+# Compact word explanations and their card HTML (no third-party dependencies)
+from streamlit_app.language_analyzers.token_annotations import explanations_html
+
+# Per-pass tracing spans (no third-party dependencies; no-ops unless a tracer is active)
+from streamlit_app.services.generation.tracing import span
+
+# Import deck-level sentence deduplication
+try:
+    from streamlit_app.services.generation.sentence_dedup import (
+        GRAMMAR_FIELDS, DedupPlan, SentenceDeduplicator, apply_shared_grammar, expand_shared_files
+    )
+    logger.info("Successfully imported sentence deduplication")
+except ImportError as e:
+    logger.warning(f"Failed to import sentence deduplication: {e}. Duplicate sentences will not be shared.")
+
+# Import per-word generation telemetry for the cost and time estimator
+try:
+    from streamlit_app.services.generation.generation_telemetry import WordTelemetry, get_generation_telemetry
+    from streamlit_app.shared_utils import get_gemini_model
+except ImportError as e:
+    logger.warning(f"Failed to import generation telemetry: {e}. Estimates will use static defaults.")
+    get_generation_telemetry = None
+
 # ============================================================================
 # MAIN ORCHESTRATOR FUNCTION
 # ============================================================================
@@ -347,16 +371,7 @@ def _build_tsv_row(idx_sent, audio_files, image_files, sent, word, file_base, la
         return str(val)
 
     # Format word explanations as HTML
-    word_explanations_html = ""
-    explanations = sent.get("word_explanations", [])
-    if explanations and len(explanations) > 0:
-        explanation_items = []
-        for exp in explanations:
-            if len(exp) >= 4:
-                exp_word, pos, color, explanation = exp[0], exp[1], exp[2], exp[3]  # Use exp_word to avoid shadowing
-                explanation_items.append(f'<div class="explanation-item"><span class="word-highlight" style="color: {color};"><strong>{exp_word}</strong></span> ({pos}): {explanation}</div>')
-        if explanation_items:
-            word_explanations_html = '<div class="word-explanations"><strong>Grammar Explanations:</strong><br>' + ''.join(explanation_items) + '</div>'
+    word_explanations_html = explanations_html(sent.get("word_explanations", []))
 
     words_data.append({
         "file_name": safe_str(file_base),
@@ -407,46 +422,98 @@ def generate_deck_progressive(
     native_language: str = "English",
     log_callback: callable = None,
     enriched_word_data: dict = None,
+    deduplicator: "SentenceDeduplicator" = None,
+    checkpoint: "WordCheckpoint" = None,
 ) -> dict:
     """
     Generate deck for a single word with detailed progress callbacks.
     Returns word data dict with all components for that word.
+
+    With a deduplicator (one per deck), sentences that repeat earlier ones are
+    replaced or share the earlier sentence's audio and image (and its grammar
+    when it was analyzed for the same word).
+
+    With a checkpoint (see services/generation/job_store.py), each finished
+    pass is stored and passes already stored by an interrupted run are
+    restored instead of redone; output_dir must then be the job's directory.
     """
     try:
         errors = []
 
         # Generate unique ID for this word generation to prevent filename conflicts
         word_unique_id = _generate_unique_id()
+        if checkpoint is not None:
+            # Restored passes refer to files named with the first run's ID
+            word_unique_id = checkpoint.unique_id(word_unique_id)
 
         # Create output directories
         output_path = Path(output_dir)
         media_dir = output_path / "media"
         media_dir.mkdir(parents=True, exist_ok=True)
 
+        telemetry = None
+        if get_generation_telemetry:
+            telemetry = WordTelemetry(language, get_gemini_model(), num_sentences)
+            gemini_calls_before = st.session_state.get('gemini_api_calls', 0)
+            gemini_tokens_before = st.session_state.get('gemini_tokens_used', 0)
+
         # PASS 1: Smart Sentences
-        if log_callback:
-            log_callback(f"<b>🔤 PASS 1/6: Smart Sentences</b>")
-            log_callback(f"Generating contextual sentences with pronunciation and visual cues for '{word}'...")
-
-        # Extract consolidated meaning string from enriched word data
-        consolidated_meaning = None
-        if enriched_word_data:
-            if isinstance(enriched_word_data, str):
-                # New consolidated string format - use directly
-                consolidated_meaning = enriched_word_data
-            elif isinstance(enriched_word_data, dict):
-                # Legacy dictionary format - extract meaning field
-                consolidated_meaning = enriched_word_data.get('meaning', None)
-
-        # Import here to avoid potential import issues
-        from streamlit_app.sentence_generator import generate_sentences
-
-        meaning, sentences = generate_sentences(word, language, num_sentences, min_length, max_length, difficulty, gemini_api_key, topics, native_language, consolidated_meaning)
-        if sentences is None or not sentences:
-            raise Exception(f"Failed to generate sentences for '{word}'")
+        with span("pass.sentences", language=language, word=word, num_sentences=num_sentences) as stage:
+            if log_callback:
+                log_callback(f"<b>🔤 PASS 1/6: Smart Sentences</b>")
+                log_callback(f"Generating contextual sentences with pronunciation and visual cues for '{word}'...")
+
+            # Extract consolidated meaning string from enriched word data
+            consolidated_meaning = None
+            if enriched_word_data:
+                if isinstance(enriched_word_data, str):
+                    # New consolidated string format - use directly
+                    consolidated_meaning = enriched_word_data
+                elif isinstance(enriched_word_data, dict):
+                    # Legacy dictionary format - extract meaning field
+                    consolidated_meaning = enriched_word_data.get('meaning', None)
+
+            # Import here to avoid potential import issues
+            from streamlit_app.sentence_generator import generate_sentences
+
+            restored = checkpoint.load("sentences") if checkpoint else None
+            if restored is not None:
+                meaning, sentences = restored['meaning'], restored['sentences']
+                dedup_plan = DedupPlan.from_dict(restored['dedup']) if restored.get('dedup') else None
+                if dedup_plan:
+                    sentences = dedup_plan.sentences
+                if log_callback:
+                    log_callback(f"♻️ Restored {len(sentences)} sentences for '{word}' from the interrupted run")
+            else:
+                meaning, sentences = generate_sentences(word, language, num_sentences, min_length, max_length, difficulty, gemini_api_key, topics, native_language, consolidated_meaning)
+                if sentences is None or not sentences:
+                    raise Exception(f"Failed to generate sentences for '{word}'")
 
-        if log_callback:
-            log_callback(f"✅ Generated {len(sentences)} sentences for '{word}'")
+                if log_callback:
+                    log_callback(f"✅ Generated {len(sentences)} sentences for '{word}'")
+
+                # Deck-level deduplication before any per-sentence API work
+                dedup_plan = None
+                if deduplicator is not None:
+                    dedup_plan = deduplicator.deduplicate(
+                        word, sentences,
+                        request_replacements=lambda n: generate_sentences(
+                            word, language, n, min_length, max_length, difficulty, gemini_api_key,
+                            topics, native_language, consolidated_meaning)[1],
+                    )
+                    sentences = dedup_plan.sentences
+                    if log_callback and (dedup_plan.replaced or dedup_plan.shared_from):
+                        log_callback(f"♻️ Replaced {dedup_plan.replaced} duplicate sentences, "
+                                     f"{len(dedup_plan.shared_from)} reuse earlier audio and images")
+                if checkpoint:
+                    checkpoint.save("sentences", {'meaning': meaning, 'sentences': sentences,
+                                                  'dedup': dedup_plan.to_dict() if dedup_plan else None})
+            unique_indices = dedup_plan.unique_indices() if dedup_plan else list(range(len(sentences)))
+            # Repeats of another word's sentence still need grammar for this word
+            grammar_indices = dedup_plan.grammar_indices() if dedup_plan else list(range(len(sentences)))
+            stage.set_attributes(sentences=len(sentences), unique_sentences=len(unique_indices))
+            if telemetry:
+                telemetry.mark("sentences")
 
         # PASS 2: Quality Validation
         if log_callback:
@@ -458,122 +525,193 @@ def generate_deck_progressive(
             log_callback(f"✅ Quality validation completed for '{word}'")
 
         # PASS 3: Grammar Analysis
-        if log_callback:
-            log_callback(f"<b>🎨 PASS 3/6: Grammar Analysis</b>")
-            log_callback(f"Breaking down sentence structure with grammar analysis for '{word}'...")
-
-        # Grammar analysis using the grammar processor
-        logger.info(f"Starting grammar analysis for '{word}' in {language}")
-        if get_grammar_processor:
-            logger.info("get_grammar_processor is available")
-            try:
-                grammar_processor = get_grammar_processor()
-                logger.info("Got grammar processor instance")
-                # Get language code for analyzer
-                from language_registry import get_language_registry
-                registry = get_language_registry()
-                language_code = registry.get_iso_code(language)
-                logger.info(f"Language code for {language}: {language_code}")
+        with span("pass.grammar", language=language, word=word, batch_size=len(grammar_indices)):
+            if log_callback:
+                log_callback(f"<b>🎨 PASS 3/6: Grammar Analysis</b>")
+                log_callback(f"Breaking down sentence structure with grammar analysis for '{word}'...")
+
+            # Grammar analysis using the grammar processor
+            logger.info(f"Starting grammar analysis for '{word}' in {language}")
+            restored = checkpoint.load("grammar") if checkpoint else None
+            if restored is not None:
+                for sentence, stored in zip(sentences, restored['sentences']):
+                    sentence.update(stored)
+                if log_callback:
+                    log_callback(f"♻️ Restored grammar analysis for '{word}' from the interrupted run")
+            elif get_grammar_processor:
+                logger.info("get_grammar_processor is available")
+                try:
+                    grammar_processor = get_grammar_processor()
+                    logger.info("Got grammar processor instance")
+                    # Get language code for analyzer
+                    from language_registry import get_language_registry
+                    registry = get_language_registry()
+                    language_code = registry.get_iso_code(language)
+                    logger.info(f"Language code for {language}: {language_code}")
                 
-                grammar_results = grammar_processor.batch_analyze_grammar_and_color(
-                    sentences=[s['sentence'] for s in sentences],
-                    target_words=[word] * len(sentences),
-                    language=language,
-                    gemini_api_key=gemini_api_key,
-                    language_code=language_code
-                )
+                    def on_grammar_result(i, result):
+                        if log_callback:
+                            log_callback(f"🎨 Sentence {grammar_indices[i] + 1}/{len(sentences)} colored")
+
+                    grammar_results = grammar_processor.batch_analyze_grammar_and_color(
+                        sentences=[sentences[i]['sentence'] for i in grammar_indices],
+                        target_words=[word] * len(grammar_indices),
+                        language=language,
+                        gemini_api_key=gemini_api_key,
+                        language_code=language_code,
+                        on_result=on_grammar_result
+                    )
                 
-                # Update sentences with grammar analysis results
-                for i, result in enumerate(grammar_results):
-                    sentences[i]['colored_sentence'] = result.get('colored_sentence', '')
-                    sentences[i]['word_explanations'] = result.get('word_explanations', [])
-                    sentences[i]['grammar_summary'] = result.get('grammar_summary', '')
+                    # Update sentences with grammar analysis results
+                    for i, result in zip(grammar_indices, grammar_results):
+                        sentences[i]['colored_sentence'] = result.get('colored_sentence', '')
+                        sentences[i]['word_explanations'] = result.get('word_explanations', [])
+                        sentences[i]['grammar_summary'] = result.get('grammar_summary', '')
+                    if dedup_plan:
+                        apply_shared_grammar(dedup_plan)
                 
+                    if log_callback:
+                        log_callback(f"✅ Grammar analysis completed for {len(sentences)} sentences")
+                    logger.info(f"Grammar analysis completed successfully for {len(sentences)} sentences")
+                except Exception as e:
+                    logger.error(f"Grammar analysis failed for '{word}': {e}")
+                    if log_callback:
+                        log_callback(f"⚠️ Grammar analysis failed for '{word}': {e}")
+                    # Continue without grammar analysis
+            else:
+                logger.warning("get_grammar_processor is None")
                 if log_callback:
-                    log_callback(f"✅ Grammar analysis completed for {len(sentences)} sentences")
-                logger.info(f"Grammar analysis completed successfully for {len(sentences)} sentences")
-            except Exception as e:
-                logger.error(f"Grammar analysis failed for '{word}': {e}")
-                if log_callback:
-                    log_callback(f"⚠️ Grammar analysis failed for '{word}': {e}")
-                # Continue without grammar analysis
-        else:
-            logger.warning("get_grammar_processor is None")
-            if log_callback:
-                log_callback("ℹ️ Grammar processor not available, skipping grammar analysis")
-
-        # Ensure all sentences have colored_sentence (fallback to basic highlighting)
-        for i in range(len(sentences)):
-            if 'colored_sentence' not in sentences[i] or not sentences[i]['colored_sentence']:
-                # Basic fallback: highlight target word in red
-                sentence = sentences[i]['sentence']
-                words = sentence.split()
-                colored_words = []
-                for w in words:
-                    if w.lower().strip('.,!?;:"\'') == word.lower():
-                        colored_words.append(f"<span style='color: #FF6B6B; font-weight: bold;'>{w}</span>")
-                    else:
-                        colored_words.append(w)
-                sentences[i]['colored_sentence'] = ' '.join(colored_words)
-            if 'word_explanations' not in sentences[i]:
-                sentences[i]['word_explanations'] = []
-            if 'grammar_summary' not in sentences[i]:
-                sentences[i]['grammar_summary'] = ''
+                    log_callback("ℹ️ Grammar processor not available, skipping grammar analysis")
+
+            # Ensure all sentences have colored_sentence (fallback to basic highlighting)
+            for i in range(len(sentences)):
+                if 'colored_sentence' not in sentences[i] or not sentences[i]['colored_sentence']:
+                    # Basic fallback: highlight target word in red
+                    sentence = sentences[i]['sentence']
+                    words = sentence.split()
+                    colored_words = []
+                    for w in words:
+                        if w.lower().strip('.,!?;:"\'') == word.lower():
+                            colored_words.append(f"<span style='color: #FF6B6B; font-weight: bold;'>{w}</span>")
+                        else:
+                            colored_words.append(w)
+                    sentences[i]['colored_sentence'] = ' '.join(colored_words)
+                if 'word_explanations' not in sentences[i]:
+                    sentences[i]['word_explanations'] = []
+                if 'grammar_summary' not in sentences[i]:
+                    sentences[i]['grammar_summary'] = ''
+            if checkpoint and restored is None:
+                checkpoint.save("grammar", {'sentences': [
+                    {key: s[key] for key in GRAMMAR_FIELDS if key in s}
+                    for s in sentences]})
+            if telemetry:
+                telemetry.mark("grammar")
 
         # PASS 4: Audio Generation
-        if log_callback:
-            log_callback(f"<b>🔊 PASS 4/6: Audio Generation</b>")
-            log_callback(f"Creating natural-sounding pronunciations with {audio_speed}x speed for '{word}'...")
+        with span("pass.audio", language=language, word=word) as stage:
+            if log_callback:
+                log_callback(f"<b>🔊 PASS 4/6: Audio Generation</b>")
+                log_callback(f"Creating natural-sounding pronunciations with {audio_speed}x speed for '{word}'...")
+
+            v = voice or _voice_for_language(language)
+            restored = checkpoint.load("audio") if checkpoint else None
+            if restored is not None:
+                audio_filenames = restored['audio_files']
+            elif dedup_plan:
+                # Synthesize unique sentences only, under the names they would have had
+                unique_audio = generate_audio(
+                    [sentences[i]['sentence'] for i in unique_indices], v, str(media_dir), batch_name=word, rate=audio_speed,
+                    exact_filenames=[f"{word}_{i+1:02d}_{word_unique_id}.mp3" for i in unique_indices]
+                )
+                audio_filenames = expand_shared_files(dedup_plan, unique_audio, 'audio')
+            else:
+                audio_filenames = generate_audio([s['sentence'] for s in sentences], v, str(media_dir), batch_name=word, rate=audio_speed, unique_id=word_unique_id)
 
-        v = voice or _voice_for_language(language)
-        audio_filenames = generate_audio([s['sentence'] for s in sentences], v, str(media_dir), batch_name=word, rate=audio_speed, unique_id=word_unique_id)
+            if checkpoint and restored is None:
+                checkpoint.save("audio", {'audio_files': audio_filenames})
 
-        if log_callback:
-            log_callback(f"✅ Generated {len(audio_filenames)} audio files for '{word}'")
+            if log_callback:
+                log_callback(f"✅ Generated {len(audio_filenames)} audio files for '{word}'")
+            stage.set_attributes(chars=sum(len(sentences[i]['sentence']) for i in unique_indices),
+                                 files=sum(1 for name in audio_filenames if name))
+            if telemetry:
+                telemetry.tts_chars = sum(len(sentences[i]['sentence']) for i in unique_indices)
+                telemetry.mark("audio")
 
         # PASS 5: Visual Media
-        if log_callback:
-            log_callback(f"<b>🖼️ PASS 5/6: Visual Media</b>")
-            log_callback(f"Finding and downloading images from Pixabay for memory reinforcement for '{word}'...")
-
-        queries = [s.get('image_keywords', f"{word}, language, learning") for s in sentences]
-        used_image_urls = set()
-        
-        # Generate images using Pixabay (always free tier)
-        try:
-            # Get Pixabay API key (required)
-            pixabay_api_key = st.session_state.get('pixabay_api_key', None)
-            if not pixabay_api_key:
-                raise ValueError("Pixabay API key is required for image generation")
-
-            image_filenames, used_image_urls = generate_images_pixabay(
-                queries, str(media_dir), batch_name=word,
-                num_images=1, pixabay_api_key=pixabay_api_key, used_image_urls=used_image_urls, unique_id=word_unique_id
-            )
+        with span("pass.images", language=language, word=word) as stage:
             if log_callback:
-                log_callback(f"✅ Downloaded {len(image_filenames)} images from Pixabay for '{word}'")
-        except Exception as e:
-            logger.warning(f"Image generation failed for '{word}': {e}")
-            image_filenames = []
-            if log_callback:
-                log_callback(f"⚠️ Image generation failed for '{word}': {e}")
+                log_callback(f"<b>🖼️ PASS 5/6: Visual Media</b>")
+                log_callback(f"Finding and downloading images from Pixabay for memory reinforcement for '{word}'...")
+
+            queries = [s.get('image_keywords', f"{word}, language, learning") for s in sentences]
+            used_image_urls = set()
+            pixabay_api_key = None
+            restored = checkpoint.load("images") if checkpoint else None
+
+            # Generate images using Pixabay (always free tier)
+            if restored is not None:
+                image_filenames = restored['image_files']
+            else:
+                try:
+                    # Get Pixabay API key (required)
+                    pixabay_api_key = st.session_state.get('pixabay_api_key', None)
+                    if not pixabay_api_key:
+                        raise ValueError("Pixabay API key is required for image generation")
+
+                    if dedup_plan:
+                        unique_images, used_image_urls = generate_images_pixabay(
+                            [queries[i] for i in unique_indices], str(media_dir), batch_name=word,
+                            num_images=1, pixabay_api_key=pixabay_api_key, used_image_urls=used_image_urls,
+                            exact_filenames=[f"{word}_{i+1:02d}_{word_unique_id}.jpg" for i in unique_indices]
+                        )
+                        image_filenames = expand_shared_files(dedup_plan, unique_images, 'image')
+                    else:
+                        image_filenames, used_image_urls = generate_images_pixabay(
+                            queries, str(media_dir), batch_name=word,
+                            num_images=1, pixabay_api_key=pixabay_api_key, used_image_urls=used_image_urls, unique_id=word_unique_id
+                        )
+                    if log_callback:
+                        log_callback(f"✅ Downloaded {len(image_filenames)} images from Pixabay for '{word}'")
+                except Exception as e:
+                    logger.warning(f"Image generation failed for '{word}': {e}")
+                    image_filenames = []
+                    if log_callback:
+                        log_callback(f"⚠️ Image generation failed for '{word}': {e}")
+                if checkpoint and image_filenames:
+                    checkpoint.save("images", {'image_files': image_filenames})
+            stage.set("files", sum(1 for name in image_filenames if name))
+            if telemetry:
+                telemetry.pixabay_calls = len(unique_indices) if pixabay_api_key else 0
+                telemetry.mark("images")
 
         # PASS 6: Word Assembly
-        if log_callback:
-            log_callback(f"<b>📦 PASS 6/6: Word Assembly</b>")
-            log_callback(f"Combining all components into final word data for '{word}'...")
+        with span("pass.assembly", language=language, word=word):
+            if log_callback:
+                log_callback(f"<b>📦 PASS 6/6: Word Assembly</b>")
+                log_callback(f"Combining all components into final word data for '{word}'...")
 
-        word_data = {
-            'word': word,
-            'meaning': meaning,
-            'sentences': sentences,
-            'audio_files': audio_filenames,
-            'image_files': image_filenames,
-            'unique_id': word_unique_id  # Store unique ID for consistent filenames
-        }
+            if deduplicator is not None:
+                deduplicator.register(word, sentences, audio_filenames, image_filenames)
 
-        if log_callback:
-            log_callback(f"✅ Word '{word}' assembly completed - {len(sentences)} sentences, {len(audio_filenames)} audio files, {len(image_filenames)} images")
+            word_data = {
+                'word': word,
+                'meaning': meaning,
+                'sentences': sentences,
+                'audio_files': audio_filenames,
+                'image_files': image_filenames,
+                'unique_id': word_unique_id  # Store unique ID for consistent filenames
+            }
+
+            if log_callback:
+                log_callback(f"✅ Word '{word}' assembly completed - {len(sentences)} sentences, {len(audio_filenames)} audio files, {len(image_filenames)} images")
+
+        if telemetry and not (checkpoint and checkpoint.restored):
+            # Partly restored words would skew the per-word estimates
+            telemetry.mark("assembly")
+            telemetry.gemini_calls = st.session_state.get('gemini_api_calls', 0) - gemini_calls_before
+            telemetry.gemini_tokens = st.session_state.get('gemini_tokens_used', 0) - gemini_tokens_before
+            get_generation_telemetry().record_word(telemetry)
 
         return {
             'success': True,
@@ -602,6 +740,50 @@ def generate_deck_progressive(
         }
 
 
+def _word_data_to_card_rows(words_data: list) -> List[Dict[str, Any]]:
+    """
+    Convert progressive-generation word data to card rows for deck export.
+    """
+    cards_data = []
+    for word_data in words_data:
+        word = word_data['word']
+        meaning = word_data['meaning']
+        sentences = word_data['sentences']
+        audio_files = word_data['audio_files']
+        image_files = word_data['image_files']
+        unique_id = word_data.get('unique_id', '')  # Get unique ID if available
+
+        for idx_sent, sent in enumerate(sentences):
+            file_base = f"{word}_{idx_sent+1:02d}"
+            if unique_id:
+                file_base = f"{file_base}_{unique_id}"  # Add unique ID if available
+            audio_name = audio_files[idx_sent] if idx_sent < len(audio_files) else ""
+            image_name = image_files[idx_sent] if idx_sent < len(image_files) else ""
+
+            # Generate IPA (simplified)
+            final_ipa = sent.get("ipa", "")
+
+            # Format word explanations as HTML
+            word_explanations_html = explanations_html(sent.get("word_explanations", []))
+
+            cards_data.append({
+                "file_name": file_base,
+                "word": word,
+                "meaning": meaning,
+                "sentence": sent.get("sentence", ""),
+                "ipa": final_ipa,
+                "english": sent.get("english_translation", ""),
+                "audio": f"[sound:{audio_name}]" if audio_name else "",
+                "image": f'<img src="{image_name}">' if image_name else "",
+                "image_keywords": sent.get("image_keywords", ""),
+                "colored_sentence": sent.get("colored_sentence", sent.get("sentence", "")),
+                "word_explanations": word_explanations_html,
+                "grammar_summary": sent.get("grammar_summary", ""),
+                "tags": "",
+            })
+    return cards_data
+
+
 def create_apkg_from_word_data(
     words_data: list,
     media_dir: str,
@@ -617,67 +799,86 @@ def create_apkg_from_word_data(
         if deck_name is None:
             deck_name = language
         # Convert word data to card data format
-        cards_data = []
-        for word_data in words_data:
-            word = word_data['word']
-            meaning = word_data['meaning']
-            sentences = word_data['sentences']
-            audio_files = word_data['audio_files']
-            image_files = word_data['image_files']
-            unique_id = word_data.get('unique_id', '')  # Get unique ID if available
-
-            for idx_sent, sent in enumerate(sentences):
-                file_base = f"{word}_{idx_sent+1:02d}"
-                if unique_id:
-                    file_base = f"{file_base}_{unique_id}"  # Add unique ID if available
-                audio_name = audio_files[idx_sent] if idx_sent < len(audio_files) else ""
-                image_name = image_files[idx_sent] if idx_sent < len(image_files) else ""
-
-                # Generate IPA (simplified)
-                final_ipa = sent.get("ipa", "")
-
-                # Format word explanations as HTML
-                word_explanations_html = ""
-                explanations = sent.get("word_explanations", [])
-                if explanations and len(explanations) > 0:
-                    explanation_items = []
-                    for exp in explanations:
-                        if len(exp) >= 4:
-                            exp_word, pos, color, explanation = exp[0], exp[1], exp[2], exp[3]  # Use exp_word to avoid shadowing
-                            explanation_items.append(f'<div class="explanation-item"><span class="word-highlight" style="color: {color};"><strong>{exp_word}</strong></span> ({pos}): {explanation}</div>')
-                    if explanation_items:
-                        word_explanations_html = '<div class="word-explanations"><strong>Grammar Explanations:</strong><br>' + ''.join(explanation_items) + '</div>'
-
-                cards_data.append({
-                    "file_name": file_base,
-                    "word": word,
-                    "meaning": meaning,
-                    "sentence": sent.get("sentence", ""),
-                    "ipa": final_ipa,
-                    "english": sent.get("english_translation", ""),
-                    "audio": f"[sound:{audio_name}]" if audio_name else "",
-                    "image": f'<img src="{image_name}">' if image_name else "",
-                    "image_keywords": sent.get("image_keywords", ""),
-                    "colored_sentence": sent.get("colored_sentence", sent.get("sentence", "")),
-                    "word_explanations": word_explanations_html,
-                    "grammar_summary": sent.get("grammar_summary", ""),
-                    "tags": "",
-                })
+        cards_data = _word_data_to_card_rows(words_data)
 
         # Create the APKG file
-        return create_apkg_export(
-            cards_data,
-            media_dir,
-            output_apkg_path,
-            language,
-            deck_name
-        )
+        with span("export.build", language=language, cards=len(cards_data)) as export_span:
+            created = create_apkg_export(
+                cards_data,
+                media_dir,
+                output_apkg_path,
+                language,
+                deck_name
+            )
+            if created and Path(output_apkg_path).exists():
+                export_span.set("bytes", Path(output_apkg_path).stat().st_size)
+            return created
 
     except Exception as e:
         logger.error(f"Error creating APKG from word data: {e}")
         return False
 
 
+def append_word_to_apkg(
+    word_data: dict,
+    media_dir: str,
+    output_apkg_path: str,
+    language: str,
+    deck_name: str = None
+) -> bool:
+    """
+    Append one finished word's cards to the partial APKG for output_apkg_path.
+
+    The partial deck is finalized with finalize_incremental_apkg().
+    """
+    try:
+        rows = _word_data_to_card_rows([word_data])
+        with span("export.append", language=language, word=word_data.get('word'), cards=len(rows)):
+            with IncrementalApkgWriter(output_apkg_path, media_dir, language, deck_name, resume=True) as writer:
+                writer.add_rows(rows)
+        return True
+    except Exception as e:
+        logger.error(f"Error appending word to APKG: {e}")
+        return False
+
+
+def finalize_incremental_apkg(output_apkg_path: str, media_dir: str, expected_notes: int = None) -> bool:
+    """
+    Finalize the partial APKG built by append_word_to_apkg().
+
+    Args:
+        output_apkg_path: Path of the final .apkg file
+        media_dir: Directory containing audio and image files
+        expected_notes: If given, only finalize when the partial deck holds this many notes
+
+    Returns:
+        True if the .apkg was written, False otherwise (caller should do a full build)
+    """
+    try:
+        if not Path(output_apkg_path + ".partial").exists():
+            return False
+        writer = IncrementalApkgWriter(output_apkg_path, media_dir, resume=True)
+        if expected_notes is not None and writer.note_count != expected_notes:
+            logger.warning(f"Partial APKG has {writer.note_count} notes, expected {expected_notes}; discarding")
+            writer.discard()
+            return False
+        with span("export.finalize", cards=writer.note_count) as export_span:
+            finalized = writer.finalize()
+            if finalized and Path(output_apkg_path).exists():
+                export_span.set("bytes", Path(output_apkg_path).stat().st_size)
+            return finalized
+    except Exception as e:
+        logger.error(f"Error finalizing incremental APKG: {e}")
+        return False
+
+
+def discard_incremental_apkg(output_apkg_path: str) -> None:
+    """Remove any partial APKG left for output_apkg_path."""
+    partial_dir = Path(output_apkg_path + ".partial")
+    if partial_dir.exists():
+        shutil.rmtree(partial_dir, ignore_errors=True)
+
+
 def generate_ipa_hybrid(text: str, language: str, ai_ipa: str = "") -> str:
     """Generate IPA using hybrid approach (AI + fallback)."""
     return ai_ipa or ""
@@ -693,6 +894,7 @@ __all__ = [
     'generate_complete_deck',
     'generate_deck_progressive',
     'create_apkg_from_word_data',
+    'append_word_to_apkg', 'finalize_incremental_apkg', 'discard_incremental_apkg',
     # Sentence generation
     'generate_sentences', 'generate_word_meaning',
     # Audio generation
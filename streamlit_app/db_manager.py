@@ -27,7 +27,9 @@ except (ImportError, KeyError) as e:
 try:
     from word_manager import (
         get_words_paginated, search_words, get_completed_words,
-        mark_word_completed, mark_words_completed, increment_word_count, get_word_rank
+        mark_word_completed, mark_words_completed, increment_word_count, get_word_rank,
+        get_words_after_rank, get_rank_at_position, get_word_count,
+        get_completed_ranks, invalidate_completed_cache, invalidate_rank_index
     )
     logger.info("Successfully imported from word_manager")
 except (ImportError, KeyError) as e:
@@ -54,6 +56,8 @@ __all__ = [
     # Word operations
     'get_words_paginated', 'search_words', 'get_completed_words',
     'mark_word_completed', 'mark_words_completed', 'increment_word_count', 'get_word_rank',
+    'get_words_after_rank', 'get_rank_at_position', 'get_word_count',
+    'get_completed_ranks', 'invalidate_completed_cache', 'invalidate_rank_index',
     # Statistics
     'get_languages', 'get_word_stats', 'log_generation'
 ]
@@ -65,6 +65,15 @@ def init_database():
     finally:
         conn.close()
 
+def _clear_word_caches():
+    """Drop the in-process word caches after the words table was rewritten."""
+    # Lazy imports: both modules import from db_manager, which imports this module
+    from word_manager import invalidate_completed_cache, invalidate_rank_index
+    from frequency_utils import clear_page_cache
+    invalidate_completed_cache()
+    invalidate_rank_index()
+    clear_page_cache()
+
 def import_excel_to_db(excel_dir: Path = None):
     """
     One-time import: Load all Excel files into SQLite.
@@ -142,6 +151,7 @@ def import_excel_to_db(excel_dir: Path = None):
                 continue
 
         conn.commit()
+        _clear_word_caches()
         logger.info(f"✅ Import complete: {total_words} words from {len(list(excel_dir.glob('*.xlsx')))} languages")
         return True
 
@@ -178,6 +188,7 @@ def remove_unsupported_languages(unsupported_languages: List[str]):
         cursor.execute("DELETE FROM generation_history WHERE language IN ({})".format(','.join('?' * len(unsupported_languages))), unsupported_languages)
 
         conn.commit()
+        _clear_word_caches()
         logger.info(f"✅ Removed {count_before} words for {len(unsupported_languages)} unsupported languages")
         return True
 
@@ -199,6 +210,7 @@ def reset_database():
         cursor.execute("DROP TABLE IF EXISTS generation_history")
 
         conn.commit()
+        _clear_word_caches()
         logger.info("Database tables dropped")
 
         # Reinitialize
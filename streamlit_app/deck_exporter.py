@@ -8,84 +8,132 @@ import logging
 import pandas as pd
 import random
 import re
+import csv
+import json
+import math
+import time
+import hashlib
+import itertools
+import sqlite3
+import zipfile
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterable, Iterator, Optional, TextIO
+
+from streamlit_app.language_analyzers.token_annotations import TokenAnnotations
 
 # Import genanki for APKG creation
 try:
     import genanki
+    from genanki.apkg_col import APKG_COL
+    from genanki.apkg_schema import APKG_SCHEMA
 except ImportError:
     genanki = None
 
+# Row keys in note field order (see _build_note_model)
+NOTE_FIELD_KEYS = [
+    'file_name', 'word', 'meaning', 'sentence', 'ipa', 'english', 'audio', 'image',
+    'image_keywords', 'colored_sentence', 'word_explanations', 'grammar_summary', 'tags',
+]
+
 logger = logging.getLogger(__name__)
 
 # ============================================================================
 # TSV & ZIP EXPORT
 # ============================================================================
+# Anki note field names, in the same order as NOTE_FIELD_KEYS
+TSV_COLUMNS = [
+    "File Name",
+    "What is the Word?",
+    "Meaning of the Word",
+    "Sentence",
+    "IPA Transliteration",
+    "English Translation",
+    "Sound",
+    "Image",
+    "Image Keywords",
+    "Colored Sentence",
+    "Word Explanations",
+    "Grammar Summary",
+    "Tags",
+]
+
+# Bump when the column layout changes; read_tsv_rows() checks it
+TSV_SCHEMA_VERSION = 1
+TSV_SCHEMA_HEADER = "#fluent forever schema"
+# "#key:value" lines read as header: Anki's file headers plus our schema line.
+# Anything else starting with '#' is data (e.g. a file name beginning with '#').
+TSV_HEADER_KEYS = frozenset({
+    "separator", "html", "tags", "columns", "notetype", "deck",
+    "notetype column", "deck column", "tags column", "guid column",
+    TSV_SCHEMA_HEADER[1:],
+})
+TSV_CHUNK_SIZE = 10000
+
+
+def _encode_structured(val) -> str:
+    """JSON-encode list/dict values (e.g. raw word explanations) for a TSV cell."""
+    if isinstance(val, TokenAnnotations):
+        return val.to_json()
+    if isinstance(val, (list, dict)):
+        return json.dumps(val, ensure_ascii=False)
+    return val
+
+
+def _decode_structured(val: str):
+    """Inverse of _encode_structured for values that look like JSON."""
+    try:
+        return json.loads(val)
+    except ValueError:
+        return val
+
+
+def _rows_to_frame(rows: List[Dict[str, Any]]) -> pd.DataFrame:
+    """Build a string-only DataFrame in NOTE_FIELD_KEYS order from card rows."""
+    df = pd.DataFrame.from_records(rows, columns=NOTE_FIELD_KEYS)
+    df['word_explanations'] = df['word_explanations'].map(_encode_structured)
+    return df.fillna("").astype(str)
+
+
 def create_anki_tsv(
-    rows: list[dict],
+    rows: Iterable[Dict[str, Any]],
     output_path: str,
+    chunk_size: int = TSV_CHUNK_SIZE,
 ) -> bool:
-    """Create Anki TSV with headers for proper field mapping."""
+    """
+    Create Anki TSV with headers for proper field mapping.
+
+    The file starts with Anki's "#key:value" header lines (separator, html,
+    columns) plus a schema version line. All 13 fields are written
+    as-is so read_tsv_rows() gets back exactly what was exported. Rows are
+    written in chunks, so any iterable (including generators) can be streamed.
+    """
     try:
-        columns = [
-            "File Name",
-            "What is the Word?",
-            "Meaning of the Word",
-            "Sentence",
-            "IPA Transliteration",
-            "English Translation",
-            "Sound",
-            "Image",
-            "Image Keywords",
-            "Colored Sentence",
-            "Word Explanations",
-            "Grammar Summary",
-            "Tags",
-        ]
-
-        formatted_rows = []
-        for r in rows:
-            # Convert word explanations list to JSON string for TSV
-            word_explanations_json = ""
-            if r.get("word_explanations"):
-                try:
-                    import json
-                    word_explanations_json = json.dumps(r["word_explanations"], ensure_ascii=False)
-                except Exception:
-                    word_explanations_json = str(r.get("word_explanations", ""))
-
-            # Format meaning with line breaks for better readability
-            raw_meaning = r.get("meaning", "")
-            formatted_meaning = raw_meaning
-            if len(raw_meaning) > 50:  # If meaning is long, add line breaks
-                # Split on common separators
-                formatted_meaning = raw_meaning.replace("; ", ";\n").replace(", ", ",\n")
-
-            formatted_rows.append({
-                "File Name": r.get("file_name", ""),
-                "What is the Word?": r.get("word", ""),
-                "Meaning of the Word": formatted_meaning,
-                "Sentence": r.get("sentence", ""),
-                "IPA Transliteration": r.get("ipa", ""),
-                "English Translation": r.get("english", ""),
-                "Sound": r.get("audio", ""),
-                "Image": r.get("image", ""),
-                "Image Keywords": r.get("image_keywords", ""),
-                "Colored Sentence": r.get("colored_sentence", ""),
-                "Word Explanations": word_explanations_json,
-                "Grammar Summary": r.get("grammar_summary", ""),
-                "Tags": r.get("tags", ""),
-            })
-
-        df = pd.DataFrame(formatted_rows)
-        df.to_csv(output_path, sep="\t", index=False, header=False, encoding="utf-8", quoting=0)  # QUOTE_MINIMAL
+        with open(output_path, "w", encoding="utf-8", newline="") as f:
+            f.write("#separator:tab\n")
+            f.write("#html:true\n")
+            f.write("#columns:" + "\t".join(TSV_COLUMNS) + "\n")
+            f.write(f"{TSV_SCHEMA_HEADER}:{TSV_SCHEMA_VERSION}\n")
+
+            for chunk in _chunked(rows, chunk_size):
+                _rows_to_frame(chunk).to_csv(
+                    f, sep="\t", index=False, header=False, quoting=csv.QUOTE_MINIMAL, lineterminator="\n"
+                )
         return True
 
     except Exception as e:
         logger.error(f"TSV creation error: {e}")
         return False
 
+
+def _chunked(rows: Iterable[Dict[str, Any]], chunk_size: int) -> Iterator[List[Dict[str, Any]]]:
+    """Yield lists of at most chunk_size rows."""
+    iterator = iter(rows)
+    while True:
+        chunk = list(itertools.islice(iterator, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
 def create_zip_export(
     tsv_path: str,
     media_dir: str,
@@ -143,6 +191,71 @@ Finding Anki Media Folder:
         logger.error(f"ZIP creation error: {e}")
         return False
 
+def _read_tsv_header(f: TextIO) -> Dict[str, str]:
+    """
+    Consume leading "#key:value" header lines from an open TSV file.
+
+    Stops at the first line whose key is not in TSV_HEADER_KEYS and leaves
+    the file positioned there, at the first data row.
+    """
+    header = {}
+    while True:
+        pos = f.tell()
+        line = f.readline()
+        key, sep, value = line[1:].rstrip('\r\n').partition(':')
+        key = key.strip().lower()
+        if not line.startswith('#') or not sep or key not in TSV_HEADER_KEYS:
+            f.seek(pos)
+            return header
+        header[key] = value
+
+
+def iter_tsv_rows(tsv_path: str, chunk_size: int = TSV_CHUNK_SIZE) -> Iterator[List[Dict[str, Any]]]:
+    """
+    Stream a TSV written by create_anki_tsv() in chunks of row dicts.
+
+    Files without a schema header (older exports) are read positionally; any
+    missing trailing columns come back as empty strings.
+
+    Args:
+        tsv_path: Path to the TSV file
+        chunk_size: Number of rows per chunk
+
+    Yields:
+        Lists of dicts keyed by NOTE_FIELD_KEYS
+    """
+    with open(tsv_path, encoding="utf-8", newline="") as f:
+        header = _read_tsv_header(f)
+        version = header.get(TSV_SCHEMA_HEADER[1:])
+        if version is not None and int(version) > TSV_SCHEMA_VERSION:
+            raise ValueError(f"Unsupported TSV schema version {version} (expected <= {TSV_SCHEMA_VERSION})")
+
+        data_start = f.tell()
+        if not f.read(1):
+            return
+        f.seek(data_start)
+        reader = pd.read_csv(
+            f,
+            sep='\t',
+            header=None,
+            names=NOTE_FIELD_KEYS,
+            dtype=str,
+            keep_default_na=False,
+            na_filter=False,
+            quoting=csv.QUOTE_MINIMAL,
+            chunksize=chunk_size,
+        )
+        for df in reader:
+            df = df.fillna("")
+            explanations = df['word_explanations']
+            structured = explanations.str[:1].isin(('[', '{'))
+            if structured.any():
+                df['word_explanations'] = explanations.where(
+                    ~structured, explanations[structured].map(_decode_structured)
+                )
+            yield df.to_dict('records')
+
+
 def read_tsv_rows(tsv_path: str) -> List[Dict[str, Any]]:
     """
     Read TSV file and convert to rows format expected by create_apkg_export.
@@ -151,28 +264,13 @@ def read_tsv_rows(tsv_path: str) -> List[Dict[str, Any]]:
         tsv_path: Path to the TSV file
 
     Returns:
-        List of dicts with keys: file_name, word, meaning, sentence, ipa, english, audio, image, image_keywords, tags
+        List of dicts with keys: file_name, word, meaning, sentence, ipa, english, audio, image,
+        image_keywords, colored_sentence, word_explanations, grammar_summary, tags
     """
     try:
-        df = pd.read_csv(tsv_path, sep='\t', header=None,
-                        names=['file_name', 'word', 'meaning', 'sentence', 'ipa', 'english', 'audio', 'image', 'image_keywords', 'tags'],
-                        encoding='utf-8')
-
         rows = []
-        for _, row in df.iterrows():
-            rows.append({
-                'file_name': str(row.get('file_name', '')),
-                'word': str(row.get('word', '')),
-                'meaning': str(row.get('meaning', '')),
-                'sentence': str(row.get('sentence', '')),
-                'ipa': str(row.get('ipa', '')),
-                'english': str(row.get('english', '')),
-                'audio': str(row.get('audio', '')),
-                'image': str(row.get('image', '')),
-                'image_keywords': str(row.get('image_keywords', '')),
-                'tags': str(row.get('tags', ''))
-            })
-
+        for chunk in iter_tsv_rows(tsv_path):
+            rows.extend(chunk)
         return rows
 
     except Exception as e:
@@ -245,9 +343,39 @@ def _create_apkg_from_rows(
     if deck_name is None:
         deck_name = language
 
-    # Create note model with 12 fields and 3 card templates
-    model_id = random.randrange(1 << 30, 1 << 31)
-    model = genanki.Model(
+    try:
+        writer = IncrementalApkgWriter(str(output_path), media_dir, language, deck_name, resume=False)
+        writer.add_rows(rows)
+        if not writer.finalize():
+            return False
+        logger.info(f"Created .apkg file with {len(rows)} notes at {output_apkg}")
+        return True
+    except FileNotFoundError as fnf_err:
+        logger.error(f"FileNotFoundError during .apkg creation: {fnf_err}")
+        logger.error(f"Current working directory: {os.getcwd()}")
+        logger.error(f"Attempted output path: {output_path}")
+        return False
+    except Exception as e:
+        logger.error(f"General error during .apkg creation: {e}")
+        logger.error(f"Current working directory: {os.getcwd()}")
+        logger.error(f"Attempted output path: {output_path}")
+        return False
+
+
+def _build_note_model(language: str, model_id: int = None):
+    """
+    Build the 13-field, 3-card Fluent Forever note model.
+
+    Args:
+        language: Target language name, used in the production card prompt
+        model_id: Anki model ID (random if not provided)
+
+    Returns:
+        genanki.Model
+    """
+    if model_id is None:
+        model_id = random.randrange(1 << 30, 1 << 31)
+    return genanki.Model(
         model_id,
         'Fluent Forever Language Learning',
         fields=[
@@ -285,91 +413,274 @@ def _create_apkg_from_rows(
         css='''.card {\n    font-family: arial;\n    font-size: 20px;\n    text-align: center;\n    color: var(--text-color, black);\n    background-color: var(--card-bg, white);\n}\n\n.hint {\n    font-size: 16px;\n    color: var(--subtle-text, #666);\n    margin: 10px;\n    font-style: italic;\n}\n\n.sentence {\n    font-size: 32px;\n    color: var(--accent-color, #0066cc);\n    margin: 20px;\n    font-weight: bold;\n}\n\n.colored-sentence {\n    font-size: 32px;\n    margin: 20px;\n    font-weight: bold;\n    line-height: 1.4;\n}\n\n.colored-sentence span {\n    display: inline;\n    margin: 0 2px;\n}\n\n/* Grammar element color classes for Anki compatibility */\n.grammar-pronouns { color: #FF4444 !important; font-weight: bold; }\n.grammar-verbs { color: #44FF44 !important; font-weight: bold; }\n.grammar-postpositions { color: #4444FF !important; font-weight: bold; }\n.grammar-nouns { color: #FFAA00 !important; font-weight: bold; }\n.grammar-adjectives { color: #FF44FF !important; font-weight: bold; }\n.grammar-adverbs { color: #44FFFF !important; font-weight: bold; }\n.grammar-aspect_markers { color: #AAFF44 !important; font-weight: bold; }\n.grammar-case_markers { color: #FF8844 !important; font-weight: bold; }\n.grammar-honorifics { color: #AA44FF !important; font-weight: bold; }\n.grammar-causative_markers { color: #FFAA88 !important; font-weight: bold; }\n.grammar-discourse_particles { color: #88FFAA !important; font-weight: bold; }\n.grammar-compound_verbs { color: #FFFF44 !important; font-weight: bold; }\n.grammar-other { color: #888888 !important; font-weight: bold; }\n\n/* Additional grammar elements for other languages */\n.grammar-articles { color: #FF6B6B !important; font-weight: bold; }\n.grammar-prepositions { color: #4ECDC4 !important; font-weight: bold; }\n.grammar-conjunctions { color: #45B7D1 !important; font-weight: bold; }\n.grammar-interjections { color: #FFA07A !important; font-weight: bold; }\n.grammar-particles { color: #98D8C8 !important; font-weight: bold; }\n.grammar-auxiliaries { color: #F7DC6F !important; font-weight: bold; }\n.grammar-modals { color: #BB8FCE !important; font-weight: bold; }\n.grammar-determiners { color: #85C1E9 !important; font-weight: bold; }\n\n.english-prompt {\n    font-size: 28px;\n    color: var(--accent-secondary, #009900);\n    margin: 20px;\n    font-weight: bold;\n}\n\n.sound {\n    margin: 20px;\n}\n\n.english {\n    font-size: 22px;\n    color: var(--accent-secondary, #009900);\n    margin: 15px;\n}\n\n.ipa {\n    font-size: 16px;\n    color: var(--subtle-text, #666);\n    font-family: "Charis SIL", "Doulos SIL", serif;\n    margin: 10px;\n}\n\n.word-info {\n    font-size: 14px;\n    color: var(--text-color, #333);\n    margin: 15px;\n}\n\n.grammar-summary {\n    font-size: 16px;\n    color: var(--text-color, #555);\n    margin: 15px;\n    font-style: italic;\n    background-color: var(--card-bg-secondary, #f9f9f9);\n    padding: 10px;\n    border-radius: 5px;\n    border-left: 4px solid var(--accent-color, #0066cc);\n}\n\n.explanations-toggle {\n    font-size: 14px;\n    color: var(--accent-color, #0066cc);\n    margin: 10px;\n    cursor: pointer;\n    text-decoration: underline;\n    font-weight: bold;\n}\n\n.word-explanations {\n    font-size: 12px;\n    color: var(--text-color, #444);\n    margin: 10px;\n    background-color: var(--card-bg-secondary, #f5f5f5);\n    padding: 8px;\n    border-radius: 3px;\n    max-height: 150px;\n    overflow-y: auto;\n}\n\n.explanation-item {\n    margin: 5px 0;\n    padding: 3px 0;\n    border-bottom: 1px solid var(--subtle-text, #ddd);\n}\n\n.explanation-item:last-child {\n    border-bottom: none;\n}\n\n.word-highlight {\n    font-weight: bold;\n    text-decoration: underline;\n}\n\n.keywords {\n    font-size: 12px;\n    color: var(--subtle-text, #999);\n    margin: 10px;\n    font-style: italic;\n}\n\n.image {\n    margin: 20px auto;\n    display: flex;\n    justify-content: center;\n    align-items: center;\n    width: 100%;\n    max-width: 100vw;\n}\n\n.image img {\n    display: block;\n    margin: 0 auto;\n    max-width: 95vw;\n    max-height: 40vh;\n    width: auto;\n    height: auto;\n    object-fit: contain;\n    border-radius: 10px;\n    box-shadow: 0 2px 12px rgba(0,0,0,0.2);\n}\n\n.instructions {\n    font-size: 18px;\n    color: var(--text-color, #333);\n    margin: 15px;\n    line-height: 1.5;\n}\n\n.user-recording {\n    font-size: 16px;\n    color: var(--accent-color, #0066cc);\n    margin: 15px;\n}\n\n.tts-voice {\n    font-size: 16px;\n    color: var(--accent-secondary, #009900);\n    margin: 15px;\n}\n\n.comparison-instructions {\n    font-size: 14px;\n    color: var(--subtle-text, #666);\n    margin: 15px;\n    font-style: italic;\n}'''
     )
 
-    # Create deck
-    deck_id = random.randrange(1 << 30, 1 << 31)
-    deck = genanki.Deck(deck_id, deck_name)
-
-    # Collect media files
-    media_files = []
-    for row in rows:
-        # Extract audio and image filenames
-        audio_match = re.search(r'\[sound:(.*?)\]', row.get('audio', ''))
-        audio_file = audio_match.group(1) if audio_match else ''
-
-        # Handle image field - could be HTML <img src="file"> or just filename
-        image_field = row.get('image', '').strip()
-        if image_field.startswith('<img src="') and image_field.endswith('">'):
-            # Extract from HTML
-            image_match = re.search(r'src="(.*?)"', image_field)
-            image_file = image_match.group(1) if image_match else ''
+
+def _safe_field(val) -> str:
+    """Convert a row value to a note field string, mapping None/NaN to ''."""
+    if val is None:
+        return ""
+    if isinstance(val, float) and math.isnan(val):
+        return ""
+    return str(val)
+
+
+def _extract_media_filenames(row: Dict[str, Any]) -> List[str]:
+    """Extract the audio and image filenames referenced by a card row."""
+    filenames = []
+
+    audio_match = re.search(r'\[sound:(.*?)\]', row.get('audio', '') or '')
+    if audio_match and audio_match.group(1):
+        filenames.append(audio_match.group(1))
+
+    # Handle image field - could be HTML <img src="file"> or just filename
+    image_field = (row.get('image', '') or '').strip()
+    if image_field.startswith('<img src="') and image_field.endswith('">'):
+        image_match = re.search(r'src="(.*?)"', image_field)
+        image_file = image_match.group(1) if image_match else ''
+    else:
+        image_file = image_field
+    if image_file:
+        filenames.append(image_file)
+
+    return filenames
+
+
+# ============================================================================
+# INCREMENTAL APKG WRITER
+# ============================================================================
+
+# Media that is already compressed gains nothing from DEFLATE
+PRECOMPRESSED_MEDIA_EXTENSIONS = {'.mp3', '.jpg', '.jpeg', '.png', '.gif', '.webp', '.ogg', '.m4a'}
+
+
+class IncrementalApkgWriter:
+    """
+    Builds an .apkg incrementally as words finish.
+
+    Notes go straight into an on-disk collection database and media files are
+    appended to a staging zip, both committed after every add_rows() call, so
+    memory stays bounded and a crash loses at most the word in flight. Media is
+    deduplicated by content hash and already-compressed formats are stored
+    without recompression. finalize() turns the staging zip into the .apkg.
+
+    Staging lives next to the output file in "<output>.partial/" and is picked
+    up again when a writer is created with resume=True.
+    """
+
+    STATE_FILE = "state.json"
+    COLLECTION_FILE = "collection.anki2"
+    MEDIA_ZIP_FILE = "media.zip"
+
+    def __init__(self, output_apkg: str, media_dir: str, language: str = "English",
+                 deck_name: str = None, resume: bool = True):
+        """
+        Open or create the staging area for an .apkg.
+
+        Args:
+            output_apkg: Path of the final .apkg file
+            media_dir: Directory containing audio and image files
+            language: Target language name
+            deck_name: Name of the Anki deck (defaults to language)
+            resume: Continue an existing staging area instead of starting over
+        """
+        if genanki is None:
+            raise RuntimeError("genanki library not available. Cannot create APKG file.")
+
+        self.output_apkg = Path(output_apkg)
+        self.media_dir = media_dir
+        self.staging_dir = Path(str(output_apkg) + ".partial")
+
+        if not resume and self.staging_dir.exists():
+            shutil.rmtree(self.staging_dir)
+        self.staging_dir.mkdir(parents=True, exist_ok=True)
+
+        state_path = self.staging_dir / self.STATE_FILE
+        if state_path.exists():
+            with open(state_path, encoding="utf-8") as f:
+                self._state = json.load(f)
+            self.model = _build_note_model(self._state['language'], self._state['model_id'])
+            self._conn = sqlite3.connect(str(self.staging_dir / self.COLLECTION_FILE))
+            logger.info(f"Resuming partial deck with {self._state['note_count']} notes at {self.staging_dir}")
         else:
-            # Assume it's just the filename
-            image_file = image_field
-        # Add media files to list
-        if audio_file:
-            audio_path = os.path.join(media_dir, audio_file)
-            if os.path.exists(audio_path):
-                media_files.append(audio_path)
-                logger.debug(f"Added audio media file: {audio_path}")
-            else:
-                logger.warning(f"Missing audio file, skipping: {audio_path}")
-        if image_file:
-            image_path = os.path.join(media_dir, image_file)
-            if os.path.exists(image_path):
-                media_files.append(image_path)
-                logger.debug(f"Added image media file: {image_path}")
+            if deck_name is None:
+                deck_name = language
+            self._state = {
+                'language': language,
+                'deck_name': deck_name,
+                'deck_id': random.randrange(1 << 30, 1 << 31),
+                'model_id': random.randrange(1 << 30, 1 << 31),
+                'timestamp': time.time(),
+                'next_id': int(time.time() * 1000),
+                'note_count': 0,
+                'media': {},    # filename -> zip entry index
+                'hashes': {},   # sha1 -> filename
+            }
+            self.model = _build_note_model(language, self._state['model_id'])
+            self._conn = sqlite3.connect(str(self.staging_dir / self.COLLECTION_FILE))
+            self._init_collection()
+            self._save_state()
+
+        self._next_media_idx = self._find_next_media_idx()
+
+    @property
+    def note_count(self) -> int:
+        """Number of notes committed so far."""
+        return self._state['note_count']
+
+    def _init_collection(self) -> None:
+        """Create the collection schema and register the deck and model."""
+        cursor = self._conn.cursor()
+        cursor.executescript(APKG_SCHEMA)
+        cursor.executescript(APKG_COL)
+        deck = genanki.Deck(self._state['deck_id'], self._state['deck_name'])
+        deck.add_model(self.model)
+        deck.write_to_db(cursor, self._state['timestamp'], iter(()))
+        self._conn.commit()
+
+    def _find_next_media_idx(self) -> int:
+        """Next free media index, including entries written before a crash."""
+        used = list(self._state['media'].values())
+        media_zip = self.staging_dir / self.MEDIA_ZIP_FILE
+        if media_zip.exists():
+            try:
+                with zipfile.ZipFile(media_zip) as zf:
+                    used.extend(int(name) for name in zf.namelist() if name.isdigit())
+            except zipfile.BadZipFile:
+                logger.warning(f"Discarding unreadable staging media zip: {media_zip}")
+                media_zip.unlink()
+                self._state['media'] = {}
+                self._state['hashes'] = {}
+                used = []
+        return max(used) + 1 if used else 0
+
+    def _save_state(self) -> None:
+        """Atomically persist the manifest."""
+        tmp_path = self.staging_dir / (self.STATE_FILE + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self._state, f, ensure_ascii=False)
+        os.replace(tmp_path, self.staging_dir / self.STATE_FILE)
+
+    def _hash_file(self, path: str) -> str:
+        """SHA-1 of a file's content, read in chunks."""
+        digest = hashlib.sha1()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 16), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def _add_media(self, zf: zipfile.ZipFile, filename: str) -> Optional[str]:
+        """
+        Add one media file to the staging zip.
+
+        Returns:
+            Filename the note should reference (a previously stored file with
+            identical content, or the file itself), or None if it is missing
+        """
+        if filename in self._state['media']:
+            return filename
+
+        path = os.path.join(self.media_dir, filename)
+        try:
+            content_hash = self._hash_file(path)
+        except FileNotFoundError:
+            logger.warning(f"Missing media file, skipping: {path}")
+            return None
+
+        existing = self._state['hashes'].get(content_hash)
+        if existing:
+            logger.debug(f"Deduplicated media file {filename} -> {existing}")
+            return existing
+
+        idx = self._next_media_idx
+        self._next_media_idx += 1
+        ext = os.path.splitext(filename)[1].lower()
+        compress_type = zipfile.ZIP_STORED if ext in PRECOMPRESSED_MEDIA_EXTENSIONS else zipfile.ZIP_DEFLATED
+        zf.write(path, str(idx), compress_type=compress_type)
+        self._state['media'][filename] = idx
+        self._state['hashes'][content_hash] = filename
+        return filename
+
+    def add_rows(self, rows: List[Dict[str, Any]]) -> int:
+        """
+        Append card rows and their media, then commit.
+
+        Args:
+            rows: Card data dicts (same format as create_apkg_export)
+
+        Returns:
+            Number of notes added
+        """
+        if not rows:
+            return 0
+
+        prepared_rows = []
+        with zipfile.ZipFile(self.staging_dir / self.MEDIA_ZIP_FILE, 'a') as zf:
+            for row in rows:
+                row = dict(row)
+                for filename in _extract_media_filenames(row):
+                    stored_name = self._add_media(zf, filename)
+                    if stored_name and stored_name != filename:
+                        row['audio'] = (row.get('audio') or '').replace(filename, stored_name)
+                        row['image'] = (row.get('image') or '').replace(filename, stored_name)
+                prepared_rows.append(row)
+
+        id_gen = itertools.count(self._state['next_id'])
+        cursor = self._conn.cursor()
+        for row in prepared_rows:
+            note = genanki.Note(
+                model=self.model,
+                fields=[_safe_field(row.get(key, '')) for key in NOTE_FIELD_KEYS]
+            )
+            note.write_to_db(cursor, self._state['timestamp'], self._state['deck_id'], id_gen)
+        self._conn.commit()
+
+        self._state['next_id'] = next(id_gen)
+        self._state['note_count'] += len(prepared_rows)
+        self._save_state()
+        return len(prepared_rows)
+
+    def close(self) -> None:
+        """Close the collection database; the staging area is kept for resuming."""
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def finalize(self) -> bool:
+        """
+        Write the final .apkg from the staging area and remove it.
+
+        Returns:
+            True if successful, False otherwise
+        """
+        self.close()
+        tmp_apkg = Path(str(self.output_apkg) + ".tmp")
+        media_zip = self.staging_dir / self.MEDIA_ZIP_FILE
+        try:
+            if media_zip.exists():
+                os.replace(media_zip, tmp_apkg)
+                mode = 'a'
             else:
-                logger.warning(f"Missing image file, skipping: {image_path}")
-
-    logger.info(f"Collected {len(media_files)} media files for .apkg package")
-
-    # Create notes
-    for row in rows:
-        # Create note
-        import math
-        def _s(val):
-            if val is None:
-                return ""
-            if isinstance(val, float):
-                if math.isnan(val):
-                    return ""
-                return str(val)
-            return str(val)
-        note = genanki.Note(
-            model=model,
-            fields=[
-                _s(row.get('file_name', '')),
-                _s(row.get('word', '')),
-                _s(row.get('meaning', '')),
-                _s(row.get('sentence', '')),
-                _s(row.get('ipa', '')),
-                _s(row.get('english', '')),
-                _s(row.get('audio', '')),
-                _s(row.get('image', '')),
-                _s(row.get('image_keywords', '')),
-                _s(row.get('colored_sentence', '')),
-                _s(row.get('word_explanations', '')),
-                _s(row.get('grammar_summary', '')),
-                _s(row.get('tags', ''))
-            ]
-        )
-        deck.add_note(note)
+                mode = 'w'
+            with zipfile.ZipFile(tmp_apkg, mode) as zf:
+                zf.write(self.staging_dir / self.COLLECTION_FILE, 'collection.anki2',
+                         compress_type=zipfile.ZIP_DEFLATED)
+                media_json = {str(idx): filename for filename, idx in self._state['media'].items()}
+                zf.writestr('media', json.dumps(media_json))
+            os.replace(tmp_apkg, self.output_apkg)
+            shutil.rmtree(self.staging_dir, ignore_errors=True)
+            logger.info(f"Finalized .apkg with {self.note_count} notes and {len(self._state['media'])} media files at {self.output_apkg}")
+            return True
+        except Exception as e:
+            logger.error(f"Error finalizing .apkg {self.output_apkg}: {e}")
+            return False
 
-    # Create package
-    try:
-        package = genanki.Package(deck)
-        package.media_files = media_files
-        logger.info(f"Set {len(media_files)} media files in package: {[os.path.basename(f) for f in media_files]}")
-        package.write_to_file(str(output_path))
-        logger.info(f"Created .apkg file with {len(rows)} notes at {output_apkg}")
-        return True
-    except FileNotFoundError as fnf_err:
-        logger.error(f"FileNotFoundError during .apkg creation: {fnf_err}")
-        logger.error(f"Current working directory: {os.getcwd()}")
-        logger.error(f"Attempted output path: {output_path}")
+    def discard(self) -> None:
+        """Drop the staging area without writing an .apkg."""
+        self.close()
+        shutil.rmtree(self.staging_dir, ignore_errors=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
         return False
-    except Exception as e:
-        logger.error(f"General error during .apkg creation: {e}")
-        logger.error(f"Current working directory: {os.getcwd()}")
-        logger.error(f"Attempted output path: {output_path}")
-        return False
\ No newline at end of file
@@ -4,13 +4,26 @@ Handles loading word lists (via SQLite) and batch size recommendations.
 """
 
 import os
+import threading
+from collections import OrderedDict
 from pathlib import Path
-from typing import List, Dict, Tuple
+from typing import List, Dict, Tuple, Optional
 import pandas as pd
 
 # Lazy imports to avoid circular dependencies
 # from db_manager import get_words_paginated, search_words, get_languages
 
+# Word-select page cache. The words table only changes on import, so pages stay
+# valid until db_setup or a completion update in word_manager clears them (the
+# page's word dicts carry completion flags; the rendered column comes from the
+# completed-rank cache in word_manager).
+PAGE_CACHE_MAX_ENTRIES = 256
+_page_cache: "OrderedDict[Tuple[str, int, int], List[Dict]]" = OrderedDict()
+# (language, page_size) -> {page: rank of the last word on the previous page}
+_page_cursors: Dict[Tuple[str, int], Dict[int, int]] = {}
+_word_counts: Dict[str, int] = {}
+_page_cache_lock = threading.Lock()
+
 # Batch size presets with time/complexity estimates
 BATCH_PRESETS = {
     5: {
@@ -111,10 +124,23 @@ def get_batch_info(batch_size: int) -> Dict:
     return BATCH_PRESETS.get(batch_size, {})
 
 
-def format_batch_option(batch_size: int) -> str:
-    """Format batch size for UI display."""
+def format_batch_option(batch_size: int, num_sentences: int = 10, language: str = None) -> str:
+    """
+    Format batch size for UI display.
+
+    Uses the time measured for earlier words when there is enough telemetry,
+    otherwise the preset's static estimate.
+    """
     info = BATCH_PRESETS.get(batch_size, {})
-    return f"{info.get('emoji', '•')} {batch_size} words ({info.get('time_estimate', 'N/A')})"
+    time_estimate = info.get('time_estimate', 'N/A')
+    try:
+        from streamlit_app.services.generation.generation_telemetry import format_duration_range, get_generation_telemetry
+        estimate = get_generation_telemetry().estimate(batch_size, num_sentences, language)
+        if estimate['source'] != 'default':
+            time_estimate = format_duration_range(estimate['wall_seconds_p50'], estimate['wall_seconds_p90'])
+    except ImportError:
+        pass
+    return f"{info.get('emoji', '•')} {batch_size} words ({time_estimate})"
 
 
 def recommend_batch_strategy(total_words: int) -> Tuple[List[int], str]:
@@ -232,9 +258,67 @@ def parse_uploaded_word_file(uploaded_file) -> Tuple[List[str], str]:
         return [], f"❌ Error reading file: {str(e)}"
 
 
+def clear_page_cache(language: Optional[str] = None):
+    """
+    Clear cached word-select pages, cursors and counts.
+
+    Args:
+        language: Language name, or None to clear every language
+    """
+    with _page_cache_lock:
+        if language is None:
+            _page_cache.clear()
+            _page_cursors.clear()
+            _word_counts.clear()
+            return
+        for key in [k for k in _page_cache if k[0] == language]:
+            del _page_cache[key]
+        for key in [k for k in _page_cursors if k[0] == language]:
+            del _page_cursors[key]
+        _word_counts.pop(language, None)
+
+
+def _get_page_words(language: str, page: int, page_size: int) -> List[Dict]:
+    """Fetch one page of words via keyset pagination, using the page cache."""
+    from db_manager import get_words_after_rank, get_rank_at_position
+
+    cache_key = (language, page_size, page)
+    with _page_cache_lock:
+        if cache_key in _page_cache:
+            _page_cache.move_to_end(cache_key)
+            return _page_cache[cache_key]
+        after_rank = _page_cursors.get((language, page_size), {}).get(page)
+
+    if after_rank is None:
+        if page <= 1:
+            after_rank = 0
+        else:
+            # Direct jump: seed the cursor from the last word of the previous page
+            after_rank = get_rank_at_position(language, (page - 1) * page_size - 1)
+            if after_rank is None:
+                return []
+
+    words = get_words_after_rank(language, after_rank=after_rank, limit=page_size)
+
+    with _page_cache_lock:
+        _page_cache[cache_key] = words
+        while len(_page_cache) > PAGE_CACHE_MAX_ENTRIES:
+            _page_cache.popitem(last=False)
+        cursors = _page_cursors.setdefault((language, page_size), {})
+        cursors[page] = after_rank
+        if words:
+            cursors[page + 1] = words[-1]['rank']
+
+    return words
+
+
 def get_words_with_ranks(language: str, page: int = 1, page_size: int = 25) -> Tuple[pd.DataFrame, int]:
     """
     Get paginated words with their frequency ranks for display.
+
+    Pages are fetched with keyset pagination on (language, rank) and cached, and
+    completion status comes from the cached completed-rank set, so the cost per
+    page does not depend on how deep into the list the user is.
     
     Args:
         language: Language name
@@ -244,21 +328,28 @@ def get_words_with_ranks(language: str, page: int = 1, page_size: int = 25) -> T
     Returns:
         (DataFrame with columns ['Rank', 'Word', 'Completed'], total_word_count)
     """
-    from db_manager import get_words_paginated, get_completed_words
-    
-    words, total_count = get_words_paginated(language, page=page, per_page=page_size)
-    completed = get_completed_words(language)
+    from db_manager import get_word_count, get_completed_ranks
+
+    with _page_cache_lock:
+        total_count = _word_counts.get(language)
+    if total_count is None:
+        total_count = get_word_count(language)
+        if total_count:
+            with _page_cache_lock:
+                _word_counts[language] = total_count
+
+    words = _get_page_words(language, page, page_size)
+    completed = get_completed_ranks(language)
     
     # Build dataframe with rank and completion status
     start_rank = (page - 1) * page_size + 1
     data = []
     
     for idx, word_dict in enumerate(words, start=start_rank):
-        word = word_dict['word']
         data.append({
             'Rank': idx,
-            'Word': word,
-            'Completed': '✓' if word in completed else ''
+            'Word': word_dict['word'],
+            'Completed': '✓' if word_dict['rank'] in completed else ''
         })
     
     df = pd.DataFrame(data)
@@ -202,102 +202,132 @@ def validate_ipa_unbracketed(text: str, language: str) -> tuple[bool, str]:
     return True, text
 
 
-def generate_ipa_hybrid(sentence: str, language: str, gemini_api_key: str) -> str:
+# Languages where romanized pronunciation is more useful to learners than strict IPA
+IPA_ROMANIZATION_LANGUAGES = ['hi', 'ar', 'fa', 'ur', 'bn', 'pa', 'gu', 'or', 'ta', 'te', 'kn', 'ml', 'si']
+
+_NUMBERED_LINE = re.compile(r'^\s*(?:Sentence\s+)?(\d+)\s*[:.)]\s*(.*)$', re.IGNORECASE)
+
+
+def _build_ipa_batch_prompt(sentences: List[str], full_lang_name: str, romanized: bool, retry: bool = False) -> str:
+    """Numbered transliteration prompt for several sentences; retry prompts are stricter."""
+    numbered = "\n".join(f"Sentence {i}: {sentence}" for i, sentence in enumerate(sentences, 1))
+    if romanized:
+        instructions = f"""Transliterate each {full_lang_name} sentence to romanized pronunciation using Latin letters.
+
+Use standard romanization conventions for {full_lang_name}. Show pronunciation clearly with familiar letters."""
+    elif retry:
+        instructions = f"""Convert each {full_lang_name} sentence to IPA only. NO Pinyin, NO romanization, NO delimiters like / or [ ], ONLY IPA symbols."""
+    else:
+        instructions = f"""Transliterate each {full_lang_name} sentence to IPA (International Phonetic Alphabet) only.
+
+IMPORTANT: Use ONLY official IPA symbols. Do NOT use:
+- Pinyin romanization (no āáǎà, no ma1, no zh/ch/sh/r/z/c/s)
+- Any non-IPA romanization systems
+- Latin letters that aren't IPA symbols
+- Any delimiters like / or [ ]"""
+
+    return f"""{instructions}
+
+{numbered}
+
+Return one line per sentence in this exact format, no explanations or additional text:
+Sentence 1: transliteration
+Sentence 2: transliteration
+..."""
+
+
+def _parse_numbered_lines(raw_response: str) -> Dict[int, str]:
+    """Map "Sentence N: text" (or "N. text") lines to {N: text}; the first answer per number wins."""
+    lines = {}
+    for line in raw_response.splitlines():
+        match = _NUMBERED_LINE.match(line)
+        if match:
+            lines.setdefault(int(match.group(1)), match.group(2).strip())
+    return lines
+
+
+def batch_generate_ipa(sentences: List[str], language: str, gemini_api_key: str) -> List[str]:
     """
-    Generate IPA transliteration with strict validation to ensure IPA-only output.
+    Generate validated IPA for MULTIPLE sentences in ONE API call.
+
+    Every line is checked with validate_ipa_output (slashed, bracketed or
+    unbracketed rules). Only the lines that fail are sent again, together,
+    in one stricter follow-up call, so N sentences cost at most two calls
+    instead of up to 2N. Sentences from several words of the same language
+    can be passed together.
 
     Args:
-        sentence: The sentence to transliterate
+        sentences: Sentences to transliterate
         language: Language code (e.g., 'zh', 'ja', 'ko') or full name
         gemini_api_key: Gemini API key
 
     Returns:
-        Validated IPA transliteration string
+        Validated IPA per sentence, in order ("" where both attempts were invalid)
     """
     if not gemini_api_key:
         logger.warning("No Gemini API key provided for IPA generation")
-        return ""
+        return [""] * len(sentences)
+    if not sentences:
+        return []
 
     # Get language registry and normalize language input
     registry = get_language_registry()
     normalized_lang = registry.normalize_language_input(language)
     full_lang_name = registry.get_full_name(normalized_lang) or language
+    romanized = normalized_lang in IPA_ROMANIZATION_LANGUAGES
 
+    results = [""] * len(sentences)
+    pending = list(range(len(sentences)))
     try:
         client = genai.Client(api_key=gemini_api_key)
 
-        # Enhanced prompt for IPA-only output using full language name
-        # For some languages, romanization is more useful than strict IPA
-        romanization_allowed = ['hi', 'ar', 'fa', 'ur', 'bn', 'pa', 'gu', 'or', 'ta', 'te', 'kn', 'ml', 'si']
-
-        if normalized_lang in romanization_allowed:
-            prompt = f"""Transliterate this {full_lang_name} sentence to romanized pronunciation using Latin letters.
-
-Use standard romanization conventions for {full_lang_name}. Show pronunciation clearly with familiar letters.
-
-Sentence: {sentence}
-
-Return ONLY the romanized transliteration, no explanations or additional text."""
-        else:
-            prompt = f"""Transliterate this {full_lang_name} sentence to IPA (International Phonetic Alphabet) only.
-
-IMPORTANT: Use ONLY official IPA symbols. Do NOT use:
-- Pinyin romanization (no āáǎà, no ma1, no zh/ch/sh/r/z/c/s)
-- Any non-IPA romanization systems
-- Latin letters that aren't IPA symbols
-- Any delimiters like / or [ ]
-
-Sentence: {sentence}
-
-Return ONLY the IPA transliteration, no explanations or additional text."""
-
-        response = client.models.generate_content(
-            model=get_gemini_model(),
-            contents=prompt
-        )
-
-        ipa_result = response.text.strip()
+        for retry in (False, True):
+            prompt = _build_ipa_batch_prompt([sentences[i] for i in pending], full_lang_name, romanized, retry)
+            response = client.models.generate_content(
+                model=get_gemini_model(),
+                contents=prompt
+            )
+            lines = _parse_numbered_lines(response.text or "")
 
-        # Validate the IPA output using normalized language code
-        is_valid, result = validate_ipa_output(ipa_result, normalized_lang)
+            invalid = []
+            for position, i in enumerate(pending, 1):
+                is_valid, result = validate_ipa_output(lines.get(position, ""), normalized_lang)
+                if is_valid:
+                    results[i] = result
+                else:
+                    logger.warning(f"Invalid IPA generated for sentence {i + 1}: {result}")
+                    invalid.append(i)
 
-        if is_valid:
-            logger.info(f"Generated valid IPA: {result}")
-            return result
-        else:
-            logger.warning(f"Invalid IPA generated: {result}")
-            # Try one more time with stricter instructions
-            if normalized_lang in romanization_allowed:
-                fallback_prompt = f"""Convert to romanized pronunciation using Latin letters:
+            pending = invalid
+            if not pending:
+                break
 
-{sentence}
+        if pending:
+            logger.error(f"IPA still invalid after retry for {len(pending)}/{len(sentences)} sentences")
+        logger.info(f"Generated valid IPA for {len(sentences) - len(pending)}/{len(sentences)} sentences")
 
-Romanization:"""
-            else:
-                fallback_prompt = f"""Convert to IPA only. NO Pinyin, NO romanization, NO delimiters like / or [ ], ONLY IPA symbols:
+    except Exception as e:
+        logger.error(f"Batch IPA generation failed: {e}")
 
-{sentence}
+    return results
 
-IPA:"""
 
-            fallback_response = client.models.generate_content(
-                model=get_gemini_model(),
-                contents=fallback_prompt
-            )
-
-            fallback_ipa = fallback_response.text.strip()
-            is_valid_fallback, fallback_result = validate_ipa_output(fallback_ipa, normalized_lang)
+def generate_ipa_hybrid(sentence: str, language: str, gemini_api_key: str) -> str:
+    """
+    Generate IPA transliteration with strict validation to ensure IPA-only output.
 
-            if is_valid_fallback:
-                logger.info(f"Fallback IPA successful: {fallback_result}")
-                return fallback_result
-            else:
-                logger.error(f"Fallback IPA also invalid: {fallback_result}")
-                return ""  # Return empty string to indicate failure
+    Args:
+        sentence: The sentence to transliterate
+        language: Language code (e.g., 'zh', 'ja', 'ko') or full name
+        gemini_api_key: Gemini API key
 
-    except Exception as e:
-        logger.error(f"IPA generation failed: {e}")
+    Returns:
+        Validated IPA transliteration string ("" on failure)
+    """
+    if not gemini_api_key:
+        logger.warning("No Gemini API key provided for IPA generation")
         return ""
+    return batch_generate_ipa([sentence], language, gemini_api_key)[0]
 
 
 # ============================================================================
@@ -307,34 +337,41 @@ IPA:"""
 # ============================================================================
 # UTILITY FUNCTIONS
 # ============================================================================
-def estimate_api_costs(num_words: int, num_sentences: int = 10) -> dict:
+def estimate_api_costs(num_words: int, num_sentences: int = 10, language: str = None,
+                       model: str = None) -> dict:
     """
-    Estimate API usage for cost calculator (Optimized 2-Pass Architecture).
-
-    Token usage per word:
-    - PASS 1 (raw generation): ~200 tokens
-    - PASS 2 (batch validation + enrichment): ~200 tokens
-    - Total: ~400 tokens per word
+    Estimate API usage and wall time for a planned deck.
 
-    With 100k free tokens:
-    - ~250 words/month (10 sentences each = 2,500 sentences)
+    Per-sentence rates come from the generation telemetry recorded for earlier
+    words (see services/generation/generation_telemetry.py), preferring the same
+    language and model. Without enough history the old static rates are used:
+    ~400 Gemini tokens per 10-sentence word, 90 TTS characters and one Pixabay
+    search per sentence.
 
     Args:
         num_words: Number of words to process
         num_sentences: Sentences per word
+        language: Target language, to use that language's telemetry
+        model: Gemini model, to use that model's telemetry
 
     Returns:
-        Dict with estimates
+        Dict with median estimates (total_sentences, total_images,
+        google_search_requests, gemini_tokens_est, google_tts_chars,
+        wall_seconds_est), and the p90 figures and their source under "percentiles"
     """
-    total_sentences = num_words * num_sentences
-    avg_chars_per_sentence = 90
+    from streamlit_app.services.generation.generation_telemetry import get_generation_telemetry
+
+    estimate = get_generation_telemetry().estimate(num_words, num_sentences, language, model)
+    total_sentences = estimate['total_sentences']
 
     return {
         "total_sentences": total_sentences,
         "total_images": total_sentences,
-        "google_search_requests": total_sentences,  # One per sentence
-        "gemini_tokens_est": int(num_words * 400),  # 2-pass architecture: ~400 tokens/word
-        "google_tts_chars": int(total_sentences * avg_chars_per_sentence),
+        "google_search_requests": estimate['pixabay_calls_p50'],
+        "gemini_tokens_est": estimate['gemini_tokens_p50'],
+        "google_tts_chars": estimate['google_tts_chars_p50'],
+        "wall_seconds_est": estimate['wall_seconds_p50'],
+        "percentiles": estimate,
     }
 
 def parse_csv_upload(file_content: bytes) -> list[dict]:
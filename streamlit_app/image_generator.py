@@ -9,6 +9,7 @@ from typing import Optional, List, Tuple, Dict
 
 # Import error recovery
 from streamlit_app.error_recovery import graceful_degradation
+from streamlit_app.services.generation.tracing import span
 
 logger = logging.getLogger(__name__)
 
@@ -78,11 +79,13 @@ def generate_images_pixabay(
                 "image_type": "photo",
             }
 
-            response = requests.get("https://pixabay.com/api/", params=params, timeout=10)
-            response.raise_for_status()
+            with span("pixabay.search", kind="client", query=search_query) as call:
+                response = requests.get("https://pixabay.com/api/", params=params, timeout=10)
+                response.raise_for_status()
 
-            data = response.json()
-            hits = data.get("hits", [])
+                data = response.json()
+                hits = data.get("hits", [])
+                call.set("hits", len(hits))
 
             pixabay_logger.info(f"Pixabay hits for '{query}': {len(hits)}")
             if not hits:
@@ -137,8 +140,10 @@ def generate_images_pixabay(
 
             pixabay_logger.info(f"Downloading image: {image_url}")
             # Download image
-            img_response = requests.get(image_url, timeout=10)
-            img_response.raise_for_status()
+            with span("pixabay.download", kind="client") as call:
+                img_response = requests.get(image_url, timeout=10)
+                img_response.raise_for_status()
+                call.set("bytes", len(img_response.content))
 
             filename = exact_filenames[i] if exact_filenames and i < len(exact_filenames) else f"{batch_name}_{i+1:02d}.jpg"
             # Add unique ID to prevent filename conflicts
@@ -391,6 +391,14 @@ def get_registry() -> AnalyzerRegistry:
     global _registry
     if _registry is None:
         _registry = AnalyzerRegistry()
+        from streamlit_app.services.generation.metrics import ANALYZERS, get_metrics_registry
+
+        def collect():
+            stats = _registry.get_statistics()
+            ANALYZERS.set(stats['total_analyzers'], state='available')
+            ANALYZERS.set(stats['loaded_instances'], state='loaded')
+
+        get_metrics_registry().add_collector("analyzer_registry", collect)
     return _registry
 
 def get_analyzer(language_code: str) -> Optional[BaseGrammarAnalyzer]:
@@ -2,11 +2,18 @@
 # Abstract base class for all language-specific grammar analyzers
 
 import abc
+import contextvars
+import inspect
 import json
 import logging
-from typing import Dict, List, Optional, Any, Tuple
+from typing import Callable, Dict, Iterator, List, Optional, Any, Tuple
 from dataclasses import dataclass, field
 
+from .retry_fanout import bisect_retry, log_retry_tree
+from .streaming_json import IncrementalBatchParser, item_sentence_index, salvage_batch_items
+from streamlit_app.services.generation.adaptive_batcher import FALLBACK_CONFIDENCE_CEILING
+from streamlit_app.services.generation.tracing import span
+
 # Import centralized configuration
 try:
     from ..shared_utils import get_gemini_model, get_gemini_fallback_model
@@ -23,7 +30,26 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
-@dataclass
+# Set while _retry_failed_batch re-runs a subset, so a failure there is reported instead of recovered again
+_retrying_batch: contextvars.ContextVar = contextvars.ContextVar("retrying_grammar_batch", default=False)
+
+def _is_answered(analysis: Optional["GrammarAnalysis"]) -> bool:
+    """Analyses scoring below FALLBACK_CONFIDENCE_CEILING are fallbacks: the sentence was not answered."""
+    return analysis is not None and analysis.confidence_score >= FALLBACK_CONFIDENCE_CEILING
+
+def _is_failed_call_response(ai_response: Optional[str]) -> bool:
+    """_call_ai implementations report a failed API call as an empty response or a {"sentence": "error"} stub."""
+    if not ai_response:
+        return True
+    if len(ai_response) > 200 or not ai_response.lstrip().startswith("{"):
+        return False
+    try:
+        stub = json.loads(ai_response)
+    except ValueError:
+        return False
+    return isinstance(stub, dict) and stub.get("sentence") == "error"
+
+@dataclass(slots=True)
 class GrammarAnalysis:
     """Standardized grammar analysis result"""
     sentence: str
@@ -39,6 +65,22 @@ class GrammarAnalysis:
     is_rtl: bool = False  # Right-to-left text direction
     text_direction: str = "ltr"  # Text direction: "ltr" or "rtl"
 
+class BatchResponseError(Exception):
+    """
+    A batch response arrived but did not answer every sentence usably.
+
+    analyses holds one entry per sentence: the analysis built from the
+    response, or None where the sentence has to be re-requested. received
+    keeps what the analyzer made of the unanswered ones (its own fallbacks),
+    for when a retry does not do better.
+    """
+
+    def __init__(self, analyses: List[Optional[GrammarAnalysis]], reason: str,
+                 received: Optional[List[Optional[GrammarAnalysis]]] = None):
+        super().__init__(reason)
+        self.analyses = analyses
+        self.received = received or [None] * len(analyses)
+
 @dataclass
 class LanguageConfig:
     """Language-specific configuration"""
@@ -60,8 +102,14 @@ class BaseGrammarAnalyzer(abc.ABC):
     - parse_grammar_response(): Parse AI response into structured data
     - get_color_scheme(): Return color scheme for grammatical elements
     - validate_analysis(): Validate analysis quality meets 85% threshold
+
+    Set result_cache to a GrammarResultCache to have the default
+    batch_analyze_grammar() answer repeated sentences without an API call.
     """
 
+    # Optional GrammarResultCache consulted by the default batch path
+    result_cache = None
+
     def __init__(self, language_config: LanguageConfig):
         self.config = language_config
         self.language_code = language_config.code
@@ -315,6 +363,17 @@ IMPORTANT:
         Returns:
             List of GrammarAnalysis objects, one per sentence
         """
+        if self.result_cache is None or not sentences:
+            return self._batch_analyze_uncached(sentences, target_word, complexity, gemini_api_key)
+        # Only cache misses are packed into the API batch
+        return self.result_cache.analyze_with_cache(
+            self, sentences, target_word, complexity,
+            lambda misses: self._batch_analyze_uncached(misses, target_word, complexity, gemini_api_key),
+        )
+
+    def _batch_analyze_uncached(self, sentences: List[str], target_word: str,
+                                complexity: str, gemini_api_key: str) -> List[GrammarAnalysis]:
+        """Batch analysis proper: one call for all sentences, bisecting retries for the ones it left unanswered."""
         try:
             # Validate inputs
             if complexity not in self.supported_levels:
@@ -323,66 +382,293 @@ IMPORTANT:
             if not sentences:
                 return []
 
-            # Generate batch AI prompt
-            prompt = self.get_batch_grammar_prompt(complexity, sentences, target_word)
-
             # Call AI model once for all sentences
+            prompt = self.get_batch_grammar_prompt(complexity, sentences, target_word)
             analysis_data = self._call_ai_model(prompt, gemini_api_key)
+            return self._analyze_received_batch(analysis_data, sentences, target_word, complexity)
+
+        except Exception as e:
+            logger.error(f"Batch grammar analysis failed for {self.language_name}: {e}")
+            # Re-request only what the response did not answer: halves first, concurrently
+            retried = self._retry_failed_batch(sentences, e, lambda subset: self._batch_analyze_uncached(
+                [sentences[i] for i in subset], target_word, complexity, gemini_api_key))
+            return [analysis or self._create_fallback_analysis(sentence, target_word, complexity)
+                    for sentence, analysis in zip(sentences, retried)]
+
+    def analyze_batch_response(self, ai_response: str, sentences: List[str], target_word: str,
+                               complexity: str) -> List[GrammarAnalysis]:
+        """
+        Build one GrammarAnalysis per sentence from a batch response that has already been received.
+
+        This is the post-processing half of batch_analyze_grammar, and the hook
+        streaming and truncation salvage use to turn single result objects into
+        analyses without another API call. Analyzers that override
+        batch_analyze_grammar override this with their own parsing and
+        validation, and pass their API response to _analyze_received_batch().
+        """
+        parsed = list(self.parse_batch_grammar_response(ai_response, sentences, complexity))
+        return [self._batch_item_to_analysis(data, sentence, target_word, complexity, i)
+                if data is not None else self._create_fallback_analysis(sentence, target_word, complexity)
+                for i, (sentence, data) in enumerate(zip(sentences, parsed + [None] * len(sentences)))]
 
-            # Parse batch response
+    def _analyze_received_batch(self, ai_response: str, sentences: List[str], target_word: str,
+                                complexity: str) -> List[GrammarAnalysis]:
+        """
+        Run analyze_batch_response() and raise BatchResponseError if the response left sentences unanswered.
+
+        A sentence is unanswered when the hook produced a fallback for it
+        (confidence below FALLBACK_CONFIDENCE_CEILING) or raised. If the
+        response was cut off, or left sentences unanswered, the result objects
+        that did close are analyzed one by one, so only the rest are
+        re-requested. A failed API call (an exception or an empty response) is
+        not reported, so only problems with the response are retried by
+        _retry_failed_batch().
+        """
+        if _is_failed_call_response(ai_response):
+            return self.analyze_batch_response(ai_response, sentences, target_word, complexity)
+
+        with span("parse.grammar", language=self.language_code, batch_size=len(sentences),
+                  bytes=len(ai_response)) as parse_span:
             try:
-                batch_results = self.parse_batch_grammar_response(analysis_data, sentences, complexity)
-            except Exception as parse_error:
-                logger.warning(f"Batch parsing failed, falling back to individual analysis: {parse_error}")
-                # Fallback to individual analysis
-                results = []
-                for sentence in sentences:
-                    try:
-                        individual_result = self.analyze_grammar(sentence, target_word, complexity, gemini_api_key)
-                        results.append(individual_result)
-                    except Exception as e2:
-                        logger.error(f"Individual analysis failed for '{sentence}': {e2}")
-                        results.append(self._create_fallback_analysis(sentence, target_word, complexity))
-                return results
-
-            # Convert to GrammarAnalysis objects
-            results = []
-            for i, (sentence, parsed_data) in enumerate(zip(sentences, batch_results)):
-                try:
-                    # Validate quality
-                    confidence = self.validate_analysis(parsed_data, sentence)
-                    if confidence < 0.85:
-                        logger.warning(f"Batch analysis confidence below 85% for sentence {i+1}: {confidence}")
-
-                    # Generate HTML output
-                    html_output = self._generate_html_output(parsed_data, sentence, complexity)
-
-                    # Create result object
-                    result = GrammarAnalysis(
-                        sentence=sentence,
-                        target_word=target_word,
-                        language_code=self.language_code,
-                        complexity_level=complexity,
-                        grammatical_elements=parsed_data.get('elements', {}),
-                        explanations=parsed_data.get('explanations', {}),
-                        color_scheme=self.get_color_scheme(complexity),
-                        html_output=html_output,
-                        confidence_score=confidence
-                    )
-                    results.append(result)
+                received = list(self.analyze_batch_response(ai_response, sentences, target_word, complexity))
+            except Exception as e:
+                logger.warning(f"Batch response could not be used whole: {e}")
+                received = []
+            received = (received + [None] * len(sentences))[:len(sentences)]
+            analyses = [analysis if _is_answered(analysis) else None for analysis in received]
+
+            # A complete response ends its JSON (and code fence); one cut off by the token limit does not
+            cut_off = not ai_response.rstrip().rstrip("`").rstrip().endswith(("]", "}"))
+            if None in analyses or cut_off:
+                # Scanned only then: keep the result objects that closed before a cut or a bad object
+                items, parser = salvage_batch_items(ai_response)
+                if items:
+                    salvaged = self._analyses_from_batch_items(parser, items, sentences, target_word, complexity)
+                    if not parser.complete:
+                        # After a cut only the closed objects are answers, whatever the analyzer made of the tail
+                        analyses = [analysis if _is_answered(analysis) else None for analysis in salvaged]
+                        received = [new or old for new, old in zip(salvaged, received)]
+                    else:
+                        analyses = [analysis or (new if _is_answered(new) else None)
+                                    for analysis, new in zip(analyses, salvaged)]
+                    parse_span.set("salvaged", len(items))
+
+        missing = analyses.count(None)
+        if missing:
+            raise BatchResponseError(analyses, f"batch response left {missing}/{len(sentences)} sentences unanswered",
+                                     received)
+        return analyses
+
+    def _retry_failed_batch(self, sentences: List[str], error: Exception,
+                            analyze_subset: Callable[[List[int]], List[GrammarAnalysis]]
+                            ) -> List[Optional[GrammarAnalysis]]:
+        """
+        Re-request the sentences a batch response left unanswered, as concurrent half batches.
 
-                except Exception as e:
-                    logger.error(f"Failed to create GrammarAnalysis for sentence {i+1}: {e}")
-                    # Return fallback for this sentence
-                    results.append(self._create_fallback_analysis(sentence, target_word, complexity))
+        Language analyzers that override batch_analyze_grammar call this from
+        their except branch, with analyze_subset(positions) re-running their
+        own batch_analyze_grammar on those sentences. Only a BatchResponseError
+        is retried; whatever a half still misses is split again (see
+        retry_fanout). Inside such a retry the call re-raises error, so the
+        failure reaches bisect_retry instead of being recovered twice.
 
-            return results
+        Returns:
+            One entry per sentence: the answered or recovered analysis, else
+            what the analyzer made of the original response, or None where the
+            caller's own fallback applies
+        """
+        if not isinstance(error, BatchResponseError):
+            # The API call itself failed; smaller batches would fail the same way
+            return [None] * len(sentences)
+        if _retrying_batch.get():
+            raise error
+
+        analyses = list(error.analyses)
+        missing = [i for i, analysis in enumerate(analyses) if analysis is None]
+        if len(sentences) < 2 or not missing:
+            return [analysis or received for analysis, received in zip(analyses, error.received)]
+
+        def retry_batch(indices):
+            token = _retrying_batch.set(True)
+            try:
+                return dict(zip(indices, analyze_subset(indices)))
+            except BatchResponseError as partial:
+                return dict(zip(indices, partial.analyses))
+            finally:
+                _retrying_batch.reset(token)
+
+        recovered, tree = bisect_retry(missing, retry_batch, lambda i: retry_batch([i]).get(i))
+        log_retry_tree(tree, f"{self.language_name} grammar")
+        for i in missing:
+            analyses[i] = recovered.get(i) or error.received[i]
+        return analyses
+
+    def _batch_item_to_analysis(self, parsed_data: Dict[str, Any], sentence: str, target_word: str,
+                                complexity: str, index: int) -> GrammarAnalysis:
+        """Validate one parsed batch item and build its GrammarAnalysis (fallback on error)."""
+        try:
+            # Validate quality
+            confidence = self.validate_analysis(parsed_data, sentence)
+            if confidence < 0.85:
+                logger.warning(f"Batch analysis confidence below 85% for sentence {index+1}: {confidence}")
+
+            # Generate HTML output
+            html_output = self._generate_html_output(parsed_data, sentence, complexity)
+
+            # Create result object
+            return GrammarAnalysis(
+                sentence=sentence,
+                target_word=target_word,
+                language_code=self.language_code,
+                complexity_level=complexity,
+                grammatical_elements=parsed_data.get('elements', {}),
+                explanations=parsed_data.get('explanations', {}),
+                color_scheme=self.get_color_scheme(complexity),
+                html_output=html_output,
+                confidence_score=confidence
+            )
 
         except Exception as e:
-            logger.error(f"Batch grammar analysis failed for {self.language_name}: {e}")
-            # Return fallbacks for all sentences
-            return [self._create_fallback_analysis(sentence, target_word, complexity)
-                   for sentence in sentences]
+            logger.error(f"Failed to create GrammarAnalysis for sentence {index+1}: {e}")
+            # Return fallback for this sentence
+            return self._create_fallback_analysis(sentence, target_word, complexity)
+
+    def _analyses_from_batch_items(self, parser: IncrementalBatchParser, items: List[Dict[str, Any]],
+                                   sentences: List[str], target_word, complexity: str
+                                   ) -> List[Optional[GrammarAnalysis]]:
+        """
+        Analyze the result objects of a batch response one by one (e.g. those that closed before a truncation).
+
+        Returns:
+            One entry per sentence: its analysis, or None where no usable object arrived
+        """
+        analyses: List[Optional[GrammarAnalysis]] = [None] * len(sentences)
+        for position, item in enumerate(items):
+            index = item_sentence_index(item, position, sentences)
+            if index >= len(sentences) or analyses[index] is not None:
+                continue
+            # Per-sentence target words (zh, ru) follow their sentence
+            target = target_word[index] if isinstance(target_word, list) and index < len(target_word) else target_word
+            analyses[index] = self._analysis_from_batch_item(parser, item, sentences[index], target, complexity)
+        return analyses
+
+    def stream_batch_analyze_grammar(self, sentences: List[str], target_word: str, complexity: str,
+                                     gemini_api_key: str,
+                                     on_result: Optional[Callable[[int, GrammarAnalysis], None]] = None
+                                     ) -> List[GrammarAnalysis]:
+        """
+        Batch analyze with a streamed response, finishing sentences as their JSON objects close.
+
+        Each completed object is turned into a GrammarAnalysis by the
+        analyzer's analyze_batch_response() hook (no extra API call). If the
+        stream is cut short, the objects that already
+        closed are kept and only the missing sentences are re-requested, in one
+        regular batch call.
+
+        Args:
+            sentences: List of sentences to analyze
+            target_word: Target word being learned (same for all sentences)
+            complexity: Complexity level ('beginner', 'intermediate', 'advanced')
+            gemini_api_key: Google Gemini API key
+            on_result: Called with (sentence index, GrammarAnalysis) as each sentence is ready
+
+        Returns:
+            List of GrammarAnalysis objects, one per sentence
+        """
+        if not sentences:
+            return []
+
+        results: List[Optional[GrammarAnalysis]] = [None] * len(sentences)
+
+        def finish(index: int, analysis: GrammarAnalysis) -> None:
+            results[index] = analysis
+            if on_result:
+                try:
+                    on_result(index, analysis)
+                except Exception as e:
+                    logger.warning(f"on_result callback failed for sentence {index + 1}: {e}")
+
+        parser = IncrementalBatchParser()
+        position = 0
+        try:
+            prompt = self._build_streaming_batch_prompt(sentences, target_word, complexity)
+            for chunk in self._stream_ai_model(prompt, gemini_api_key):
+                for item in parser.feed(chunk):
+                    index = item_sentence_index(item, position, sentences)
+                    position += 1
+                    if index >= len(sentences) or results[index] is not None:
+                        continue
+                    analysis = self._analysis_from_batch_item(parser, item, sentences[index], target_word,
+                                                              complexity)
+                    if analysis is not None:
+                        finish(index, analysis)
+        except Exception as e:
+            logger.warning(f"Streamed batch analysis for {self.language_name} stopped early: {e}")
+
+        missing = [i for i, analysis in enumerate(results) if analysis is None]
+        if missing:
+            logger.info(f"Streamed batch returned {len(sentences) - len(missing)}/{len(sentences)} sentences"
+                        f"{'' if parser.complete else ' (truncated)'}, retrying {len(missing)}")
+            retried = self.batch_analyze_grammar(
+                sentences=[sentences[i] for i in missing],
+                target_word=target_word,
+                complexity=complexity,
+                gemini_api_key=gemini_api_key,
+            )
+            for i, analysis in zip(missing, retried):
+                finish(i, analysis)
+            for i in missing:
+                if results[i] is None:
+                    finish(i, self._create_fallback_analysis(sentences[i], target_word, complexity))
+
+        return results
+
+    def _build_streaming_batch_prompt(self, sentences: List[str], target_word: str, complexity: str) -> str:
+        """The same batch prompt batch_analyze_grammar sends."""
+        builder = getattr(self, 'prompt_builder', None)
+        build = (getattr(builder, 'build_batch_prompt', None)
+                 or getattr(builder, 'build_batch_analysis_prompt', None))
+        if build:
+            return build(sentences, target_word, complexity)
+        return self.get_batch_grammar_prompt(complexity, sentences, target_word)
+
+    def _analysis_from_batch_item(self, parser: IncrementalBatchParser, item: Dict[str, Any], sentence: str,
+                                  target_word: str, complexity: str) -> Optional[GrammarAnalysis]:
+        """Run one result object through this analyzer's own batch post-processing (no API call)."""
+        response = parser.wrap([{**item, "sentence_index": 1} if "sentence_index" in item else item])
+        try:
+            analyses = self.analyze_batch_response(response, [sentence], target_word, complexity)
+        except Exception as e:
+            logger.debug(f"Could not convert batch result for '{sentence}': {e}")
+            return None
+        return analyses[0] if analyses else None
+
+    def _stream_ai_model(self, prompt: str, api_key: str) -> Iterator[str]:
+        """Stream a Gemini response, switching to the fallback model if the primary fails before any text."""
+        from streamlit_app.shared_utils import get_gemini_api
+        api = get_gemini_api()
+        api.configure(api_key=api_key)
+
+        received = False
+        try:
+            for chunk in api.generate_content_stream(
+                model=get_gemini_model(),
+                contents=prompt,
+                config={'max_output_tokens': 20000}
+            ):
+                received = True
+                yield chunk
+            return
+        except Exception as primary_error:
+            if received:
+                raise
+            logger.warning(f"Primary model {get_gemini_model()} failed: {primary_error}")
+
+        yield from api.generate_content_stream(
+            model=get_gemini_fallback_model(),
+            contents=prompt,
+            config={'max_output_tokens': 20000}
+        )
 
     def _call_ai_model(self, prompt: str, api_key: str) -> str:
         """Call Google Gemini AI model with the generated prompt"""
@@ -497,6 +783,93 @@ IMPORTANT:
             confidence_score=0.0
         )
 
+    def analyze_grammar_locally(self, sentence: str, target_word: str,
+                                complexity: str) -> Optional[GrammarAnalysis]:
+        """
+        Analyze a sentence with the rule-based fallback engine only (no AI call).
+
+        The rule output is scored by the language's validator as if it were an
+        AI result (the is_fallback cap is not applied), so callers can decide
+        whether it is good enough to skip the API. Used by the local-first tier
+        in GrammarProcessor.
+
+        Args:
+            sentence: Sentence to analyze
+            target_word: Target word being learned
+            complexity: Complexity level
+
+        Returns:
+            GrammarAnalysis scored by the validator, or None if the analyzer has
+            no rule engine or validator
+        """
+        validator = getattr(self, 'validator', None)
+        if validator is None:
+            return None
+
+        result = self._create_rule_based_result(sentence, target_word, complexity)
+        if not result:
+            return None
+
+        result = dict(result)
+        result.pop('is_fallback', None)
+        result.pop('confidence', None)
+        validated = validator.validate_result(result, sentence)
+        if isinstance(validated, dict):
+            confidence = validated.get('confidence', 0.0)
+            result = validated
+        else:
+            confidence = getattr(validated, 'confidence_score', 0.0)
+
+        return self._build_local_analysis(sentence, target_word, complexity, result, float(confidence or 0.0))
+
+    def _get_rule_fallbacks(self) -> Optional[Any]:
+        """Locate the analyzer's rule-based fallbacks component, if any."""
+        code_prefix = self.language_code.replace('-', '_')
+        for attr in ('fallbacks', f'{code_prefix}_fallbacks'):
+            fallbacks = getattr(self, attr, None)
+            if fallbacks is not None:
+                return fallbacks
+        return getattr(getattr(self, 'response_parser', None), 'fallbacks', None)
+
+    def _create_rule_based_result(self, sentence: str, target_word: str,
+                                  complexity: str) -> Optional[Dict[str, Any]]:
+        """Run the rule-based fallback engine and return its raw result dict."""
+        fallbacks = self._get_rule_fallbacks()
+        if fallbacks is None or not hasattr(fallbacks, 'create_fallback'):
+            return None
+        params = inspect.signature(fallbacks.create_fallback).parameters
+        if 'target_word' in params:
+            return fallbacks.create_fallback(sentence, complexity, target_word)
+        return fallbacks.create_fallback(sentence, complexity)
+
+    def _build_local_analysis(self, sentence: str, target_word: str, complexity: str,
+                              result: Dict[str, Any], confidence: float) -> GrammarAnalysis:
+        """Build a GrammarAnalysis from a scored rule-based result."""
+        # Analyzers with their own result builder (German, Spanish) know their
+        # word/HTML formats best
+        build_analysis_result = getattr(self, '_build_analysis_result', None)
+        if build_analysis_result is not None:
+            analysis = build_analysis_result(sentence, target_word, complexity, result)
+            analysis.confidence_score = confidence
+            return analysis
+
+        word_explanations = result.get('word_explanations', [])
+        formatter = getattr(self, '_format_word_explanations', None)
+        if formatter is not None:
+            word_explanations = formatter(word_explanations)
+        return GrammarAnalysis(
+            sentence=sentence,
+            target_word=target_word or "",
+            language_code=self.language_code,
+            complexity_level=complexity,
+            grammatical_elements=result.get('elements', {}),
+            explanations=result.get('explanations', {}),
+            color_scheme=self.get_color_scheme(complexity),
+            html_output=self._generate_html_output(result, sentence, complexity),
+            confidence_score=confidence,
+            word_explanations=word_explanations,
+        )
+
     @property
     def version(self) -> str:
         """Return analyzer version for tracking updates"""
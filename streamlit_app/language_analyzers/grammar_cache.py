@@ -0,0 +1,228 @@
+# Grammar Result Cache
+# Persistent cache of GrammarAnalysis results across runs
+
+"""
+Re-running a deck, or analyzing the same sentence again in a test or
+comparison script, repeats the grammar-analysis Gemini call every time.
+GrammarResultCache stores finished GrammarAnalysis payloads on disk (through
+PersistentCache) keyed by language, complexity, sentence and target word.
+
+Every key also carries an analyzer fingerprint: the analyzer's version plus
+a hash of its batch prompt template. Editing a prompt or bumping VERSION
+changes the fingerprint, so stale entries simply stop matching and age out.
+
+Fallback analyses are never stored, so a failed call is retried next time.
+
+Show statistics or clear the cache with:
+
+    python -m streamlit_app.language_analyzers.grammar_cache [--clear]
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import threading
+import unicodedata
+from dataclasses import asdict
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = "./cache/grammar"
+DEFAULT_MAX_ENTRIES = 5000
+DEFAULT_TTL = 30 * 24 * 3600  # 30 days; prompt changes invalidate entries sooner
+
+# Analyses scoring below this are fallbacks and are not worth keeping
+MIN_CACHEABLE_CONFIDENCE = 0.4
+
+# Stand-ins used to render an analyzer's prompt template for fingerprinting
+_SENTENCE_PLACEHOLDER = "<<SENTENCE>>"
+_TARGET_PLACEHOLDER = "<<TARGET>>"
+
+
+class GrammarResultCache:
+    """
+    Versioned, persistent cache of grammar analyses.
+
+    Usage:
+        cached = cache.lookup(analyzer, sentences, target_word, complexity)
+        ...  # analyze the sentences whose entry is None
+        cache.store(analyzer, sentence, target_word, complexity, analysis)
+    """
+
+    def __init__(self, cache_dir: Optional[str] = DEFAULT_CACHE_DIR,
+                 max_entries: int = DEFAULT_MAX_ENTRIES, ttl: int = DEFAULT_TTL):
+        """
+        Initialize the cache.
+
+        Args:
+            cache_dir: Directory for cache files (None keeps entries in memory only)
+            max_entries: Entries kept before least recently used ones are evicted
+            ttl: Seconds an entry stays valid
+        """
+        self.ttl = ttl
+        self._memory: Optional[Dict[str, Dict[str, Any]]] = None
+        if cache_dir:
+            # Imported here: persistent_cache creates its own cache directories on import
+            try:
+                from ..persistent_cache import PersistentCache
+            except ImportError:
+                from persistent_cache import PersistentCache
+            self._store = PersistentCache(cache_dir=cache_dir, max_entries=max_entries, default_ttl=ttl)
+        else:
+            self._store = None
+            self._memory = {}
+        self._fingerprints: Dict[tuple, str] = {}
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0, 'stores': 0}
+
+    def fingerprint(self, analyzer, complexity: str) -> str:
+        """Analyzer version plus a hash of its batch prompt template for this complexity."""
+        memo_key = (type(analyzer), analyzer.language_code, complexity)
+        with self._lock:
+            cached = self._fingerprints.get(memo_key)
+        if cached:
+            return cached
+
+        try:
+            template = analyzer._build_streaming_batch_prompt(
+                [_SENTENCE_PLACEHOLDER], _TARGET_PLACEHOLDER, complexity)
+        except Exception as e:
+            logger.debug(f"Could not render {analyzer.language_code} prompt template: {e}")
+            template = ""
+        digest = hashlib.sha256(template.encode('utf-8')).hexdigest()[:12]
+        fingerprint = f"{type(analyzer).__name__}-{analyzer.version}-{digest}"
+        with self._lock:
+            self._fingerprints[memo_key] = fingerprint
+        return fingerprint
+
+    def key(self, analyzer, sentence: str, target_word: str, complexity: str) -> str:
+        """Cache key for one sentence."""
+        normalized = unicodedata.normalize('NFC', sentence or '').strip()
+        return "|".join([
+            analyzer.language_code, complexity, self.fingerprint(analyzer, complexity),
+            unicodedata.normalize('NFC', target_word or '').strip(), normalized,
+        ])
+
+    def get(self, analyzer, sentence: str, target_word: str, complexity: str):
+        """Cached GrammarAnalysis for one sentence, or None."""
+        key = self.key(analyzer, sentence, target_word, complexity)
+        if self._store is not None:
+            payload = self._store.get(key)
+        else:
+            payload = self._memory.get(key)
+
+        analysis = None
+        if payload is not None:
+            try:
+                from .base_analyzer import GrammarAnalysis
+                analysis = GrammarAnalysis(**payload)
+            except Exception as e:
+                logger.debug(f"Discarding unreadable grammar cache entry: {e}")
+
+        with self._lock:
+            self.stats['hits' if analysis is not None else 'misses'] += 1
+        return analysis
+
+    def lookup(self, analyzer, sentences: List[str], target_word: str, complexity: str) -> List[Any]:
+        """Cached GrammarAnalysis per sentence, None for misses."""
+        return [self.get(analyzer, sentence, target_word, complexity) for sentence in sentences]
+
+    def store(self, analyzer, sentence: str, target_word: str, complexity: str, analysis) -> bool:
+        """
+        Store one analysis.
+
+        Returns:
+            True if stored, False for fallbacks and unserializable results
+        """
+        if analysis is None or analysis.confidence_score < MIN_CACHEABLE_CONFIDENCE:
+            return False
+        key = self.key(analyzer, sentence, target_word, complexity)
+        try:
+            payload = json.loads(json.dumps(asdict(analysis), ensure_ascii=False))
+        except (TypeError, ValueError) as e:
+            logger.debug(f"Not caching grammar analysis for '{sentence}': {e}")
+            return False
+
+        if self._store is not None:
+            stored = self._store.set(key, payload, ttl=self.ttl,
+                                     metadata={'language': analyzer.language_code, 'version': analyzer.version})
+        else:
+            self._memory[key] = payload
+            stored = True
+        if stored:
+            with self._lock:
+                self.stats['stores'] += 1
+        return stored
+
+    def analyze_with_cache(self, analyzer, sentences: List[str], target_word: str, complexity: str,
+                           analyze: Callable[[List[str]], List[Any]]) -> List[Any]:
+        """
+        Answer from the cache and pass only the misses to analyze().
+
+        Args:
+            analyzer: Analyzer the results belong to
+            sentences: Sentences to analyze
+            target_word: Target word shared by the sentences
+            complexity: Complexity level
+            analyze: Analyzes a list of sentences, returning one GrammarAnalysis each
+
+        Returns:
+            One GrammarAnalysis per sentence, in order
+        """
+        results = self.lookup(analyzer, sentences, target_word, complexity)
+        misses = [i for i, analysis in enumerate(results) if analysis is None]
+        if not misses:
+            return results
+
+        fresh = analyze([sentences[i] for i in misses])
+        for i, analysis in zip(misses, fresh):
+            results[i] = analysis
+            self.store(analyzer, sentences[i], target_word, complexity, analysis)
+        return results
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Hit/miss/store counters plus the number of entries held."""
+        with self._lock:
+            stats = dict(self.stats)
+        stats['entries'] = len(self._store.memory_cache) if self._store is not None else len(self._memory)
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = round(stats['hits'] / lookups, 3) if lookups else 0.0
+        return stats
+
+    def clear(self) -> int:
+        """Remove every entry. Returns the number removed."""
+        if self._store is not None:
+            return self._store.clear()
+        count = len(self._memory)
+        self._memory.clear()
+        return count
+
+
+# Global instance
+_grammar_result_cache = None
+
+def get_grammar_result_cache() -> GrammarResultCache:
+    """Get the global grammar result cache, persisted to DEFAULT_CACHE_DIR."""
+    global _grammar_result_cache
+    if _grammar_result_cache is None:
+        _grammar_result_cache = GrammarResultCache()
+    return _grammar_result_cache
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Show or clear the grammar result cache")
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR, help="Cache directory")
+    parser.add_argument("--clear", action="store_true", help="Remove all cached analyses")
+    args = parser.parse_args()
+
+    cache = GrammarResultCache(cache_dir=args.cache_dir)
+    if args.clear:
+        print(f"Removed {cache.clear()} cached analyses from {args.cache_dir}")
+    else:
+        print(json.dumps(cache.get_stats(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
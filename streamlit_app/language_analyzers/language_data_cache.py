@@ -0,0 +1,221 @@
+# Language Data Cache
+# Process-wide, read-only cache for analyzer data files (YAML/JSON)
+
+"""
+Every analyzer config reads its grammatical roles, patterns and word meanings
+from YAML/JSON files under languages/<language>/infrastructure/data. Parsing
+them (YAML in particular) dominated analyzer construction, and tests, gold
+standard comparisons and run_all_tests build analyzers many times over.
+
+load_language_data() parses each file once per process and hands every caller
+the same deeply frozen object, so instances can share it safely across
+threads. Mutating it raises TypeError; use copy.deepcopy() for a private,
+mutable copy.
+
+Parsed data can also be pre-serialized next to the sources with:
+
+    python -m streamlit_app.language_analyzers.language_data_cache --build
+
+which writes marshal files to a __datacache__ directory; they are used only
+while the source file's size and mtime still match.
+"""
+
+import argparse
+import copy
+import json
+import logging
+import marshal
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+import yaml
+
+logger = logging.getLogger(__name__)
+
+CACHE_DIR_NAME = "__datacache__"
+_CACHE_FORMAT_VERSION = 1
+
+_SafeLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+_cache: Dict[str, Any] = {}
+_cache_lock = threading.Lock()
+_path_locks: Dict[str, threading.Lock] = {}
+
+
+def _readonly(self, *args, **kwargs):
+    raise TypeError("Shared language data is read-only; use copy.deepcopy() for a mutable copy")
+
+
+class FrozenDict(dict):
+    """dict that refuses mutation. Still passes isinstance(x, dict)."""
+
+    __slots__ = ()
+    __setitem__ = __delitem__ = _readonly
+    clear = pop = popitem = setdefault = update = __ior__ = _readonly
+
+    def __copy__(self):
+        return dict(self)
+
+    def __deepcopy__(self, memo):
+        return {copy.deepcopy(k, memo): copy.deepcopy(v, memo) for k, v in self.items()}
+
+    def __reduce__(self):
+        return (FrozenDict, (dict(self),))
+
+
+class FrozenList(list):
+    """list that refuses mutation. Still passes isinstance(x, list)."""
+
+    __slots__ = ()
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = _readonly
+    append = clear = extend = insert = pop = remove = reverse = sort = _readonly
+
+    def __copy__(self):
+        return list(self)
+
+    def __deepcopy__(self, memo):
+        return [copy.deepcopy(v, memo) for v in self]
+
+    def __reduce__(self):
+        return (FrozenList, (list(self),))
+
+
+def freeze(data: Any) -> Any:
+    """Recursively convert dicts and lists to their frozen counterparts."""
+    if isinstance(data, dict):
+        return FrozenDict((k, freeze(v)) for k, v in data.items())
+    if isinstance(data, list):
+        return FrozenList(freeze(v) for v in data)
+    return data
+
+
+def _cache_path(path: Path) -> Path:
+    return path.parent / CACHE_DIR_NAME / (path.name + ".marshal")
+
+
+def _source_signature(path: Path) -> Tuple[int, int, int]:
+    stat = path.stat()
+    return (_CACHE_FORMAT_VERSION, stat.st_size, stat.st_mtime_ns)
+
+
+def _parse(path: Path) -> Any:
+    """Parse a YAML or JSON file into plain Python data."""
+    with open(path, "r", encoding="utf-8") as f:
+        if path.suffix.lower() == ".json":
+            return json.load(f)
+        return yaml.load(f, Loader=_SafeLoader)
+
+
+def _read_binary_cache(path: Path) -> Tuple[bool, Any]:
+    """Return (hit, data) from a pre-serialized cache file, if fresh."""
+    cache_file = _cache_path(path)
+    try:
+        with open(cache_file, "rb") as f:
+            signature, data = marshal.load(f)
+    except (OSError, EOFError, ValueError, TypeError):
+        return False, None
+    if tuple(signature) != _source_signature(path):
+        return False, None
+    return True, data
+
+
+def load_language_data(path) -> Optional[Any]:
+    """
+    Load a language data file once per process and return shared frozen data.
+
+    Args:
+        path: Path to a .yaml/.yml or .json file
+
+    Returns:
+        Frozen parsed data, or None if the file does not exist
+
+    Raises:
+        yaml.YAMLError / json.JSONDecodeError / OSError on unreadable files
+        (callers keep their own error handling)
+    """
+    path = Path(path)
+    key = os.path.abspath(path)
+
+    data = _cache.get(key, _cache)
+    if data is not _cache:
+        return data
+
+    with _cache_lock:
+        path_lock = _path_locks.setdefault(key, threading.Lock())
+
+    with path_lock:
+        data = _cache.get(key, _cache)
+        if data is not _cache:
+            return data
+        if not path.exists():
+            return None
+
+        hit, raw = _read_binary_cache(path)
+        if not hit:
+            raw = _parse(path)
+        data = freeze(raw)
+        _cache[key] = data
+        return data
+
+
+def clear_language_data_cache() -> None:
+    """Drop all cached data (e.g. after editing data files in a running process)."""
+    with _cache_lock:
+        _cache.clear()
+        _path_locks.clear()
+
+
+def build_binary_cache(paths: Iterable[Path]) -> int:
+    """
+    Pre-serialize data files to marshal caches.
+
+    Args:
+        paths: YAML/JSON files to serialize
+
+    Returns:
+        Number of cache files written
+    """
+    written = 0
+    for path in paths:
+        path = Path(path)
+        try:
+            raw = _parse(path)
+            cache_file = _cache_path(path)
+            cache_file.parent.mkdir(exist_ok=True)
+            tmp_file = cache_file.with_suffix(".tmp")
+            with open(tmp_file, "wb") as f:
+                marshal.dump((_source_signature(path), raw), f)
+            os.replace(tmp_file, cache_file)
+            written += 1
+        except Exception as e:
+            logger.warning(f"Could not pre-serialize {path}: {e}")
+    return written
+
+
+def find_language_data_files(languages_dir: Path) -> list:
+    """Find analyzer data files under languages/*/infrastructure/data."""
+    return sorted(
+        p for pattern in ("*.yaml", "*.yml", "*.json")
+        for p in Path(languages_dir).glob(f"*/infrastructure/data/{pattern}")
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pre-serialize language data files")
+    parser.add_argument("--build", action="store_true", help="Write marshal caches for all language data files")
+    parser.add_argument("--languages-dir", default=str(Path(__file__).resolve().parents[2] / "languages"),
+                        help="Path to the languages directory")
+    args = parser.parse_args()
+
+    if args.build:
+        files = find_language_data_files(Path(args.languages_dir))
+        written = build_binary_cache(files)
+        print(f"Pre-serialized {written}/{len(files)} language data files")
+    else:
+        parser.print_help()
+
+
+if __name__ == "__main__":
+    main()
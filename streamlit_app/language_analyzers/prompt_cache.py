@@ -0,0 +1,184 @@
+# Prompt Cache
+# Stable batch-prompt prefixes, precompiled templates and context caching
+
+"""
+Batch grammar prompts repeat the same role list, JSON schema and instructions
+for every batch; only the numbered sentences and the target word change.
+Prompt builders render those variable parts last, and @cacheable_batch_prompt
+splits the rendered prompt into a stable prefix (per builder and complexity)
+and a short variable suffix. The result is still a plain str for every caller.
+
+GeminiAPI.generate_content registers the prefix once through a ContextCache
+and then sends only the suffix together with the cached-content handle.
+LocalContextCache is an in-memory stand-in for tests and reports.
+"""
+
+import abc
+import functools
+import hashlib
+import logging
+import threading
+import time
+from typing import Callable, Dict, Optional, Tuple
+
+from jinja2 import Template
+
+logger = logging.getLogger(__name__)
+
+# Two different sentinel batches: whatever both renders share is independent
+# of the sentences, their count and the target word.
+_SENTINEL_BATCHES = (
+    (["① sentinel sentence."], "①"),
+    (["② sentinel sentence.", "③ sentinel sentence."], "②"),
+)
+
+
+@functools.lru_cache(maxsize=None)
+def compile_template(source: str) -> Template:
+    """Compile a Jinja2 template once per process. Templates are safe to share."""
+    return Template(source)
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token estimate (about 4 characters per token for Gemini models)."""
+    return (len(text) + 3) // 4
+
+
+class CacheablePrompt(str):
+    """A prompt string that also carries its stable prefix and variable suffix."""
+
+    def __new__(cls, prefix: str, suffix: str, cache_key: Optional[str] = None):
+        prompt = super().__new__(cls, prefix + suffix)
+        prompt.prefix = prefix
+        prompt.suffix = suffix
+        prompt.cache_key = cache_key
+        return prompt
+
+
+def _common_line_prefix(first: str, second: str) -> str:
+    """Longest common prefix of two strings, cut back to a line boundary."""
+    length = 0
+    limit = min(len(first), len(second))
+    while length < limit and first[length] == second[length]:
+        length += 1
+    return first[:first.rfind("\n", 0, length) + 1]
+
+
+def cacheable_batch_prompt(build: Callable) -> Callable:
+    """
+    Decorate a prompt builder's build_batch_prompt(sentences, target_word, complexity, ...).
+
+    The stable prefix is found once per builder instance and complexity by
+    rendering two sentinel batches; real prompts that start with it are
+    returned as CacheablePrompt, anything else is returned unchanged.
+    """
+    @functools.wraps(build)
+    def wrapper(self, sentences, target_word, complexity, *args, **kwargs):
+        prompt = build(self, sentences, target_word, complexity, *args, **kwargs)
+
+        prefixes = self.__dict__.setdefault("_stable_batch_prefixes", {})
+        key = (complexity, repr(args), repr(sorted(kwargs.items())))
+        if key not in prefixes:
+            try:
+                renders = [build(self, batch, word, complexity, *args, **kwargs)
+                           for batch, word in _SENTINEL_BATCHES]
+                prefixes[key] = _common_line_prefix(*renders)
+            except Exception as e:
+                logger.debug(f"Could not derive stable prompt prefix: {e}")
+                prefixes[key] = ""
+
+        prefix = prefixes[key]
+        if not prefix or not isinstance(prompt, str) or not prompt.startswith(prefix):
+            return prompt
+        return CacheablePrompt(prefix, prompt[len(prefix):], f"{type(self).__name__}:{complexity}")
+
+    return wrapper
+
+
+def _prefix_key(model: str, prefix: str) -> Tuple[str, str]:
+    return model, hashlib.sha1(prefix.encode("utf-8")).hexdigest()
+
+
+class ContextCache(abc.ABC):
+    """Registers stable prompt prefixes once and hands out reusable handles."""
+
+    @abc.abstractmethod
+    def get_handle(self, model: str, prefix: str) -> Optional[str]:
+        """Return a cached-content handle for prefix, or None to send the full prompt."""
+
+    def invalidate(self, handle: str) -> None:
+        """Forget a handle the API no longer accepts (e.g. expired)."""
+
+
+class LocalContextCache(ContextCache):
+    """In-memory stand-in used by tests and the prompt cache report."""
+
+    def __init__(self):
+        self.prefixes: Dict[str, str] = {}
+        self._handles: Dict[Tuple[str, str], str] = {}
+        self.registrations = 0
+        self.hits = 0
+
+    def get_handle(self, model: str, prefix: str) -> Optional[str]:
+        key = _prefix_key(model, prefix)
+        handle = self._handles.get(key)
+        if handle is None:
+            handle = f"local/{len(self._handles) + 1}"
+            self._handles[key] = handle
+            self.prefixes[handle] = prefix
+            self.registrations += 1
+        else:
+            self.hits += 1
+        return handle
+
+    def invalidate(self, handle: str) -> None:
+        self.prefixes.pop(handle, None)
+        self._handles = {key: value for key, value in self._handles.items() if value != handle}
+
+
+class GeminiContextCache(ContextCache):
+    """
+    Explicit Gemini context caching (client.caches) for stable prompt prefixes.
+
+    Prefixes below the model's minimum cacheable size are not registered; the
+    full prompt is sent instead and Gemini's implicit prefix caching still
+    applies because the stable part comes first.
+    """
+
+    def __init__(self, api, ttl_seconds: int = 3600, min_prefix_tokens: int = 1024):
+        self.api = api
+        self.ttl_seconds = ttl_seconds
+        self.min_prefix_tokens = min_prefix_tokens
+        self._handles: Dict[Tuple[str, str], Tuple[str, float]] = {}
+        self._unsupported = set()
+        self._lock = threading.Lock()
+
+    def get_handle(self, model: str, prefix: str) -> Optional[str]:
+        if estimate_tokens(prefix) < self.min_prefix_tokens:
+            return None
+
+        key = _prefix_key(model, prefix)
+        with self._lock:
+            if key in self._unsupported:
+                return None
+            entry = self._handles.get(key)
+            if entry and entry[1] > time.time():
+                return entry[0]
+
+            try:
+                cache = self.api.client.caches.create(
+                    model=model,
+                    config={"contents": [prefix], "ttl": f"{self.ttl_seconds}s"},
+                )
+            except Exception as e:
+                logger.info(f"Context caching unavailable for {model}, sending full prompts: {e}")
+                self._unsupported.add(key)
+                return None
+
+            # Stop using the handle a minute before the server expires it
+            self._handles[key] = (cache.name, time.time() + self.ttl_seconds - 60)
+            return cache.name
+
+    def invalidate(self, handle: str) -> None:
+        with self._lock:
+            self._handles = {key: entry for key, entry in self._handles.items() if entry[0] != handle}
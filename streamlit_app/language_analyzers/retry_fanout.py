@@ -0,0 +1,168 @@
+# Retry Fan-out
+# Concurrent, bisecting retries for sentences a batch call did not return
+
+"""
+When a batch response leaves sentences unanswered, retrying them one by one
+costs one sequential round-trip each. bisect_retry() instead re-sends the
+failed sentences as two half batches, concurrently; whatever a half still
+fails is split again, and only single sentences fall through to the
+per-sentence call. A lone sentence that breaks parsing is isolated in about
+log2(n) rounds while the rest of the batch is recovered in bulk.
+
+Concurrency is bounded by the shared GeminiRateLimiter that every Gemini call
+goes through, so the fan-out never exceeds the configured request rate.
+
+The retry tree is returned so callers can record it in the generation log.
+"""
+
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from streamlit_app.services.generation.tracing import in_current_context
+
+logger = logging.getLogger(__name__)
+
+# Retries for one batch rarely need more; real concurrency is capped by the rate limiter
+DEFAULT_MAX_WORKERS = 4
+
+
+@dataclass
+class RetryNode:
+    """One retry call: a batch of sentence positions or a single sentence."""
+    indices: List[int]
+    kind: str                   # "split", "batch" or "single"
+    recovered: List[int] = field(default_factory=list)
+    failed: List[int] = field(default_factory=list)
+    error: Optional[str] = None
+    children: List["RetryNode"] = field(default_factory=list)
+
+    @property
+    def calls(self) -> int:
+        """API calls made by this node and its descendants."""
+        own = 0 if self.kind == "split" else 1
+        return own + sum(child.calls for child in self.children)
+
+
+def _label(indices: Sequence[int]) -> str:
+    numbers = [i + 1 for i in indices]
+    if len(numbers) > 2 and numbers == list(range(numbers[0], numbers[-1] + 1)):
+        return f"{numbers[0]}-{numbers[-1]}"
+    return ",".join(str(n) for n in numbers)
+
+
+def format_retry_tree(node: RetryNode, depth: int = 0) -> List[str]:
+    """Render a retry tree as indented lines (sentence numbers are 1-based)."""
+    indent = "  " * depth
+    if node.kind == "split":
+        lines = [f"{indent}retry sentences [{_label(node.indices)}]: {len(node.recovered)} recovered, "
+                 f"{len(node.failed)} failed in {node.calls} calls"]
+    else:
+        outcome = "ok" if not node.failed else "failed"
+        if node.kind == "batch":
+            outcome = f"{len(node.recovered)} ok, {len(node.failed)} failed"
+        lines = [f"{indent}{node.kind} [{_label(node.indices)}]: {outcome}"
+                 f"{f' ({node.error})' if node.error else ''}"]
+    for child in node.children:
+        lines.extend(format_retry_tree(child, depth + 1))
+    return lines
+
+
+def log_retry_tree(node: RetryNode, context: str) -> None:
+    """
+    Record a retry tree in the application log and, inside a Streamlit
+    generation run, in the generation log.
+    """
+    lines = format_retry_tree(node)
+    for line in lines:
+        logger.info(f"{context}: {line}")
+    try:
+        import streamlit as st
+        log_manager = st.session_state.get('log_manager')
+        if log_manager is not None:
+            log_manager.log_message(f"🔁 {context} {lines[0]}")
+            for line in lines[1:]:
+                log_manager.log_message(f"    {line}", level='DEBUG')
+    except Exception:
+        pass
+
+
+def bisect_retry(indices: Sequence[int],
+                 retry_batch: Callable[[List[int]], Dict[int, Any]],
+                 retry_single: Callable[[int], Any],
+                 max_workers: int = DEFAULT_MAX_WORKERS) -> Tuple[Dict[int, Any], RetryNode]:
+    """
+    Retry failed sentences by concurrent bisection.
+
+    Args:
+        indices: Positions (in the caller's batch) of the sentences to retry
+        retry_batch: Re-sends a subset as one batch call; returns {position: result}
+            for the sentences it answered (missing or None means failed).
+            Raising counts as every sentence in the subset failing.
+        retry_single: Analyzes one sentence; returns a result or None / raises on failure
+        max_workers: Upper bound on threads per fan-out level
+
+    Returns:
+        ({position: result} for recovered sentences, retry tree)
+    """
+    results: Dict[int, Any] = {}
+    lock = threading.Lock()
+
+    def store(index: int, result: Any) -> None:
+        with lock:
+            results[index] = result
+
+    def attempt(subset: List[int]) -> RetryNode:
+        if len(subset) == 1:
+            node = RetryNode(indices=subset, kind="single")
+            try:
+                result = retry_single(subset[0])
+            except Exception as e:
+                result, node.error = None, str(e)[:120]
+            if result is None:
+                node.failed = list(subset)
+            else:
+                node.recovered = list(subset)
+                store(subset[0], result)
+            return node
+
+        node = RetryNode(indices=subset, kind="batch")
+        try:
+            answered = retry_batch(subset) or {}
+        except Exception as e:
+            answered, node.error = {}, str(e)[:120]
+        for index in subset:
+            if answered.get(index) is not None:
+                node.recovered.append(index)
+                store(index, answered[index])
+            else:
+                node.failed.append(index)
+        if node.failed:
+            node.children = fan_out(node.failed)
+        return node
+
+    def fan_out(subset: List[int]) -> List[RetryNode]:
+        if len(subset) == 1:
+            return [attempt(subset)]
+        middle = (len(subset) + 1) // 2
+        halves = [subset[:middle], subset[middle:]]
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(halves))) as executor:
+            return list(executor.map(in_current_context(attempt), halves))
+
+    root = RetryNode(indices=list(indices), kind="split")
+    if root.indices:
+        root.children = fan_out(root.indices)
+    root.recovered = sorted(results)
+    root.failed = [i for i in root.indices if i not in results]
+    return results, root
+
+
+def run_concurrently(items: Sequence[Any], worker: Callable[[Any], Any],
+                     max_workers: int = DEFAULT_MAX_WORKERS) -> List[Any]:
+    """Apply worker to every item on a thread pool, preserving order."""
+    if len(items) <= 1:
+        return [worker(item) for item in items]
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(items))) as executor:
+        return list(executor.map(in_current_context(worker), items))
@@ -0,0 +1,177 @@
+# Streaming JSON
+# Incremental parsing of batch grammar responses
+
+"""
+Batch grammar responses are either a top-level JSON array or an object whose
+first array holds the per-sentence results ({"batch_results": [...]}), in both
+cases optionally wrapped in a markdown code fence.
+
+IncrementalBatchParser is fed the response text chunk by chunk and returns
+each per-sentence object as soon as its closing brace arrives, so a streamed
+response can be used before it is complete. salvage_batch_items() runs the
+same parser over a finished (possibly truncated) response and keeps every
+object that closed before the cut.
+"""
+
+import json
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class IncrementalBatchParser:
+    """
+    Character-level scanner that yields the object elements of the results array.
+
+    Only string/escape state and nesting depth are tracked while scanning;
+    each element is decoded with json.loads once its braces balance. Chunks
+    are kept in a list and scanned in place: an element or key spanning
+    several chunks is assembled from its pieces when it closes, so feeding a
+    long response costs time linear in its length.
+    """
+
+    def __init__(self):
+        self.envelope_key: Optional[str] = None
+        self.items: List[Dict[str, Any]] = []
+        self.complete = False
+        self._chunks: List[str] = []
+        self._stack: List[str] = []
+        self._in_string = False
+        self._escape = False
+        self._last_string: Optional[str] = None
+        self._array_depth: Optional[int] = None
+        # Start (in the chunk being scanned) and earlier pieces of the open element / top-level string
+        self._item_start: Optional[int] = None
+        self._item_parts: List[str] = []
+        self._string_start: Optional[int] = None
+        self._string_parts: List[str] = []
+
+    @property
+    def text(self) -> str:
+        """Everything fed so far."""
+        return "".join(self._chunks)
+
+    def feed(self, chunk: str) -> List[Dict[str, Any]]:
+        """
+        Consume the next chunk of response text.
+
+        Args:
+            chunk: Text received since the last call
+
+        Returns:
+            Result objects completed by this chunk, in order
+        """
+        self._chunks.append(chunk)
+        completed = []
+        pos = 0
+
+        while pos < len(chunk) and not self.complete:
+            char = chunk[pos]
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                    if self._string_start is not None:
+                        self._last_string = "".join(self._string_parts) + chunk[self._string_start:pos + 1]
+                        self._string_start, self._string_parts = None, []
+            elif char == '"':
+                if self._stack:
+                    self._in_string = True
+                    if self._array_depth is None and len(self._stack) == 1:
+                        # A key of the top-level object; the one before the results array names the envelope
+                        self._string_start, self._string_parts = pos, []
+            elif char in "{[":
+                self._open(char, pos)
+            elif char in "}]":
+                item = self._close(char, chunk, pos)
+                if item is not None:
+                    completed.append(item)
+
+            pos += 1
+
+        # Carry what is still open into the next chunk
+        if self._item_start is not None:
+            self._item_parts.append(chunk[self._item_start:])
+            self._item_start = 0
+        if self._string_start is not None:
+            self._string_parts.append(chunk[self._string_start:])
+            self._string_start = 0
+
+        self.items.extend(completed)
+        return completed
+
+    def _open(self, char: str, pos: int) -> None:
+        depth = len(self._stack)
+        if self._array_depth is None and char == "[" and depth <= 1:
+            # The results array: the top-level array, or the first array value of the top-level object
+            self._array_depth = depth + 1
+            if depth == 1 and self._last_string:
+                try:
+                    self.envelope_key = json.loads(self._last_string)
+                except ValueError:
+                    self.envelope_key = None
+        elif char == "{" and self._array_depth is not None and depth == self._array_depth:
+            self._item_start, self._item_parts = pos, []
+        self._stack.append(char)
+
+    def _close(self, char: str, chunk: str, pos: int) -> Optional[Dict[str, Any]]:
+        if not self._stack:
+            return None
+        self._stack.pop()
+        depth = len(self._stack)
+
+        if self._array_depth is not None and depth == self._array_depth - 1 and char == "]":
+            self.complete = True
+            return None
+        if char == "}" and self._item_start is not None and depth == self._array_depth:
+            text = "".join(self._item_parts) + chunk[self._item_start:pos + 1]
+            self._item_start, self._item_parts = None, []
+            try:
+                item = json.loads(text)
+            except ValueError as e:
+                logger.debug(f"Skipping undecodable batch item: {e}")
+                return None
+            return item if isinstance(item, dict) else None
+        return None
+
+    def wrap(self, items: List[Dict[str, Any]]) -> str:
+        """Serialize items in the same envelope the response used."""
+        if self.envelope_key:
+            return json.dumps({self.envelope_key: items}, ensure_ascii=False)
+        return json.dumps(items, ensure_ascii=False)
+
+
+def salvage_batch_items(text: str) -> Tuple[List[Dict[str, Any]], IncrementalBatchParser]:
+    """
+    Recover the per-sentence objects that closed before a response was cut off.
+
+    Args:
+        text: Complete or truncated batch response
+
+    Returns:
+        (items, parser) — parser.complete is False when the results array never closed
+    """
+    parser = IncrementalBatchParser()
+    items = parser.feed(text or "")
+    return items, parser
+
+
+def item_sentence_index(item: Dict[str, Any], position: int, sentences: List[str]) -> int:
+    """
+    Map a result object to its sentence.
+
+    Uses the 1-based "sentence_index" when present and in range, then an exact
+    "sentence" match, and otherwise the object's position in the array.
+    """
+    index = item.get("sentence_index")
+    if isinstance(index, int) and 1 <= index <= len(sentences):
+        return index - 1
+    sentence = item.get("sentence")
+    if isinstance(sentence, str) and sentence.strip() in sentences:
+        return sentences.index(sentence.strip())
+    return position
@@ -0,0 +1,220 @@
+# Token Annotations
+# Compact, immutable storage for per-word grammar explanations
+
+"""
+Grammar results describe each word as [word, role, color, meaning]. Held as
+a list of four-element lists, every word costs its own list object plus
+separate copies of role and color strings that repeat on nearly every
+sentence ("noun", "#FF6B6B"), and every hand-off (GrammarProcessor,
+BatchProcessor, session state, TSV export) copied the rows again.
+
+TokenAnnotations stores the same data as four parallel tuples with interned
+role and color strings. It is immutable, so it is shared instead of
+copied (copy and deepcopy return the same object), and it still behaves like
+the list of rows consumers expect: len(), iteration and indexing yield
+(word, role, color, meaning) tuples, and it compares equal to an equivalent
+list of lists. to_html() and to_json() render the card views directly.
+
+Measure memory and conversion time against the list-of-lists form with:
+
+    python -m streamlit_app.language_analyzers.token_annotations
+"""
+
+import argparse
+import copy
+import json
+import sys
+import time
+import tracemalloc
+from collections.abc import Sequence
+from typing import Any, Iterable, Iterator, List, Tuple
+
+Row = Tuple[str, str, str, str]
+
+
+def _intern(value: Any) -> Any:
+    return sys.intern(value) if type(value) is str else value
+
+
+class TokenAnnotations(Sequence):
+    """Struct-of-arrays word explanations: words, roles, colors, meanings."""
+
+    __slots__ = ('words', 'roles', 'colors', 'meanings')
+
+    def __init__(self, words: Iterable[Any] = (), roles: Iterable[Any] = (),
+                 colors: Iterable[Any] = (), meanings: Iterable[Any] = ()):
+        self.words = tuple(words)
+        self.roles = tuple(roles)
+        self.colors = tuple(colors)
+        self.meanings = tuple(meanings)
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Any]) -> "TokenAnnotations":
+        """
+        Build from [word, role, color, meaning] rows.
+
+        Rows with fewer than four fields are skipped, as every consumer of word
+        explanations already does. An existing TokenAnnotations is returned as is.
+        """
+        if isinstance(rows, TokenAnnotations):
+            return rows
+        words, roles, colors, meanings = [], [], [], []
+        for row in rows or ():
+            if len(row) < 4:
+                continue
+            words.append(row[0])
+            roles.append(_intern(row[1]))
+            colors.append(_intern(row[2]))
+            meanings.append(row[3])
+        return cls(words, roles, colors, meanings)
+
+    def __len__(self) -> int:
+        return len(self.words)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return TokenAnnotations(self.words[index], self.roles[index],
+                                    self.colors[index], self.meanings[index])
+        return (self.words[index], self.roles[index], self.colors[index], self.meanings[index])
+
+    def __iter__(self) -> Iterator[Row]:
+        return zip(self.words, self.roles, self.colors, self.meanings)
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, TokenAnnotations):
+            return (self.words == other.words and self.roles == other.roles
+                    and self.colors == other.colors and self.meanings == other.meanings)
+        if isinstance(other, (list, tuple)):
+            return len(other) == len(self) and all(
+                isinstance(row, (list, tuple)) and tuple(row) == mine for row, mine in zip(other, self))
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"TokenAnnotations({self.to_list()!r})"
+
+    # Immutable: copies share the same storage
+    def __copy__(self) -> "TokenAnnotations":
+        return self
+
+    def __deepcopy__(self, memo) -> "TokenAnnotations":
+        return self
+
+    def __reduce__(self):
+        return (TokenAnnotations, (self.words, self.roles, self.colors, self.meanings))
+
+    def to_list(self) -> List[List[Any]]:
+        """Plain [[word, role, color, meaning], ...] rows."""
+        return [list(row) for row in self]
+
+    def to_json(self) -> str:
+        """JSON array of rows, as stored in the TSV word_explanations field."""
+        return json.dumps(self.to_list(), ensure_ascii=False)
+
+    def to_html(self) -> str:
+        """Grammar explanations block for the card back ("" when empty)."""
+        if not self.words:
+            return ""
+        items = ''.join(
+            f'<div class="explanation-item"><span class="word-highlight" style="color: {color};">'
+            f'<strong>{word}</strong></span> ({role}): {meaning}</div>'
+            for word, role, color, meaning in self
+        )
+        return '<div class="word-explanations"><strong>Grammar Explanations:</strong><br>' + items + '</div>'
+
+
+def explanations_html(word_explanations: Iterable[Any]) -> str:
+    """Card HTML for word explanations given as TokenAnnotations or list rows."""
+    return TokenAnnotations.from_rows(word_explanations).to_html()
+
+
+# ============================================================================
+# MEASUREMENT
+# ============================================================================
+
+_ROLES = ("noun", "verb", "adjective", "adverb", "pronoun", "preposition", "article", "conjunction")
+_COLORS = ("#FF6B6B", "#4ECDC4", "#45B7D1", "#96CEB4", "#FFEAA7", "#DDA0DD", "#F4A460", "#CCCCCC")
+
+
+def _sample_rows(sentence_index: int, words_per_sentence: int) -> List[List[str]]:
+    # json.loads gives every role and color string its own object, like a parsed API response
+    rows = [[f"word{sentence_index}_{i}", _ROLES[i % len(_ROLES)], _COLORS[i % len(_COLORS)],
+             f"Explanation of word {i} in sentence {sentence_index}"] for i in range(words_per_sentence)]
+    return json.loads(json.dumps(rows))
+
+
+def _measure(build) -> Tuple[Any, int]:
+    tracemalloc.start()
+    result = build()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, size
+
+
+def _copy_rows(rows: List[List[Any]]) -> List[List[Any]]:
+    # What GrammarProcessor._convert_analyzer_output_to_explanations did before
+    return [[r[0], r[1], r[2], r[3]] for r in rows if len(r) >= 4]
+
+
+def measure(sentences: int = 1000, words_per_sentence: int = 8) -> dict:
+    """
+    Compare list-of-lists word explanations with TokenAnnotations.
+
+    Memory is what stays allocated for `sentences` analyzed sentences once each
+    parsed response has been converted and dropped; times cover the conversion
+    only, and a deepcopy as session state snapshots do.
+
+    Returns:
+        Bytes retained and milliseconds per conversion for both representations
+    """
+    lists, list_bytes = _measure(
+        lambda: [_copy_rows(_sample_rows(s, words_per_sentence)) for s in range(sentences)])
+    del lists
+    compact, compact_bytes = _measure(
+        lambda: [TokenAnnotations.from_rows(_sample_rows(s, words_per_sentence)) for s in range(sentences)])
+
+    parsed = [_sample_rows(s, words_per_sentence) for s in range(sentences)]
+    start = time.perf_counter()
+    lists = [_copy_rows(rows) for rows in parsed]
+    list_convert = time.perf_counter() - start
+    start = time.perf_counter()
+    copy.deepcopy(lists)
+    list_deepcopy = time.perf_counter() - start
+
+    start = time.perf_counter()
+    compact = [TokenAnnotations.from_rows(rows) for rows in parsed]
+    compact_convert = time.perf_counter() - start
+    start = time.perf_counter()
+    copy.deepcopy(compact)
+    compact_deepcopy = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for annotations in compact:
+        annotations.to_html()
+        annotations.to_json()
+    views = time.perf_counter() - start
+
+    return {
+        'sentences': sentences,
+        'words_per_sentence': words_per_sentence,
+        'list_of_lists_bytes': list_bytes,
+        'token_annotations_bytes': compact_bytes,
+        'list_of_lists_convert_ms': round(list_convert * 1000, 2),
+        'token_annotations_convert_ms': round(compact_convert * 1000, 2),
+        'list_of_lists_deepcopy_ms': round(list_deepcopy * 1000, 2),
+        'token_annotations_deepcopy_ms': round(compact_deepcopy * 1000, 2),
+        'html_and_json_views_ms': round(views * 1000, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure word explanation memory and conversion time")
+    parser.add_argument("--sentences", type=int, default=1000, help="Analyzed sentences to simulate")
+    parser.add_argument("--words", type=int, default=8, help="Words per sentence")
+    args = parser.parse_args()
+    print(json.dumps(measure(args.sentences, args.words), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -2,6 +2,7 @@
 
 import streamlit as st
 import os
+from streamlit_app.services.generation.file_manager import get_apkg_download_data
 
 
 def render_complete_page():
@@ -91,6 +92,24 @@ def render_complete_page():
         st.markdown("")
         st.info("💡 **Tip:** These sentences are still included in your deck. If they're not suitable, you can edit or delete them in Anki after import.")
 
+    # Per-stage timing from the generation trace
+    trace_summary = st.session_state.get("generation_trace_summary")
+    if trace_summary:
+        with st.expander("⏱️ Where the Time Went"):
+            st.markdown("Time per stage and API call, slowest first. *Share* is the fraction of the whole run; "
+                        "nested stages overlap their parents.")
+            st.dataframe(trace_summary, use_container_width=True, hide_index=True)
+            otlp_path = st.session_state.get("generation_trace_otlp_path")
+            if otlp_path and os.path.exists(otlp_path):
+                with open(otlp_path, "rb") as f:
+                    st.download_button(
+                        label="⬇️ Download Trace (OpenTelemetry JSON)",
+                        data=f.read(),
+                        file_name="generation_trace.otlp.json",
+                        mime="application/json",
+                        key="trace_download_complete"
+                    )
+
     st.divider()
 
     col1, col2 = st.columns(2)
@@ -111,18 +130,19 @@ def render_complete_page():
         3. 📖 **Reading**: Read → Comprehend
         """)
 
-        if "apkg_file" in st.session_state and st.session_state.apkg_file:
+        apkg_path = st.session_state.get("apkg_path")
+        if apkg_path and os.path.exists(apkg_path):
             # Add download button with enhanced styling
             st.markdown("**Ready to download!** 📥")
             # Calculate file size in KB
-            file_size_kb = round(len(st.session_state.apkg_file) / 1024)
+            file_size_kb = round(st.session_state.get("apkg_size_bytes", os.path.getsize(apkg_path)) / 1024)
             
             # Create consistent button layout
             button_col1, button_col2 = st.columns(2)
             with button_col1:
                 st.download_button(
                     label=f"⬇️ Download Anki Deck (.apkg) ({file_size_kb} KB)",
-                    data=st.session_state.apkg_file,
+                    data=get_apkg_download_data(apkg_path),
                     file_name=st.session_state.get("apkg_filename", f"{st.session_state.selected_lang.replace(' ', '_')}_deck.apkg"),
                     mime="application/octet-stream",
                     use_container_width=True,
@@ -190,8 +210,8 @@ def render_complete_page():
             # Reset generation progress when going back
             if 'generation_progress' in st.session_state:
                 st.session_state['generation_progress']['step'] = 0
-            # Clear the apkg_file and related state since we're going back to regenerate
-            for key in ["apkg_file", "apkg_filename", "log_file_path", "log_stream", "output_dirs_cleared"]:
+            # Clear the registered deck and related state since we're going back to regenerate
+            for key in ["apkg_path", "apkg_filename", "apkg_size_bytes", "log_file_path", "log_stream", "output_dirs_cleared", "generation_trace_summary", "generation_trace_otlp_path"]:
                 if key in st.session_state:
                     del st.session_state[key]
             st.session_state.page = "generate"
@@ -202,7 +222,7 @@ def render_complete_page():
             st.session_state.generating_deck = False
             
             # Clean up old files and reset state relevant to generation
-            for key in ["selected_words", "selected_lang", "selected_language", "apkg_file", "apkg_filename", "generation_progress", "generation_log", "log_file_path", "log_stream", "output_dirs_cleared"]:
+            for key in ["selected_words", "selected_lang", "selected_language", "apkg_path", "apkg_filename", "apkg_size_bytes", "generation_progress", "generation_log", "log_file_path", "log_stream", "output_dirs_cleared", "generation_trace_summary", "generation_trace_otlp_path"]:
                 if key in st.session_state:
                     del st.session_state[key]
             # Clean up log file if it exists
@@ -9,6 +9,8 @@ import logging
 # Add parent directory to path for imports
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from streamlit_app.services.generation.generation_telemetry import format_duration_range, get_generation_telemetry
+
 logger = logging.getLogger(__name__)
 
 try:
@@ -72,6 +74,20 @@ def render_generate_page():
             st.caption(f"{topics_text}")
         else:
             st.info("**No topics**")
+
+    # Wall time and quota use, calibrated from previously generated words
+    if selected_words:
+        estimate = get_generation_telemetry().estimate(len(selected_words), num_sentences, selected_lang)
+        st.markdown("### ⏱️ **Estimated Time & API Usage**")
+        est1, est2, est3, est4 = st.columns(4)
+        est1.metric("Time", format_duration_range(estimate['wall_seconds_p50'], estimate['wall_seconds_p90']))
+        est2.metric("Gemini tokens", f"{estimate['gemini_tokens_p50']:,}", help=f"Up to {estimate['gemini_tokens_p90']:,} (p90) in {estimate['gemini_calls_p90']:,} requests")
+        est3.metric("TTS characters", f"{estimate['google_tts_chars_p50']:,}", help=f"Up to {estimate['google_tts_chars_p90']:,} (p90)")
+        est4.metric("Image searches", f"{estimate['pixabay_calls_p50']:,}")
+        if estimate['source'] == 'default':
+            st.caption("Static estimate - it is calibrated from real timings once a few words have been generated.")
+        else:
+            st.caption(f"Median and 90th percentile from {estimate['samples']} previously generated words.")
     
     # Separate section for viewing and editing selected words with enrichment data
     st.markdown("---")
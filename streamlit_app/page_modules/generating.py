@@ -8,25 +8,41 @@ import datetime
 import time
 import re
 import logging
+import pathlib
 from utils import get_secret, log_message
 from core_functions import generate_complete_deck
 from streamlit_app.services.generation.log_manager import LogManager
 from streamlit_app.services.generation.progress_tracker import ProgressTracker
 from streamlit_app.services.generation.session_validator import SessionValidator
 from streamlit_app.services.generation.file_manager import FileManager
+from streamlit_app.services.generation.generation_telemetry import format_duration_range, get_generation_telemetry
+from streamlit_app.services.generation.job_store import UNFINISHED, get_job_store
+from streamlit_app.services.generation.generation_queue import TRACE_FILE, get_generation_queue
+from streamlit_app.services.generation.tracing import Tracer, export_otlp, load_jsonl, span, summarize
+from constants import GEMINI_CALL_LIMIT, GEMINI_TOKEN_LIMIT
+from voice_catalog import voice_family
 
 
 logger = logging.getLogger(__name__)
 
+BACKGROUND_POLL_SECONDS = 2
+# st.fragment arrived in Streamlit 1.37; older versions poll by rerunning the page
+SUPPORTS_FRAGMENTS = hasattr(st, "fragment")
 
-def check_budget_limits(selected_words, num_sentences, voice):
+
+def check_budget_limits(selected_words, num_sentences, voice, language=None):
     """
     Check if generation would exceed recommended free tier limits and show warnings.
 
+    Quota checks use the telemetry-calibrated estimate (p90, so a slow or
+    verbose run still fits) of Gemini calls and tokens, TTS characters and
+    Pixabay searches.
+
     Args:
         selected_words: List of words to generate
         num_sentences: Number of sentences per word
         voice: Selected voice type
+        language: Target language, to use that language's telemetry
 
     Returns:
         dict: Warning information with messages and severity levels
@@ -50,7 +66,59 @@ def check_budget_limits(selected_words, num_sentences, voice):
         'Neural2': 1.5
     }
 
+    # Free monthly TTS characters per voice family
+    TTS_MONTHLY_FREE_CHARS = {
+        'Standard': 4_000_000,
+        'Chirp3': 4_000_000,
+        'Chirp3 HD': 1_000_000,
+        'Wavenet': 1_000_000,
+        'Neural2': 1_000_000,
+        'Chirp3-HD': 1_000_000
+    }
+    PIXABAY_REQUESTS_PER_MINUTE = 100
+
     voice_multiplier = voice_costs.get(voice, 1.0)
+    estimate = get_generation_telemetry().estimate(num_words, num_sentences, language)
+    calibrated = estimate['source'] != 'default'
+
+    # Planned wall time, from measured words when available
+    warnings.append({
+        'type': 'time_estimate',
+        'severity': 'low',
+        'message': f"⏱️ **Estimated Time:** {format_duration_range(estimate['wall_seconds_p50'], estimate['wall_seconds_p90'])} for {total_cards} cards",
+        'details': (f"Based on {estimate['samples']} previously generated words ({estimate['source']} telemetry)."
+                    if calibrated else "Static estimate; it is calibrated once a few words have been generated.")
+    })
+
+    # Gemini daily quotas
+    if estimate['gemini_calls_p90'] > GEMINI_CALL_LIMIT or estimate['gemini_tokens_p90'] > GEMINI_TOKEN_LIMIT:
+        warnings.append({
+            'type': 'gemini_quota',
+            'severity': 'high',
+            'message': f"🚨 **Gemini Quota:** up to {estimate['gemini_calls_p90']:,} requests and {estimate['gemini_tokens_p90']:,} tokens exceeds the daily {GEMINI_CALL_LIMIT:,} requests / {GEMINI_TOKEN_LIMIT:,} tokens.",
+            'details': "Split the words across several days or reduce sentences per word."
+        })
+
+    # Google TTS monthly free characters
+    family = voice if voice in TTS_MONTHLY_FREE_CHARS else voice_family(voice or "")
+    tts_free_chars = TTS_MONTHLY_FREE_CHARS.get(family, TTS_MONTHLY_FREE_CHARS['Standard'])
+    if estimate['google_tts_chars_p90'] > tts_free_chars:
+        warnings.append({
+            'type': 'tts_quota',
+            'severity': 'high',
+            'message': f"🚨 **Text-to-Speech Quota:** up to {estimate['google_tts_chars_p90']:,} characters exceeds the {tts_free_chars:,} free monthly characters for '{voice}'.",
+            'details': f"Estimated cost: ~${total_cards * 0.2874 * voice_multiplier:.2f} beyond the free tier."
+        })
+
+    # Pixabay rate limit: searches per minute of generation
+    minutes = max(estimate['wall_seconds_p50'] / 60, 1.0)
+    if estimate['pixabay_calls_p90'] / minutes > PIXABAY_REQUESTS_PER_MINUTE:
+        warnings.append({
+            'type': 'pixabay_rate',
+            'severity': 'medium',
+            'message': f"🖼️ **Pixabay Rate Limit:** ~{estimate['pixabay_calls_p90'] / minutes:.0f} image searches per minute exceeds Pixabay's {PIXABAY_REQUESTS_PER_MINUTE}/minute.",
+            'details': "Some images may be skipped; generate in smaller batches."
+        })
 
     # Check daily limit
     if total_cards > DAILY_LIMIT:
@@ -92,6 +160,195 @@ def check_budget_limits(selected_words, num_sentences, voice):
     return warnings
 
 
+def _show_budget_warnings(selected_words, num_sentences, voice, language):
+    """Show the time estimate and any budget warnings for the deck (inline, no blocking)."""
+    budget_warnings = check_budget_limits(selected_words, num_sentences, voice, language)
+    for estimate in [w for w in budget_warnings if w['type'] == 'time_estimate']:
+        st.caption(f"{estimate['message']} - {estimate['details']}")
+    budget_warnings = [w for w in budget_warnings if w['type'] != 'time_estimate']
+    if budget_warnings:
+        st.markdown("---")
+        st.markdown("### ⚠️ **Budget & Usage Warnings**")
+
+        for warning in budget_warnings:
+            severity_colors = {
+                'high': '🔴',
+                'medium': '🟡',
+                'low': '🟢'
+            }
+            color = severity_colors.get(warning['severity'], '🟢')
+
+            with st.expander(f"{color} {warning['message']}", expanded=warning['severity'] == 'high'):
+                st.markdown(f"**Details:** {warning['details']}")
+                if warning['severity'] == 'high':
+                    st.markdown("**💡 Recommendation:** Consider reducing the number of sentences per word or using Standard voice to stay within free limits.")
+
+        st.markdown("---")
+
+
+def _generation_tracer(language=None, num_words=None):
+    """
+    The tracer for the deck being generated, created on first use. Spans go to
+    a .trace.jsonl file next to the generation log as they finish.
+    """
+    tracer = st.session_state.get('generation_tracer')
+    if tracer is None:
+        log_file_path = st.session_state.get('log_file_path')
+        jsonl_path = pathlib.Path(log_file_path).with_suffix(".trace.jsonl") if log_file_path else None
+        tracer = Tracer(jsonl_path=jsonl_path, attributes={'language': language, 'words': num_words})
+        st.session_state['generation_tracer'] = tracer
+    return tracer
+
+
+def _finish_generation_trace():
+    """Export the deck's trace as OTLP/JSON and keep its summary for the complete page."""
+    tracer = st.session_state.pop('generation_tracer', None)
+    if tracer is None or not tracer.spans:
+        return
+    st.session_state['generation_trace_summary'] = tracer.summary()
+    if tracer.jsonl_path:
+        try:
+            otlp_path = tracer.export_otlp(str(tracer.jsonl_path).replace(".trace.jsonl", ".otlp.json"))
+            st.session_state['generation_trace_otlp_path'] = str(otlp_path)
+        except OSError as e:
+            logger.warning(f"Could not export generation trace: {e}")
+
+
+def _generation_job(language, words, params):
+    """
+    The job this deck is checkpointed to: the one in the session (restored
+    from the URL), else an unfinished job for the same deck, else a new one.
+    The job ID goes into the URL so a refreshed page finds the job again.
+    """
+    store = get_job_store()
+    job_id = st.session_state.get('generation_job_id')
+    job = store.get_job(job_id) if job_id else None
+    if job is None or job['status'] not in UNFINISHED:
+        job_id = store.find_resumable(language, words, params) or store.create_job(language, words, params)
+    st.session_state['generation_job_id'] = job_id
+    st.query_params['job'] = job_id
+    return job_id
+
+
+def _end_generation_job(status, apkg_path=None):
+    """Mark the session's job finished so it is no longer resumed."""
+    job_id = st.session_state.pop('generation_job_id', None)
+    if job_id:
+        get_job_store().finish_job(job_id, status, apkg_path)
+    if 'job' in st.query_params:
+        del st.query_params['job']
+
+
+def _queue_user():
+    """Who a background job is queued for: the browser session (the app has no sign-in)."""
+    try:
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
+        ctx = get_script_run_ctx()
+    except ImportError:
+        ctx = None
+    return ctx.session_id if ctx else "local"
+
+
+def _worker_session_values(google_api_key):
+    """API keys and session settings a background worker needs (handed over in memory only)."""
+    keys = ('google_tts_api_key', 'pixabay_api_key', 'grammar_streaming', 'grammar_local_first',
+            'grammar_local_confidence_threshold', 'word_enrichment_data')
+    values = {key: st.session_state[key] for key in keys if key in st.session_state}
+    values['google_api_key'] = google_api_key
+    return values
+
+
+def _finish_background_job(progress, file_manager):
+    """Hand a background job's deck, usage and trace summary over to the complete page."""
+    job_id = progress['job_id']
+    job_dir = get_job_store().job_dir(job_id)
+    for key, amount in progress['usage'].items():
+        st.session_state[key] = st.session_state.get(key, 0) + amount
+
+    trace_path = job_dir / TRACE_FILE
+    if trace_path.exists():
+        spans = load_jsonl(str(trace_path))
+        st.session_state['generation_trace_summary'] = summarize(spans)
+        log_file_path = st.session_state.get('log_file_path')
+        if spans and log_file_path:
+            try:
+                otlp_path = export_otlp(spans, str(pathlib.Path(log_file_path).with_suffix(".otlp.json")),
+                                        attributes={'language': st.session_state.get('selected_lang'), 'job_id': job_id})
+                st.session_state['generation_trace_otlp_path'] = str(otlp_path)
+            except OSError as e:
+                logger.warning(f"Could not export generation trace: {e}")
+
+    if progress['status'] == "finalized" and progress['apkg_path'] and file_manager.load_apkg_file(progress['apkg_path']):
+        apkg_path = file_manager.get_registered_apkg_path()
+        result = {
+            'success': True,
+            'apkg_path': apkg_path,
+            'tsv_path': None,
+            'media_dir': str(job_dir / "media"),
+            'output_dir': str(job_dir),
+            'errors': [],
+            'partial_success': True
+        }
+    else:
+        apkg_path = None
+        result = {
+            'success': False,
+            'error': f"Deck generation {progress['status']}",
+            'errors': [{'error': f"Background job {job_id} {progress['status']}"}],
+            'partial_success': False
+        }
+
+    generation_progress = st.session_state['generation_progress']
+    generation_progress['result'] = result
+    generation_progress['success'] = result['success']
+    generation_progress['step'] = 2
+    st.session_state['generation_progress'] = generation_progress
+    st.session_state.pop('generation_queue_seq', None)
+    _end_generation_job(progress['status'], apkg_path)
+
+
+def _polling_fragment(func):
+    """Rerun func on its own every BACKGROUND_POLL_SECONDS where fragments are supported."""
+    if not SUPPORTS_FRAGMENTS:
+        return func
+    return st.fragment(run_every=BACKGROUND_POLL_SECONDS)(func)
+
+
+@_polling_fragment
+def _follow_background_job(file_manager):
+    """
+    Poll the session's background job: new log messages and progress every
+    couple of seconds, and the hand-off to the complete page once it ends.
+    Only this fragment reruns while polling, so the rest of the page stays idle
+    (without fragment support the whole page reruns instead).
+    """
+    generation_queue = get_generation_queue()
+    job_id = st.session_state.get('generation_job_id')
+    if generation_queue is None or job_id is None:
+        return
+    progress = generation_queue.progress(job_id, st.session_state.get('generation_queue_seq', 0))
+    if progress is None:
+        progress = {'job_id': job_id, 'status': "failed", 'usage': {}, 'apkg_path': None}
+        _finish_background_job(progress, file_manager)
+        st.rerun()
+
+    log_manager = st.session_state['log_manager']
+    for event in progress['events']:
+        log_manager.log_message(event['message'])
+    st.session_state['generation_queue_seq'] = progress['last_seq']
+
+    st.progress(progress['completed_words'] / max(progress['words'], 1))
+    if progress['queue_position'] is not None:
+        st.info(f"⏳ Waiting for a free worker ({progress['queue_position']} job(s) ahead)...")
+    elif progress['status'] in UNFINISHED:
+        st.info(f"⚙️ Generating in the background: {progress['completed_words']}/{progress['words']} words done")
+    st.code(log_manager.get_display_logs(), language=None)
+
+    if progress['status'] not in UNFINISHED:
+        _finish_background_job(progress, file_manager)
+        st.rerun()
+
+
 def render_generating_page():
     """Render the deck generation page with comprehensive error recovery."""
     
@@ -116,9 +373,13 @@ def render_generating_page():
     session_validator.initialize_generation_progress()
     session_validator.initialize_logging()
 
-    # Initialize LogManager service (always available after logging is set up)
+    # Initialize LogManager service (always available after logging is set up).
+    # Reuse it across reruns so the ring buffer survives; only rebuild when the
+    # underlying log file changes.
     if 'log_stream' in st.session_state:
-        st.session_state['log_manager'] = LogManager(st.session_state['log_stream'])
+        existing_log_manager = st.session_state.get('log_manager')
+        if existing_log_manager is None or existing_log_manager.log_stream is not st.session_state['log_stream']:
+            st.session_state['log_manager'] = LogManager(st.session_state['log_stream'])
 
     step = session_validator.get_generation_step()
 
@@ -314,11 +575,11 @@ Combine all components into a professional Anki deck.
         def update_log_display(msg, display_element):
             """Update log display in real-time during generation."""
             st.session_state['log_manager'].log_message(msg)
-            display_element.code(st.session_state['log_manager'].get_display_logs(), language=None)
+            progress_tracker.refresh_log_display()
             time.sleep(0.05)  # Brief pause for UI update
 
-        # Display initial log content
-        log_display.code(st.session_state['log_manager'].get_display_logs(), language=None)
+        # Display initial log content (placeholder is new on every rerun)
+        progress_tracker.refresh_log_display(force=True)
 
     # Display Pass 1 results if available
     if step == 1 and 'generation_results' in st.session_state and st.session_state['generation_results'].get('pass1_results'):
@@ -344,6 +605,19 @@ Combine all components into a professional Anki deck.
     voice = st.session_state.selected_voice
     import pathlib
     output_dir = str(pathlib.Path("./output"))
+    # A checkpointed job keeps its media and partial deck in its own directory,
+    # which survives the per-session clearing of ./output
+    job_params = {
+        'sentences_per_word': num_sentences,
+        'sentence_length_range': [min_length, max_length],
+        'difficulty': difficulty,
+        'audio_speed': audio_speed,
+        'selected_voice': voice,
+        'enable_topics': enable_topics,
+        'selected_topics': selected_topics if enable_topics else [],
+    }
+    if st.session_state.get('generation_job_id') and 'generation_substep' in st.session_state:
+        output_dir = str(get_job_store().job_dir(st.session_state['generation_job_id']))
 
     # Clear output directories using FileManager
     file_manager.clear_output_directories()
@@ -400,31 +674,40 @@ Combine all components into a professional Anki deck.
                 st.session_state.page = "word_select"
                 st.rerun()
 
+    elif step == 1 and get_generation_queue() is not None:
+        # Generate in a background worker; only the progress fragment below reruns while it works
+        current_status.markdown("⚙️ **Generating your complete deck...**")
+        step_indicator.markdown("🔄 **Processing in the background**")
+        log_display.empty()
+
+        _show_budget_warnings(selected_words, num_sentences, voice, selected_lang)
+
+        generation_queue = get_generation_queue()
+        job_id = st.session_state.get('generation_job_id')
+        job = get_job_store().get_job(job_id) if job_id else None
+        if job is None or (job['status'] in UNFINISHED and not generation_queue.is_active(job_id)):
+            # New job, or one whose worker went away with a server restart: it resumes from its checkpoints
+            job_id = _generation_job(selected_lang, selected_words, job_params)
+            st.session_state.setdefault('generation_queue_seq', 0)
+            generation_queue.submit(job_id, _queue_user(), _worker_session_values(google_api_key))
+            st.session_state['log_manager'].log_message(f"<b>🚀 Deck generation job {job_id} submitted</b>")
+
+        _follow_background_job(file_manager)
+
+        if st.button("⏹️ Cancel generation"):
+            generation_queue.cancel(job_id)
+            st.rerun()
+        if not SUPPORTS_FRAGMENTS:
+            time.sleep(BACKGROUND_POLL_SECONDS)
+            st.rerun()
+
     elif step == 1:
         # Perform progressive generation - process one word at a time for real-time UI updates
         current_status.markdown("⚙️ **Generating your complete deck...**")
         step_indicator.markdown("🔄 **Processing**")
 
         # Check budget limits and show warnings (inline, no blocking)
-        budget_warnings = check_budget_limits(selected_words, num_sentences, voice)
-        if budget_warnings:
-            st.markdown("---")
-            st.markdown("### ⚠️ **Budget & Usage Warnings**")
-
-            for warning in budget_warnings:
-                severity_colors = {
-                    'high': '🔴',
-                    'medium': '🟡',
-                    'low': '🟢'
-                }
-                color = severity_colors.get(warning['severity'], '🟢')
-
-                with st.expander(f"{color} {warning['message']}", expanded=warning['severity'] == 'high'):
-                    st.markdown(f"**Details:** {warning['details']}")
-                    if warning['severity'] == 'high':
-                        st.markdown("**💡 Recommendation:** Consider reducing the number of sentences per word or using Standard voice to stay within free limits.")
-
-            st.markdown("---")
+        _show_budget_warnings(selected_words, num_sentences, voice, selected_lang)
 
         # Initialize progressive generation state
         if 'generation_substep' not in st.session_state:
@@ -437,6 +720,36 @@ Combine all components into a professional Anki deck.
                 'partial_success': True,
                 'pass1_results': []
             }
+            # Sentences seen so far in this deck, so repeats are replaced or share their artifacts
+            from streamlit_app.services.generation.sentence_dedup import SentenceDeduplicator
+            dedup = st.session_state['generation_dedup'] = SentenceDeduplicator()
+
+            # Resume the deck's job where it stopped: finished words are not generated again
+            job_id = _generation_job(selected_lang, selected_words, job_params)
+            output_dir = str(get_job_store().job_dir(job_id))
+            completed = get_job_store().completed_words(job_id)
+            resumed = 0
+            while resumed in completed:
+                word_data = completed[resumed]
+                st.session_state['generation_results']['words_data'].append(word_data)
+                st.session_state['generation_results']['pass1_results'].append(
+                    {'word': word_data['word'], 'sentences': word_data['sentences']})
+                if word_data['sentences']:
+                    dedup.register(word_data['word'], word_data['sentences'],
+                                   word_data['audio_files'], word_data['image_files'])
+                resumed += 1
+            st.session_state['generation_substep'] = resumed
+            if resumed:
+                st.session_state['log_manager'].log_message(
+                    f"<b>♻️ Resuming job {job_id}: {resumed}/{len(selected_words)} words already done</b>")
+            if len(completed) > resumed:
+                # Words past a gap will be appended again; start the partial deck over
+                # (finalizing then rebuilds it from the stored words)
+                from core_functions import discard_incremental_apkg
+                discard_incremental_apkg(str(pathlib.Path(output_dir) / f"{selected_lang}.apkg"))
+            # A fresh trace per deck; a leftover one belongs to an abandoned run
+            st.session_state.pop('generation_tracer', None)
+            _generation_tracer(selected_lang, len(selected_words))
             st.session_state['log_manager'].log_message("<b>⚙️ Starting progressive deck generation...</b>")
             status_text.info("⚙️ Starting progressive deck generation...")
             detail_text.markdown("*Processing words one by one for real-time updates...*")
@@ -449,32 +762,41 @@ Combine all components into a professional Anki deck.
         if substep >= len(selected_words):
             # All words processed - finalize the deck
             st.session_state['log_manager'].log_message("<b>📦 FINAL PASS: Deck Assembly</b>")
+            dedup = st.session_state.get('generation_dedup')
+            if dedup is not None and (dedup.stats['replaced'] or dedup.stats['shared']):
+                st.session_state['log_manager'].log_message(
+                    f"♻️ Deduplication: {dedup.stats['replaced']} sentences replaced in "
+                    f"{dedup.stats['replacement_calls']} calls, {dedup.stats['shared']} reused earlier artifacts")
             st.session_state['log_manager'].log_message("Combining all word components into a professional Anki deck...")
             status_text.info("📦 Finalizing deck assembly...")
 
             try:
-                from core_functions import create_apkg_from_word_data
-                import pathlib
+                from core_functions import create_apkg_from_word_data, finalize_incremental_apkg
 
                 output_path = pathlib.Path(output_dir)
                 media_dir = output_path / "media"
 
-                # Create the final APKG file
+                # Finalize the deck built up word by word; rebuild from scratch if it is incomplete
                 apkg_file_path = output_path / f"{selected_lang}.apkg"
-                success = create_apkg_from_word_data(
-                    results['words_data'],
-                    str(media_dir),
-                    str(apkg_file_path),
-                    selected_lang,
-                    selected_lang
-                )
+                expected_notes = sum(len(word_data.get('sentences', [])) for word_data in results['words_data'])
+                with _generation_tracer(selected_lang, len(selected_words)).activate(), \
+                        span("export", language=selected_lang, words=len(results['words_data'])):
+                    success = finalize_incremental_apkg(str(apkg_file_path), str(media_dir), expected_notes)
+                    if not success:
+                        success = create_apkg_from_word_data(
+                            results['words_data'],
+                            str(media_dir),
+                            str(apkg_file_path),
+                            selected_lang,
+                            selected_lang
+                        )
                 
                 if success and apkg_file_path.exists():
-                    apkg_path = str(apkg_file_path)
-                    
-                    # Load the APKG file into session state for download
-                    if not file_manager.load_apkg_file(apkg_path):
+                    # Register the APKG file for download (moves it to the downloads dir)
+                    if not file_manager.load_apkg_file(str(apkg_file_path)):
                         raise Exception("Failed to load created APKG file for download")
+                    apkg_path = file_manager.get_registered_apkg_path()
+                    _end_generation_job("finalized", apkg_path)
                     
                     # Success!
                     result = {
@@ -496,7 +818,7 @@ Combine all components into a professional Anki deck.
                     detail_text.markdown("*Your Anki deck is ready. Moving to export...*")
 
                     # Update log display one final time
-                    log_display.code(st.session_state['log_manager'].get_display_logs(), language=None)
+                    progress_tracker.refresh_log_display()
 
                     # Store results and move to completion
                     progress = st.session_state['generation_progress']
@@ -508,6 +830,8 @@ Combine all components into a professional Anki deck.
                     # Clean up progressive generation state
                     del st.session_state['generation_substep']
                     del st.session_state['generation_results']
+                    st.session_state.pop('generation_dedup', None)
+                    _finish_generation_trace()
 
                     st.rerun()
                 else:
@@ -523,7 +847,7 @@ Combine all components into a professional Anki deck.
                 }
 
                 # Update log display for error
-                log_display.code(st.session_state['log_manager'].get_display_logs(), language=None)
+                progress_tracker.refresh_log_display()
 
                 # Store results and move to completion
                 progress = st.session_state['generation_progress']
@@ -532,9 +856,14 @@ Combine all components into a professional Anki deck.
                 progress['step'] = 2
                 st.session_state['generation_progress'] = progress
 
+                # Keep the stored words; a new job is started if the deck is generated again
+                _end_generation_job("failed")
+
                 # Clean up progressive generation state
                 del st.session_state['generation_substep']
                 del st.session_state['generation_results']
+                st.session_state.pop('generation_dedup', None)
+                _finish_generation_trace()
 
                 st.rerun()
 
@@ -548,85 +877,107 @@ Combine all components into a professional Anki deck.
             status_text.info(f"🔤 Processing word {substep + 1}/{len(selected_words)}: '{current_word}'")
             detail_text.markdown(f"*Generating sentences, audio, and images for '{current_word}'...*")
 
-            try:
-                from core_functions import generate_deck_progressive
-
-                # Get enriched word data for current word if available
-                enriched_word_data = None
-                if 'word_enrichment_data' in st.session_state:
-                    # Find the enriched data for this word
-                    for word_data in st.session_state['word_enrichment_data']:
-                        if word_data['word'] == current_word:
-                            enriched_word_data = word_data
-                            break
+            # One "word" span per word: the passes, API calls and partial-deck append nest under it
+            word_succeeded = False
+            with _generation_tracer(selected_lang, len(selected_words)).activate(), \
+                    span("word", language=selected_lang, word=current_word, sentences=num_sentences):
+                try:
+                    from core_functions import generate_deck_progressive
+
+                    # Get enriched word data for current word if available
+                    enriched_word_data = None
+                    if 'word_enrichment_data' in st.session_state:
+                        # Find the enriched data for this word
+                        for word_data in st.session_state['word_enrichment_data']:
+                            if word_data['word'] == current_word:
+                                enriched_word_data = word_data
+                                break
+
+                    # Generate the word using core_functions with log callback
+                    result = generate_deck_progressive(
+                        word=current_word,
+                        language=selected_lang,
+                        gemini_api_key=google_api_key,
+                        output_dir=output_dir,
+                        num_sentences=num_sentences,
+                        min_length=min_length,
+                        max_length=max_length,
+                        difficulty=difficulty,
+                        audio_speed=audio_speed,
+                        voice=voice,
+                        topics=selected_topics if enable_topics else None,
+                        native_language="English",
+                        log_callback=lambda msg: update_log_display(msg, log_display),
+                        enriched_word_data=enriched_word_data,
+                        deduplicator=st.session_state.get('generation_dedup'),
+                        checkpoint=(get_job_store().checkpoint(st.session_state['generation_job_id'], substep, current_word)
+                                    if st.session_state.get('generation_job_id') else None),
+                    )
 
-                # Generate the word using core_functions with log callback
-                result = generate_deck_progressive(
-                    word=current_word,
-                    language=selected_lang,
-                    gemini_api_key=google_api_key,
-                    output_dir=output_dir,
-                    num_sentences=num_sentences,
-                    min_length=min_length,
-                    max_length=max_length,
-                    difficulty=difficulty,
-                    audio_speed=audio_speed,
-                    voice=voice,
-                    topics=selected_topics if enable_topics else None,
-                    native_language="English",
-                    log_callback=lambda msg: update_log_display(msg, log_display),
-                    enriched_word_data=enriched_word_data,
-                )
+                    word_succeeded = result['success']
+                    if result['success']:
+                        # Add successful word data to results
+                        results['words_data'].append(result['word_data'])
+                        results['audio_files'].extend(result['audio_files'])
+                        results['image_files'].extend(result['image_files'])
+                    else:
+                        # Handle partial failure
+                        results['words_data'].append(result['word_data'])  # Add empty data to maintain structure
+                        results['errors'].extend(result['errors'])
+                        results['partial_success'] = False
 
-                if result['success']:
-                    # Add successful word data to results
-                    results['words_data'].append(result['word_data'])
-                    results['audio_files'].extend(result['audio_files'])
-                    results['image_files'].extend(result['image_files'])
-                else:
-                    # Handle partial failure
-                    results['words_data'].append(result['word_data'])  # Add empty data to maintain structure
-                    results['errors'].extend(result['errors'])
+                    # Add Pass 1 results for display
+                    results['pass1_results'].append({
+                        'word': current_word,
+                        'sentences': result['word_data']['sentences']
+                    })
+
+                except Exception as e:
+                    error_msg = f"Failed to process word '{current_word}': {e}"
+                    st.session_state['log_manager'].log_message(f"<b>⚠️ {error_msg}</b>")
+                    results['errors'].append({
+                        'component': f"Word processing for '{current_word}'",
+                        'error': str(e),
+                        'critical': False
+                    })
                     results['partial_success'] = False
 
-                # Add Pass 1 results for display
-                results['pass1_results'].append({
-                    'word': current_word,
-                    'sentences': result['word_data']['sentences']
-                })
+                    # Continue with empty data for this word to maintain structure
+                    word_data = {
+                        'word': current_word,
+                        'meaning': '',
+                        'sentences': [],
+                        'audio_files': ["" for _ in range(num_sentences)],
+                        'image_files': ["" for _ in range(num_sentences)]
+                    }
+                    results['words_data'].append(word_data)
 
-            except Exception as e:
-                error_msg = f"Failed to process word '{current_word}': {e}"
-                st.session_state['log_manager'].log_message(f"<b>⚠️ {error_msg}</b>")
-                results['errors'].append({
-                    'component': f"Word processing for '{current_word}'",
-                    'error': str(e),
-                    'critical': False
-                })
-                results['partial_success'] = False
-
-                # Continue with empty data for this word to maintain structure
-                word_data = {
-                    'word': current_word,
-                    'meaning': '',
-                    'sentences': [],
-                    'audio_files': ["" for _ in range(num_sentences)],
-                    'image_files': ["" for _ in range(num_sentences)]
-                }
-                results['words_data'].append(word_data)
+                    # Add Pass 1 results for display (empty for failed words)
+                    results['pass1_results'].append({
+                        'word': current_word,
+                        'sentences': word_data['sentences']
+                    })
 
-                # Add Pass 1 results for display (empty for failed words)
-                results['pass1_results'].append({
-                    'word': current_word,
-                    'sentences': word_data['sentences']
-                })
+                # Append the finished word to the partial deck so the final pass only has to seal it
+                from core_functions import append_word_to_apkg
+                output_path = pathlib.Path(output_dir)
+                append_word_to_apkg(
+                    results['words_data'][-1],
+                    str(output_path / "media"),
+                    str(output_path / f"{selected_lang}.apkg"),
+                    selected_lang,
+                    selected_lang
+                )
+                if word_succeeded and st.session_state.get('generation_job_id'):
+                    # Only once it is in the partial deck, so a resumed job does not append it twice
+                    get_job_store().complete_word(st.session_state['generation_job_id'], substep, results['words_data'][-1])
 
             # Move to next word
             st.session_state['generation_substep'] = substep + 1
             st.session_state['generation_results'] = results
 
             # Update log display in real-time
-            log_display.code(st.session_state['log_manager'].get_display_logs(), language=None)
+            progress_tracker.refresh_log_display()
 
             # Trigger UI update
             time.sleep(0.1)  # Brief pause for UI stability
@@ -703,16 +1054,16 @@ Combine all components into a professional Anki deck.
                 try:
                     apkg_path = result.get('apkg_path')
                     if apkg_path and os.path.exists(apkg_path):
-                        progress['apkg_path'] = apkg_path
-                        progress['apkg_ready'] = True
-                        
                         log_message(f"[DEBUG] APKG path from result: {apkg_path}")
                         st.session_state['log_manager'].log_message(f"<b>📦 APKG file found:</b> {apkg_path}")
                         
-                        # Read APKG file and store in session state for download
+                        # Register APKG file for download (only the path is kept in session state)
                         if not file_manager.load_apkg_file(apkg_path):
                             st.error("Failed to load APKG file for download")
                             return
+
+                        progress['apkg_path'] = file_manager.get_registered_apkg_path()
+                        progress['apkg_ready'] = True
                         
                     else:
                         st.session_state['log_manager'].log_message(f"<b>⚠️ APKG file not found at path:</b> {apkg_path}")
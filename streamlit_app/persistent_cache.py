@@ -11,6 +11,8 @@ import logging
 from dataclasses import dataclass, asdict
 from datetime import datetime, timedelta
 
+from streamlit_app.services.generation.metrics import watch_cache
+
 logger = logging.getLogger(__name__)
 
 @dataclass
@@ -83,6 +85,7 @@ class PersistentCache:
 
         # Load existing cache entries
         self._load_cache()
+        watch_cache(self)
 
         logger.info(f"PersistentCache initialized with {len(self.memory_cache)} entries")
 
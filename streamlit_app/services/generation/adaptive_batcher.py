@@ -0,0 +1,329 @@
+"""
+Adaptive Batcher Service
+
+Sizes grammar-analysis batches from observed output sizes instead of a fixed
+8 sentences per call. Output tokens per sentence character are learned per
+(language, complexity) and batches are packed up to a target output budget,
+so short beginner sentences share a call while long advanced ones are split.
+A batch that truncates or fails at its tail halves the budget for that key;
+clean batches grow it back. Statistics persist across restarts and are
+shared by the server and its generation workers: each process reloads the
+file when it changes and, holding a file lock, adds its own counts to the
+file's when saving.
+
+Export the current metrics as JSON with:
+
+    python -m streamlit_app.services.generation.adaptive_batcher
+"""
+
+import argparse
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+from streamlit_app.services.generation.file_lock import locked_file
+
+logger = logging.getLogger(__name__)
+
+# Batch responses are capped at 20,000 output tokens; plan for well under that
+DEFAULT_OUTPUT_TOKEN_BUDGET = 12000
+DEFAULT_BATCH_SIZE = 8          # Used until a (language, complexity) has history
+MIN_BATCH_SIZE = 1
+MAX_BATCH_SIZE = 20
+DEFAULT_STATS_PATH = "./cache/adaptive_batching.json"
+
+# Analyses scoring below this are fallbacks, i.e. the sentence was not answered
+FALLBACK_CONFIDENCE_CEILING = 0.4
+
+_SMOOTHING = 0.3                # Weight of the newest sample in the running estimate
+_MIN_SCALE = 0.125              # Smallest fraction of the budget after repeated shrinking
+_GROW_STEP = 0.125              # Budget fraction regained per clean batch
+_MIN_SENTENCE_CHARS = 10        # Very short sentences still carry per-sentence JSON overhead
+
+
+# Statistics that add up across processes; the others are the latest learned state
+_COUNTERS = ('batches', 'sentences', 'failed_sentences', 'truncated_batches', 'output_tokens')
+
+
+def _new_stats() -> Dict[str, Any]:
+    return {
+        'tokens_per_char': None,
+        'scale': 1.0,
+        'batches': 0,
+        'sentences': 0,
+        'failed_sentences': 0,
+        'truncated_batches': 0,
+        'output_tokens': 0,
+        'last_batch_size': 0,
+    }
+
+
+class AdaptiveBatcher:
+    """
+    Plans grammar batches against an output-token budget and learns from results.
+
+    Usage:
+        batches = batcher.plan_batches(sentences, "de", "advanced")
+        for indices in batches:
+            ...  # analyze [sentences[i] for i in indices]
+            batcher.record_batch("de", "advanced", batch, output_tokens, failed, truncated)
+    """
+
+    def __init__(self, stats_path: Optional[str] = None,
+                 output_token_budget: int = DEFAULT_OUTPUT_TOKEN_BUDGET,
+                 default_batch_size: int = DEFAULT_BATCH_SIZE,
+                 min_batch_size: int = MIN_BATCH_SIZE,
+                 max_batch_size: int = MAX_BATCH_SIZE):
+        """
+        Initialize the batcher.
+
+        Args:
+            stats_path: JSON file to load and persist statistics (None keeps them in memory)
+            output_token_budget: Target output tokens per batch call
+            default_batch_size: Sentences per batch before any history exists
+            min_batch_size: Smallest batch to plan
+            max_batch_size: Largest batch to plan
+        """
+        self.stats_path = Path(stats_path) if stats_path else None
+        self.output_token_budget = output_token_budget
+        self.default_batch_size = default_batch_size
+        self.min_batch_size = min_batch_size
+        self.max_batch_size = max_batch_size
+        self._stats: Dict[str, Dict[str, Any]] = {}
+        self._synced: Dict[str, Dict[str, Any]] = {}   # The file's statistics as last read or written
+        self._file_state = None                        # (mtime, size) of the file then
+        self._lock = threading.Lock()
+        with self._lock:
+            self._refresh()
+
+    @staticmethod
+    def _key(language_code: Optional[str], complexity: str) -> str:
+        return f"{language_code or 'generic'}:{complexity}"
+
+    def _entry(self, language_code: Optional[str], complexity: str) -> Dict[str, Any]:
+        return self._stats.setdefault(self._key(language_code, complexity), _new_stats())
+
+    def estimate_output_tokens(self, sentence: str, language_code: Optional[str], complexity: str) -> Optional[float]:
+        """Estimated output tokens for one sentence, or None without history."""
+        with self._lock:
+            self._refresh()
+            tokens_per_char = self._stats.get(self._key(language_code, complexity), {}).get('tokens_per_char')
+        if not tokens_per_char:
+            return None
+        return tokens_per_char * max(len(sentence), _MIN_SENTENCE_CHARS)
+
+    def plan_batches(self, sentences: Sequence[str], language_code: Optional[str],
+                     complexity: str) -> List[List[int]]:
+        """
+        Split sentences into batches that fit the output budget.
+
+        Args:
+            sentences: Sentences to analyze
+            language_code: ISO language code
+            complexity: Complexity level
+
+        Returns:
+            Lists of sentence indices, one list per API call, in order
+        """
+        with self._lock:
+            self._refresh()
+            stats = dict(self._stats.get(self._key(language_code, complexity), _new_stats()))
+        scale = stats['scale']
+
+        if not stats['tokens_per_char']:
+            size = max(self.min_batch_size, min(self.max_batch_size, round(self.default_batch_size * scale)))
+            return [list(range(start, min(start + size, len(sentences))))
+                    for start in range(0, len(sentences), size)]
+
+        budget = self.output_token_budget * scale
+        batches: List[List[int]] = []
+        current: List[int] = []
+        used = 0.0
+        for index, sentence in enumerate(sentences):
+            cost = stats['tokens_per_char'] * max(len(sentence), _MIN_SENTENCE_CHARS)
+            if current and (len(current) >= self.max_batch_size or
+                            (used + cost > budget and len(current) >= self.min_batch_size)):
+                batches.append(current)
+                current, used = [], 0.0
+            current.append(index)
+            used += cost
+        if current:
+            batches.append(current)
+        return batches
+
+    def record_batch(self, language_code: Optional[str], complexity: str, sentences: Sequence[str],
+                     output_tokens: int = 0, failed_indices: Sequence[int] = (),
+                     truncated: bool = False) -> None:
+        """
+        Learn from one finished batch call.
+
+        Args:
+            language_code: ISO language code
+            complexity: Complexity level
+            sentences: Sentences that were sent in the batch
+            output_tokens: Output tokens the batch produced (0 if unknown)
+            failed_indices: Positions in the batch that fell back or had to be retried
+            truncated: The response hit the output limit
+        """
+        if not sentences:
+            return
+        failed = set(failed_indices)
+        # Losing the last sentence(s) or most of the batch is how an over-full response fails
+        overfull = truncated or (len(sentences) > 1 and (
+            (len(sentences) - 1) in failed or len(failed) * 2 >= len(sentences)))
+
+        with self._lock:
+            self._refresh()
+            stats = self._entry(language_code, complexity)
+            if output_tokens > 0:
+                chars = sum(max(len(s), _MIN_SENTENCE_CHARS) for s in sentences)
+                sample = output_tokens / chars
+                current = stats['tokens_per_char']
+                if truncated and current:
+                    sample = max(sample, current)  # A truncated response only gives a lower bound
+                stats['tokens_per_char'] = sample if not current else (
+                    _SMOOTHING * sample + (1 - _SMOOTHING) * current)
+
+            if overfull:
+                stats['scale'] = max(_MIN_SCALE, stats['scale'] / 2)
+            elif not failed:
+                stats['scale'] = min(1.0, stats['scale'] + _GROW_STEP)
+
+            stats['batches'] += 1
+            stats['sentences'] += len(sentences)
+            stats['failed_sentences'] += len(failed)
+            stats['truncated_batches'] += int(truncated)
+            stats['output_tokens'] += max(0, output_tokens)
+            stats['last_batch_size'] = len(sentences)
+            self._save()
+
+        if overfull:
+            logger.info(f"Shrinking {self._key(language_code, complexity)} batches "
+                        f"(truncated={truncated}, failed={len(failed)}/{len(sentences)})")
+
+    def get_metrics(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Batch metrics per language and complexity.
+
+        Returns:
+            {"<language>:<complexity>": {avg_batch_size, last_batch_size, fill_ratio,
+            retry_rate, truncation_rate, tokens_per_char, budget_scale, batches, sentences}}
+        """
+        with self._lock:
+            self._refresh()
+            snapshot = {key: dict(stats) for key, stats in self._stats.items()}
+
+        metrics = {}
+        for key, stats in snapshot.items():
+            batches = stats['batches']
+            metrics[key] = {
+                'avg_batch_size': round(stats['sentences'] / batches, 2) if batches else 0.0,
+                'last_batch_size': stats['last_batch_size'],
+                'fill_ratio': round(stats['output_tokens'] / (batches * self.output_token_budget), 3) if batches else 0.0,
+                'retry_rate': round(stats['failed_sentences'] / stats['sentences'], 3) if stats['sentences'] else 0.0,
+                'truncation_rate': round(stats['truncated_batches'] / batches, 3) if batches else 0.0,
+                'tokens_per_char': round(stats['tokens_per_char'], 3) if stats['tokens_per_char'] else None,
+                'budget_scale': stats['scale'],
+                'batches': batches,
+                'sentences': stats['sentences'],
+            }
+        return metrics
+
+    def reset(self) -> None:
+        """Forget all learned statistics."""
+        with self._lock:
+            self._stats.clear()
+            self._save(merge=False)
+
+    def _current_file_state(self) -> Optional[tuple]:
+        try:
+            stat = self.stats_path.stat()
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def _read(self) -> Dict[str, Dict[str, Any]]:
+        with open(self.stats_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        return {key: {**_new_stats(), **stats} for key, stats in data.get('stats', {}).items()}
+
+    def _merge_file(self, theirs: Dict[str, Dict[str, Any]]) -> None:
+        """
+        Rebase our statistics on the file's: counters become the file's plus
+        what this process added since it last synced, and a key this process
+        did not change takes the file's learned state.
+        """
+        merged = {}
+        for key in set(self._stats) | set(theirs):
+            base = self._synced.get(key, _new_stats())
+            ours = self._stats.get(key, _new_stats())
+            stats = dict(theirs.get(key, _new_stats()) if ours == base else ours)
+            for name in _COUNTERS:
+                stats[name] = theirs.get(key, _new_stats())[name] + ours[name] - base[name]
+            merged[key] = stats
+        self._stats = merged
+        self._synced = {key: dict(stats) for key, stats in theirs.items()}
+
+    def _refresh(self) -> None:
+        """Pick up statistics other processes saved since we last synced (lock held)."""
+        if not self.stats_path:
+            return
+        file_state = self._current_file_state()
+        if file_state is None or file_state == self._file_state:
+            return
+        try:
+            self._merge_file(self._read())
+            self._file_state = file_state
+        except Exception as e:
+            logger.warning(f"Could not load batch statistics from {self.stats_path}: {e}")
+
+    def _save(self, merge: bool = True) -> None:
+        """Persist the statistics, merged with any saved by other processes meanwhile (lock held)."""
+        if not self.stats_path:
+            return
+        try:
+            # Other processes wait here, so none writes between our read and our write
+            with locked_file(self.stats_path):
+                if merge:
+                    self._refresh()
+                # Per process, so concurrent writers never share (and truncate) a temp file
+                tmp_path = self.stats_path.with_name(f"{self.stats_path.name}.{os.getpid()}.tmp")
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    json.dump({'stats': self._stats}, f, indent=2)
+                os.replace(tmp_path, self.stats_path)
+                self._synced = {key: dict(stats) for key, stats in self._stats.items()}
+                self._file_state = self._current_file_state()
+        except Exception as e:
+            logger.warning(f"Could not persist batch statistics to {self.stats_path}: {e}")
+
+
+# Global instance
+_adaptive_batcher = None
+
+def get_adaptive_batcher() -> AdaptiveBatcher:
+    """Get the global adaptive batcher, persisted to DEFAULT_STATS_PATH."""
+    global _adaptive_batcher
+    if _adaptive_batcher is None:
+        _adaptive_batcher = AdaptiveBatcher(stats_path=DEFAULT_STATS_PATH)
+    return _adaptive_batcher
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export adaptive batching metrics as JSON")
+    parser.add_argument("--stats-path", default=DEFAULT_STATS_PATH, help="Statistics file to read")
+    parser.add_argument("--reset", action="store_true", help="Forget all learned statistics")
+    args = parser.parse_args()
+
+    batcher = AdaptiveBatcher(stats_path=args.stats_path)
+    if args.reset:
+        batcher.reset()
+        print(f"Reset batch statistics in {args.stats_path}")
+    else:
+        print(json.dumps(batcher.get_metrics(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -21,6 +21,7 @@ from streamlit_app.shared_utils import get_gemini_model, get_gemini_fallback_mod
 from streamlit_app.shared_utils import LANGUAGE_NAME_TO_CODE, CONTENT_LANGUAGE_MAP
 from streamlit_app.language_analyzers.analyzer_registry import get_analyzer
 from streamlit_app.generation_utils import validate_ipa_output
+from streamlit_app.services.generation.tracing import span
 
 logger = logging.getLogger(__name__)
 
@@ -311,7 +312,9 @@ IMPORTANT:
             logger.debug(f"Content generation raw response: {response_text[:500]}...")
 
             # Parse the response
-            result = self._parse_generation_response(response_text, word, language, num_sentences, min_length, max_length)
+            with span("parse.content", language=language, word=word, bytes=len(response_text)) as parse_span:
+                result = self._parse_generation_response(response_text, word, language, num_sentences, min_length, max_length)
+                parse_span.set("sentences", len(result.get('sentences', [])))
             
             # Debug: log parsing results
             parsed_sentences = len(result.get('sentences', []))
@@ -463,9 +466,11 @@ IMPORTANT:
             logger.warning(f"Failed to parse sentences from response. Raw response: {response_text}")
 
         # Validate and create fallbacks
-        validated_sentences, validated_translations, validated_ipa, validated_keywords, validation_warnings = self._validate_and_create_fallbacks(
-            sentences, translations, ipa_list, keywords, word, restrictions, num_sentences, min_length, max_length
-        )
+        with span("validate.content", language=language, word=word, sentences=len(sentences)) as validate_span:
+            validated_sentences, validated_translations, validated_ipa, validated_keywords, validation_warnings = self._validate_and_create_fallbacks(
+                sentences, translations, ipa_list, keywords, word, restrictions, num_sentences, min_length, max_length
+            )
+            validate_span.set("warnings", len(validation_warnings))
 
         return {
             'meaning': meaning,
@@ -0,0 +1,56 @@
+"""
+File Lock
+
+Cross-process lock for the JSON stores in ./cache that the server and its
+generation workers all read, merge and rewrite (generation telemetry and
+adaptive batching statistics). Without it two processes can read the file,
+merge their own data and write it back at the same time, and the second
+write drops what the first one added.
+
+The lock is an advisory lock on a "<file>.lock" sidecar, taken with
+fcntl.flock on POSIX and msvcrt.locking on Windows. Where neither is
+available the block runs unlocked, as before.
+
+Usage:
+    with locked_file(stats_path):
+        ...  # read, merge, write stats_path
+"""
+
+import contextlib
+import logging
+from pathlib import Path
+from typing import Iterator, Union
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+try:
+    import msvcrt
+except ImportError:  # POSIX
+    msvcrt = None
+
+logger = logging.getLogger(__name__)
+
+
+@contextlib.contextmanager
+def locked_file(path: Union[str, Path]) -> Iterator[None]:
+    """Hold an exclusive lock for path against other processes (and other handles in this one)."""
+    lock_path = Path(path).with_name(f"{Path(path).name}.lock")
+    lock_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(lock_path, 'a+b') as handle:
+        if fcntl is not None:
+            fcntl.flock(handle.fileno(), fcntl.LOCK_EX)
+        elif msvcrt is not None:
+            handle.seek(0)
+            msvcrt.locking(handle.fileno(), msvcrt.LK_LOCK, 1)
+        else:
+            logger.debug(f"No file locking available; writing {path} unlocked")
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
+            elif msvcrt is not None:
+                handle.seek(0)
+                msvcrt.locking(handle.fileno(), msvcrt.LK_UNLCK, 1)
@@ -6,10 +6,17 @@ Handles file and directory operations for deck generation, including clearing, r
 
 import os
 import shutil
+import time
+import uuid
 from pathlib import Path
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Callable, Union
 import streamlit as st
 
+# Finished decks are moved here so a later run writing the same output path
+# cannot clobber a file a user has not downloaded yet.
+DOWNLOADS_SUBDIR = "downloads"
+DOWNLOAD_EXPIRY_SECONDS = 6 * 3600
+
 
 class FileManager:
     """
@@ -72,13 +79,18 @@ class FileManager:
 
     def load_apkg_file(self, apkg_path: Optional[str]) -> bool:
         """
-        Load APKG file into session state for download.
+        Register an APKG file for download.
+
+        The file is moved into the downloads directory under a unique name and
+        only its path and metadata are kept in session state; the bytes are
+        read from disk when the user downloads, so per-session memory does not
+        grow with deck size. Expired downloads are cleaned up on each call.
 
         Args:
             apkg_path: Path to the APKG file
 
         Returns:
-            bool: True if file was loaded successfully, False otherwise
+            bool: True if file was registered successfully, False otherwise
         """
         if not apkg_path or not os.path.exists(apkg_path):
             self.log_manager.log_message(f"<b>⚠️ APKG file not found at path:</b> {apkg_path}")
@@ -88,20 +100,29 @@ class FileManager:
             return False
 
         try:
-            # Read APKG file and store in session state
-            with open(apkg_path, 'rb') as f:
-                st.session_state.apkg_file = f.read()
+            self.cleanup_expired_downloads()
 
             # Generate timestamp for unique filename
             import datetime
             timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
             selected_lang = st.session_state.get('selected_lang', 'Unknown')
-            st.session_state.apkg_filename = f"{selected_lang.replace(' ', '_')}_{timestamp}_deck.apkg"
+            apkg_filename = f"{selected_lang.replace(' ', '_')}_{timestamp}_deck.apkg"
+
+            downloads_dir = Path(self.output_dir) / DOWNLOADS_SUBDIR
+            downloads_dir.mkdir(parents=True, exist_ok=True)
+            download_path = downloads_dir / f"{uuid.uuid4().hex}_{apkg_filename}"
+            os.replace(apkg_path, download_path)
+
+            # Drop any previously registered deck for this session
+            self._remove_registered_download()
+            st.session_state.apkg_path = str(download_path)
+            st.session_state.apkg_filename = apkg_filename
+            st.session_state.apkg_size_bytes = download_path.stat().st_size
 
             self.log_manager.log_message(f"<b>📦 APKG file found:</b> {apkg_path}")
-            self.log_manager.log_message(f"<b>� APKG file loaded for download:</b> {len(st.session_state.apkg_file)} bytes")
+            self.log_manager.log_message(f"<b>📦 APKG file ready for download:</b> {st.session_state.apkg_size_bytes} bytes")
             if st.session_state.get('log_stream'):
-                st.session_state['log_stream'].write(f"[DEBUG] APKG file loaded: {len(st.session_state.apkg_file)} bytes, filename: {st.session_state.apkg_filename}\n")
+                st.session_state['log_stream'].write(f"[DEBUG] APKG file registered: {download_path} ({st.session_state.apkg_size_bytes} bytes), filename: {apkg_filename}\n")
                 st.session_state['log_stream'].flush()
 
             return True
@@ -113,6 +134,49 @@ class FileManager:
                 st.session_state['log_stream'].flush()
             return False
 
+    def get_registered_apkg_path(self) -> Optional[str]:
+        """
+        Get the path of the deck registered for download in this session.
+
+        Returns:
+            Path string, or None if no deck is registered
+        """
+        return st.session_state.get('apkg_path')
+
+    def cleanup_expired_downloads(self, max_age_seconds: int = DOWNLOAD_EXPIRY_SECONDS) -> int:
+        """
+        Delete registered decks older than the expiry age.
+
+        Args:
+            max_age_seconds: Age after which a download file is removed
+
+        Returns:
+            int: Number of files removed
+        """
+        downloads_dir = Path(self.output_dir) / DOWNLOADS_SUBDIR
+        if not downloads_dir.exists():
+            return 0
+
+        cutoff = time.time() - max_age_seconds
+        removed = 0
+        for path in downloads_dir.glob("*.apkg"):
+            try:
+                if path.stat().st_mtime < cutoff:
+                    path.unlink()
+                    removed += 1
+            except OSError:
+                continue  # Removed concurrently or still in use
+        return removed
+
+    def _remove_registered_download(self) -> None:
+        """Delete the deck file currently registered in session state, if any."""
+        apkg_path = st.session_state.get('apkg_path')
+        if apkg_path and os.path.exists(apkg_path):
+            try:
+                os.remove(apkg_path)
+            except OSError:
+                pass
+
     def get_log_file_data(self) -> Optional[Dict[str, Any]]:
         """
         Get log file data for download.
@@ -165,10 +229,10 @@ class FileManager:
         Reset file-related session state variables.
         """
         # Clear file state
-        if 'apkg_file' in st.session_state:
-            del st.session_state.apkg_file
-        if 'apkg_filename' in st.session_state:
-            del st.session_state.apkg_filename
+        self._remove_registered_download()
+        for key in ('apkg_path', 'apkg_filename', 'apkg_size_bytes'):
+            if key in st.session_state:
+                del st.session_state[key]
         if 'output_dirs_cleared' in st.session_state:
             del st.session_state.output_dirs_cleared
 
@@ -181,4 +245,33 @@ class FileManager:
             'apkg_ready': False,
             'apkg_path': None
         })
-        st.session_state['generation_progress'] = progress
\ No newline at end of file
+        st.session_state['generation_progress'] = progress
+
+
+def get_apkg_download_data(apkg_path: str) -> Union[Callable[[], bytes], bytes]:
+    """
+    Get download_button data for a deck file without holding it in session state.
+
+    On Streamlit versions with deferred downloads this returns a callable, so the
+    file is only read when the user clicks. Older versions get the file's bytes,
+    read here and used for the current render only; no file handle is left open.
+
+    Args:
+        apkg_path: Path to the registered APKG file
+
+    Returns:
+        Callable or bytes accepted by st.download_button
+    """
+    try:
+        from streamlit.runtime.media_file_manager import MediaFileManager
+        supports_deferred = hasattr(MediaFileManager, 'add_deferred')
+    except ImportError:
+        supports_deferred = False
+
+    def read_apkg() -> bytes:
+        with open(apkg_path, 'rb') as f:
+            return f.read()
+
+    if supports_deferred:
+        return read_apkg
+    return read_apkg()
@@ -8,7 +8,6 @@ import pathlib
 
 # Remove the circular import - will import locally where needed
 # from core_functions import generate_sentences
-from streamlit_app.deck_exporter import create_apkg_export
 from .file_manager import FileManager
 from .log_manager import LogManager
 
@@ -130,6 +129,10 @@ class GenerationOrchestrator:
             media_dir = output_path / "media"
             apkg_file_path = output_path / f"{selected_lang}.apkg"
 
+            # Lazy import: deck_exporter imports language_analyzers, whose
+            # tracing import loads this package
+            from streamlit_app.deck_exporter import create_apkg_export
+
             # Create the final APKG file
             success = create_apkg_export(
                 results['words_data'],
@@ -140,11 +143,10 @@ class GenerationOrchestrator:
             )
 
             if success and apkg_file_path.exists():
-                apkg_path = str(apkg_file_path)
-
-                # Load the APKG file for download
-                if not self.file_manager.load_apkg_file(apkg_path):
+                # Register the APKG file for download (moves it to the downloads dir)
+                if not self.file_manager.load_apkg_file(str(apkg_file_path)):
                     raise Exception("Failed to load created APKG file for download")
+                apkg_path = self.file_manager.get_registered_apkg_path()
 
                 result = {
                     'success': True,
@@ -0,0 +1,430 @@
+"""
+Generation Queue
+
+Runs deck generation in worker processes instead of the Streamlit script
+thread, so a long deck no longer holds a server thread for its whole run
+and the UI of every session stays responsive while decks are generated.
+
+Jobs are the job store's (see job_store.py): the generating page creates or
+resumes a job and submits it here. A dispatcher thread in the server process
+hands queued jobs to a pool of spawned worker processes:
+
+    - at most GENERATION_WORKERS jobs run at once (default 2)
+    - each user runs at most GENERATION_JOBS_PER_USER jobs at once (default 1)
+    - the next job is the oldest one of the user with the fewest running jobs,
+      so one user's queue of large decks cannot starve everyone else
+
+Workers generate the deck word by word from the job's checkpoints, write
+progress messages to the job store and leave the finished .apkg in the job
+directory. The page polls progress(job_id, since=...) for new messages. A
+worker that dies (e.g. killed for memory) is retried once; its checkpoints
+make the retry cheap. API keys go to the worker in memory and are never
+stored. Each worker has its own Gemini rate limiter, so the worker count
+multiplies the per-process request rate.
+
+Workers return their metric changes (counters and histograms, see
+metrics.py) with the job result and the server merges them into its
+registry, so /metrics counts work done in workers. In-flight gauges stay
+per process; app_generation_jobs{state="running"} shows the workers' load.
+Generation telemetry and adaptive batching stats are shared through their
+cache files, which each process merges on save and reloads when they change.
+
+GENERATION_WORKERS=0 keeps generation in the script thread, one word per rerun.
+
+Usage:
+    queue = get_generation_queue()
+    queue.submit(job_id, user, session_values)
+    progress = queue.progress(job_id, since=last_seq)
+    queue.cancel(job_id)
+"""
+
+import contextlib
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from streamlit_app.services.generation import metrics
+from streamlit_app.services.generation.job_store import (
+    DEFAULT_DB_PATH, DEFAULT_JOBS_DIR, UNFINISHED, GenerationJobStore, get_job_store,
+)
+from streamlit_app.services.generation.tracing import Tracer, span
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WORKERS = 2
+DEFAULT_JOBS_PER_USER = 1
+MAX_ATTEMPTS = 2                # A job whose worker died is run once more
+TRACE_FILE = "trace.jsonl"      # Worker's spans, in the job directory
+USAGE_KEYS = ("gemini_api_calls", "gemini_tokens_used", "pixabay_api_calls")
+
+
+class _SessionState(dict):
+    """st.session_state stand-in for worker processes: a dict with attribute access."""
+
+    def __getattr__(self, name):
+        try:
+            return self[name]
+        except KeyError:
+            raise AttributeError(name)
+
+    def __setattr__(self, name, value):
+        self[name] = value
+
+
+@contextlib.contextmanager
+def _worker_session_state(values: Dict[str, Any]) -> Iterator[_SessionState]:
+    """Serve st.session_state from values while the pipeline runs outside a script run."""
+    import streamlit
+
+    previous = streamlit.session_state
+    streamlit.session_state = _SessionState(values)
+    try:
+        yield streamlit.session_state
+    finally:
+        streamlit.session_state = previous
+
+
+def run_generation_job(job_id: str, session_values: Dict[str, Any],
+                       db_path: str = DEFAULT_DB_PATH, jobs_dir: str = DEFAULT_JOBS_DIR) -> Dict[str, Any]:
+    """
+    Generate a job's deck, resuming from its checkpoints (runs in a worker process).
+
+    Args:
+        job_id: Job in the store at db_path
+        session_values: API keys and session settings the pipeline reads from st.session_state
+        db_path: Job store database
+        jobs_dir: Job store directory
+
+    Returns:
+        'usage': API usage of this run (gemini_api_calls, gemini_tokens_used,
+        pixabay_api_calls), 'metrics': the run's metric changes and 'pid': the
+        process that ran it; {} when the job was not run
+    """
+    registry = metrics.get_metrics_registry()
+    before = registry.snapshot()
+    usage = _run_job(job_id, session_values, db_path, jobs_dir)
+    if usage is None:
+        return {}
+    return {'usage': usage, 'metrics': registry.delta(before), 'pid': os.getpid()}
+
+
+def _run_job(job_id: str, session_values: Dict[str, Any], db_path: str, jobs_dir: str) -> Optional[Dict[str, int]]:
+    """Body of run_generation_job; returns the API usage, or None when the job is not run."""
+    from streamlit_app.core_functions import (
+        append_word_to_apkg, create_apkg_from_word_data, finalize_incremental_apkg, generate_deck_progressive,
+    )
+    from streamlit_app.services.generation.sentence_dedup import SentenceDeduplicator
+
+    store = GenerationJobStore(db_path, jobs_dir)
+    job = store.get_job(job_id)
+    # A job cancelled or finished while it waited for this worker is not started
+    if job is None or job['status'] not in UNFINISHED or not store.set_status(job_id, "running"):
+        return None
+    language, words, params = job['language'], job['words'], job['params']
+    output_dir = store.job_dir(job_id)
+    media_dir = output_dir / "media"
+    apkg_path = output_dir / f"{language}.apkg"
+
+    values = {**params, **session_values, 'selected_lang': language, 'selected_words': words}
+    values.update({key: 0 for key in USAGE_KEYS})
+    enriched = session_values.get('word_enrichment_data') or []
+    tracer = Tracer(jsonl_path=str(output_dir / TRACE_FILE),
+                    attributes={'language': language, 'words': len(words), 'job_id': job_id})
+
+    with _worker_session_state(values) as session_state, tracer.activate():
+        try:
+            # Finished words are kept; the deduplicator learns their sentences again
+            words_data = store.completed_words(job_id)
+            deduplicator = SentenceDeduplicator()
+            for word_data in words_data.values():
+                if word_data['sentences']:
+                    deduplicator.register(word_data['word'], word_data['sentences'],
+                                          word_data['audio_files'], word_data['image_files'])
+            if words_data:
+                store.add_event(job_id, f"<b>♻️ Resuming: {len(words_data)}/{len(words)} words already done</b>")
+
+            for index, word in enumerate(words):
+                if index in words_data:
+                    continue
+                if store.get_job(job_id)['status'] == "cancelled":
+                    store.add_event(job_id, "<b>⏹️ Generation cancelled</b>")
+                    return {key: session_state[key] for key in USAGE_KEYS}
+
+                store.add_event(job_id, f"<b>🔤 Processing word {index + 1}/{len(words)}: '{word}'</b>")
+                with span("word", language=language, word=word, sentences=params['sentences_per_word']):
+                    result = generate_deck_progressive(
+                        word=word,
+                        language=language,
+                        gemini_api_key=session_values.get('google_api_key', ''),
+                        output_dir=str(output_dir),
+                        num_sentences=params['sentences_per_word'],
+                        min_length=params['sentence_length_range'][0],
+                        max_length=params['sentence_length_range'][1],
+                        difficulty=params['difficulty'],
+                        audio_speed=params['audio_speed'],
+                        voice=params['selected_voice'],
+                        topics=params['selected_topics'] if params['enable_topics'] else None,
+                        native_language="English",
+                        log_callback=lambda msg: store.add_event(job_id, msg),
+                        enriched_word_data=next((w for w in enriched if w.get('word') == word), None),
+                        deduplicator=deduplicator,
+                        checkpoint=store.checkpoint(job_id, index, word),
+                    )
+                    append_word_to_apkg(result['word_data'], str(media_dir), str(apkg_path), language, language)
+                words_data[index] = result['word_data']
+                if result['success']:
+                    store.complete_word(job_id, index, result['word_data'])
+                else:
+                    for error in result['errors']:
+                        store.add_event(job_id, f"<b>⚠️ Failed to process word '{word}':</b> {error.get('error', error)}")
+
+            if store.get_job(job_id)['status'] == "cancelled":
+                store.add_event(job_id, "<b>⏹️ Generation cancelled</b>")
+                return {key: session_state[key] for key in USAGE_KEYS}
+            store.add_event(job_id, "<b>📦 FINAL PASS: Deck Assembly</b>")
+            ordered = [words_data[index] for index in sorted(words_data)]
+            expected_notes = sum(len(word_data.get('sentences', [])) for word_data in ordered)
+            with span("export", language=language, words=len(ordered)):
+                success = finalize_incremental_apkg(str(apkg_path), str(media_dir), expected_notes)
+                if not success:
+                    success = create_apkg_from_word_data(ordered, str(media_dir), str(apkg_path), language, language)
+            if success and apkg_path.exists():
+                if store.finish_job(job_id, "finalized", str(apkg_path)):
+                    store.add_event(job_id, "<b>✅ Deck assembly completed successfully!</b>")
+                else:
+                    store.add_event(job_id, "<b>⏹️ Generation cancelled</b>")
+            else:
+                store.add_event(job_id, "<b>❌ Deck finalization failed:</b> APKG file creation failed")
+                store.finish_job(job_id, "failed")
+        except Exception as e:
+            logger.exception(f"Generation job {job_id} failed")
+            store.add_event(job_id, f"<b>❌ Generation failed:</b> {e}")
+            store.finish_job(job_id, "failed")
+        return {key: session_state[key] for key in USAGE_KEYS}
+
+
+@dataclass
+class QueuedJob:
+    """A submitted job waiting for or holding a worker."""
+    job_id: str
+    user: str
+    session_values: Dict[str, Any]
+    submitted_at: float = field(default_factory=time.time)
+    attempts: int = 0
+    executor: Optional[Executor] = None
+
+
+class GenerationQueue:
+    """
+    Bounded, per-user fair queue of generation jobs run by worker processes.
+
+    Usage:
+        queue = GenerationQueue(max_workers=2, max_jobs_per_user=1)
+        queue.submit(job_id, user, session_values)
+        queue.progress(job_id, since=0)   # status, completed words, queue position, new messages
+    """
+
+    def __init__(self, max_workers: int = DEFAULT_WORKERS, max_jobs_per_user: int = DEFAULT_JOBS_PER_USER,
+                 store: Optional[GenerationJobStore] = None,
+                 runner: Callable[..., Dict[str, Any]] = run_generation_job,
+                 executor_factory: Optional[Callable[[int], Executor]] = None):
+        """
+        Initialize the queue.
+
+        Args:
+            max_workers: Jobs running at once (worker processes)
+            max_jobs_per_user: Jobs one user may have running at once
+            store: Job store (default: the global one)
+            runner: Picklable function run for each job in a worker
+            executor_factory: Builds the worker pool for max_workers (default: spawned processes)
+        """
+        self.store = store or get_job_store()
+        self.max_workers = max(1, max_workers)
+        self.max_jobs_per_user = max(1, max_jobs_per_user)
+        self._runner = runner
+        self._executor_factory = executor_factory or self._process_pool
+        self._executor: Optional[Executor] = None
+        self._pending: List[QueuedJob] = []
+        self._running: Dict[str, QueuedJob] = {}
+        self._usage: Dict[str, Dict[str, int]] = {}
+        self._condition = threading.Condition()
+        self._dispatcher: Optional[threading.Thread] = None
+        self._closed = False
+
+    @staticmethod
+    def _process_pool(max_workers: int) -> Executor:
+        # Spawned, not forked: the server process is full of threads and open sockets
+        return ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context("spawn"))
+
+    def submit(self, job_id: str, user: str, session_values: Dict[str, Any]) -> None:
+        """Queue a job; a job already queued, running or finished is left as it is."""
+        with self._condition:
+            if self._is_active(job_id):
+                return
+        if not self.store.set_status(job_id, "queued"):
+            return
+        self.store.add_event(job_id, "<b>⏳ Queued for a background worker</b>")
+        with self._condition:
+            self._pending.append(QueuedJob(job_id, user, dict(session_values)))
+            self._update_gauges()
+            if self._dispatcher is None:
+                self._dispatcher = threading.Thread(target=self._dispatch, name="generation-dispatcher", daemon=True)
+                self._dispatcher.start()
+            self._condition.notify_all()
+
+    def cancel(self, job_id: str) -> None:
+        """Drop a queued job, or stop a running one after its current word."""
+        with self._condition:
+            self._pending = [job for job in self._pending if job.job_id != job_id]
+            self._update_gauges()
+        self.store.finish_job(job_id, "cancelled")
+
+    def is_active(self, job_id: str) -> bool:
+        """Whether the job is queued or running in this process."""
+        with self._condition:
+            return self._is_active(job_id)
+
+    def progress(self, job_id: str, since: int = 0) -> Optional[Dict[str, Any]]:
+        """
+        The job's progress and the messages logged after `since`.
+
+        Returns:
+            status, words, completed_words, queue_position (0 = next; None when
+            not waiting), active, apkg_path, events, last_seq and usage; None
+            for an unknown job
+        """
+        job = self.store.get_job(job_id)
+        if job is None:
+            return None
+        with self._condition:
+            position = next((i for i, queued in enumerate(self._pending) if queued.job_id == job_id), None)
+            active = self._is_active(job_id)
+            usage = dict(self._usage.get(job_id, {}))
+        events = self.store.events(job_id, since)
+        return {
+            'job_id': job_id,
+            'status': job['status'],
+            'words': len(job['words']),
+            'completed_words': job['completed_words'],
+            'queue_position': position,
+            'active': active,
+            'apkg_path': job['apkg_path'],
+            'events': events,
+            'last_seq': events[-1]['seq'] if events else since,
+            'usage': usage,
+        }
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop dispatching and shut the worker pool down."""
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait, cancel_futures=True)
+
+    def _is_active(self, job_id: str) -> bool:
+        return job_id in self._running or any(job.job_id == job_id for job in self._pending)
+
+    def _next_job(self) -> Optional[QueuedJob]:
+        """Oldest pending job of the user with the fewest running jobs, within the per-user cap."""
+        running = {}
+        for job in self._running.values():
+            running[job.user] = running.get(job.user, 0) + 1
+        eligible = [job for job in self._pending if running.get(job.user, 0) < self.max_jobs_per_user]
+        if not eligible:
+            return None
+        return min(eligible, key=lambda job: (running.get(job.user, 0), job.submitted_at))
+
+    def _dispatch(self) -> None:
+        while True:
+            with self._condition:
+                job = None
+                while not self._closed:
+                    if len(self._running) < self.max_workers:
+                        job = self._next_job()
+                        if job is not None:
+                            break
+                    self._condition.wait()
+                if self._closed:
+                    return
+                self._pending.remove(job)
+                self._running[job.job_id] = job
+                job.attempts += 1
+                if self._executor is None:
+                    self._executor = self._executor_factory(self.max_workers)
+                job.executor = self._executor
+                self._update_gauges()
+
+            self.store.add_event(job.job_id, "<b>⚙️ Started on a background worker</b>")
+            try:
+                future = job.executor.submit(self._runner, job.job_id, job.session_values,
+                                             str(self.store.db_path), str(self.store.jobs_dir))
+            except (BrokenProcessPool, RuntimeError) as e:
+                self._finish(job, None, e)
+                continue
+            future.add_done_callback(lambda done, job=job: self._finish(job, done))
+
+    def _finish(self, job: QueuedJob, future: Optional[Future], error: Optional[BaseException] = None) -> None:
+        result = {}
+        if error is None:
+            try:
+                result = future.result() or {}
+            except BaseException as e:
+                error = e
+        if result.get('metrics') and result.get('pid') != os.getpid():
+            # Work done in a worker process; in-process runners already counted it here
+            metrics.get_metrics_registry().merge(result['metrics'])
+        retry = isinstance(error, BrokenProcessPool) and job.attempts < MAX_ATTEMPTS
+        with self._condition:
+            self._running.pop(job.job_id, None)
+            if isinstance(error, BrokenProcessPool) and self._executor is job.executor:
+                # A dead worker breaks the whole pool; the next job gets a new one
+                self._executor = None
+                job.executor.shutdown(wait=False)
+            if retry:
+                self._pending.insert(0, job)
+            elif error is None:
+                self._usage[job.job_id] = result.get('usage', {})
+            self._update_gauges()
+            self._condition.notify_all()
+
+        if error is None:
+            return
+        logger.error(f"Generation job {job.job_id} worker failed: {error}")
+        if retry:
+            self.store.add_event(job.job_id, "<b>⚠️ The worker stopped unexpectedly; resuming on a new one</b>")
+        else:
+            self.store.add_event(job.job_id, f"<b>❌ Generation failed:</b> worker stopped ({error})")
+            self.store.finish_job(job.job_id, "failed")
+
+    def _update_gauges(self) -> None:
+        metrics.GENERATION_JOBS.set(len(self._pending), state="queued")
+        metrics.GENERATION_JOBS.set(len(self._running), state="running")
+
+
+_generation_queue: Optional[GenerationQueue] = None
+_queue_lock = threading.Lock()
+
+
+def get_generation_queue() -> Optional[GenerationQueue]:
+    """
+    Get the global generation queue, or None when GENERATION_WORKERS=0
+    (generation then runs in the script thread).
+    """
+    global _generation_queue
+    workers = int(os.environ.get("GENERATION_WORKERS", DEFAULT_WORKERS))
+    if workers <= 0:
+        return None
+    with _queue_lock:
+        if _generation_queue is None:
+            _generation_queue = GenerationQueue(
+                max_workers=workers,
+                max_jobs_per_user=int(os.environ.get("GENERATION_JOBS_PER_USER", DEFAULT_JOBS_PER_USER)))
+    return _generation_queue
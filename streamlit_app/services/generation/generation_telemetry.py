@@ -0,0 +1,367 @@
+"""
+Generation Telemetry Service
+
+Records what each generated word actually cost - seconds per pipeline stage,
+Gemini calls and tokens, TTS characters and Pixabay calls - and predicts the
+wall time and quota use of a planned deck from those records instead of the
+fixed 400 tokens/word and "40-60 minutes" guesses.
+
+Samples are kept per (language, model), normalized per sentence, and the
+estimate reports the median and 90th percentile. Until a language has
+MIN_SAMPLES words the estimate falls back to all languages for the model,
+then to every record, then to the static defaults. Records persist across
+restarts and are shared by the server and its generation workers: each
+process reloads the file when it changes and, holding a file lock, merges it
+into its own records before saving.
+
+Show the recorded percentiles, or estimate a deck, with:
+
+    python -m streamlit_app.services.generation.generation_telemetry [--words 20 --sentences 10 --language Spanish]
+"""
+
+import argparse
+import json
+import logging
+import math
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+from streamlit_app.services.generation.file_lock import locked_file
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TELEMETRY_PATH = "./cache/generation_telemetry.json"
+MAX_SAMPLES_PER_KEY = 200       # Oldest words are dropped beyond this
+MIN_SAMPLES = 3                 # Words needed before a key's own percentiles are trusted
+
+# Per-sentence rates used before any telemetry exists (the old static estimate)
+DEFAULT_RATES = {
+    'seconds': 9.0,             # "5-10 minutes" for 5 words x 10 sentences
+    'gemini_calls': 0.3,
+    'gemini_tokens': 40.0,      # ~400 tokens per 10-sentence word
+    'tts_chars': 90.0,
+    'pixabay_calls': 1.0,
+}
+DEFAULT_P90_FACTOR = 1.5        # Spread applied to the defaults for the p90 column
+
+_QUANTITIES = ('seconds', 'gemini_calls', 'gemini_tokens', 'tts_chars', 'pixabay_calls')
+
+
+def _percentile(values: Sequence[float], pct: float) -> float:
+    """Nearest-rank percentile; 0.0 for no values."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def format_duration(seconds: float) -> str:
+    """Readable duration: 45 -> "45 seconds", 600 -> "10 minutes", 5400 -> "1.5 hours"."""
+    if seconds < 90:
+        return f"{max(1, round(seconds))} seconds"
+    if seconds < 90 * 60:
+        return f"{round(seconds / 60)} minutes"
+    return f"{seconds / 3600:.1f} hours"
+
+
+def format_duration_range(low: float, high: float) -> str:
+    """Readable range in the style of the batch presets: (600, 900) -> "10-15 minutes"."""
+    low_text, high_text = format_duration(low), format_duration(high)
+    low_value, low_unit = low_text.split(' ', 1)
+    high_value, high_unit = high_text.split(' ', 1)
+    if low_text == high_text:
+        return low_text
+    if low_unit == high_unit:
+        return f"{low_value}-{high_value} {high_unit}"
+    return f"{low_text} - {high_text}"
+
+
+class WordTelemetry:
+    """
+    Measurements for one generated word.
+
+    Usage:
+        word_telemetry = WordTelemetry("Spanish", "gemini-2.5-flash", 10)
+        ...  # generate sentences
+        word_telemetry.mark("sentences")
+        ...  # analyze grammar
+        word_telemetry.mark("grammar")
+        word_telemetry.tts_chars += sum(len(s) for s in synthesized)
+        telemetry.record_word(word_telemetry)
+    """
+
+    def __init__(self, language: str, model: str, num_sentences: int):
+        self.language = language
+        self.model = model
+        self.num_sentences = num_sentences
+        self.stage_seconds: Dict[str, float] = {}
+        self.gemini_calls = 0
+        self.gemini_tokens = 0
+        self.tts_chars = 0
+        self.pixabay_calls = 0
+        self._last_mark = time.perf_counter()
+
+    def mark(self, stage: str) -> None:
+        """Charge the time since the previous mark (or creation) to a stage; repeated stages add up."""
+        now = time.perf_counter()
+        self.stage_seconds[stage] = self.stage_seconds.get(stage, 0.0) + now - self._last_mark
+        self._last_mark = now
+
+    def to_record(self) -> Dict[str, Any]:
+        return {
+            'num_sentences': self.num_sentences,
+            'stage_seconds': {name: round(seconds, 3) for name, seconds in self.stage_seconds.items()},
+            'gemini_calls': self.gemini_calls,
+            'gemini_tokens': self.gemini_tokens,
+            'tts_chars': self.tts_chars,
+            'pixabay_calls': self.pixabay_calls,
+            'recorded_at': round(time.time()),
+        }
+
+
+class GenerationTelemetry:
+    """
+    Persisted per-word generation records and a deck estimator built on them.
+
+    Usage:
+        telemetry = get_generation_telemetry()
+        estimate = telemetry.estimate(num_words=20, num_sentences=10, language="Spanish")
+        estimate['wall_seconds_p90'], estimate['gemini_tokens_p50']
+    """
+
+    def __init__(self, telemetry_path: Optional[str] = None,
+                 max_samples: int = MAX_SAMPLES_PER_KEY, min_samples: int = MIN_SAMPLES):
+        """
+        Initialize the store.
+
+        Args:
+            telemetry_path: JSON file to load and persist records (None keeps them in memory)
+            max_samples: Words kept per (language, model)
+            min_samples: Words needed before a key's own percentiles are used
+        """
+        self.telemetry_path = Path(telemetry_path) if telemetry_path else None
+        self.max_samples = max_samples
+        self.min_samples = min_samples
+        self._records: Dict[str, List[Dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+        self._file_state = None     # (mtime, size) of the file as last read or written
+        with self._lock:
+            self._refresh()
+
+    @staticmethod
+    def _key(language: Optional[str], model: Optional[str]) -> str:
+        return f"{language or 'generic'}:{model or 'default'}"
+
+    def record_word(self, word_telemetry: WordTelemetry) -> None:
+        """Store one finished word and persist the store."""
+        if word_telemetry.num_sentences <= 0:
+            return
+        key = self._key(word_telemetry.language, word_telemetry.model)
+        with self._lock:
+            self._refresh()
+            samples = self._records.setdefault(key, [])
+            samples.append(word_telemetry.to_record())
+            del samples[:-self.max_samples]
+            self._save()
+
+    def _samples_for(self, language: Optional[str], model: Optional[str]) -> tuple:
+        """Most specific sample set with enough words, and where it came from."""
+        with self._lock:
+            self._refresh()
+            records = {key: list(samples) for key, samples in self._records.items()}
+
+        def matching(want_language: bool) -> List[Dict[str, Any]]:
+            # A missing language or model matches any recorded one
+            found = []
+            for key, samples in records.items():
+                key_language, key_model = key.split(':', 1)
+                if (model and key_model != model) or (want_language and language and key_language != language):
+                    continue
+                found.extend(samples)
+            return found
+
+        candidates = [
+            ('language', matching(want_language=True)),
+            ('model', matching(want_language=False)),
+            ('all', [r for samples in records.values() for r in samples]),
+        ]
+        for source, samples in candidates:
+            if len(samples) >= self.min_samples:
+                return source, samples
+        return 'default', []
+
+    @staticmethod
+    def _per_sentence(record: Dict[str, Any]) -> Dict[str, float]:
+        n = record['num_sentences']
+        rates = {quantity: record.get(quantity, 0) / n for quantity in _QUANTITIES if quantity != 'seconds'}
+        rates['seconds'] = sum(record.get('stage_seconds', {}).values()) / n
+        for name, seconds in record.get('stage_seconds', {}).items():
+            rates[f"stage:{name}"] = seconds / n
+        return rates
+
+    def estimate(self, num_words: int, num_sentences: int, language: Optional[str] = None,
+                 model: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Predict wall time and quota use for a deck.
+
+        Args:
+            num_words: Words in the deck
+            num_sentences: Sentences per word
+            language: Target language name as used by the generator
+            model: Gemini model name
+
+        Returns:
+            {source, samples, total_sentences, and <quantity>_p50 / <quantity>_p90 for
+            wall_seconds, gemini_calls, gemini_tokens, google_tts_chars and pixabay_calls,
+            plus stage_seconds_p50 per stage}. source is "language", "model", "all" or
+            "default" depending on which records were used.
+        """
+        total_sentences = max(0, num_words) * max(0, num_sentences)
+        source, samples = self._samples_for(language, model)
+
+        if samples:
+            rates = [self._per_sentence(record) for record in samples]
+            p50 = {q: _percentile([r[q] for r in rates], 50) for q in _QUANTITIES}
+            p90 = {q: _percentile([r[q] for r in rates], 90) for q in _QUANTITIES}
+            stages = sorted({key[len("stage:"):] for r in rates for key in r if key.startswith("stage:")})
+            stage_p50 = {name: _percentile([r.get(f"stage:{name}", 0.0) for r in rates], 50) for name in stages}
+        else:
+            p50 = dict(DEFAULT_RATES)
+            p90 = {q: rate * DEFAULT_P90_FACTOR for q, rate in DEFAULT_RATES.items()}
+            stage_p50 = {}
+
+        names = {'seconds': 'wall_seconds', 'tts_chars': 'google_tts_chars'}
+        result: Dict[str, Any] = {
+            'source': source,
+            'samples': len(samples),
+            'total_sentences': total_sentences,
+        }
+        for quantity in _QUANTITIES:
+            name = names.get(quantity, quantity)
+            result[f"{name}_p50"] = round(p50[quantity] * total_sentences, 1 if quantity == 'seconds' else None)
+            result[f"{name}_p90"] = round(p90[quantity] * total_sentences, 1 if quantity == 'seconds' else None)
+        result['stage_seconds_p50'] = {name: round(rate * total_sentences, 1) for name, rate in stage_p50.items()}
+        return result
+
+    def get_summary(self) -> Dict[str, Dict[str, Any]]:
+        """Per-sentence p50/p90 of every quantity for each (language, model)."""
+        with self._lock:
+            self._refresh()
+            keys = list(self._records)
+        summary = {}
+        for key in keys:
+            with self._lock:
+                samples = list(self._records.get(key, []))
+            rates = [self._per_sentence(record) for record in samples]
+            summary[key] = {'words': len(samples)}
+            for quantity in _QUANTITIES:
+                values = [r[quantity] for r in rates]
+                summary[key][f"{quantity}_per_sentence_p50"] = round(_percentile(values, 50), 3)
+                summary[key][f"{quantity}_per_sentence_p90"] = round(_percentile(values, 90), 3)
+        return summary
+
+    def reset(self) -> None:
+        """Forget all records."""
+        with self._lock:
+            self._records.clear()
+            self._save(merge=False)
+
+    def _current_file_state(self) -> Optional[tuple]:
+        try:
+            stat = self.telemetry_path.stat()
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def _read(self) -> Dict[str, List[Dict[str, Any]]]:
+        with open(self.telemetry_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        return {key: [r for r in samples if r.get('num_sentences', 0) > 0][-self.max_samples:]
+                for key, samples in data.get('records', {}).items()}
+
+    def _merged(self, ours: List[Dict[str, Any]], theirs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Their samples plus ours that they lack, oldest first, trimmed to max_samples."""
+        unmatched: Dict[str, int] = {}
+        for record in theirs:
+            marker = json.dumps(record, sort_keys=True)
+            unmatched[marker] = unmatched.get(marker, 0) + 1
+        merged = list(theirs)
+        for record in ours:
+            marker = json.dumps(record, sort_keys=True)
+            if unmatched.get(marker):
+                unmatched[marker] -= 1
+            else:
+                merged.append(record)
+        merged.sort(key=lambda r: r.get('recorded_at', 0))
+        return merged[-self.max_samples:]
+
+    def _refresh(self) -> None:
+        """Reload the file if another process wrote it since we last did (lock held)."""
+        if not self.telemetry_path:
+            return
+        file_state = self._current_file_state()
+        if file_state is None or file_state == self._file_state:
+            return
+        try:
+            self._records = self._read()
+            self._file_state = file_state
+        except Exception as e:
+            logger.warning(f"Could not load generation telemetry from {self.telemetry_path}: {e}")
+
+    def _save(self, merge: bool = True) -> None:
+        """Persist the records, first merging in any the file gained from other processes (lock held)."""
+        if not self.telemetry_path:
+            return
+        try:
+            # Other processes wait here, so none writes between our read and our write
+            with locked_file(self.telemetry_path):
+                if merge and self._current_file_state() not in (None, self._file_state):
+                    for key, samples in self._read().items():
+                        self._records[key] = self._merged(self._records.get(key, []), samples)
+                # Per process, so concurrent writers never share (and truncate) a temp file
+                tmp_path = self.telemetry_path.with_name(f"{self.telemetry_path.name}.{os.getpid()}.tmp")
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    json.dump({'records': self._records}, f)
+                os.replace(tmp_path, self.telemetry_path)
+                self._file_state = self._current_file_state()
+        except Exception as e:
+            logger.warning(f"Could not persist generation telemetry to {self.telemetry_path}: {e}")
+
+
+# Global instance
+_generation_telemetry = None
+
+def get_generation_telemetry() -> GenerationTelemetry:
+    """Get the global telemetry store, persisted to DEFAULT_TELEMETRY_PATH."""
+    global _generation_telemetry
+    if _generation_telemetry is None:
+        _generation_telemetry = GenerationTelemetry(telemetry_path=DEFAULT_TELEMETRY_PATH)
+    return _generation_telemetry
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Show generation telemetry or estimate a deck")
+    parser.add_argument("--telemetry-path", default=DEFAULT_TELEMETRY_PATH, help="Telemetry file to read")
+    parser.add_argument("--words", type=int, help="Estimate a deck with this many words")
+    parser.add_argument("--sentences", type=int, default=10, help="Sentences per word for the estimate")
+    parser.add_argument("--language", help="Target language for the estimate")
+    parser.add_argument("--model", help="Gemini model for the estimate")
+    parser.add_argument("--reset", action="store_true", help="Forget all records")
+    args = parser.parse_args()
+
+    telemetry = GenerationTelemetry(telemetry_path=args.telemetry_path)
+    if args.reset:
+        telemetry.reset()
+        print(f"Reset generation telemetry in {args.telemetry_path}")
+    elif args.words:
+        print(json.dumps(telemetry.estimate(args.words, args.sentences, args.language, args.model), indent=2))
+    else:
+        print(json.dumps(telemetry.get_summary(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
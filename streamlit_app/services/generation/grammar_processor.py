@@ -7,10 +7,20 @@ Extracted from sentence_generator.py for better separation of concerns.
 
 import json
 import logging
-from typing import Dict, Any, List, Optional
+from typing import Callable, Dict, Any, List, Optional
 
 # Import centralized configuration
-from streamlit_app.shared_utils import get_gemini_model
+from streamlit_app.shared_utils import GEMINI_RATE_LIMIT, get_gemini_api, get_gemini_model
+from streamlit_app.services.generation.adaptive_batcher import (
+    DEFAULT_BATCH_SIZE,
+    FALLBACK_CONFIDENCE_CEILING,
+    AdaptiveBatcher,
+    get_adaptive_batcher,
+)
+from streamlit_app.language_analyzers.grammar_cache import GrammarResultCache, get_grammar_result_cache
+from streamlit_app.language_analyzers.retry_fanout import run_concurrently
+from streamlit_app.language_analyzers.token_annotations import TokenAnnotations
+from streamlit_app.services.generation.tracing import span
 
 # Import the new grammar analyzer system
 try:
@@ -24,12 +34,207 @@ except ImportError as e:
 
 logger = logging.getLogger(__name__)
 
+# Local-first tier: rule-based analyses scoring at least this are used without an API call
+DEFAULT_LOCAL_CONFIDENCE_THRESHOLD = 0.9
+DEFAULT_LOCAL_FIRST_COMPLEXITIES = ("beginner",)
+BATCH_SIZE = DEFAULT_BATCH_SIZE  # Sentences per call until the adaptive batcher has history
+
+# Phrases the rule engines put in explanations when they are guessing
+LOCAL_HEDGE_MARKERS = (
+    "likely", "probably", "possibly", "guess", "could not be determined", "cannot be",
+    "without context", "defaults to", "heuristic", "ambiguous", "unknown",
+    "unrecognised", "unrecognized", "fallback",
+)
+
+
+def is_local_analysis_confident(analysis, threshold: float = DEFAULT_LOCAL_CONFIDENCE_THRESHOLD) -> bool:
+    """
+    Decide whether a rule-based analysis is good enough to skip the API.
+
+    Validator scores alone are generous to rule output, so every word must also
+    have a specific explanation: a real category (not "other"), no hedging
+    phrases, more than just the word itself, and no generic template text shared
+    between different words. Punctuation tokens are ignored.
+
+    Args:
+        analysis: GrammarAnalysis from analyzer.analyze_grammar_locally()
+        threshold: Minimum validator confidence
+
+    Returns:
+        True if the analysis can be used as-is
+    """
+    if analysis is None or analysis.confidence_score < threshold:
+        return False
+    if not analysis.word_explanations:
+        return False
+
+    words_by_explanation = {}
+    for exp in analysis.word_explanations:
+        if len(exp) < 4:
+            return False
+        word = str(exp[0]).lower()
+        if not any(ch.isalnum() for ch in word):
+            continue
+        explanation = str(exp[3]).lower()
+        if str(exp[1]).lower() == "other":
+            return False
+        if any(marker in explanation for marker in LOCAL_HEDGE_MARKERS):
+            return False
+        if len(explanation.replace(word, "").strip(" ()[]:.,")) < 3:
+            return False
+        if words_by_explanation.setdefault(explanation, word) != word:
+            return False
+    return True
+
 
 class GrammarProcessor:
     """
     Service for processing grammar analysis and sentence coloring.
+
+    With local_first enabled, each sentence is first analyzed by the language's
+    rule-based engine and only sentences it cannot handle confidently are sent
+    to Gemini. The "grammar_local_first" and "grammar_local_confidence_threshold"
+    session keys override the constructor settings.
+
+    With streaming enabled, batch responses are streamed and each sentence is
+    finished as soon as its JSON object arrives; truncated batches keep what
+    arrived and retry only the missing sentences. The "grammar_streaming"
+    session key overrides the constructor setting.
+
+    Batch sizes are planned by an AdaptiveBatcher (the persisted global one
+    unless another is passed in); get_batch_metrics() exposes its metrics.
+
+    With a result_cache, sentences analyzed before (same language, complexity,
+    target word and analyzer prompt version) are answered from the cache and
+    only misses are batched. get_grammar_processor() uses the persisted global
+    cache.
     """
 
+    def __init__(self, local_first: bool = False,
+                 local_confidence_threshold: float = DEFAULT_LOCAL_CONFIDENCE_THRESHOLD,
+                 local_first_complexities=DEFAULT_LOCAL_FIRST_COMPLEXITIES,
+                 streaming: bool = False,
+                 batcher: Optional[AdaptiveBatcher] = None,
+                 result_cache: Optional[GrammarResultCache] = None):
+        """
+        Initialize the processor.
+
+        Args:
+            local_first: Try the rule-based engine before calling Gemini
+            local_confidence_threshold: Minimum validator confidence for local results
+            local_first_complexities: Complexity levels the local tier is used for
+            streaming: Stream batch responses and parse them incrementally
+            batcher: Batch planner (default: the global, persisted AdaptiveBatcher)
+            result_cache: Cache of earlier analyses to consult before batching (None disables it)
+        """
+        self.streaming = streaming
+        self.batcher = batcher
+        self.result_cache = result_cache
+        self.local_first = local_first
+        self.local_confidence_threshold = local_confidence_threshold
+        self.local_first_complexities = tuple(local_first_complexities)
+        self.reset_local_first_stats()
+
+    def reset_local_first_stats(self) -> None:
+        """Reset the local-first counters."""
+        self._local_first_stats = {
+            'sentences': 0,
+            'local': 0,
+            'api': 0,
+            'api_calls_avoided': 0,
+        }
+
+    def get_local_first_stats(self) -> Dict[str, int]:
+        """
+        Get local-first counters.
+
+        Returns:
+            Dict with sentences seen, sentences answered locally, sentences sent
+            to the API, and API calls avoided
+        """
+        return dict(self._local_first_stats)
+
+    def _get_batcher(self) -> AdaptiveBatcher:
+        if self.batcher is None:
+            self.batcher = get_adaptive_batcher()
+        return self.batcher
+
+    def get_batch_metrics(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Get adaptive batching metrics.
+
+        Returns:
+            Per "<language>:<complexity>": batch size, fill ratio, retry rate and truncation rate
+        """
+        return self._get_batcher().get_metrics()
+
+    def _get_complexity(self) -> str:
+        """Complexity level from the user's difficulty setting."""
+        try:
+            import streamlit as st
+            return st.session_state.get("difficulty", "intermediate")
+        except Exception:
+            return "intermediate"
+
+    def _local_first_settings(self):
+        """Return (enabled, threshold), letting session state override the defaults."""
+        enabled = self.local_first
+        threshold = self.local_confidence_threshold
+        try:
+            import streamlit as st
+            enabled = bool(st.session_state.get("grammar_local_first", enabled))
+            threshold = float(st.session_state.get("grammar_local_confidence_threshold", threshold))
+        except Exception:
+            pass
+        return enabled, threshold
+
+    def _streaming_enabled(self, analyzer) -> bool:
+        """Whether to stream batch responses, letting session state override the default."""
+        enabled = self.streaming
+        try:
+            import streamlit as st
+            enabled = bool(st.session_state.get("grammar_streaming", enabled))
+        except Exception:
+            pass
+        return enabled and hasattr(analyzer, 'stream_batch_analyze_grammar')
+
+    def _try_local_analysis(self, analyzer, sentence: str, word: str, complexity: str,
+                            language_code: str) -> Optional[Dict[str, Any]]:
+        """
+        Run the local-first tier for one sentence.
+
+        Returns:
+            Result dict if the rule-based analysis passed the gate, else None
+        """
+        enabled, threshold = self._local_first_settings()
+        if not enabled or complexity not in self.local_first_complexities:
+            return None
+        if not hasattr(analyzer, 'analyze_grammar_locally'):
+            return None
+
+        self._local_first_stats['sentences'] += 1
+        try:
+            analysis = analyzer.analyze_grammar_locally(sentence, word, complexity)
+        except Exception as e:
+            logger.debug(f"Local analysis failed for {language_code}: {e}")
+            analysis = None
+
+        if not is_local_analysis_confident(analysis, threshold):
+            self._local_first_stats['api'] += 1
+            return None
+
+        self._local_first_stats['local'] += 1
+        logger.info(f"Local {language_code} analysis accepted (confidence={analysis.confidence_score:.2f})")
+        return self._analysis_to_result(analysis, language_code)
+
+    def _analysis_to_result(self, analysis_result, language_code: str) -> Dict[str, Any]:
+        """Convert a GrammarAnalysis to the colored_sentence/word_explanations/grammar_summary dict."""
+        return {
+            "colored_sentence": analysis_result.html_output,
+            "word_explanations": self._convert_analyzer_output_to_explanations(analysis_result, language_code),
+            "grammar_summary": self._create_grammar_summary(analysis_result, language_code)
+        }
+
     def analyze_grammar_and_color(
         self,
         sentence: str,
@@ -61,11 +266,12 @@ class GrammarProcessor:
             logger.info(f"Using {language_code} analyzer for grammar analysis")
             try:
                 # Determine complexity level from user's difficulty setting
-                try:
-                    import streamlit as st
-                    complexity = st.session_state.get("difficulty", "intermediate")
-                except Exception:
-                    complexity = "intermediate"
+                complexity = self._get_complexity()
+
+                local_result = self._try_local_analysis(analyzer, sentence, word, complexity, language_code)
+                if local_result is not None:
+                    self._local_first_stats['api_calls_avoided'] += 1
+                    return local_result
 
                 # Analyze grammar using the language-specific analyzer
                 analysis_result = analyzer.analyze_grammar(
@@ -76,15 +282,7 @@ class GrammarProcessor:
                 )
 
                 # Convert analyzer result to expected format
-                colored_sentence = analysis_result.html_output
-                word_explanations = self._convert_analyzer_output_to_explanations(analysis_result, language_code)
-                grammar_summary = self._create_grammar_summary(analysis_result, language_code)
-
-                result = {
-                    "colored_sentence": colored_sentence,
-                    "word_explanations": word_explanations,
-                    "grammar_summary": grammar_summary
-                }
+                result = self._analysis_to_result(analysis_result, language_code)
 
                 # API usage tracking
                 try:
@@ -108,20 +306,16 @@ class GrammarProcessor:
         logger.info(f"Using generic grammar analysis for {language}")
         return self._analyze_grammar_generic(sentence, word, language, gemini_api_key)
 
-    def _convert_analyzer_output_to_explanations(self, analysis_result, language_code: str) -> List[List[Any]]:
-        """Convert analyzer output to word explanations format."""
+    def _convert_analyzer_output_to_explanations(self, analysis_result, language_code: str) -> TokenAnnotations:
+        """Convert analyzer output to compact word explanations ([word, pos, color, explanation] rows)."""
         word_explanations = []
 
         # First, try to use word_explanations directly if available (preferred for detailed analysis)
         if hasattr(analysis_result, 'word_explanations') and analysis_result.word_explanations:
             logger.info(f"Using word_explanations directly from analyzer result ({len(analysis_result.word_explanations)} items)")
-            for exp in analysis_result.word_explanations:
-                if len(exp) >= 4:
-                    word, pos, color, explanation = exp[0], exp[1], exp[2], exp[3]
-                    # Preserve language-specific POS categories and colors from analyzer
-                    # (e.g. classifier, topic_particle, aspect_marker, case_marker)
-                    word_explanations.append([word, pos, color, explanation])
-            return word_explanations
+            # Preserve language-specific POS categories and colors from analyzer
+            # (e.g. classifier, topic_particle, aspect_marker, case_marker)
+            return TokenAnnotations.from_rows(analysis_result.word_explanations)
 
         # Fallback: combine grammatical elements and explanations
         elements = analysis_result.grammatical_elements
@@ -138,7 +332,7 @@ class GrammarProcessor:
                     word_explanations.append([word, element_type, color, explanation])
 
         logger.info(f"Generated {len(word_explanations)} word explanations")
-        return word_explanations
+        return TokenAnnotations.from_rows(word_explanations)
 
     def _map_pos_to_category(self, pos: str) -> str:
         """Map part-of-speech tags to grammatical categories."""
@@ -211,7 +405,7 @@ class GrammarProcessor:
         """
         Generic grammar analysis fallback when no language-specific analyzer is available.
         """
-        from streamlit_app.shared_utils import get_gemini_api, get_gemini_model
+        from streamlit_app.shared_utils import GEMINI_RATE_LIMIT, get_gemini_api, get_gemini_model
         api = get_gemini_api()
         api.configure(api_key=gemini_api_key)
 
@@ -357,11 +551,13 @@ IMPORTANT:
         target_words: List[str],
         language: str,
         gemini_api_key: str,
-        language_code: Optional[str] = None
+        language_code: Optional[str] = None,
+        on_result: Optional[Callable[[int, Dict[str, Any]], None]] = None
     ) -> List[Dict[str, Any]]:
         """
-        Analyze multiple sentences in batches of 8 for optimal efficiency.
-        Processes sentences in chunks of 8 to minimize API calls while staying within model limits.
+        Analyze multiple sentences in as few API calls as fit the output budget.
+        Batch sizes come from the adaptive batcher (8 sentences until it has history
+        for the language and complexity) and every call's outcome is fed back to it.
 
         Args:
             sentences: List of sentences to analyze
@@ -369,6 +565,8 @@ IMPORTANT:
             language: Language name
             gemini_api_key: Google Gemini API key
             language_code: ISO language code
+            on_result: Called with (sentence index, result) as each sentence is ready;
+                with streaming enabled this happens before the whole batch has arrived
 
         Returns:
             List of analysis results
@@ -382,59 +580,112 @@ IMPORTANT:
             analyzer = get_analyzer(language_code) if get_analyzer else None
 
         if analyzer and hasattr(analyzer, 'batch_analyze_grammar'):
-            # Use 8-sentence batch processing for efficiency
-            logger.info(f"Using 8-sentence batch processing with {language_code} analyzer for {len(sentences)} sentences")
+            # Use adaptive batch processing for efficiency
+            logger.info(f"Using adaptive batch processing with {language_code} analyzer for {len(sentences)} sentences")
 
             try:
-                # Process sentences in chunks of 8
-                BATCH_SIZE = 8
-                all_results = []
-
-                for batch_start in range(0, len(sentences), BATCH_SIZE):
-                    batch_end = min(batch_start + BATCH_SIZE, len(sentences))
-                    batch_sentences = sentences[batch_start:batch_end]
-                    batch_target_words = target_words[batch_start:batch_end] if target_words else [sentences[batch_start].split()[0]] * len(batch_sentences)
-
-                    logger.info(f"Processing batch {batch_start//BATCH_SIZE + 1}: sentences {batch_start + 1}-{batch_end}")
-
-                    # Determine complexity level from user's difficulty setting
-                    try:
-                        import streamlit as st
-                        complexity = st.session_state.get("difficulty", "intermediate")
-                    except Exception:
-                        complexity = "intermediate"
+                # Determine complexity level from user's difficulty setting
+                complexity = self._get_complexity()
+                if not target_words:
+                    target_words = [sentences[0].split()[0]] * len(sentences)
+
+                # Local-first tier: keep confident rule-based results, send the rest to the API
+                all_results: List[Optional[Dict[str, Any]]] = [None] * len(sentences)
+                pending = []
+                for idx, sentence in enumerate(sentences):
+                    tw = target_words[idx] if idx < len(target_words) else target_words[0]
+                    all_results[idx] = self._try_local_analysis(analyzer, sentence, tw, complexity, language_code)
+                    if all_results[idx] is None:
+                        pending.append(idx)
+                    elif on_result:
+                        on_result(idx, all_results[idx])
+
+                # Sentences analyzed in an earlier run are answered from the result cache
+                cache = self.result_cache
+                cached = 0
+                if cache is not None and pending:
+                    still_pending = []
+                    for idx in pending:
+                        tw = target_words[idx] if idx < len(target_words) else target_words[0]
+                        analysis = cache.get(analyzer, sentences[idx], tw, complexity)
+                        if analysis is None:
+                            still_pending.append(idx)
+                            continue
+                        all_results[idx] = self._analysis_to_result(analysis, language_code)
+                        cached += 1
+                        if on_result:
+                            on_result(idx, all_results[idx])
+                    pending = still_pending
+
+                streaming = self._streaming_enabled(analyzer)
+
+                # Size batches to the output budget learned for this language and complexity
+                batcher = self._get_batcher()
+                batches = batcher.plan_batches([sentences[idx] for idx in pending], language_code, complexity)
+                api = get_gemini_api()
+
+                for batch_number, positions in enumerate(batches, 1):
+                    batch_indices = [pending[p] for p in positions]
+                    batch_sentences = [sentences[idx] for idx in batch_indices]
+                    batch_target_words = [target_words[idx] if idx < len(target_words) else target_words[0] for idx in batch_indices]
+                    failed = []
+
+                    logger.info(f"Processing batch {batch_number}/{len(batches)}: {len(batch_sentences)} sentences")
 
                     # Use same target word for all sentences in batch (common case)
                     target_word = batch_target_words[0] if batch_target_words else batch_sentences[0].split()[0]
 
-                    # Batch analyze this chunk of 8 sentences at once
-                    batch_results = analyzer.batch_analyze_grammar(
-                        sentences=batch_sentences,
-                        target_word=target_word,
-                        complexity=complexity,
-                        gemini_api_key=gemini_api_key
-                    )
-
-                    # Convert to expected format
-                    for i, analysis_result in enumerate(batch_results):
+                    def finish(i, analysis, batch_indices=batch_indices, batch_target_words=batch_target_words,
+                               failed=failed):
+                        idx = batch_indices[i]
+                        if analysis is None or analysis.confidence_score < FALLBACK_CONFIDENCE_CEILING:
+                            failed.append(i)
+                        elif cache is not None:
+                            cache.store(analyzer, sentences[idx], batch_target_words[i], complexity, analysis)
                         try:
-                            colored_sentence = analysis_result.html_output
-                            word_explanations = self._convert_analyzer_output_to_explanations(analysis_result, language_code)
-                            grammar_summary = self._create_grammar_summary(analysis_result, language_code)
-
-                            result = {
-                                "colored_sentence": colored_sentence,
-                                "word_explanations": word_explanations,
-                                "grammar_summary": grammar_summary
-                            }
-                            all_results.append(result)
-
+                            all_results[idx] = self._analysis_to_result(analysis, language_code)
                         except Exception as e:
-                            logger.error(f"Failed to convert batch result {batch_start + i + 1}: {e}")
-                            all_results.append(self._create_generic_fallback(sentences[batch_start + i], batch_target_words[i] if i < len(batch_target_words) else target_word, language))
+                            logger.error(f"Failed to convert batch result {idx + 1}: {e}")
+                            all_results[idx] = self._create_generic_fallback(sentences[idx], batch_target_words[i], language)
+                        if on_result:
+                            on_result(idx, all_results[idx])
+
+                    # Measured per batch: the API instance is shared with other sessions and threads
+                    with api.measure_usage() as usage:
+                        with span("grammar.batch", language=language_code, batch_size=len(batch_sentences),
+                                  streaming=streaming):
+                            # Batch analyze this chunk at once
+                            if streaming:
+                                analyzer.stream_batch_analyze_grammar(
+                                    sentences=batch_sentences,
+                                    target_word=target_word,
+                                    complexity=complexity,
+                                    gemini_api_key=gemini_api_key,
+                                    on_result=finish
+                                )
+                            else:
+                                batch_results = analyzer.batch_analyze_grammar(
+                                    sentences=batch_sentences,
+                                    target_word=target_word,
+                                    complexity=complexity,
+                                    gemini_api_key=gemini_api_key
+                                )
+
+                                # Convert to expected format
+                                for i in range(len(batch_indices)):
+                                    finish(i, batch_results[i] if i < len(batch_results) else None)
+
+                    batcher.record_batch(
+                        language_code, complexity, batch_sentences,
+                        output_tokens=usage.output_tokens,
+                        failed_indices=failed,
+                        truncated=usage.truncated_responses > 0,
+                    )
 
                 # API usage tracking (count each batch as one call)
-                num_batches = (len(sentences) + BATCH_SIZE - 1) // BATCH_SIZE
+                num_batches = len(batches)
+                self._local_first_stats['api_calls_avoided'] += max(
+                    0, len(batcher.plan_batches(sentences, language_code, complexity)) - num_batches)
                 try:
                     import streamlit as st
                     if "gemini_api_calls" not in st.session_state:
@@ -442,34 +693,40 @@ IMPORTANT:
                     if "gemini_tokens_used" not in st.session_state:
                         st.session_state.gemini_tokens_used = 0
                     st.session_state.gemini_api_calls += num_batches
-                    st.session_state.gemini_tokens_used += (150 * len(sentences))  # Estimate tokens
+                    st.session_state.gemini_tokens_used += (150 * len(pending))  # Estimate tokens
+                    st.session_state.grammar_batch_metrics = batcher.get_metrics()
+                    if cache is not None:
+                        st.session_state.grammar_cache_stats = cache.get_stats()
                 except Exception:
                     pass
 
-                logger.info(f"Batch grammar analysis completed for {len(sentences)} sentences in {num_batches} API calls using {language_code} analyzer")
+                logger.info(f"Batch grammar analysis completed for {len(sentences)} sentences "
+                            f"({len(sentences) - len(pending) - cached} local, {cached} cached) "
+                            f"in {num_batches} API calls using {language_code} analyzer")
                 return all_results
 
             except Exception as e:
                 logger.warning(f"Batch processing failed for {language_code}: {e}, falling back to individual processing")
 
-        # Fallback to individual processing
+        # Fallback to individual processing, concurrently under the shared Gemini rate limiter
         logger.info(f"Falling back to individual processing for {len(sentences)} sentences")
-        results = []
-        for sentence, target_word in zip(sentences, target_words):
+
+        def analyze_one(item):
+            sentence, target_word = item
             try:
-                result = self.analyze_grammar_and_color(
+                return self.analyze_grammar_and_color(
                     sentence=sentence,
                     word=target_word,
                     language=language,
                     gemini_api_key=gemini_api_key,
                     language_code=language_code
                 )
-                results.append(result)
             except Exception as e:
                 logger.error(f"Failed to analyze sentence '{sentence}': {e}")
-                results.append(self._create_generic_fallback(sentence, target_word, language))
+                return self._create_generic_fallback(sentence, target_word, language)
 
-        return results
+        return run_concurrently(list(zip(sentences, target_words)), analyze_one,
+                                max_workers=GEMINI_RATE_LIMIT['max_concurrent'])
 
 
 # Global instance for backward compatibility
@@ -479,5 +736,5 @@ def get_grammar_processor() -> GrammarProcessor:
     """Get global grammar processor instance."""
     global _grammar_processor
     if _grammar_processor is None:
-        _grammar_processor = GrammarProcessor()
+        _grammar_processor = GrammarProcessor(result_cache=get_grammar_result_cache())
     return _grammar_processor
\ No newline at end of file
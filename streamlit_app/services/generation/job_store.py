@@ -0,0 +1,369 @@
+"""
+Generation Job Store
+
+Durable state for progressive deck generation, so a browser refresh, a
+worker restart or an out-of-memory kill in the middle of a long deck does
+not throw away the words (and the API calls) already paid for.
+
+Each job has an ID, a row in a SQLite database and a directory holding its
+media and partial .apkg. Every pass of every word (sentences, grammar,
+audio, images) is checkpointed as it completes, and each finished word's
+data is stored once it is in the partial deck. A resumed job skips finished
+words outright, restarts an interrupted word at its first unfinished pass,
+and can rebuild the .apkg from stored word data without any API work.
+
+Jobs are found again by ID (kept in the page URL) or by their language,
+word list and settings. Jobs run by the generation queue (see
+generation_queue.py) also record progress events here, which the page polls.
+
+A finalized job's media is deleted once its deck is built (the .apkg holds
+it), and finished jobs older than DEFAULT_RETENTION_DAYS are purged with
+their directories whenever a store is opened or a job created. List jobs, or
+remove old finished ones and their media by hand, with:
+
+    python -m streamlit_app.services.generation.job_store [--purge-days 7]
+"""
+
+import argparse
+import contextlib
+import hashlib
+import json
+import logging
+import shutil
+import sqlite3
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DB_PATH = "./cache/generation_jobs.db"
+DEFAULT_JOBS_DIR = "./cache/jobs"
+STAGES = ("sentences", "grammar", "audio", "images")
+WORD_STAGE = "word"             # The finished word, appended to the partial deck
+UNFINISHED = ("queued", "running")
+DEFAULT_RETENTION_DAYS = 7.0    # Finished jobs kept this long for the job list, then purged
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    job_id TEXT PRIMARY KEY,
+    fingerprint TEXT NOT NULL,
+    language TEXT NOT NULL,
+    words TEXT NOT NULL,
+    params TEXT NOT NULL,
+    status TEXT NOT NULL,
+    apkg_path TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_fingerprint ON jobs (fingerprint, status);
+CREATE TABLE IF NOT EXISTS stages (
+    job_id TEXT NOT NULL,
+    word_index INTEGER NOT NULL,
+    word TEXT NOT NULL,
+    stage TEXT NOT NULL,
+    data TEXT NOT NULL,
+    completed_at REAL NOT NULL,
+    PRIMARY KEY (job_id, word_index, stage)
+);
+CREATE TABLE IF NOT EXISTS events (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    job_id TEXT NOT NULL,
+    message TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS events_job ON events (job_id, seq);
+"""
+
+
+def _json_default(value: Any) -> Any:
+    # TokenAnnotations and similar row containers are stored as plain rows
+    if hasattr(value, 'to_list'):
+        return value.to_list()
+    if isinstance(value, (set, tuple)):
+        return list(value)
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def job_fingerprint(language: str, words: List[str], params: Dict[str, Any]) -> str:
+    """Hash of what a job generates; equal fingerprints produce the same deck."""
+    payload = json.dumps([language, list(words), params], sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:16]
+
+
+class WordCheckpoint:
+    """
+    Per-pass checkpoints for one word of a job, passed to generate_deck_progressive.
+
+    Usage:
+        data = checkpoint.load("grammar")
+        if data is None:
+            ...  # run the pass
+            checkpoint.save("grammar", {...})
+    """
+
+    def __init__(self, store: "GenerationJobStore", job_id: str, word_index: int, word: str):
+        self.store = store
+        self.job_id = job_id
+        self.word_index = word_index
+        self.word = word
+        self.restored: List[str] = []
+
+    def load(self, stage: str) -> Optional[Any]:
+        data = self.store.load_stage(self.job_id, self.word_index, stage)
+        if data is not None:
+            self.restored.append(stage)
+        return data
+
+    def save(self, stage: str, data: Any) -> None:
+        self.store.save_stage(self.job_id, self.word_index, self.word, stage, data)
+
+    def unique_id(self, candidate: str) -> str:
+        """The word's file-name suffix: the stored one, else candidate (stored for later runs)."""
+        data = self.store.load_stage(self.job_id, self.word_index, "started")
+        if data:
+            return data['unique_id']
+        self.save("started", {'unique_id': candidate})
+        return candidate
+
+
+class GenerationJobStore:
+    """
+    SQLite-backed jobs with a media directory each.
+
+    Usage:
+        store = get_job_store()
+        job_id = store.find_resumable(language, words, params) or store.create_job(language, words, params)
+        checkpoint = store.checkpoint(job_id, index, word)   # for generate_deck_progressive
+        store.complete_word(job_id, index, word_data)
+        store.finish_job(job_id, "finalized", apkg_path)
+    """
+
+    def __init__(self, db_path: str = DEFAULT_DB_PATH, jobs_dir: str = DEFAULT_JOBS_DIR,
+                 retention_days: Optional[float] = DEFAULT_RETENTION_DAYS):
+        """
+        Initialize the store.
+
+        Args:
+            db_path: SQLite database file
+            jobs_dir: Directory holding one subdirectory per job
+            retention_days: Finished jobs older than this are purged automatically (None keeps them)
+        """
+        self.db_path = Path(db_path)
+        self.jobs_dir = Path(jobs_dir)
+        self.retention_days = retention_days
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.jobs_dir.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+        self._purge_expired()
+
+    @contextlib.contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """A connection that commits on success and is always closed."""
+        conn = sqlite3.connect(str(self.db_path), timeout=30)
+        conn.row_factory = sqlite3.Row
+        try:
+            # WAL lets sessions read while another session's word is being written
+            conn.execute("PRAGMA journal_mode=WAL")
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def job_dir(self, job_id: str) -> Path:
+        """Directory for the job's media and partial .apkg."""
+        return self.jobs_dir / job_id
+
+    def create_job(self, language: str, words: List[str], params: Dict[str, Any]) -> str:
+        """Register a new job and create its directory. Returns the job ID."""
+        self._purge_expired()
+        job_id = uuid.uuid4().hex[:12]
+        now = time.time()
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "INSERT INTO jobs (job_id, fingerprint, language, words, params, status, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, 'running', ?, ?)",
+                (job_id, job_fingerprint(language, words, params), language,
+                 json.dumps(list(words), ensure_ascii=False), json.dumps(params, ensure_ascii=False, default=str),
+                 now, now))
+        (self.job_dir(job_id) / "media").mkdir(parents=True, exist_ok=True)
+        logger.info(f"Created generation job {job_id}: {len(words)} {language} words")
+        return job_id
+
+    def find_resumable(self, language: str, words: List[str], params: Dict[str, Any]) -> Optional[str]:
+        """ID of the newest unfinished job for the same deck, or None."""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT job_id FROM jobs WHERE fingerprint = ? AND status IN (?, ?) "
+                "ORDER BY updated_at DESC LIMIT 1",
+                (job_fingerprint(language, words, params), *UNFINISHED)).fetchone()
+        if row is None or not self.job_dir(row['job_id']).exists():
+            return None
+        return row['job_id']
+
+    def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """The job's language, words, params, status and progress, or None."""
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+            if row is None:
+                return None
+            counts = conn.execute(
+                "SELECT stage, COUNT(*) AS n FROM stages WHERE job_id = ? GROUP BY stage", (job_id,)).fetchall()
+        job = dict(row)
+        job['words'] = json.loads(job['words'])
+        job['params'] = json.loads(job['params'])
+        stage_counts = {r['stage']: r['n'] for r in counts}
+        job['completed_words'] = stage_counts.pop(WORD_STAGE, 0)
+        stage_counts.pop("started", None)
+        job['stages'] = stage_counts
+        return job
+
+    def save_stage(self, job_id: str, word_index: int, word: str, stage: str, data: Any) -> None:
+        """Record that a stage of one word finished, with the data needed to skip it later."""
+        payload = json.dumps(data, ensure_ascii=False, default=_json_default)
+        now = time.time()
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO stages (job_id, word_index, word, stage, data, completed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)", (job_id, word_index, word, stage, payload, now))
+            conn.execute("UPDATE jobs SET updated_at = ? WHERE job_id = ?", (now, job_id))
+
+    def load_stage(self, job_id: str, word_index: int, stage: str) -> Optional[Any]:
+        """Stored data of a finished stage, or None."""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT data FROM stages WHERE job_id = ? AND word_index = ? AND stage = ?",
+                (job_id, word_index, stage)).fetchone()
+        return json.loads(row['data']) if row else None
+
+    def checkpoint(self, job_id: str, word_index: int, word: str) -> WordCheckpoint:
+        return WordCheckpoint(self, job_id, word_index, word)
+
+    def complete_word(self, job_id: str, word_index: int, word_data: Dict[str, Any]) -> None:
+        """Store a finished word (after it was appended to the partial deck)."""
+        self.save_stage(job_id, word_index, word_data.get('word', ''), WORD_STAGE, word_data)
+
+    def completed_words(self, job_id: str) -> Dict[int, Dict[str, Any]]:
+        """Finished words' data by word index."""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT word_index, data FROM stages WHERE job_id = ? AND stage = ? ORDER BY word_index",
+                (job_id, WORD_STAGE)).fetchall()
+        return {row['word_index']: json.loads(row['data']) for row in rows}
+
+    def words_data(self, job_id: str) -> List[Dict[str, Any]]:
+        """Finished words in deck order, as create_apkg_from_word_data() takes them."""
+        return list(self.completed_words(job_id).values())
+
+    def set_status(self, job_id: str, status: str) -> bool:
+        """
+        Set an unfinished job's status ('queued' or 'running'). A finished job,
+        e.g. one cancelled meanwhile, is left as it is; returns whether it changed.
+        """
+        with self._lock, self._connect() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET status = ?, updated_at = ? WHERE job_id = ? AND status IN (?, ?)",
+                (status, time.time(), job_id, *UNFINISHED))
+        return cursor.rowcount > 0
+
+    def add_event(self, job_id: str, message: str) -> None:
+        """Append a progress message to the job's event log."""
+        with self._lock, self._connect() as conn:
+            conn.execute("INSERT INTO events (job_id, message, created_at) VALUES (?, ?, ?)",
+                         (job_id, message, time.time()))
+
+    def events(self, job_id: str, since: int = 0, limit: int = 500) -> List[Dict[str, Any]]:
+        """The job's progress messages after sequence number `since`, oldest first."""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT seq, message, created_at FROM events WHERE job_id = ? AND seq > ? ORDER BY seq LIMIT ?",
+                (job_id, since, limit)).fetchall()
+        return [dict(row) for row in rows]
+
+    def finish_job(self, job_id: str, status: str, apkg_path: Optional[str] = None) -> bool:
+        """
+        Mark an unfinished job 'finalized', 'failed' or 'cancelled'; finished jobs
+        are no longer resumed and keep their first outcome (a cancel is never
+        overwritten by a worker finishing). Returns whether the job changed.
+        """
+        with self._lock, self._connect() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET status = ?, apkg_path = ?, updated_at = ? WHERE job_id = ? AND status IN (?, ?)",
+                (status, apkg_path, time.time(), job_id, *UNFINISHED))
+        if cursor.rowcount and status == "finalized":
+            # The deck holds the media now and a finalized job is never resumed
+            shutil.rmtree(self.job_dir(job_id) / "media", ignore_errors=True)
+        return cursor.rowcount > 0
+
+    def list_jobs(self, limit: int = 20) -> List[Dict[str, Any]]:
+        """Newest jobs first, with their progress."""
+        with self._connect() as conn:
+            ids = [row['job_id'] for row in conn.execute(
+                "SELECT job_id FROM jobs ORDER BY updated_at DESC LIMIT ?", (limit,))]
+        return [job for job in (self.get_job(job_id) for job_id in ids) if job]
+
+    def purge(self, older_than_days: float = 7.0, include_running: bool = False) -> int:
+        """
+        Delete finished jobs (and, optionally, abandoned running ones) not touched
+        for older_than_days, with their directories. Returns the number removed.
+        """
+        cutoff = time.time() - older_than_days * 86400
+        finished = ("finalized", "failed", "cancelled")
+        statuses = finished + UNFINISHED if include_running else finished
+        with self._lock, self._connect() as conn:
+            ids = [row['job_id'] for row in conn.execute(
+                f"SELECT job_id FROM jobs WHERE updated_at < ? AND status IN ({','.join('?' * len(statuses))})",
+                (cutoff, *statuses))]
+            for job_id in ids:
+                conn.execute("DELETE FROM stages WHERE job_id = ?", (job_id,))
+                conn.execute("DELETE FROM events WHERE job_id = ?", (job_id,))
+                conn.execute("DELETE FROM jobs WHERE job_id = ?", (job_id,))
+        for job_id in ids:
+            shutil.rmtree(self.job_dir(job_id), ignore_errors=True)
+        return len(ids)
+
+    def _purge_expired(self) -> None:
+        if self.retention_days is None:
+            return
+        try:
+            removed = self.purge(older_than_days=self.retention_days)
+        except sqlite3.Error as e:
+            logger.warning(f"Could not purge expired generation jobs: {e}")
+            return
+        if removed:
+            logger.info(f"Purged {removed} generation job(s) older than {self.retention_days:g} days")
+
+
+_job_store: Optional[GenerationJobStore] = None
+
+
+def get_job_store() -> GenerationJobStore:
+    """Get the global job store instance."""
+    global _job_store
+    if _job_store is None:
+        _job_store = GenerationJobStore()
+    return _job_store
+
+
+def main():
+    parser = argparse.ArgumentParser(description="List or purge deck generation jobs")
+    parser.add_argument("--purge-days", type=float, help="Remove finished jobs older than this many days")
+    parser.add_argument("--include-running", action="store_true", help="With --purge-days, also remove abandoned running jobs")
+    parser.add_argument("--limit", type=int, default=20, help="Jobs to list")
+    args = parser.parse_args()
+
+    store = get_job_store()
+    if args.purge_days is not None:
+        print(f"Removed {store.purge(args.purge_days, args.include_running)} jobs")
+    for job in store.list_jobs(args.limit):
+        updated = time.strftime("%Y-%m-%d %H:%M", time.localtime(job['updated_at']))
+        print(f"{job['job_id']}  {job['status']:<9}  {job['language']:<20}  "
+              f"{job['completed_words']}/{len(job['words'])} words  {updated}")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,11 +2,45 @@
 """
 Log Manager Service for Generation Operations
 Handles log accumulation, file writing, and provides log content for UI display.
+
+Logs are kept in a bounded ring buffer of structured records so memory and
+render time stay flat on long runs. Older records can optionally be spilled to
+a rotating file.
 """
 
 import datetime
+import logging
+import logging.handlers
 import re
-from typing import Optional, TextIO
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Deque, List, Optional, TextIO
+
+# Defaults sized for 500-word runs: enough history for debugging, small enough
+# that st.code() renders instantly.
+DEFAULT_MAX_RECORDS = 2000
+DEFAULT_DISPLAY_LINES = 100
+DEFAULT_SPILL_MAX_BYTES = 5 * 1024 * 1024
+DEFAULT_SPILL_BACKUPS = 3
+
+
+@dataclass(frozen=True)
+class LogRecord:
+    """A single structured log entry."""
+    seq: int
+    timestamp: float
+    level: str
+    message: str
+    stage: Optional[str] = None
+    word: Optional[str] = None
+    elapsed: float = 0.0
+
+    def format_display(self) -> str:
+        """Format the record as a single clean, timestamped display line."""
+        clock = datetime.datetime.fromtimestamp(self.timestamp).strftime('%H:%M:%S')
+        return f"[{clock}] {self.message}"
 
 
 class LogManager:
@@ -15,59 +49,165 @@ class LogManager:
     Handles log accumulation, file writing, and provides clean log content for display.
     """
 
-    def __init__(self, log_stream: Optional[TextIO] = None):
+    def __init__(self, log_stream: Optional[TextIO] = None,
+                 max_records: int = DEFAULT_MAX_RECORDS,
+                 display_lines: int = DEFAULT_DISPLAY_LINES,
+                 spill_path: Optional[str] = None,
+                 spill_max_bytes: int = DEFAULT_SPILL_MAX_BYTES,
+                 spill_backups: int = DEFAULT_SPILL_BACKUPS):
         """
         Initialize the log manager.
 
         Args:
             log_stream: Optional file stream for persistent logging
+            max_records: Maximum number of records kept in memory
+            display_lines: Number of most recent records shown in the UI
+            spill_path: Optional path of a rotating file that receives every record
+            spill_max_bytes: Size at which the spill file is rotated
+            spill_backups: Number of rotated spill files to keep
         """
         self.log_stream = log_stream
-        self.logs_list = []  # For structured log storage
-        self.logs_string = ""  # For UI display (clean, timestamped)
+        self.max_records = max_records
+        self.display_lines = display_lines
+        self._records: Deque[LogRecord] = deque(maxlen=max_records)
+        self._next_seq = 1
+        self._started_at = time.time()
+        self._stage: Optional[str] = None
+        self._word: Optional[str] = None
+        self._lock = threading.Lock()
+
+        self._spill_handler: Optional[logging.Handler] = None
+        if spill_path:
+            self._spill_handler = logging.handlers.RotatingFileHandler(
+                spill_path, maxBytes=spill_max_bytes, backupCount=spill_backups, encoding='utf-8'
+            )
+            self._spill_handler.setFormatter(logging.Formatter('%(message)s'))
+
+    def set_context(self, stage: Optional[str] = None, word: Optional[str] = None) -> None:
+        """
+        Set the stage and word attached to subsequent records.
+
+        Args:
+            stage: Current generation stage (e.g. "PASS 3")
+            word: Word currently being processed
+        """
+        with self._lock:
+            self._stage = stage
+            self._word = word
 
-    def log_message(self, message: str) -> None:
+    def log_message(self, message: str, level: Optional[str] = None,
+                    stage: Optional[str] = None, word: Optional[str] = None) -> None:
         """
         Log a message with timestamp and clean formatting.
 
         Args:
             message: The message to log
+            level: Optional level; inferred from the message when omitted
+            stage: Optional stage, defaults to the current context
+            word: Optional word, defaults to the current context
         """
-        # Store in structured list
-        self.logs_list.append(message)
-
         # Write to file if stream available
         if self.log_stream:
             self.log_stream.write(message + '\n')
             self.log_stream.flush()
 
-        # Update clean display string
-        clean_msg = self._clean_html_tags(message)
-        timestamp = datetime.datetime.now().strftime('%H:%M:%S')
-        self.logs_string += f"[{timestamp}] {clean_msg}\n"
+        now = time.time()
+        with self._lock:
+            record = LogRecord(
+                seq=self._next_seq,
+                timestamp=now,
+                level=level or self._infer_level(message),
+                message=self._clean_html_tags(message),
+                stage=stage if stage is not None else self._stage,
+                word=word if word is not None else self._word,
+                elapsed=now - self._started_at,
+            )
+            self._next_seq += 1
+            self._records.append(record)
+
+        if self._spill_handler:
+            self._spill_handler.handle(logging.makeLogRecord({
+                'msg': f"{record.seq}\t{record.level}\t{record.stage or ''}\t"
+                       f"{record.word or ''}\t{record.elapsed:.3f}\t{record.format_display()}",
+                'levelno': logging.INFO,
+            }))
+
+    @property
+    def last_seq(self) -> int:
+        """Sequence number of the most recent record (0 if none)."""
+        return self._next_seq - 1
+
+    def get_records_since(self, seq: int = 0) -> List[LogRecord]:
+        """
+        Get records newer than a sequence number.
+
+        Records that have already been evicted from the ring buffer are not
+        returned; the first returned record's seq shows where the gap ends.
+
+        Args:
+            seq: Sequence number of the last record the caller has seen
 
-    def get_display_logs(self) -> str:
+        Returns:
+            List of records with seq > the given value, oldest first
+        """
+        with self._lock:
+            if not self._records or seq >= self._records[-1].seq:
+                return []
+            first_seq = self._records[0].seq
+            start = max(0, seq - first_seq + 1)
+            return [self._records[i] for i in range(start, len(self._records))]
+
+    def get_display_logs(self, max_lines: Optional[int] = None) -> str:
         """
         Get logs formatted for UI display.
 
+        Only the most recent records are returned so rendering cost does not
+        grow with the length of the run.
+
+        Args:
+            max_lines: Number of recent records to include (defaults to display_lines)
+
         Returns:
             Clean, timestamped log string for UI
         """
-        return self.logs_string
+        limit = max_lines or self.display_lines
+        with self._lock:
+            tail = list(self._records)[-limit:]
+        if not tail:
+            return ""
+        return "\n".join(record.format_display() for record in tail) + "\n"
 
     def get_raw_logs(self) -> list:
         """
         Get raw log messages.
 
         Returns:
-            List of raw log messages
+            List of buffered log messages
         """
-        return self.logs_list.copy()
+        with self._lock:
+            return [record.message for record in self._records]
 
     def clear_logs(self) -> None:
         """Clear all logs."""
-        self.logs_list.clear()
-        self.logs_string = ""
+        with self._lock:
+            self._records.clear()
+            self._started_at = time.time()
+
+    def close(self) -> None:
+        """Close the spill file, if any."""
+        if self._spill_handler:
+            self._spill_handler.close()
+            self._spill_handler = None
+
+    def _infer_level(self, message: str) -> str:
+        """Infer a log level from the message's markers."""
+        if '[DEBUG]' in message:
+            return 'DEBUG'
+        if '[ERROR]' in message or '[CRITICAL]' in message or '❌' in message:
+            return 'ERROR'
+        if '[WARNING]' in message or '⚠️' in message:
+            return 'WARNING'
+        return 'INFO'
 
     def _clean_html_tags(self, text: str) -> str:
         """
@@ -86,6 +226,54 @@ class LogManager:
         Get the number of log entries.
 
         Returns:
-            Number of log messages
+            Number of buffered log messages
+        """
+        with self._lock:
+            return len(self._records)
+
+
+class BoundedLogStream:
+    """
+    File-like text stream that keeps only the most recent lines.
+
+    Used in place of an unbounded io.StringIO for the session-wide logging
+    handler, which otherwise grows for the life of the session.
+    """
+
+    def __init__(self, max_lines: int = DEFAULT_MAX_RECORDS):
+        """
+        Initialize the stream.
+
+        Args:
+            max_lines: Maximum number of complete lines retained
         """
-        return len(self.logs_list)
\ No newline at end of file
+        self._lines: Deque[str] = deque(maxlen=max_lines)
+        self._partial = ""
+        self._lock = threading.Lock()
+        self.closed = False
+
+    def write(self, text: str) -> int:
+        """Append text, evicting the oldest lines when full."""
+        with self._lock:
+            data = self._partial + text
+            *complete, self._partial = data.split('\n')
+            self._lines.extend(complete)
+        return len(text)
+
+    def flush(self) -> None:
+        """No-op; present for file-like compatibility."""
+
+    def getvalue(self) -> str:
+        """Return the retained content."""
+        with self._lock:
+            content = "\n".join(self._lines)
+            if self._lines:
+                content += "\n"
+            return content + self._partial
+
+    def close(self) -> None:
+        """Release buffered content."""
+        with self._lock:
+            self._lines.clear()
+            self._partial = ""
+            self.closed = True
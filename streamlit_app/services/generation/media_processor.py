@@ -3,25 +3,69 @@ Media Processor Service
 
 Handles IPA generation, audio processing, and image processing.
 Extracted from sentence_generator.py for better separation of concerns.
+
+process_media_for_sentences runs the three stages concurrently on one
+event loop per batch: IPA on its own small thread pool, every audio
+synthesis as a coroutine, and one batched Pixabay download on an I/O
+thread. Results stay aligned with the input sentences, and failures are
+empty strings.
 """
 
+import asyncio
 import logging
-from typing import Optional, List, Dict, Any
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional, List, Dict, Any
 from pathlib import Path
 import streamlit as st
 
+from streamlit_app.services.generation.tracing import in_current_context
+
 logger = logging.getLogger(__name__)
 
+DEFAULT_IO_WORKERS = 8   # Concurrent TTS requests plus the image download
+DEFAULT_IPA_WORKERS = 2  # IPA is CPU-bound; a second thread only hides IPAService start-up
+
+
+def _script_context_initializer() -> Optional[Callable[[], None]]:
+    """Thread initializer giving pool threads the caller's Streamlit script context (session state, warnings)."""
+    try:
+        from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+    except ImportError:
+        return None
+    ctx = get_script_run_ctx()
+    if ctx is None:
+        return None
+    return lambda: add_script_run_ctx(threading.current_thread(), ctx)
+
+
+def _run_on_new_loop(coro):
+    """Run a coroutine on a fresh event loop and close it, worker threads included."""
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coro)
+    finally:
+        loop.run_until_complete(loop.shutdown_default_executor())
+        loop.close()
+
+
+def _audio_filename(batch_name: str, index: int, unique_id: Optional[str]) -> str:
+    """{batch_name}_{index:02d}_{unique_id}.mp3, 1-based."""
+    unique_suffix = f"_{unique_id}" if unique_id else ""
+    return f"{batch_name}_{index+1:02d}{unique_suffix}.mp3"
+
 
 class MediaProcessor:
     """
     Service for processing media-related tasks: IPA generation, audio, images.
     """
 
-    def __init__(self):
+    def __init__(self, io_workers: int = DEFAULT_IO_WORKERS, ipa_workers: int = DEFAULT_IPA_WORKERS):
         """Initialize media processor with output directories."""
         self.audio_output_dir = "output/audio"
         self.image_output_dir = "output/images"
+        self.io_workers = io_workers
+        self.ipa_workers = ipa_workers
         # Ensure directories exist
         Path(self.audio_output_dir).mkdir(parents=True, exist_ok=True)
         Path(self.image_output_dir).mkdir(parents=True, exist_ok=True)
@@ -71,14 +115,20 @@ class MediaProcessor:
         Returns:
             List of audio file paths
         """
+        async def synthesize_all():
+            return await asyncio.gather(*[
+                self._generate_audio_async(sentence, voice, index=i, batch_name=batch_name, unique_id=unique_id)
+                for i, sentence in enumerate(sentences)
+            ], return_exceptions=True)
+
+        # One event loop for the batch instead of one per sentence
         audio_files = []
-        for i, sentence in enumerate(sentences):
-            try:
-                audio_file = self.generate_audio(sentence, language, voice, index=i, batch_name=batch_name, unique_id=unique_id)
-                audio_files.append(audio_file)
-            except Exception as e:
-                logger.error(f"Failed to generate audio for sentence {i}: {e}")
+        for i, result in enumerate(_run_on_new_loop(synthesize_all())):
+            if isinstance(result, BaseException):
+                logger.error(f"Failed to generate audio for sentence {i}: {result}")
                 audio_files.append("")  # Empty string for failed audio
+            else:
+                audio_files.append(result)
 
         return audio_files
 
@@ -97,31 +147,24 @@ class MediaProcessor:
         Returns:
             Audio file path
         """
-        try:
-            import asyncio
-            import os
-            from pathlib import Path
+        return _run_on_new_loop(
+            self._generate_audio_async(text, voice, index=index, batch_name=batch_name, unique_id=unique_id)
+        )
 
+    async def _generate_audio_async(self, text: str, voice: str = None, index: int = 0,
+                                    batch_name: str = "audio", unique_id: str = None) -> str:
+        """Synthesize one sentence on the running event loop. Returns the filename, or "" on failure."""
+        try:
             # Import audio generator
-            from audio_generator import generate_audio_async, get_google_voices_for_language
+            from audio_generator import generate_audio_async
 
             # Create output path with unique filename
-            output_dir = Path("output/audio")
+            output_dir = Path(self.audio_output_dir)
             output_dir.mkdir(parents=True, exist_ok=True)
-            
-            # Generate unique filename following the pattern: {batch_name}_{index:02d}_{unique_id}.mp3
-            unique_suffix = f"_{unique_id}" if unique_id else ""
-            filename = f"{batch_name}_{index+1:02d}{unique_suffix}.mp3"
-            output_path = output_dir / filename
-
-            # Generate audio asynchronously
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            success = loop.run_until_complete(
-                generate_audio_async(text, voice, str(output_path))
-            )
-            loop.close()
 
+            # Generate unique filename following the pattern: {batch_name}_{index:02d}_{unique_id}.mp3
+            filename = _audio_filename(batch_name, index, unique_id)
+            success = await generate_audio_async(text, voice, str(output_dir / filename))
             return filename if success else ""
         except ImportError:
             logger.warning("Audio generator not available")
@@ -143,15 +186,36 @@ class MediaProcessor:
         Returns:
             List of image file paths
         """
-        image_files = []
-        for i, keywords in enumerate(keywords_list):
-            try:
-                image_file = self.generate_image(keywords, language, index=i, batch_name=batch_name, unique_id=unique_id)
-                image_files.append(image_file)
-            except Exception as e:
-                logger.error(f"Failed to generate image for keywords {i}: {e}")
-                image_files.append("")  # Empty string for failed images
+        if not keywords_list:
+            return []
+        try:
+            # Get Pixabay API key (required)
+            pixabay_api_key = getattr(st.session_state, 'pixabay_api_key', None)
+            if not pixabay_api_key:
+                logger.error("Pixabay API key is required for image generation")
+                return [""] * len(keywords_list)
 
+            from image_generator import generate_images_pixabay
+
+            # One call for the batch, so the same photo is never picked twice;
+            # exact filenames let results be matched back to their sentence
+            unique_suffix = f"_{unique_id}" if unique_id else ""
+            filenames = [f"{batch_name}_{i+1:02d}{unique_suffix}.jpg" for i in range(len(keywords_list))]
+            generated, _ = generate_images_pixabay(
+                queries=list(keywords_list),
+                output_dir=self.image_output_dir,
+                batch_name=batch_name,
+                num_images=1,
+                pixabay_api_key=pixabay_api_key,
+                exact_filenames=filenames,
+            )
+        except Exception as e:
+            logger.error(f"Image generation failed for batch '{batch_name}': {e}")
+            return [""] * len(keywords_list)
+
+        produced = set(generated)
+        image_files = [name if name in produced else "" for name in filenames]
+        logger.info(f"Generated {sum(1 for f in image_files if f)}/{len(image_files)} images for '{batch_name}'")
         return image_files
 
     def generate_image(self, keywords: str, language: str, index: int = 0, batch_name: str = "batch", unique_id: str = None, image_quality: str = "free") -> str:
@@ -227,19 +291,66 @@ class MediaProcessor:
         Returns:
             Dict with 'ipa', 'audio', 'images' lists
         """
-        # Generate IPA for all sentences
-        ipa_list = [self.generate_ipa_hybrid(sentence, language) for sentence in sentences]
+        # One event loop for the whole batch
+        return _run_on_new_loop(
+            self._process_media_async(sentences, keywords_list, language, voice, batch_name, unique_id)
+        )
 
-        # Generate audio for all sentences
-        audio_list = self.generate_audio_batch(sentences, language, voice, batch_name, unique_id)
+    async def _process_media_async(
+        self,
+        sentences: List[str],
+        keywords_list: List[str],
+        language: str,
+        voice: str,
+        batch_name: str,
+        unique_id: str
+    ) -> Dict[str, List[str]]:
+        """Run the IPA, audio and image stages concurrently and collect aligned results."""
+        loop = asyncio.get_running_loop()
+        initializer = _script_context_initializer()
+        # asyncio.to_thread (used for TTS requests) runs on the default executor
+        loop.set_default_executor(ThreadPoolExecutor(
+            max_workers=self.io_workers, thread_name_prefix="media-io", initializer=initializer))
+        ipa_pool = ThreadPoolExecutor(
+            max_workers=self.ipa_workers, thread_name_prefix="media-ipa", initializer=initializer)
 
-        # Generate images for all keyword sets
-        image_list = self.generate_images_batch(keywords_list, language, batch_name, unique_id)
+        try:
+            # run_in_executor does not carry contextvars; wrap so stage spans nest under the word
+            images = loop.run_in_executor(
+                None, in_current_context(self.generate_images_batch), keywords_list, language, batch_name, unique_id)
+            audio = [self._generate_audio_async(sentence, voice, index=i, batch_name=batch_name, unique_id=unique_id)
+                     for i, sentence in enumerate(sentences)]
+            ipa = [loop.run_in_executor(ipa_pool, in_current_context(self.generate_ipa_hybrid), sentence, language)
+                   for sentence in sentences]
+
+            ipa_list, audio_list, image_list = await asyncio.gather(
+                asyncio.gather(*ipa, return_exceptions=True),
+                asyncio.gather(*audio, return_exceptions=True),
+                asyncio.gather(images, return_exceptions=True),
+            )
+        finally:
+            ipa_pool.shutdown(wait=False)
+
+        image_list = image_list[0]
+        if isinstance(image_list, BaseException):
+            logger.error(f"Image stage failed: {image_list}")
+            image_list = [""] * len(keywords_list)
+
+        def as_text(results: List[Any], stage: str) -> List[str]:
+            # Empty string for failures keeps every list aligned with the sentences
+            texts = []
+            for i, result in enumerate(results):
+                if isinstance(result, BaseException):
+                    logger.error(f"{stage} failed for sentence {i}: {result}")
+                    texts.append("")
+                else:
+                    texts.append(result or "")
+            return texts
 
         return {
-            'ipa': ipa_list,
-            'audio': audio_list,
-            'images': image_list
+            'ipa': as_text(ipa_list, "IPA"),
+            'audio': as_text(audio_list, "Audio"),
+            'images': as_text(image_list, "Image")
         }
 
 
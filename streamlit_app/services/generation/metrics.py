@@ -0,0 +1,513 @@
+"""
+Process Metrics Service
+
+One registry of counters, gauges and histograms for the whole process, so
+cache, API and pipeline health can be watched across sessions instead of
+through each session's st.session_state counters. Exposed in the Prometheus
+text format (0.0.4) on a side port, in a file rewritten periodically, or both.
+
+Fed by:
+    - client spans (tracing.span(kind="client")): request latency per provider
+      and operation, outcomes, 429s and requests in flight
+    - pass.* spans: pipeline stages in flight and their duration
+    - GeminiAPI: output tokens and truncated responses
+    - IPAService: transcriptions per tier
+    - every PersistentCache and CacheManager: entries, hits, misses, bytes on disk
+    - the analyzer registry: analyzers available and loaded
+    - the generation queue: jobs queued and running
+    - generation worker processes: their counters and histograms are merged
+      into the server's registry when each job ends (see generation_queue.py)
+
+Enable the exporter with environment variables (read once per process):
+
+    METRICS_PORT=9464 streamlit run streamlit_app/app_v3.py
+    curl http://127.0.0.1:9464/metrics
+
+    METRICS_FILE=./logs/metrics.prom METRICS_FILE_INTERVAL=15   # for node_exporter's textfile collector
+
+METRICS_HOST sets the bind address (default 127.0.0.1).
+"""
+
+import bisect
+import logging
+import math
+import os
+import threading
+import weakref
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+METRIC_PREFIX = "app_"
+# Seconds; API calls range from a cached Wiktionary page to a long Gemini batch
+DEFAULT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+DEFAULT_FILE_INTERVAL = 15.0
+
+LabelValues = Tuple[str, ...]
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _format_labels(names: Sequence[str], values: Sequence[Any], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class _Metric:
+    """Common label handling; values are keyed by the label values in labelnames order."""
+
+    type_name = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values: Dict[LabelValues, Any] = {}
+
+    def _key(self, labels: Dict[str, Any]) -> LabelValues:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} takes labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+    def samples(self) -> Iterator[Tuple[str, str, float]]:
+        """(sample name, formatted labels, value) triples."""
+        with self._lock:
+            values = dict(self._values)
+        for key, value in sorted(values.items()):
+            yield self.name, _format_labels(self.labelnames, key), value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type_name}"]
+        lines.extend(f"{name}{labels} {_format_value(value)}" for name, labels, value in self.samples())
+        return lines
+
+
+class Counter(_Metric):
+    """Monotonic count. Name it *_total."""
+
+    type_name = "counter"
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        if amount < 0:
+            raise ValueError("Counters only go up")
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def set_total(self, value: float, **labels: Any) -> None:
+        """Mirror a component's own monotonic count (used by collectors)."""
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def get(self, **labels: Any) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+
+class Gauge(_Metric):
+    """Value that goes up and down."""
+
+    type_name = "gauge"
+
+    def set(self, value: float, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1.0, **labels: Any) -> None:
+        self.inc(-amount, **labels)
+
+    def get(self, **labels: Any) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+
+class Histogram(_Metric):
+    """Observations counted into cumulative buckets, with sum and count."""
+
+    type_name = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        if "le" in self.labelnames:
+            raise ValueError("'le' is reserved for histogram buckets")
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            counts, total = self._values.get(key, ([0] * (len(self.buckets) + 1), 0.0))
+            counts[bisect.bisect_left(self.buckets, value)] += 1
+            self._values[key] = (counts, total + value)
+
+    def get(self, **labels: Any) -> Dict[str, Any]:
+        """count, sum and cumulative bucket counts for one label set."""
+        with self._lock:
+            counts, total = self._values.get(self._key(labels), ([0] * (len(self.buckets) + 1), 0.0))
+            counts = list(counts)
+        cumulative = [sum(counts[:i + 1]) for i in range(len(counts))]
+        return {'count': cumulative[-1], 'sum': total,
+                'buckets': dict(zip(self.buckets + (math.inf,), cumulative))}
+
+    def samples(self) -> Iterator[Tuple[str, str, float]]:
+        with self._lock:
+            values = {key: (list(counts), total) for key, (counts, total) in self._values.items()}
+        for key, (counts, total) in sorted(values.items()):
+            running = 0
+            for bound, count in zip(self.buckets + (math.inf,), counts):
+                running += count
+                yield (f"{self.name}_bucket",
+                       _format_labels(self.labelnames, key, f'le="{_format_value(bound)}"'), running)
+            yield f"{self.name}_sum", _format_labels(self.labelnames, key), total
+            yield f"{self.name}_count", _format_labels(self.labelnames, key), running
+
+
+class MetricsRegistry:
+    """
+    Process-wide metric families plus collectors that refresh gauges at scrape time.
+
+    Usage:
+        registry = get_metrics_registry()
+        calls = registry.counter("app_calls_total", "Calls made", ["provider"])
+        calls.inc(provider="gemini")
+        registry.render()
+    """
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: Dict[str, Callable[[], None]] = {}
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, cls, name: str, documentation: str, labelnames: Sequence[str], **kwargs) -> Any:
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, documentation, labelnames, **kwargs)
+            elif type(metric) is not cls or metric.labelnames != tuple(labelnames):
+                raise ValueError(f"Metric {name} is already registered as a different {metric.type_name}")
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._get_or_create(Counter, name, documentation, labelnames)
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._get_or_create(Gauge, name, documentation, labelnames)
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._get_or_create(Histogram, name, documentation, labelnames, buckets=buckets)
+
+    def add_collector(self, key: str, collector: Callable[[], None]) -> None:
+        """Run collector before every render; a collector added again under the same key replaces it."""
+        with self._lock:
+            self._collectors[key] = collector
+
+    def collect(self) -> None:
+        with self._lock:
+            collectors = list(self._collectors.items())
+        for key, collector in collectors:
+            try:
+                collector()
+            except Exception as e:
+                logger.warning(f"Metrics collector {key} failed: {e}")
+
+    def snapshot(self) -> Dict[str, Dict[LabelValues, Any]]:
+        """Current counter and histogram values, to diff against later with delta()."""
+        with self._lock:
+            metrics = [metric for metric in self._metrics.values() if not isinstance(metric, Gauge)]
+        snapshot = {}
+        for metric in metrics:
+            with metric._lock:
+                snapshot[metric.name] = {
+                    key: (list(value[0]), value[1]) if isinstance(metric, Histogram) else value
+                    for key, value in metric._values.items()}
+        return snapshot
+
+    def delta(self, since: Dict[str, Dict[LabelValues, Any]]) -> List[Dict[str, Any]]:
+        """
+        Counter increments and histogram observations made after the snapshot
+        `since`, as plain data another process can merge() (gauges are left out:
+        they describe this process's current state, not events).
+        """
+        with self._lock:
+            metrics = [metric for metric in self._metrics.values() if not isinstance(metric, Gauge)]
+        changes = []
+        for metric in metrics:
+            before = since.get(metric.name, {})
+            with metric._lock:
+                values = dict(metric._values)
+            for key, value in values.items():
+                if isinstance(metric, Histogram):
+                    old_counts, old_total = before.get(key, ([0] * len(value[0]), 0.0))
+                    counts = [new - old for new, old in zip(value[0], old_counts)]
+                    if any(counts):
+                        changes.append({'name': metric.name, 'type': metric.type_name, 'doc': metric.documentation,
+                                        'labelnames': metric.labelnames, 'buckets': metric.buckets,
+                                        'labels': key, 'counts': counts, 'sum': value[1] - old_total})
+                elif value != before.get(key, 0):
+                    changes.append({'name': metric.name, 'type': metric.type_name, 'doc': metric.documentation,
+                                    'labelnames': metric.labelnames, 'labels': key,
+                                    'amount': value - before.get(key, 0)})
+        return changes
+
+    def merge(self, changes: List[Dict[str, Any]]) -> None:
+        """Add another process's delta() to this registry."""
+        for change in changes:
+            key = tuple(change['labels'])
+            try:
+                if change['type'] == "histogram":
+                    metric = self.histogram(change['name'], change['doc'], change['labelnames'], change['buckets'])
+                    if metric.buckets != tuple(change['buckets']):
+                        raise ValueError("different buckets")
+                    with metric._lock:
+                        counts, total = metric._values.get(key, ([0] * (len(metric.buckets) + 1), 0.0))
+                        metric._values[key] = ([a + b for a, b in zip(counts, change['counts'])],
+                                               total + change['sum'])
+                else:
+                    metric = self.counter(change['name'], change['doc'], change['labelnames'])
+                    with metric._lock:
+                        metric._values[key] = metric._values.get(key, 0) + change['amount']
+            except ValueError as e:
+                logger.warning(f"Skipping metric changes for {change['name']}: {e}")
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format."""
+        self.collect()
+        with self._lock:
+            metrics = sorted(self._metrics.values(), key=lambda metric: metric.name)
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+_registry: Optional[MetricsRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_metrics_registry() -> MetricsRegistry:
+    """Get the global metrics registry."""
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = MetricsRegistry()
+    return _registry
+
+
+# ----------------------------------------------------------------------------
+# Standard metrics
+# ----------------------------------------------------------------------------
+
+_r = get_metrics_registry()
+REQUEST_DURATION = _r.histogram(
+    f"{METRIC_PREFIX}request_duration_seconds", "External API call latency", ["provider", "operation"])
+REQUESTS = _r.counter(
+    f"{METRIC_PREFIX}requests_total", "External API calls by outcome (ok, error, rate_limited)",
+    ["provider", "outcome"])
+RATE_LIMITED = _r.counter(
+    f"{METRIC_PREFIX}rate_limited_total", "External API calls answered with 429 / RESOURCE_EXHAUSTED",
+    ["provider"])
+REQUESTS_IN_FLIGHT = _r.gauge(
+    f"{METRIC_PREFIX}requests_in_flight", "External API calls currently open", ["provider"])
+PIPELINE_IN_FLIGHT = _r.gauge(
+    f"{METRIC_PREFIX}pipeline_in_flight", "Words currently in each generation pass", ["stage"])
+STAGE_DURATION = _r.histogram(
+    f"{METRIC_PREFIX}pipeline_stage_duration_seconds", "Time per word spent in each generation pass", ["stage"])
+GEMINI_TOKENS = _r.counter(
+    f"{METRIC_PREFIX}gemini_output_tokens_total", "Gemini output tokens", ["model"])
+GEMINI_TRUNCATED = _r.counter(
+    f"{METRIC_PREFIX}gemini_truncated_responses_total", "Gemini responses cut off at MAX_TOKENS", ["model"])
+IPA_TRANSCRIPTIONS = _r.counter(
+    f"{METRIC_PREFIX}ipa_transcriptions_total", "IPA transcriptions by tier (epitran, phonemizer, ai_fallback, error)",
+    ["tier"])
+CACHE_ENTRIES = _r.gauge(f"{METRIC_PREFIX}cache_entries", "Entries held in memory", ["cache"])
+CACHE_BYTES = _r.gauge(f"{METRIC_PREFIX}cache_bytes", "Size of the cache's files on disk", ["cache"])
+CACHE_HITS = _r.counter(f"{METRIC_PREFIX}cache_hits_total", "Cache hits", ["cache"])
+CACHE_MISSES = _r.counter(f"{METRIC_PREFIX}cache_misses_total", "Cache misses", ["cache"])
+ANALYZERS = _r.gauge(f"{METRIC_PREFIX}analyzers", "Grammar analyzers by state (available, loaded)", ["state"])
+GENERATION_JOBS = _r.gauge(
+    f"{METRIC_PREFIX}generation_jobs", "Deck generation jobs in the background queue by state (queued, running)",
+    ["state"])
+del _r
+
+_RATE_LIMIT_MARKERS = ("RESOURCE_EXHAUSTED", "Too Many Requests")
+
+
+def observe_span_start(name: str, kind: str) -> None:
+    """Called by tracing.span when a client or pass.* span opens."""
+    if kind == "client":
+        REQUESTS_IN_FLIGHT.inc(provider=name.split(".", 1)[0])
+    elif name.startswith("pass."):
+        PIPELINE_IN_FLIGHT.inc(stage=name[len("pass."):])
+
+
+def observe_span_end(span: Any) -> None:
+    """Called by tracing.span when a client or pass.* span closes."""
+    if span.kind == "client":
+        provider, _, operation = span.name.partition(".")
+        REQUESTS_IN_FLIGHT.dec(provider=provider)
+        REQUEST_DURATION.observe(span.duration_s, provider=provider, operation=operation or "call")
+        rate_limited = span.attributes.get('status') == 429 or (
+            span.error is not None and any(marker in span.error for marker in _RATE_LIMIT_MARKERS))
+        if rate_limited:
+            RATE_LIMITED.inc(provider=provider)
+        outcome = "rate_limited" if rate_limited else "error" if span.error else "ok"
+        REQUESTS.inc(provider=provider, outcome=outcome)
+    elif span.name.startswith("pass."):
+        stage = span.name[len("pass."):]
+        PIPELINE_IN_FLIGHT.dec(stage=stage)
+        STAGE_DURATION.observe(span.duration_s, stage=stage)
+
+
+# ----------------------------------------------------------------------------
+# Caches
+# ----------------------------------------------------------------------------
+
+_watched_caches: "weakref.WeakSet[Any]" = weakref.WeakSet()
+
+
+def watch_cache(cache: Any) -> None:
+    """
+    Report a cache's get_stats() and its files on disk. Caches are labelled by
+    directory; instances sharing one (a module imported under two names) are added up.
+    """
+    _watched_caches.add(cache)
+    get_metrics_registry().add_collector("caches", _collect_caches)
+
+
+def _directory_bytes(directory: Path) -> int:
+    total = 0
+    try:
+        for path in directory.iterdir():
+            if path.is_file():
+                total += path.stat().st_size
+    except OSError:
+        pass
+    return total
+
+
+def _collect_caches() -> None:
+    totals: Dict[str, Dict[str, Any]] = {}
+    for cache in list(_watched_caches):
+        directory = Path(cache.cache_dir)
+        stats = cache.get_stats()
+        entry = totals.setdefault(str(directory), {'dir': directory, 'entries': 0, 'hits': 0, 'misses': 0})
+        entry['entries'] += stats.get('entries', stats.get('memory_entries', 0))
+        entry['hits'] += stats.get('hits', 0)
+        entry['misses'] += stats.get('misses', 0)
+    for label, entry in totals.items():
+        CACHE_ENTRIES.set(entry['entries'], cache=label)
+        CACHE_HITS.set_total(entry['hits'], cache=label)
+        CACHE_MISSES.set_total(entry['misses'], cache=label)
+        CACHE_BYTES.set(_directory_bytes(entry['dir']), cache=label)
+
+
+# ----------------------------------------------------------------------------
+# Exporters
+# ----------------------------------------------------------------------------
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    registry: MetricsRegistry
+
+    def do_GET(self):
+        if self.path.split("?", 1)[0] not in ("/metrics", "/"):
+            self.send_error(404)
+            return
+        body = self.registry.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logger.debug("metrics: " + format % args)
+
+
+def start_metrics_server(port: int, host: str = "127.0.0.1",
+                         registry: Optional[MetricsRegistry] = None) -> ThreadingHTTPServer:
+    """Serve /metrics from a daemon thread. Port 0 picks a free port (see server.server_address)."""
+    handler = type("MetricsHandler", (_MetricsHandler,), {'registry': registry or get_metrics_registry()})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    logger.info(f"Serving metrics on http://{host}:{server.server_address[1]}/metrics")
+    return server
+
+
+def write_metrics_file(path: str, registry: Optional[MetricsRegistry] = None) -> Path:
+    """Write the current metrics to path atomically (for a textfile collector)."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    tmp.write_text((registry or get_metrics_registry()).render(), encoding="utf-8")
+    os.replace(tmp, path)
+    return path
+
+
+def _write_periodically(path: str, interval: float, stop: threading.Event) -> None:
+    while not stop.wait(interval):
+        try:
+            write_metrics_file(path)
+        except OSError as e:
+            logger.warning(f"Could not write metrics to {path}: {e}")
+
+
+_exporter_started = False
+_exporter_lock = threading.Lock()
+
+
+def start_metrics_exporter() -> bool:
+    """
+    Start the exporters configured by METRICS_PORT / METRICS_FILE, once per
+    process (Streamlit re-runs the app script on every interaction).
+
+    Returns:
+        True if an exporter is running
+    """
+    global _exporter_started
+    with _exporter_lock:
+        if _exporter_started:
+            return True
+        port = os.environ.get("METRICS_PORT")
+        path = os.environ.get("METRICS_FILE")
+        if port:
+            try:
+                start_metrics_server(int(port), os.environ.get("METRICS_HOST", "127.0.0.1"))
+                _exporter_started = True
+            except (OSError, ValueError) as e:
+                logger.warning(f"Could not start metrics server on port {port}: {e}")
+        if path:
+            interval = float(os.environ.get("METRICS_FILE_INTERVAL", DEFAULT_FILE_INTERVAL))
+            threading.Thread(target=_write_periodically, args=(path, interval, threading.Event()),
+                             name="metrics-file", daemon=True).start()
+            _exporter_started = True
+        return _exporter_started
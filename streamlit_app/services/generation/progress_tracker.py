@@ -34,6 +34,7 @@ class ProgressTracker:
         self.pass_indicator = pass_indicator
         self.log_manager = log_manager
         self.log_display = log_display
+        self._rendered_seq: Optional[int] = None
 
     def update_progress_pass_based(self, progress_pct: float, current_word: str, status: str) -> None:
         """
@@ -111,8 +112,22 @@ class ProgressTracker:
         self.log_manager.log_message(log_message)
 
         # Update log display in real-time if provided
-        if self.log_display:
-            self.log_display.code(self.log_manager.get_display_logs(), language=None)
+        self.refresh_log_display()
+
+    def refresh_log_display(self, force: bool = False) -> None:
+        """
+        Re-render the log tail, skipping the render when nothing new was logged.
+
+        Args:
+            force: Render even if no records were added since the last render
+        """
+        if not self.log_display:
+            return
+        last_seq = self.log_manager.last_seq
+        if not force and last_seq == self._rendered_seq:
+            return
+        self.log_display.code(self.log_manager.get_display_logs(), language=None)
+        self._rendered_seq = last_seq
 
     def reset_progress(self) -> None:
         """Reset all progress indicators to initial state."""
@@ -0,0 +1,303 @@
+"""
+Sentence Deduplication Service
+
+With topics enabled and high-frequency words, Gemini often returns the same
+or nearly the same sentence for several words of a deck. Every copy used to
+be grammar-analyzed, synthesized and image-searched on its own.
+
+SentenceDeduplicator runs after sentence generation for each word and keeps
+the deck seen so far. Sentences are compared on normalized text (Unicode
+NFC, case, punctuation and whitespace folded) and, for near-duplicates, on
+MinHash signatures of character shingles, which also works for scripts
+written without spaces.
+
+- Duplicates within a word and near-duplicates of any earlier sentence are
+  replaced in one batched generation call.
+- A sentence that exactly repeats one already in the deck (or that no
+  replacement could fix) shares that sentence's audio and image instead of
+  paying for them again. Grammar is shared only when the earlier sentence
+  was analyzed for the same word, since the analysis highlights and
+  explains the target word.
+"""
+
+import logging
+import re
+import unicodedata
+import zlib
+from dataclasses import asdict, dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_NEAR_DUPLICATE_THRESHOLD = 0.8  # Estimated Jaccard similarity of shingle sets
+DEFAULT_NUM_PERMUTATIONS = 64
+SHINGLE_SIZE = 3
+REPLACEMENT_SLACK = 2                   # Extra sentences requested so some replacements can be rejected
+
+# Sentence fields produced by grammar analysis, shared along with audio and image within a word
+GRAMMAR_FIELDS = ('colored_sentence', 'word_explanations', 'grammar_summary')
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_WHITESPACE = re.compile(r'\s+')
+
+
+def normalize_sentence(text: str) -> str:
+    """Normalize a sentence for comparison: NFC, casefold, punctuation dropped, whitespace collapsed."""
+    text = unicodedata.normalize('NFC', text or '').casefold()
+    text = ''.join(' ' if unicodedata.category(char).startswith('P') else char for char in text)
+    return _WHITESPACE.sub(' ', text).strip()
+
+
+def shingles(normalized: str, size: int = SHINGLE_SIZE) -> set:
+    """Character shingles of a normalized sentence (the whole text if it is shorter)."""
+    if len(normalized) <= size:
+        return {normalized}
+    return {normalized[i:i + size] for i in range(len(normalized) - size + 1)}
+
+
+class MinHasher:
+    """Fixed-size MinHash signatures whose agreement estimates Jaccard similarity."""
+
+    def __init__(self, num_permutations: int = DEFAULT_NUM_PERMUTATIONS, seed: int = 1):
+        # Deterministic coefficients so signatures are comparable across reruns
+        state = seed
+        self._coefficients = []
+        for _ in range(num_permutations):
+            state = (state * 6364136223846793005 + 1442695040888963407) % (1 << 64)
+            a = state % _MERSENNE_PRIME or 1
+            state = (state * 6364136223846793005 + 1442695040888963407) % (1 << 64)
+            self._coefficients.append((a, state % _MERSENNE_PRIME))
+
+    def signature(self, normalized: str) -> Tuple[int, ...]:
+        hashes = [zlib.crc32(shingle.encode('utf-8')) for shingle in shingles(normalized)]
+        return tuple(min((a * h + b) % _MERSENNE_PRIME for h in hashes) for a, b in self._coefficients)
+
+    @staticmethod
+    def similarity(first: Tuple[int, ...], second: Tuple[int, ...]) -> float:
+        if not first or len(first) != len(second):
+            return 0.0
+        return sum(x == y for x, y in zip(first, second)) / len(first)
+
+
+@dataclass
+class DeckSentence:
+    """A sentence already in the deck and the artifacts generated for it."""
+    word: str
+    normalized: str
+    signature: Tuple[int, ...]
+    sentence: Dict[str, Any]
+    audio_file: str = ""
+    image_file: str = ""
+
+
+@dataclass
+class DedupPlan:
+    """
+    Outcome of deduplicating one word's sentences.
+
+    shared_from maps a sentence position to the deck sentence whose artifacts
+    it reuses, or to the earlier position in the same word it repeats.
+    """
+    sentences: List[Dict[str, Any]]
+    shared_from: Dict[int, Any] = field(default_factory=dict)
+    replaced: int = 0
+    word: str = ""
+
+    def unique_indices(self) -> List[int]:
+        """Positions that still need audio and images of their own."""
+        return [i for i in range(len(self.sentences)) if i not in self.shared_from]
+
+    def shares_grammar(self, i: int) -> bool:
+        """Whether position i can reuse its source's grammar, i.e. it was analyzed for this word."""
+        source = self.shared_from.get(i)
+        if source is None:
+            return False
+        return isinstance(source, int) or source.word == self.word
+
+    def grammar_indices(self) -> List[int]:
+        """Positions that still need grammar analysis of their own."""
+        return [i for i in range(len(self.sentences)) if not self.shares_grammar(i)]
+
+    def source_index(self, i: int) -> Optional[int]:
+        """Position in the same word that position i repeats, if any."""
+        source = self.shared_from.get(i)
+        return source if isinstance(source, int) else None
+
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON-ready form (for generation checkpoints)."""
+        return {
+            'sentences': self.sentences,
+            'shared_from': [[i, source if isinstance(source, int) else asdict(source)]
+                            for i, source in self.shared_from.items()],
+            'replaced': self.replaced,
+            'word': self.word,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "DedupPlan":
+        shared_from = {}
+        for i, source in data.get('shared_from', []):
+            if isinstance(source, dict):
+                source = DeckSentence(**{**source, 'signature': tuple(source.get('signature', ()))})
+            shared_from[int(i)] = source
+        return cls(sentences=data['sentences'], shared_from=shared_from, replaced=data.get('replaced', 0),
+                   word=data.get('word', ""))
+
+
+class SentenceDeduplicator:
+    """
+    Deck-wide sentence deduplication.
+
+    Usage (once per word, in deck order):
+        plan = dedup.deduplicate(word, sentences, request_replacements)
+        ...  # analyze only plan.grammar_indices(); synthesize and search only plan.unique_indices()
+        apply_shared_grammar(plan)
+        audio_files = expand_shared_files(plan, unique_audio_files, 'audio')
+        dedup.register(word, plan.sentences, audio_files, image_files)
+    """
+
+    def __init__(self, threshold: float = DEFAULT_NEAR_DUPLICATE_THRESHOLD,
+                 num_permutations: int = DEFAULT_NUM_PERMUTATIONS):
+        self.threshold = threshold
+        self.hasher = MinHasher(num_permutations)
+        self._deck: List[DeckSentence] = []
+        self._by_text: Dict[str, DeckSentence] = {}
+        self.stats = {'sentences': 0, 'replaced': 0, 'shared': 0, 'replacement_calls': 0}
+
+    def _deck_match(self, normalized: str, signature: Tuple[int, ...]) -> Tuple[Optional[str], Optional[DeckSentence]]:
+        exact = self._by_text.get(normalized)
+        if exact is not None:
+            return 'exact', exact
+        for entry in self._deck:
+            if self.hasher.similarity(signature, entry.signature) >= self.threshold:
+                return 'near', entry
+        return None, None
+
+    def _classify(self, texts: List[str]) -> List[Tuple[Optional[str], Any]]:
+        """
+        Per sentence: (None, None) if new, ('exact', DeckSentence) for a deck repeat,
+        ('near', DeckSentence) for a deck near-duplicate, or ('exact'|'near', index)
+        for a repeat of an earlier position in the same list.
+        """
+        normalized = [normalize_sentence(t) for t in texts]
+        signatures = [self.hasher.signature(n) for n in normalized]
+        matches: List[Tuple[Optional[str], Any]] = []
+        for i, (norm, sig) in enumerate(zip(normalized, signatures)):
+            kind, source = self._deck_match(norm, sig)
+            if kind is None:
+                for j in range(i):
+                    if matches[j][0] is not None:
+                        continue
+                    if normalized[j] == norm:
+                        kind, source = 'exact', j
+                        break
+                    if self.hasher.similarity(sig, signatures[j]) >= self.threshold:
+                        kind, source = 'near', j
+                        break
+            matches.append((kind, source))
+        return matches
+
+    def deduplicate(self, word: str, sentences: List[Dict[str, Any]],
+                    request_replacements: Optional[Callable[[int], List[Dict[str, Any]]]] = None) -> DedupPlan:
+        """
+        Deduplicate one word's sentences against each other and the deck so far.
+
+        Args:
+            word: Word the sentences were generated for
+            sentences: Sentence dicts (with a 'sentence' key) in card order
+            request_replacements: Generates n new sentence dicts for the word in one call
+
+        Returns:
+            DedupPlan with the final sentences and the positions that share artifacts
+        """
+        sentences = list(sentences)
+        matches = self._classify([s.get('sentence', '') for s in sentences])
+
+        # Deck repeats are shared for free; everything else that collides is worth a new sentence
+        to_replace = [i for i, (kind, source) in enumerate(matches)
+                      if kind == 'near' or (kind == 'exact' and isinstance(source, int))]
+        replaced = 0
+        if to_replace and request_replacements is not None:
+            try:
+                self.stats['replacement_calls'] += 1
+                candidates = request_replacements(len(to_replace) + REPLACEMENT_SLACK) or []
+            except Exception as e:
+                logger.warning(f"Replacement sentences for '{word}' failed, keeping duplicates: {e}")
+                candidates = []
+            for candidate in candidates:
+                if not to_replace:
+                    break
+                position = to_replace[0]
+                trial = sentences[:position] + [candidate] + sentences[position + 1:]
+                if self._classify([s.get('sentence', '') for s in trial])[position][0] is None:
+                    sentences[position] = candidate
+                    to_replace.pop(0)
+                    replaced += 1
+            if replaced:
+                matches = self._classify([s.get('sentence', '') for s in sentences])
+
+        plan = DedupPlan(sentences=sentences, replaced=replaced, word=word)
+        for i, (kind, source) in enumerate(matches):
+            # Only exact repeats can share artifacts; near-duplicates that survive keep their own
+            if kind == 'exact':
+                plan.shared_from[i] = source
+
+        self.stats['sentences'] += len(sentences)
+        self.stats['replaced'] += replaced
+        self.stats['shared'] += len(plan.shared_from)
+        if replaced or plan.shared_from:
+            logger.info(f"Dedup for '{word}': {replaced} replaced, {len(plan.shared_from)} sharing artifacts")
+        return plan
+
+    def register(self, word: str, sentences: List[Dict[str, Any]],
+                 audio_files: List[str], image_files: List[str]) -> None:
+        """Add a finished word's sentences and their artifacts to the deck."""
+        for i, sentence in enumerate(sentences):
+            normalized = normalize_sentence(sentence.get('sentence', ''))
+            if normalized in self._by_text:
+                continue
+            entry = DeckSentence(
+                word=word,
+                normalized=normalized,
+                signature=self.hasher.signature(normalized),
+                sentence=sentence,
+                audio_file=audio_files[i] if i < len(audio_files) else "",
+                image_file=image_files[i] if i < len(image_files) else "",
+            )
+            self._deck.append(entry)
+            self._by_text[normalized] = entry
+
+
+def apply_shared_grammar(plan: DedupPlan) -> None:
+    """Copy grammar fields onto positions that repeat a sentence analyzed for the same word."""
+    for i, source in plan.shared_from.items():
+        if not plan.shares_grammar(i):
+            continue
+        origin = plan.sentences[source] if isinstance(source, int) else source.sentence
+        for key in GRAMMAR_FIELDS:
+            if key in origin:
+                plan.sentences[i][key] = origin[key]
+
+
+def expand_shared_files(plan: DedupPlan, unique_files: List[str], kind: str) -> List[str]:
+    """
+    Spread files generated for plan.unique_indices() over every position.
+
+    Args:
+        plan: Dedup plan for the word
+        unique_files: Files generated for the unique positions, in order (may be shorter)
+        kind: 'audio' or 'image'
+
+    Returns:
+        One file name per sentence ("" where none exists)
+    """
+    files = [""] * len(plan.sentences)
+    for i, name in zip(plan.unique_indices(), unique_files):
+        files[i] = name or ""
+    for i in sorted(plan.shared_from):
+        source = plan.shared_from[i]
+        if isinstance(source, int):
+            files[i] = files[source]
+        else:
+            files[i] = source.audio_file if kind == 'audio' else source.image_file
+    return files
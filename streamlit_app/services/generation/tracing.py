@@ -0,0 +1,397 @@
+"""
+Generation Tracing Service
+
+Lightweight spans showing where a deck's time went: each pass of
+generate_deck_progressive, every Gemini, TTS, Pixabay and Wiktionary call,
+response parsing, validation and the APKG export. Spans nest, carry
+attributes (language, word, batch size, tokens, bytes) and are written as
+they finish to a local JSONL file; the whole trace can be exported as
+OTLP/JSON, which OpenTelemetry collectors and trace viewers import.
+
+Instrumented code calls the module-level span(); with no active tracer it
+does nothing, so library code and tests pay one context-variable lookup.
+The exceptions are client spans (external API calls) and pass.* spans, which
+are always timed because they also feed the process metrics (metrics.py).
+
+    tracer = Tracer(jsonl_path="logs/generation.trace.jsonl", attributes={"language": "Spanish"})
+    with tracer.activate():
+        with span("pass.grammar", word="comer", batch_size=10) as s:
+            ...
+            s.set("tokens", 812)
+    tracer.summary()                       # per span name: count, total, p95, tokens, bytes
+    tracer.export_otlp("logs/generation.otlp.json")
+
+Spans opened on pool threads nest under the submitting span when the work is
+wrapped with in_current_context(); asyncio tasks and to_thread inherit it.
+
+Summarize or convert a recorded trace with:
+
+    python -m streamlit_app.services.generation.tracing logs/generation_....trace.jsonl [--otlp out.json]
+"""
+
+import argparse
+import contextlib
+import contextvars
+import json
+import logging
+import math
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from streamlit_app.services.generation import metrics
+
+logger = logging.getLogger(__name__)
+
+SERVICE_NAME = "language-learning-deck-generator"
+MAX_SPANS = 20000               # Spans kept in memory per tracer; the JSONL file has them all
+# Numeric attributes added up per span name in the summary
+SUMMED_ATTRIBUTES = ("tokens", "bytes", "chars", "batch_size")
+
+_current_tracer: contextvars.ContextVar[Optional["Tracer"]] = contextvars.ContextVar("generation_tracer", default=None)
+_current_span: contextvars.ContextVar[Optional["Span"]] = contextvars.ContextVar("generation_span", default=None)
+
+
+class Span:
+    """One timed operation with attributes. Finished spans are read-only by convention."""
+
+    def __init__(self, name: str, trace_id: str, parent_id: Optional[str], kind: str,
+                 attributes: Dict[str, Any]):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.kind = kind
+        self.attributes = {key: value for key, value in attributes.items() if value is not None}
+        self.start_unix_ns = time.time_ns()
+        self._start = time.perf_counter_ns()
+        self.duration_ns: Optional[int] = None
+        self.error: Optional[str] = None
+
+    def set(self, key: str, value: Any) -> None:
+        if value is not None:
+            self.attributes[key] = value
+
+    def set_attributes(self, **attributes: Any) -> None:
+        for key, value in attributes.items():
+            self.set(key, value)
+
+    def add(self, key: str, amount: float) -> None:
+        """Add to a numeric attribute (e.g. bytes over several chunks)."""
+        self.attributes[key] = self.attributes.get(key, 0) + amount
+
+    def end(self) -> None:
+        if self.duration_ns is None:
+            self.duration_ns = time.perf_counter_ns() - self._start
+
+    @property
+    def duration_s(self) -> float:
+        return (self.duration_ns or 0) / 1e9
+
+    def to_record(self) -> Dict[str, Any]:
+        """One JSONL line."""
+        return {
+            'trace_id': self.trace_id,
+            'span_id': self.span_id,
+            'parent_id': self.parent_id,
+            'name': self.name,
+            'kind': self.kind,
+            'start_unix_ns': self.start_unix_ns,
+            'duration_ms': round(self.duration_s * 1000, 3),
+            'status': 'error' if self.error else 'ok',
+            'error': self.error,
+            'attributes': self.attributes,
+        }
+
+    def to_otlp(self) -> Dict[str, Any]:
+        """The span in OTLP/JSON form."""
+        return {
+            'traceId': self.trace_id,
+            'spanId': self.span_id,
+            'parentSpanId': self.parent_id or "",
+            'name': self.name,
+            'kind': 3 if self.kind == 'client' else 1,  # SPAN_KIND_CLIENT / SPAN_KIND_INTERNAL
+            'startTimeUnixNano': str(self.start_unix_ns),
+            'endTimeUnixNano': str(self.start_unix_ns + (self.duration_ns or 0)),
+            'attributes': _otlp_attributes(self.attributes),
+            'status': {'code': 2, 'message': self.error} if self.error else {'code': 1},
+        }
+
+    @classmethod
+    def from_record(cls, record: Dict[str, Any]) -> "Span":
+        span = cls.__new__(cls)
+        span.name = record['name']
+        span.trace_id = record['trace_id']
+        span.span_id = record['span_id']
+        span.parent_id = record.get('parent_id')
+        span.kind = record.get('kind', 'internal')
+        span.attributes = record.get('attributes', {})
+        span.start_unix_ns = record['start_unix_ns']
+        span._start = 0
+        span.duration_ns = int(record['duration_ms'] * 1e6)
+        span.error = record.get('error')
+        return span
+
+
+class _NoopSpan:
+    """Stand-in returned when no tracer is active."""
+
+    def set(self, key: str, value: Any) -> None:
+        pass
+
+    def set_attributes(self, **attributes: Any) -> None:
+        pass
+
+    def add(self, key: str, amount: float) -> None:
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {'boolValue': value}
+    if isinstance(value, int):
+        return {'intValue': str(value)}
+    if isinstance(value, float):
+        return {'doubleValue': value}
+    if isinstance(value, (list, tuple)):
+        return {'arrayValue': {'values': [_otlp_value(item) for item in value]}}
+    return {'stringValue': str(value)}
+
+
+def _otlp_attributes(attributes: Dict[str, Any]) -> List[Dict[str, Any]]:
+    return [{'key': key, 'value': _otlp_value(value)} for key, value in attributes.items()]
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(pct * len(ordered)) - 1)]
+
+
+class Tracer:
+    """
+    Collects the spans of one deck (one trace) and exports them.
+
+    Usage:
+        tracer = Tracer(jsonl_path="logs/deck.trace.jsonl")
+        with tracer.activate():
+            ...  # code calling span()
+        rows = tracer.summary()
+    """
+
+    def __init__(self, jsonl_path: Optional[str] = None, attributes: Optional[Dict[str, Any]] = None,
+                 max_spans: int = MAX_SPANS):
+        """
+        Initialize the tracer.
+
+        Args:
+            jsonl_path: File each finished span is appended to (None keeps spans in memory only)
+            attributes: Resource attributes for the whole trace (e.g. language)
+            max_spans: Finished spans kept in memory for summary() and export_otlp()
+        """
+        self.trace_id = os.urandom(16).hex()
+        self.jsonl_path = Path(jsonl_path) if jsonl_path else None
+        self.attributes = dict(attributes or {})
+        self.max_spans = max_spans
+        self.spans: List[Span] = []
+        self.dropped = 0
+        self._lock = threading.Lock()
+        if self.jsonl_path:
+            self.jsonl_path.parent.mkdir(parents=True, exist_ok=True)
+
+    @contextlib.contextmanager
+    def activate(self) -> Iterator["Tracer"]:
+        """Make this the tracer span() records to, for the current context."""
+        token = _current_tracer.set(self)
+        try:
+            yield self
+        finally:
+            _current_tracer.reset(token)
+
+    def _finish(self, span: Span) -> None:
+        with self._lock:
+            self.spans.append(span)
+            if len(self.spans) > self.max_spans:
+                del self.spans[0]
+                self.dropped += 1
+            if self.jsonl_path:
+                try:
+                    with open(self.jsonl_path, "a", encoding="utf-8") as f:
+                        f.write(json.dumps(span.to_record(), ensure_ascii=False, default=str) + "\n")
+                except OSError as e:
+                    logger.warning(f"Could not write trace span to {self.jsonl_path}: {e}")
+
+    def summary(self) -> List[Dict[str, Any]]:
+        """
+        Per span name: count, errors, total_s, mean_ms, p95_ms, max_ms, share of the
+        traced time (root spans added up) and SUMMED_ATTRIBUTES totals, slowest first.
+        """
+        with self._lock:
+            spans = list(self.spans)
+        return summarize(spans)
+
+    def export_otlp(self, path: str) -> Path:
+        """Write the trace as OTLP/JSON (ExportTraceServiceRequest) and return the path."""
+        with self._lock:
+            spans = list(self.spans)
+        return export_otlp(spans, path, self.attributes)
+
+
+def summarize(spans: List[Span]) -> List[Dict[str, Any]]:
+    """Summary rows for a list of finished spans (see Tracer.summary)."""
+    traced_total = sum(s.duration_s for s in spans if s.parent_id is None) or 1.0
+    by_name: Dict[str, List[Span]] = {}
+    for s in spans:
+        by_name.setdefault(s.name, []).append(s)
+
+    rows = []
+    for name, group in by_name.items():
+        durations = [s.duration_s for s in group]
+        total = sum(durations)
+        row = {
+            'span': name,
+            'count': len(group),
+            'errors': sum(1 for s in group if s.error),
+            'total_s': round(total, 3),
+            'mean_ms': round(total / len(group) * 1000, 1),
+            'p95_ms': round(_percentile(durations, 0.95) * 1000, 1),
+            'max_ms': round(max(durations) * 1000, 1),
+            'share': round(total / traced_total, 3),
+        }
+        for key in SUMMED_ATTRIBUTES:
+            values = [s.attributes[key] for s in group if isinstance(s.attributes.get(key), (int, float))]
+            if values:
+                row[key] = sum(values)
+        rows.append(row)
+    rows.sort(key=lambda row: row['total_s'], reverse=True)
+    return rows
+
+
+def export_otlp(spans: List[Span], path: str, attributes: Optional[Dict[str, Any]] = None) -> Path:
+    """Write spans as an OTLP/JSON file."""
+    payload = {
+        'resourceSpans': [{
+            'resource': {'attributes': _otlp_attributes({'service.name': SERVICE_NAME, **(attributes or {})})},
+            'scopeSpans': [{
+                'scope': {'name': __name__},
+                'spans': [s.to_otlp() for s in spans],
+            }],
+        }],
+    }
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    tmp.write_text(json.dumps(payload, ensure_ascii=False, default=str), encoding="utf-8")
+    os.replace(tmp, path)
+    return path
+
+
+def load_jsonl(path: str) -> List[Span]:
+    """Spans from a JSONL trace file."""
+    spans = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                spans.append(Span.from_record(json.loads(line)))
+    return spans
+
+
+def _error_status(error: BaseException) -> Optional[int]:
+    """HTTP status carried by a requests HTTPError or a google-genai APIError."""
+    status = getattr(getattr(error, 'response', None), 'status_code', None)
+    if status is None:
+        status = getattr(error, 'code', None)
+    return status if isinstance(status, int) else None
+
+
+@contextlib.contextmanager
+def span(name: str, kind: str = "internal", **attributes: Any) -> Iterator[Any]:
+    """
+    Time the enclosed block as a span of the active tracer.
+
+    Args:
+        name: Span name, e.g. "pass.grammar" or "gemini.generate"
+        kind: "client" for calls to external services, else "internal"
+        **attributes: Initial attributes (None values are skipped)
+
+    Yields:
+        The Span (or a no-op stand-in when no tracer is active); errors raised
+        inside mark the span failed and propagate.
+    """
+    tracer = _current_tracer.get()
+    observed = kind == "client" or name.startswith("pass.")
+    if tracer is None and not observed:
+        yield NOOP_SPAN
+        return
+
+    parent = _current_span.get() if tracer is not None else None
+    current = Span(name, parent.trace_id if parent else tracer.trace_id if tracer else "",
+                   parent.span_id if parent else None, kind, attributes)
+    token = _current_span.set(current) if tracer is not None else None
+    if observed:
+        metrics.observe_span_start(name, kind)
+    try:
+        yield current
+    except BaseException as e:
+        current.error = f"{type(e).__name__}: {e}"[:300]
+        current.set("status", _error_status(e))
+        raise
+    finally:
+        if token is not None:
+            try:
+                _current_span.reset(token)
+            except ValueError:
+                pass  # A generator holding the span was closed from another context
+        current.end()
+        if observed:
+            metrics.observe_span_end(current)
+        if tracer is not None:
+            tracer._finish(current)
+
+
+def current_span() -> Any:
+    """The innermost open span, or a no-op stand-in."""
+    if _current_tracer.get() is None:
+        return NOOP_SPAN
+    return _current_span.get() or NOOP_SPAN
+
+
+def in_current_context(func: Callable) -> Callable:
+    """Wrap func to run in a copy of the caller's context, so spans opened on pool threads nest under the caller's span."""
+    context = contextvars.copy_context()
+
+    def run(*args, **kwargs):
+        return context.copy().run(func, *args, **kwargs)
+
+    return run
+
+
+def format_summary(rows: List[Dict[str, Any]]) -> str:
+    """Plain-text table of summary rows."""
+    lines = [f"{'span':<28}{'count':>7}{'errors':>8}{'total s':>10}{'mean ms':>10}{'p95 ms':>10}{'share':>8}{'tokens':>9}{'bytes':>12}"]
+    for row in rows:
+        lines.append(
+            f"{row['span']:<28}{row['count']:>7}{row['errors']:>8}{row['total_s']:>10}{row['mean_ms']:>10}"
+            f"{row['p95_ms']:>10}{row['share']:>8.1%}{row.get('tokens', ''):>9}{row.get('bytes', ''):>12}"
+        )
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Summarize a generation trace")
+    parser.add_argument("trace", help="JSONL trace written during generation")
+    parser.add_argument("--otlp", help="Also convert it to an OTLP/JSON file")
+    args = parser.parse_args()
+
+    spans = load_jsonl(args.trace)
+    print(format_summary(summarize(spans)))
+    if args.otlp:
+        print(f"\nOTLP trace written to {export_otlp(spans, args.otlp)}")
+
+
+if __name__ == "__main__":
+    main()
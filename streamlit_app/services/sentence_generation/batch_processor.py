@@ -8,6 +8,9 @@ from typing import List, Dict, Any, Optional, Tuple
 
 from .api_client import APIClient
 from .data_transformer import DataTransformer
+from streamlit_app.language_analyzers.prompt_cache import estimate_tokens
+from streamlit_app.language_analyzers.token_annotations import TokenAnnotations
+from streamlit_app.services.generation.adaptive_batcher import AdaptiveBatcher, get_adaptive_batcher
 
 logger = logging.getLogger(__name__)
 
@@ -16,17 +19,19 @@ class BatchProcessor:
     """
     Service for handling batch processing of sentences.
     Provides unified batch processing for both analyzer-specific and generic languages.
+    Chunk sizes come from an AdaptiveBatcher (the persisted global one by default).
     """
 
-    def __init__(self, api_client: APIClient):
+    def __init__(self, api_client: APIClient, batcher: Optional[AdaptiveBatcher] = None):
         self.api_client = api_client
+        self.batcher = batcher or get_adaptive_batcher()
 
     def process_batch(self, sentences: List[str], word: str, language: str,
                      language_code: str, analyzer=None, complexity_level: str = "beginner",
                      native_language: str = "English") -> List[Dict[str, Any]]:
         """
-        Process a batch of sentences for grammar analysis using 8-sentence chunks.
-        This ensures efficient batch processing with maximum 8 sentences per API call.
+        Process a batch of sentences for grammar analysis in adaptively sized chunks.
+        Chunks are sized to the output budget learned for the language and complexity.
 
         Args:
             sentences: List of sentences to analyze
@@ -43,15 +48,14 @@ class BatchProcessor:
         if not sentences:
             return []
 
-        logger.info(f"Processing batch of {len(sentences)} sentences for {language} using 8-sentence chunks")
+        chunks = self.batcher.plan_batches(sentences, language_code, complexity_level)
+        logger.info(f"Processing batch of {len(sentences)} sentences for {language} in {len(chunks)} chunks")
 
-        # Process sentences in chunks of 8 to optimize API usage
-        chunk_size = 8
         all_results = []
 
-        for i in range(0, len(sentences), chunk_size):
-            chunk = sentences[i:i + chunk_size]
-            logger.info(f"Processing chunk {i//chunk_size + 1} with {len(chunk)} sentences")
+        for chunk_number, positions in enumerate(chunks, 1):
+            chunk = [sentences[p] for p in positions]
+            logger.info(f"Processing chunk {chunk_number} with {len(chunk)} sentences")
 
             try:
                 # Process this chunk as a batch
@@ -65,9 +69,12 @@ class BatchProcessor:
                     native_language=native_language
                 )
 
+                # Sentences missing from the response are retried like failed ones
+                chunk_results = list(chunk_results) + [None] * (len(chunk) - len(chunk_results))
+
                 # If some sentences failed, retry only those individually
                 if failed_indices:
-                    logger.warning(f"Chunk {i//chunk_size + 1} had {len(failed_indices)} failed sentences, retrying individually")
+                    logger.warning(f"Chunk {chunk_number} had {len(failed_indices)} failed sentences, retrying individually")
                     failed_sentences = [chunk[idx] for idx in failed_indices]
                     retry_results = self._process_sentences_individually(
                         sentences=failed_sentences,
@@ -86,9 +93,9 @@ class BatchProcessor:
                 all_results.extend(chunk_results)
 
             except Exception as e:
-                logger.error(f"Chunk processing failed for chunk {i//chunk_size + 1}: {e}")
+                logger.error(f"Chunk processing failed for chunk {chunk_number}: {e}")
                 # Fallback: Process entire chunk individually
-                logger.info(f"Falling back to individual processing for entire chunk {i//chunk_size + 1}")
+                logger.info(f"Falling back to individual processing for entire chunk {chunk_number}")
                 chunk_fallback_results = self._process_sentences_individually(
                     sentences=chunk,
                     word=word,
@@ -107,8 +114,9 @@ class BatchProcessor:
                       language_code: str, analyzer=None, complexity_level: str = "beginner",
                       native_language: str = "English") -> Tuple[List[Dict[str, Any]], List[int]]:
         """
-        Process a chunk of up to 8 sentences as a single batch API call.
+        Process a chunk of sentences as a single batch API call.
         Returns processed results and indices of failed sentences for partial fallback.
+        The outcome is recorded with the adaptive batcher.
         """
         # Create batch prompt for this chunk
         prompt = self._create_batch_prompt(
@@ -145,13 +153,21 @@ class BatchProcessor:
             for i, result in enumerate(processed_results):
                 if not result.get("word_explanations") or len(result.get("word_explanations", [])) == 0:
                     failed_indices.append(i)
+            # Sentences the response never reached count as failed too
+            failed_indices.extend(range(len(processed_results), len(sentences)))
 
+            self.batcher.record_batch(
+                language_code, complexity_level, sentences,
+                output_tokens=estimate_tokens(response_text or ""),
+                failed_indices=failed_indices,
+            )
             return processed_results, failed_indices
 
         except Exception as e:
             logger.error(f"Chunk processing failed: {e}")
             # If batch fails completely, mark all as failed
             failed_indices = list(range(len(sentences)))
+            self.batcher.record_batch(language_code, complexity_level, sentences, failed_indices=failed_indices)
             return [], failed_indices
 
     def _create_batch_prompt(self, sentences: List[str], word: str, language: str,
@@ -278,7 +294,7 @@ Provide explanations in {native_language}. Return ONLY the JSON array, no additi
 
                     results_with_html.append({
                         "colored_sentence": colored_sentence,
-                        "word_explanations": word_explanations,
+                        "word_explanations": TokenAnnotations.from_rows(word_explanations),
                         "grammar_summary": grammar_summary,
                     })
 
@@ -347,7 +363,7 @@ Provide explanations in {native_language}. Return ONLY the JSON array, no additi
 
                     results.append({
                         "colored_sentence": colored_sentence,
-                        "word_explanations": word_explanations,
+                        "word_explanations": TokenAnnotations.from_rows(word_explanations),
                         "grammar_summary": grammar_summary,
                     })
 
@@ -364,7 +380,7 @@ Provide explanations in {native_language}. Return ONLY the JSON array, no additi
                     if isinstance(result, dict):
                         processed_results.append({
                             "colored_sentence": result.get("colored_sentence", sentences[i]),
-                            "word_explanations": result.get("word_explanations", []),
+                            "word_explanations": TokenAnnotations.from_rows(result.get("word_explanations", [])),
                             "grammar_summary": result.get("grammar_summary", ""),
                         })
                     else:
@@ -451,7 +467,7 @@ Return ONLY the JSON object."""
 
                     processed_results.append({
                         "colored_sentence": colored_sentence,
-                        "word_explanations": word_explanations,
+                        "word_explanations": TokenAnnotations.from_rows(word_explanations),
                         "grammar_summary": grammar_summary,
                     })
 
@@ -475,7 +491,7 @@ Return ONLY the JSON object."""
 
         return processed_results
 
-    def _convert_analyzer_output_to_explanations(self, grammar_result: Dict[str, Any], language: str) -> List[List[Any]]:
+    def _convert_analyzer_output_to_explanations(self, grammar_result: Dict[str, Any], language: str) -> TokenAnnotations:
         """Convert analyzer output to word_explanations format."""
         # This is a simplified version - the full implementation is in sentence_generator.py
         explanations = []
@@ -496,7 +512,7 @@ Return ONLY the JSON object."""
                             color = DataTransformer.get_color_for_category("other", language)
                             explanations.append([word, structure, color, meaning])
 
-        return explanations
+        return TokenAnnotations.from_rows(explanations)
 
     def _generate_colored_sentence_from_explanations(self, sentence: str, word_explanations: List[List[Any]]) -> str:
         """Generate a colored HTML sentence from word explanations."""
@@ -9,6 +9,7 @@ from collections import defaultdict
 
 # Import language registry for consistent language handling
 from streamlit_app.language_registry import get_language_registry
+from streamlit_app.services.generation.metrics import IPA_TRANSCRIPTIONS
 
 logger = logging.getLogger(__name__)
 
@@ -337,6 +338,7 @@ class IPAService:
             ipa = self._try_epitran(text, normalized_lang)
             if ipa and self._validate_ipa(ipa, normalized_lang, strict=True):
                 self.metrics['tier_usage']['epitran'] += 1
+                IPA_TRANSCRIPTIONS.inc(tier='epitran')
                 response_time = time.time() - start_time
                 self.metrics['response_times'].append(response_time)
                 logger.info(f"IPA success via Epitran for {full_lang_name} ({response_time:.3f}s)")
@@ -346,6 +348,7 @@ class IPAService:
             ipa = self._try_phonemizer(text, normalized_lang)
             if ipa and self._validate_ipa(ipa, normalized_lang, strict=True):
                 self.metrics['tier_usage']['phonemizer'] += 1
+                IPA_TRANSCRIPTIONS.inc(tier='phonemizer')
                 response_time = time.time() - start_time
                 self.metrics['response_times'].append(response_time)
                 logger.info(f"IPA success via Phonemizer for {full_lang_name} ({response_time:.3f}s)")
@@ -354,6 +357,7 @@ class IPAService:
             # Tier 3: AI fallback (guaranteed)
             fallback_ipa = self._ensure_fallback_ipa(ai_ipa, text, normalized_lang)
             self.metrics['tier_usage']['ai_fallback'] += 1
+            IPA_TRANSCRIPTIONS.inc(tier='ai_fallback')
             response_time = time.time() - start_time
             self.metrics['response_times'].append(response_time)
             logger.info(f"IPA fallback used for {full_lang_name} ({response_time:.3f}s)")
@@ -361,6 +365,7 @@ class IPAService:
 
         except Exception as e:
             self.metrics['errors']['generation'] += 1
+            IPA_TRANSCRIPTIONS.inc(tier='error')
             response_time = time.time() - start_time
             self.metrics['response_times'].append(response_time)
             logger.error(f"IPA generation failed for {full_lang_name}: {e} ({response_time:.3f}s)")
@@ -16,6 +16,13 @@ from dataclasses import dataclass
 from datetime import datetime, timedelta
 from functools import wraps
 import random
+import threading
+import contextlib
+import contextvars
+import itertools
+
+from streamlit_app.services.generation.metrics import GEMINI_TOKENS, GEMINI_TRUNCATED
+from streamlit_app.services.generation.tracing import current_span, span
 
 logger = logging.getLogger(__name__)
 
@@ -417,6 +424,19 @@ CURATED_TOPICS = [
 
 # UI Constants
 PAGE_SIZE = 25
+# Explicit context caching for stable batch-prompt prefixes (see
+# language_analyzers/prompt_cache.py). Prefixes shorter than the model's
+# minimum cacheable size are sent in full.
+GEMINI_CONTEXT_CACHE = {
+    'enabled': True,
+    'ttl_seconds': 3600,
+    'min_prefix_tokens': 1024,
+}
+# Shared limit on Gemini calls made from any thread (parallel retries included)
+GEMINI_RATE_LIMIT = {
+    'max_concurrent': 4,
+    'requests_per_minute': 60,
+}
 
 # Color codes for usage bars
 USAGE_BAR_GREEN = "#238636"
@@ -441,6 +461,43 @@ SESSION_AUDIO_SPEED = "audio_speed"
 # GEMINI API WRAPPER WITH FALLBACKS
 # ============================================================================
 
+class GeminiRateLimiter:
+    """Caps concurrent Gemini calls and spaces call starts to a requests-per-minute rate."""
+
+    def __init__(self, max_concurrent: int = 4, requests_per_minute: int = 60):
+        self.max_concurrent = max_concurrent
+        self.min_interval = 60.0 / requests_per_minute if requests_per_minute else 0.0
+        self._slots = threading.BoundedSemaphore(max_concurrent)
+        self._lock = threading.Lock()
+        self._next_start = 0.0
+
+    def __enter__(self):
+        self._slots.acquire()
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next_start)
+            self._next_start = start + self.min_interval
+        if start > now:
+            time.sleep(start - now)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._slots.release()
+        return False
+
+
+@dataclass
+class GeminiUsage:
+    """Output tokens and truncated responses of the Gemini calls made inside GeminiAPI.measure_usage()."""
+    output_tokens: int = 0
+    truncated_responses: int = 0
+
+
+# Meters open in the current context; pool threads started with in_current_context() inherit them
+_usage_meters: contextvars.ContextVar = contextvars.ContextVar("gemini_usage_meters", default=())
+_usage_lock = threading.Lock()
+
+
 class GeminiAPI:
     """Unified Gemini API wrapper that supports both new and old APIs with fallbacks."""
 
@@ -448,6 +505,9 @@ class GeminiAPI:
         self.api_type = None
         self.client = None
         self.genai = None
+        self.context_cache = None
+        self._api_key = None
+        self.rate_limiter = GeminiRateLimiter(**GEMINI_RATE_LIMIT)
 
         # Try new API first
         try:
@@ -463,17 +523,141 @@ class GeminiAPI:
         """Configure the API with the provided key."""
         if self.api_type == 'new':
             self.client = self.genai.Client(api_key=api_key)
+            # Cached contents belong to the key's project; keep handles while the key is unchanged
+            if GEMINI_CONTEXT_CACHE['enabled'] and (self.context_cache is None or api_key != self._api_key):
+                from streamlit_app.language_analyzers.prompt_cache import GeminiContextCache
+                self.context_cache = GeminiContextCache(
+                    self,
+                    ttl_seconds=GEMINI_CONTEXT_CACHE['ttl_seconds'],
+                    min_prefix_tokens=GEMINI_CONTEXT_CACHE['min_prefix_tokens'],
+                )
+            self._api_key = api_key
         else:
             logger.warning("Mock API - no real configuration needed")
 
+    @contextlib.contextmanager
+    def measure_usage(self):
+        """Measure the Gemini calls made inside the block.
+
+        Only calls made from this context count (including retries on pool
+        threads started with in_current_context), never those of other
+        sessions or threads sharing this API instance.
+
+        Usage:
+            with api.measure_usage() as usage:
+                analyzer.batch_analyze_grammar(...)
+            usage.output_tokens, usage.truncated_responses
+        """
+        usage = GeminiUsage()
+        token = _usage_meters.set(_usage_meters.get() + (usage,))
+        try:
+            yield usage
+        finally:
+            _usage_meters.reset(token)
+
+    def _record_usage(self, response, text: Optional[str], model: str = "") -> None:
+        tokens = getattr(getattr(response, 'usage_metadata', None), 'candidates_token_count', None)
+        if not isinstance(tokens, int):
+            tokens = (len(text) + 3) // 4 if isinstance(text, str) else 0
+        meters = _usage_meters.get()
+        with _usage_lock:
+            for usage in meters:
+                usage.output_tokens += tokens
+        GEMINI_TOKENS.inc(tokens, model=model)
+        current_span().set_attributes(tokens=tokens, bytes=len(text.encode('utf-8')) if isinstance(text, str) else None)
+
+        candidates = getattr(response, 'candidates', None)
+        finish_reason = getattr(candidates[0], 'finish_reason', None) if isinstance(candidates, list) and candidates else None
+        if 'MAX_TOKENS' in str(finish_reason):
+            with _usage_lock:
+                for usage in meters:
+                    usage.truncated_responses += 1
+            GEMINI_TRUNCATED.inc(model=model)
+
     def generate_content(self, model: str, contents: str, **kwargs):
-        """Generate content using the appropriate API."""
+        """Generate content using the appropriate API.
+
+        Prompts built with a stable prefix (CacheablePrompt) send only their
+        variable suffix when the prefix is held in the context cache.
+        """
+        prefix = getattr(contents, 'prefix', None)
+        if prefix and self.context_cache is not None:
+            handle = self.context_cache.get_handle(model, prefix)
+            if handle:
+                config = dict(kwargs.get('config') or {})
+                config['cached_content'] = handle
+                try:
+                    return self._generate_content(model, contents.suffix, **{**kwargs, 'config': config})
+                except Exception as e:
+                    logger.warning(f"Cached prompt failed, resending full prompt: {e}")
+                    self.context_cache.invalidate(handle)
+        return self._generate_content(model, str(contents), **kwargs)
+
+    def generate_content_stream(self, model: str, contents: str, **kwargs):
+        """Generate content as a stream of text chunks.
+
+        Same prompt handling as generate_content. A cached prompt that fails
+        before its first chunk is resent in full; errors after that are raised
+        so the caller can keep what already arrived.
+        """
+        prefix = getattr(contents, 'prefix', None)
+        if prefix and self.context_cache is not None:
+            handle = self.context_cache.get_handle(model, prefix)
+            if handle:
+                config = dict(kwargs.get('config') or {})
+                config['cached_content'] = handle
+                received = False
+                try:
+                    for chunk in self._generate_content_stream(model, contents.suffix, **{**kwargs, 'config': config}):
+                        received = True
+                        yield chunk
+                    return
+                except Exception as e:
+                    if received:
+                        raise
+                    logger.warning(f"Cached prompt failed, resending full prompt: {e}")
+                    self.context_cache.invalidate(handle)
+        yield from self._generate_content_stream(model, str(contents), **kwargs)
+
+    def _generate_content_stream(self, model: str, contents: str, **kwargs):
+        if self.api_type == 'new':
+            response = None
+            streamed = []
+            with span("gemini.generate", kind="client", model=model, prompt_chars=len(contents), stream=True) as call:
+                try:
+                    # The rate limiter covers starting the request (sending it
+                    # and receiving the first chunk), not reading the stream:
+                    # a slow consumer must not hold a concurrency slot.
+                    with self.rate_limiter:
+                        stream = iter(self.client.models.generate_content_stream(
+                            model=model,
+                            contents=contents,
+                            **kwargs
+                        ))
+                        first = next(stream, None)
+                    if first is not None:
+                        for response in itertools.chain((first,), stream):
+                            if response.text:
+                                streamed.append(response.text)
+                                yield response.text
+                finally:
+                    if streamed:
+                        self._record_usage(response, "".join(streamed), model)
+                    call.set("chunks", len(streamed))
+        else:
+            yield self._generate_content(model, contents, **kwargs).text
+
+    def _generate_content(self, model: str, contents: str, **kwargs):
         if self.api_type == 'new':
-            return self.client.models.generate_content(
-                model=model,
-                contents=contents,
-                **kwargs
-            )
+            with span("gemini.generate", kind="client", model=model, prompt_chars=len(contents)):
+                with self.rate_limiter:
+                    response = self.client.models.generate_content(
+                        model=model,
+                        contents=contents,
+                        **kwargs
+                    )
+                self._record_usage(response, getattr(response, 'text', None), model)
+            return response
         else:
             # Mock response
             class MockResponse:
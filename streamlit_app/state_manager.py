@@ -13,7 +13,7 @@ from constants import (
     SESSION_COMPLETED_WORDS, SESSION_SELECTION_MODE, SESSION_SENTENCES_PER_WORD,
     SESSION_AUDIO_SPEED, SESSION_DIFFICULTY, SESSION_SELECTED_VOICE_DISPLAY,
     SESSION_SELECTED_VOICE, SESSION_LOG_STREAM, SESSION_ENABLE_TOPICS,
-    SESSION_SELECTED_TOPICS, SESSION_CUSTOM_TOPICS, PAGE_MAIN
+    SESSION_SELECTED_TOPICS, SESSION_CUSTOM_TOPICS, PAGE_MAIN, PAGE_GENERATING
 )
 
 
@@ -81,10 +81,10 @@ def initialize_session_state():
 
     # Logging
     if SESSION_LOG_STREAM not in st.session_state:
-        import io
         import logging
         import atexit
-        st.session_state[SESSION_LOG_STREAM] = io.StringIO()
+        from streamlit_app.services.generation.log_manager import BoundedLogStream
+        st.session_state[SESSION_LOG_STREAM] = BoundedLogStream()
         log_handler = logging.StreamHandler(st.session_state[SESSION_LOG_STREAM])
         log_handler.setLevel(logging.INFO)
         log_handler.setFormatter(logging.Formatter('%(asctime)s %(levelname)s:%(name)s:%(message)s'))
@@ -123,6 +123,31 @@ def initialize_session_state():
             st.session_state.cache_manager_initialized = False
 
 
+def restore_generation_job():
+    """
+    Resume an unfinished deck after a browser refresh or server restart.
+
+    The generating page keeps its job ID in the URL (?job=...); when a fresh
+    session arrives with one, restore the job's language, words and settings
+    and go straight back to the generating page, which picks up where the
+    job stopped.
+    """
+    job_id = st.query_params.get("job")
+    if not job_id or st.session_state.get("selected_words"):
+        return
+    from streamlit_app.services.generation.job_store import UNFINISHED, get_job_store
+    job = get_job_store().get_job(job_id)
+    if job is None or job['status'] not in UNFINISHED:
+        del st.query_params["job"]
+        return
+    st.session_state.selected_lang = job['language']
+    st.session_state.selected_words = job['words']
+    for key, value in job['params'].items():
+        st.session_state[key] = tuple(value) if key == "sentence_length_range" else value
+    st.session_state.generation_job_id = job_id
+    st.session_state[SESSION_PAGE] = PAGE_GENERATING
+
+
 def initialize_languages_config():
     """Initialize learned languages from config if not set."""
     config_path = Path(__file__).parent / LANGUAGES_CONFIG_PATH
@@ -0,0 +1,292 @@
+# Google TTS Voice Catalog
+# Cached, indexed list of Google Cloud Text-to-Speech voices
+
+"""
+The voice dropdowns on the settings pages used to download the full
+/v1/voices catalog (hundreds of voices) on every render and filter it
+client-side, a blocking call with a 10 second timeout.
+
+VoiceCatalog fetches the catalog once, indexes it by BCP-47 code and voice
+family (Standard, Wavenet, Neural2, Chirp3-HD, ...) and persists it to
+./cache/google_tts_voices.json. Lookups never touch the network: a stale
+catalog keeps answering while a background thread refreshes it, and on a
+cold start with no cache the bundled google_tts_voices_snapshot.json answers
+instead.
+
+Show the catalog, refresh it, or rewrite the bundled snapshot with:
+
+    python -m streamlit_app.voice_catalog [--refresh] [--write-snapshot]
+"""
+
+import argparse
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+VOICES_URL = "https://texttospeech.googleapis.com/v1/voices"
+DEFAULT_CATALOG_PATH = "./cache/google_tts_voices.json"
+SNAPSHOT_PATH = Path(__file__).resolve().parent / "google_tts_voices_snapshot.json"
+DEFAULT_TTL = 7 * 24 * 3600  # Google adds voices every few weeks, never removes them quickly
+FETCH_TIMEOUT = 10
+FAILURE_COOLDOWN = 15 * 60  # After a failed fetch, renders stop retrying for this long
+
+# Codes whose voices are listed under another code
+TTS_LANGUAGE_ALIASES = {
+    "zh-TW": "cmn-CN",  # Chinese Traditional uses same voices as Simplified
+    "zh-tw": "cmn-CN",
+}
+
+
+def fetch_google_tts_voices(api_key: str, timeout: int = FETCH_TIMEOUT) -> List[Dict[str, Any]]:
+    """
+    Download the full voice catalog through the REST API.
+
+    Returns:
+        Voice dicts with name, language_codes, ssml_gender and natural_sample_rate_hertz
+
+    Raises:
+        requests.exceptions.RequestException: On network or HTTP errors
+    """
+    response = requests.get(VOICES_URL, params={"key": api_key}, timeout=timeout)
+    response.raise_for_status()
+    return [{
+        'name': voice['name'],
+        'language_codes': voice.get('languageCodes', []),
+        'ssml_gender': voice.get('ssmlGender', 0),
+        'natural_sample_rate_hertz': voice.get('naturalSampleRateHertz', 0)
+    } for voice in response.json().get("voices", [])]
+
+
+def voice_family(voice_name: str) -> str:
+    """Voice family from a voice name: "en-US-Neural2-D" -> "Neural2", "en-US-Chirp3-HD-Aoede" -> "Chirp3-HD"."""
+    parts = voice_name.split('-')
+    return '-'.join(parts[2:-1]) if len(parts) >= 4 else ""
+
+
+class VoiceCatalog:
+    """
+    Google TTS voices indexed by language code and family.
+
+    Usage:
+        catalog = get_voice_catalog()
+        catalog.refresh_if_stale(api_key)       # returns immediately
+        voices = catalog.voices_for("es-ES")    # never blocks on the network
+    """
+
+    def __init__(self, cache_path: Optional[str] = DEFAULT_CATALOG_PATH,
+                 snapshot_path: Optional[Path] = SNAPSHOT_PATH, ttl: int = DEFAULT_TTL,
+                 fetch: Callable[[str], List[Dict[str, Any]]] = fetch_google_tts_voices,
+                 failure_cooldown: int = FAILURE_COOLDOWN):
+        """
+        Initialize the catalog from the disk cache, or the bundled snapshot if there is none.
+
+        Args:
+            cache_path: JSON file the fetched catalog is persisted to (None keeps it in memory)
+            snapshot_path: Bundled catalog used until the first successful fetch
+            ttl: Seconds before a fetched catalog is refreshed
+            fetch: Downloads the catalog for an API key
+            failure_cooldown: Seconds refresh_if_stale waits after a failed fetch
+        """
+        self.cache_path = Path(cache_path) if cache_path else None
+        self.snapshot_path = Path(snapshot_path) if snapshot_path else None
+        self.ttl = ttl
+        self.failure_cooldown = failure_cooldown
+        self._fetch = fetch
+        self._lock = threading.Lock()
+        self._refresh_thread: Optional[threading.Thread] = None
+        self.last_error: Optional[str] = None
+        self.last_failed_at = 0.0
+
+        self.source = "empty"
+        self.fetched_at = 0.0
+        self._voices: List[Dict[str, Any]] = []
+        self._by_code: Dict[str, List[Dict[str, Any]]] = {}
+        self._by_family: Dict[tuple, List[Dict[str, Any]]] = {}
+
+        if not self._load(self.cache_path, "cache"):
+            self._load(self.snapshot_path, "snapshot")
+
+    def _load(self, path: Optional[Path], source: str) -> bool:
+        if not path or not path.exists():
+            return False
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self._install(data.get("voices", []), data.get("fetched_at", 0.0), source)
+            return True
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Could not load voice catalog from {path}: {e}")
+            return False
+
+    def _install(self, voices: List[Dict[str, Any]], fetched_at: float, source: str) -> None:
+        by_code: Dict[str, List[Dict[str, Any]]] = {}
+        by_family: Dict[tuple, List[Dict[str, Any]]] = {}
+        for voice in voices:
+            family = voice_family(voice['name'])
+            for code in voice.get('language_codes', []):
+                by_code.setdefault(code.lower(), []).append(voice)
+                by_family.setdefault((code.lower(), family), []).append(voice)
+        # Swap the indexes in one step so readers never see a half-built catalog
+        with self._lock:
+            self._voices = list(voices)
+            self._by_code = by_code
+            self._by_family = by_family
+            self.fetched_at = fetched_at
+            self.source = source
+
+    def _save(self) -> None:
+        if not self.cache_path:
+            return
+        try:
+            self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.cache_path.with_suffix('.tmp')
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({"fetched_at": self.fetched_at, "voices": self._voices}, f, ensure_ascii=False)
+            os.replace(tmp_path, self.cache_path)
+        except OSError as e:
+            logger.warning(f"Could not persist voice catalog to {self.cache_path}: {e}")
+
+    def voices_for(self, language_code: Optional[str] = None, family: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Voices for a BCP-47 code (all voices if None), optionally of one family."""
+        if not language_code:
+            return list(self._voices)
+        code = TTS_LANGUAGE_ALIASES.get(language_code, language_code).lower()
+        if family is not None:
+            return list(self._by_family.get((code, family), []))
+        return list(self._by_code.get(code, []))
+
+    def families(self, language_code: str) -> List[str]:
+        """Voice families available for a BCP-47 code."""
+        code = TTS_LANGUAGE_ALIASES.get(language_code, language_code).lower()
+        return sorted({family for (voice_code, family) in self._by_family if voice_code == code})
+
+    def is_fresh(self) -> bool:
+        """True if the catalog was fetched (not bundled) within the TTL."""
+        return self.source in ("cache", "live") and time.time() - self.fetched_at < self.ttl
+
+    @property
+    def refresh_failed(self) -> bool:
+        """True if only the bundled snapshot is available because fetching failed."""
+        return self.source == "snapshot" and self.last_error is not None
+
+    def refresh(self, api_key: str) -> bool:
+        """
+        Fetch the catalog now (blocking) and persist it.
+
+        Returns:
+            True if the catalog was replaced, False if fetching failed
+        """
+        try:
+            voices = self._fetch(api_key)
+        except Exception as e:
+            self.last_error = str(e)
+            self.last_failed_at = time.time()
+            logger.error(f"Network error getting Google TTS voices: {e}")
+            return False
+        if not voices:
+            self.last_error = "No voices returned from Google TTS REST API"
+            self.last_failed_at = time.time()
+            logger.warning(self.last_error)
+            return False
+
+        self._install(voices, time.time(), "live")
+        self.last_error = None
+        self.last_failed_at = 0.0
+        self._save()
+        logger.info(f"Voice catalog refreshed: {len(voices)} voices, {len(self._by_code)} language codes")
+        return True
+
+    def refresh_in_background(self, api_key: str) -> bool:
+        """
+        Start a background refresh unless one is already running.
+
+        The API key is passed in because Streamlit session state is not
+        available from other threads.
+
+        Returns:
+            True if a refresh was started
+        """
+        with self._lock:
+            if self._refresh_thread is not None and self._refresh_thread.is_alive():
+                return False
+            self._refresh_thread = threading.Thread(
+                target=self.refresh, args=(api_key,), name="voice-catalog-refresh", daemon=True)
+            self._refresh_thread.start()
+        return True
+
+    def refresh_if_stale(self, api_key: str) -> bool:
+        """
+        Start a background refresh if the catalog is bundled or older than the
+        TTL, unless a fetch failed within the failure cooldown (an offline
+        server or a bad key would otherwise start a fetch on every render).
+        """
+        if not api_key or self.is_fresh():
+            return False
+        if time.time() - self.last_failed_at < self.failure_cooldown:
+            return False
+        return self.refresh_in_background(api_key)
+
+    def wait_for_refresh(self, timeout: Optional[float] = None) -> None:
+        """Block until a running background refresh finishes."""
+        thread = self._refresh_thread
+        if thread is not None:
+            thread.join(timeout)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Source, size and age of the catalog."""
+        return {
+            'source': self.source,
+            'voices': len(self._voices),
+            'language_codes': len(self._by_code),
+            'age_seconds': round(time.time() - self.fetched_at) if self.fetched_at else None,
+            'fresh': self.is_fresh(),
+            'last_error': self.last_error,
+        }
+
+    def write_snapshot(self, path: Optional[Path] = None) -> Path:
+        """Write the current catalog as the bundled cold-start snapshot."""
+        path = Path(path or SNAPSHOT_PATH)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({"fetched_at": self.fetched_at, "voices": self._voices}, f, ensure_ascii=False, indent=1)
+            f.write("\n")
+        return path
+
+
+# Global instance
+_voice_catalog = None
+
+def get_voice_catalog() -> VoiceCatalog:
+    """Get the global voice catalog, persisted to DEFAULT_CATALOG_PATH."""
+    global _voice_catalog
+    if _voice_catalog is None:
+        _voice_catalog = VoiceCatalog()
+    return _voice_catalog
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Show, refresh or snapshot the Google TTS voice catalog")
+    parser.add_argument("--cache-path", default=DEFAULT_CATALOG_PATH, help="Catalog cache file")
+    parser.add_argument("--refresh", action="store_true", help="Fetch the catalog now (needs GOOGLE_TTS_API_KEY)")
+    parser.add_argument("--write-snapshot", action="store_true", help="Write the catalog as the bundled snapshot")
+    args = parser.parse_args()
+
+    catalog = VoiceCatalog(cache_path=args.cache_path)
+    if args.refresh:
+        api_key = os.getenv("GOOGLE_TTS_API_KEY") or os.getenv("GOOGLE_API_KEY", "")
+        if not api_key or not catalog.refresh(api_key):
+            print(f"Refresh failed: {catalog.last_error or 'GOOGLE_TTS_API_KEY not set'}")
+    if args.write_snapshot:
+        print(f"Snapshot written to {catalog.write_snapshot()}")
+    print(json.dumps(catalog.get_stats(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
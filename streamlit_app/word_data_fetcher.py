@@ -16,6 +16,7 @@ class CircuitBreakerOpenException(Exception): pass
 def call_with_circuit_breaker(_breaker, func): return func()
 
 from persistent_cache import WIKTIONARY_CACHE, TRANSLATION_CACHE, get_cached_response
+from streamlit_app.services.generation.tracing import span
 
 logger = logging.getLogger(__name__)
 
@@ -39,8 +40,10 @@ def parse_hindi_wiktionary_html(word: str) -> List[Dict[str, Any]]:
             'User-Agent': 'LanguageLearningApp/1.0 (https://github.com/your-repo)'
         }
 
-        response = requests.get(url, headers=headers, timeout=15)
-        response.raise_for_status()
+        with span("wiktionary.fetch", kind="client", word=word, language="Hindi", html=True) as call:
+            response = requests.get(url, headers=headers, timeout=15)
+            response.raise_for_status()
+            call.set("bytes", len(response.content))
 
         soup = BeautifulSoup(response.text, 'html.parser')
         definitions = []
@@ -158,13 +161,15 @@ def fetch_wiktionary_data(word: str, language: str = "Hindi") -> Dict[str, Any]:
                 'User-Agent': 'LanguageLearningApp/1.0 (https://github.com/your-repo)'
             }
 
-            response = requests.get(url, headers=headers, timeout=10)
-
-            # If language-specific page fails, try English Wiktionary
-            if response.status_code != 200:
-                url = f"https://en.wiktionary.org/api/rest_v1/page/definition/{word}"
+            with span("wiktionary.fetch", kind="client", word=word, language=language) as call:
                 response = requests.get(url, headers=headers, timeout=10)
 
+                # If language-specific page fails, try English Wiktionary
+                if response.status_code != 200:
+                    url = f"https://en.wiktionary.org/api/rest_v1/page/definition/{word}"
+                    response = requests.get(url, headers=headers, timeout=10)
+                call.set_attributes(status=response.status_code, bytes=len(response.content))
+
             if response.status_code == 200:
                 data = response.json()
 
@@ -7,8 +7,9 @@ and word management functions.
 
 import sqlite3
 import logging
+import threading
 from pathlib import Path
-from typing import List, Dict, Optional, Tuple
+from typing import List, Dict, Optional, Tuple, FrozenSet
 
 # Setup logging
 logger = logging.getLogger(__name__)
@@ -16,6 +17,17 @@ logger = logging.getLogger(__name__)
 # Database path
 DB_PATH = Path(__file__).parent / "language_learning.db"
 
+# Per-language set of completed ranks, shared across sessions in this process.
+# Write-through: every completion update below invalidates the language entry.
+_completed_ranks_cache: Dict[str, FrozenSet[int]] = {}
+_completed_cache_lock = threading.Lock()
+
+# Sparse per-language rank index: the rank at every RANK_INDEX_STRIDE-th
+# position. The words table only changes on import (db_setup clears it).
+RANK_INDEX_STRIDE = 1000
+_rank_index: Dict[str, List[int]] = {}
+_rank_index_lock = threading.Lock()
+
 
 # ============================================================================
 # WORD QUERIES
@@ -138,6 +150,213 @@ def get_completed_words(language: str) -> List[str]:
         conn.close()
 
 
+def get_words_after_rank(language: str, after_rank: int = 0, limit: int = 50) -> List[Dict]:
+    """
+    Get the next page of words using keyset pagination on (language, rank).
+
+    Unlike LIMIT/OFFSET, the cost of this query does not grow with page depth:
+    it seeks straight into idx_language_rank.
+
+    Args:
+        language: Language name
+        after_rank: Rank of the last word on the previous page (0 for the first page)
+        limit: Words per page
+
+    Returns:
+        List of word dicts ordered by rank
+    """
+    conn = sqlite3.connect(DB_PATH)
+    cursor = conn.cursor()
+
+    try:
+        cursor.execute(
+            """SELECT word, rank, completed, times_generated, last_generated
+               FROM words WHERE language = ? AND rank > ?
+               ORDER BY rank LIMIT ?""",
+            (language, after_rank, limit)
+        )
+
+        return [
+            {
+                "word": row[0],
+                "rank": row[1],
+                "completed": row[2],
+                "times_generated": row[3],
+                "last_generated": row[4]
+            }
+            for row in cursor.fetchall()
+        ]
+
+    except Exception as e:
+        logger.error(f"Error getting words after rank: {e}")
+        return []
+    finally:
+        conn.close()
+
+
+def get_rank_at_position(language: str, position: int) -> Optional[int]:
+    """
+    Get the rank of the word at a 0-based position in rank order.
+
+    Used to seed a keyset cursor when jumping straight to a page. Ranks can
+    have gaps (duplicates are dropped on import), so page boundaries cannot be
+    computed arithmetically. Instead the lookup seeks to the nearest entry of
+    the sparse rank index and skips at most RANK_INDEX_STRIDE - 1 rows from
+    there, so its cost does not grow with position.
+
+    Args:
+        language: Language name
+        position: 0-based position in rank order
+
+    Returns:
+        Rank at that position, or None if out of range
+    """
+    index = _get_rank_index(language)
+    if position < 0 or position // RANK_INDEX_STRIDE >= len(index):
+        return None
+
+    conn = sqlite3.connect(DB_PATH)
+    cursor = conn.cursor()
+
+    try:
+        cursor.execute(
+            """SELECT rank FROM words WHERE language = ? AND rank >= ?
+               ORDER BY rank LIMIT 1 OFFSET ?""",
+            (language, index[position // RANK_INDEX_STRIDE], position % RANK_INDEX_STRIDE)
+        )
+        result = cursor.fetchone()
+        return result[0] if result else None
+
+    except Exception as e:
+        logger.error(f"Error getting rank at position: {e}")
+        return None
+    finally:
+        conn.close()
+
+
+def _get_rank_index(language: str) -> List[int]:
+    """Get the sparse rank index for a language, building it with one index scan on first use."""
+    with _rank_index_lock:
+        cached = _rank_index.get(language)
+    if cached is not None:
+        return cached
+
+    conn = sqlite3.connect(DB_PATH)
+    cursor = conn.cursor()
+
+    try:
+        cursor.execute("SELECT rank FROM words WHERE language = ? ORDER BY rank", (language,))
+        index = [row[0] for row in cursor.fetchall()][::RANK_INDEX_STRIDE]
+
+    except Exception as e:
+        logger.error(f"Error building rank index: {e}")
+        return []
+    finally:
+        conn.close()
+
+    with _rank_index_lock:
+        _rank_index[language] = index
+    return index
+
+
+def invalidate_rank_index(language: Optional[str] = None):
+    """
+    Drop the sparse rank index for one language, or for all languages.
+
+    Args:
+        language: Language name, or None to clear everything
+    """
+    with _rank_index_lock:
+        if language is None:
+            _rank_index.clear()
+        else:
+            _rank_index.pop(language, None)
+
+
+def get_word_count(language: str) -> int:
+    """
+    Get the total number of words for a language.
+
+    Args:
+        language: Language name
+
+    Returns:
+        Word count
+    """
+    conn = sqlite3.connect(DB_PATH)
+    cursor = conn.cursor()
+
+    try:
+        cursor.execute("SELECT COUNT(*) FROM words WHERE language = ?", (language,))
+        return cursor.fetchone()[0]
+
+    except Exception as e:
+        logger.error(f"Error counting words: {e}")
+        return 0
+    finally:
+        conn.close()
+
+
+def get_completed_ranks(language: str) -> FrozenSet[int]:
+    """
+    Get the ranks of completed words for a language.
+
+    The result is cached in memory per language and invalidated whenever
+    completion status is written, so page renders do not re-read the table.
+
+    Args:
+        language: Language name
+
+    Returns:
+        Frozen set of completed ranks
+    """
+    with _completed_cache_lock:
+        cached = _completed_ranks_cache.get(language)
+    if cached is not None:
+        return cached
+
+    conn = sqlite3.connect(DB_PATH)
+    cursor = conn.cursor()
+
+    try:
+        cursor.execute(
+            "SELECT rank FROM words WHERE language = ? AND completed = 1",
+            (language,)
+        )
+        ranks = frozenset(row[0] for row in cursor.fetchall())
+
+    except Exception as e:
+        logger.error(f"Error getting completed ranks: {e}")
+        return frozenset()
+    finally:
+        conn.close()
+
+    with _completed_cache_lock:
+        _completed_ranks_cache[language] = ranks
+    return ranks
+
+
+def invalidate_completed_cache(language: Optional[str] = None):
+    """
+    Drop cached completion state for one language, or for all languages.
+
+    Args:
+        language: Language name, or None to clear everything
+    """
+    with _completed_cache_lock:
+        if language is None:
+            _completed_ranks_cache.clear()
+        else:
+            _completed_ranks_cache.pop(language, None)
+
+
+def _clear_page_cache(language: str):
+    """Drop cached word-select pages, whose word dicts carry completion flags."""
+    # Lazy import: frequency_utils pulls in pandas and imports from db_manager
+    from frequency_utils import clear_page_cache
+    clear_page_cache(language)
+
+
 # ============================================================================
 # PROGRESS TRACKING
 # ============================================================================
@@ -165,6 +384,8 @@ def mark_word_completed(language: str, word: str, completed: bool = True):
         logger.error(f"Error marking word completed: {e}")
     finally:
         conn.close()
+        invalidate_completed_cache(language)
+        _clear_page_cache(language)
 
 
 def mark_words_completed(language: str, words: List[str], completed: bool = True):
@@ -192,6 +413,8 @@ def mark_words_completed(language: str, words: List[str], completed: bool = True
         logger.error(f"Error marking words completed: {e}")
     finally:
         conn.close()
+        invalidate_completed_cache(language)
+        _clear_page_cache(language)
 
 
 def increment_word_count(language: str, word: str):
@@ -0,0 +1,387 @@
+"""
+Offline benchmark of whole-deck generation.
+
+Runs generate_deck_progressive word by word, as the Generating page does,
+with every Gemini, Google TTS, Pixabay and Wiktionary call answered from a
+recording (see recorded_responses.py), and reports for each deck size:
+
+    wall time, words per minute, sentences per second,
+    seconds spent in each pipeline stage (summed over words),
+    peak RSS of the run, and replay hits/fallbacks/injected errors per service
+
+Stage times come from the same WordTelemetry marks the estimator records.
+Each deck size runs in its own process with an empty working directory, so
+peak RSS is per run and the grammar, meaning and telemetry caches start
+cold every time. With --enrich, each word is first enriched from
+Wiktionary (the word-selection step) and that time is reported as the
+"enrichment" stage.
+
+Recordings come from tests/benchmarks/recordings/<language>.json when one
+exists. Otherwise the language's mock responses in
+tests/test_end_to_end_pipeline.py are replayed, with synthetic TTS audio,
+Pixabay results and Wiktionary definitions. Decks larger than the recorded
+word list reuse its words with a numeric suffix, so their requests replay
+through same-route fallbacks.
+
+Usage:
+    python -m tests.benchmarks.full_deck --language japanese                     # 10, 50 and 200 words
+    python -m tests.benchmarks.full_deck --language spanish --sizes 10 \\
+        --latency gemini=1500:400 --latency tts=250 --errors pixabay=0.05       # slow Gemini, flaky Pixabay
+    python -m tests.benchmarks.full_deck --language spanish --requests-per-minute 0   # no Gemini rate limit
+    python -m tests.benchmarks.full_deck --record --language Spanish --words hola casa comer
+        # live run; needs GOOGLE_API_KEY, GOOGLE_TTS_API_KEY and PIXABAY_API_KEY
+"""
+
+import argparse
+import base64
+import contextlib
+import io
+import json
+import logging
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from unittest.mock import patch
+
+from tests.benchmarks.recorded_responses import (
+    PROJECT_ROOT, RECORDINGS_DIR, SERVICES, RecordedResponses, ResponseStore, ServiceFaults,
+)
+
+DEFAULT_SIZES = (10, 50, 200)
+# Replayed requests never leave the process, but the app still checks key formats
+REPLAY_KEYS = ("AIzaREPLAY_GEMINI_KEY_000000000000000", "AIzaREPLAY_TTS_KEY_000000000000000", "REPLAY_PIXABAY_KEY")
+STAGES = ("enrichment", "sentences", "grammar", "audio", "images", "assembly")
+
+# Stand-in media for synthetic recordings: an MPEG frame header and a JPEG header
+_SYNTHETIC_MP3 = b"\xff\xfb\x90\x64" + b"\x00" * 413
+_SYNTHETIC_JPEG = b"\xff\xd8\xff\xe0\x00\x10JFIF\x00" + b"\x00" * 500 + b"\xff\xd9"
+
+
+class _SessionState(dict):
+    """st.session_state stand-in: a dict with attribute access."""
+
+    def __getattr__(self, name):
+        try:
+            return self[name]
+        except KeyError:
+            raise AttributeError(name)
+
+    def __setattr__(self, name, value):
+        self[name] = value
+
+
+def _session_state(difficulty: str, gemini_key: str, tts_key: str, pixabay_key: str) -> _SessionState:
+    return _SessionState({
+        "google_api_key": gemini_key,
+        "google_tts_api_key": tts_key,
+        "pixabay_api_key": pixabay_key,
+        "difficulty": difficulty,
+        "native_language": "English",
+        "audio_speed": 0.8,
+        "gemini_api_calls": 0,
+        "gemini_tokens_used": 0,
+    })
+
+
+def _mock_data(language: str) -> Dict[str, Any]:
+    from tests.test_end_to_end_pipeline import LANGUAGE_MOCK_DATA
+
+    wanted = language.lower()
+    for key, data in LANGUAGE_MOCK_DATA.items():
+        if wanted in (key, data["language_name"].lower(), data["language_code"]):
+            return data
+    raise ValueError(f"No recording or mock data for '{language}' "
+                     f"(mock data exists for: {', '.join(sorted(LANGUAGE_MOCK_DATA))})")
+
+
+def synthetic_store(language: str) -> ResponseStore:
+    """Recordings built from the end-to-end test's mock responses for one language."""
+    data = _mock_data(language)
+    meaning = data["mock_content_response"].split("\n", 1)[0].replace("MEANING:", "").strip()
+    store = ResponseStore(meta={
+        "language": data["language_name"],
+        "words": [data["word"]],
+        "num_sentences": data["num_sentences"],
+        "min_length": data["min_length"],
+        "max_length": data["max_length"],
+        "difficulty": data["difficulty"],
+        "topics": [data["topic"]],
+        "synthetic": True,
+    })
+
+    def add(route: str, response: Dict[str, Any]) -> None:
+        store.add(f"synthetic-{route}", route.split(":")[0], route, {"synthetic": True}, response)
+
+    add("gemini:content", {"text": data["mock_content_response"]})
+    add("gemini:grammar", {"text": data["mock_grammar_batch_response"]})
+    add("tts:synthesize", {"status": 200, "content_type": "application/json",
+                           "text": json.dumps({"audioContent": base64.b64encode(_SYNTHETIC_MP3).decode("ascii")})})
+    hits = [{"webformatURL": f"https://cdn.pixabay.com/photo/synthetic/{n:02d}_640.jpg"} for n in range(10)]
+    add("pixabay:search", {"status": 200, "content_type": "application/json", "text": json.dumps({"hits": hits})})
+    add("pixabay:download", {"status": 200, "content_type": "image/jpeg",
+                             "base64": base64.b64encode(_SYNTHETIC_JPEG).decode("ascii")})
+    definitions = [{"partOfSpeech": "Word", "definitions": [{"definition": meaning}]}]
+    add("wiktionary:definition", {"status": 200, "content_type": "application/json",
+                                  "text": json.dumps({data["language_code"]: definitions, "en": definitions})})
+    return store
+
+
+def load_store(language: str, path: Optional[Path] = None) -> ResponseStore:
+    """The given recording, the language's recording under RECORDINGS_DIR, or synthetic recordings."""
+    path = Path(path) if path else RECORDINGS_DIR / f"{language.lower()}.json"
+    if path.exists():
+        return ResponseStore.load(path)
+    return synthetic_store(language)
+
+
+def deck_words(base_words: List[str], size: int) -> List[str]:
+    """`size` distinct words: the recorded words, then the same words numbered 2, 3, ..."""
+    words = []
+    for i in range(size):
+        word = base_words[i % len(base_words)]
+        round_number = i // len(base_words) + 1
+        words.append(word if round_number == 1 else f"{word}{round_number}")
+    return words
+
+
+def parse_faults(latency: List[str], errors: List[str]) -> Dict[str, ServiceFaults]:
+    """--latency service=ms[:jitter_ms] and --errors service=rate into ServiceFaults."""
+    faults: Dict[str, ServiceFaults] = {}
+
+    def split(spec: str):
+        service, _, value = spec.partition("=")
+        if service not in SERVICES or not value:
+            raise ValueError(f"Expected service=value with service in {', '.join(SERVICES)}, got '{spec}'")
+        return faults.setdefault(service, ServiceFaults()), value
+
+    for spec in latency:
+        service_faults, value = split(spec)
+        ms, _, jitter = value.partition(":")
+        service_faults.latency_ms = float(ms)
+        service_faults.jitter_ms = float(jitter) if jitter else 0.0
+    for spec in errors:
+        service_faults, value = split(spec)
+        service_faults.error_rate = float(value)
+    return faults
+
+
+@contextlib.contextmanager
+def _pipeline(meta: Dict[str, Any], session_state: _SessionState, requests_per_minute: Optional[int]):
+    """Fresh grammar processor, in-memory telemetry and session state for one run."""
+    from streamlit_app.language_analyzers.grammar_cache import GrammarResultCache
+    from streamlit_app.services.generation import generation_telemetry, grammar_processor
+    import streamlit_app.shared_utils as shared_utils
+
+    class StageRecorder(generation_telemetry.GenerationTelemetry):
+        def __init__(self):
+            super().__init__(telemetry_path=None)
+            self.words = []
+
+        def record_word(self, word_telemetry):
+            self.words.append(word_telemetry)
+            super().record_word(word_telemetry)
+
+    recorder = StageRecorder()
+    rate_limit = dict(shared_utils.GEMINI_RATE_LIMIT)
+    if requests_per_minute is not None:
+        rate_limit['requests_per_minute'] = requests_per_minute
+
+    with patch("streamlit.session_state", session_state), \
+         patch.object(generation_telemetry, "_generation_telemetry", recorder), \
+         patch.object(grammar_processor, "_grammar_processor",
+                      grammar_processor.GrammarProcessor(result_cache=GrammarResultCache(cache_dir=None))), \
+         patch.dict(shared_utils.GEMINI_RATE_LIMIT, rate_limit), \
+         patch.object(shared_utils, "_gemini_api", None):
+        yield recorder
+
+
+def _generate(words: List[str], meta: Dict[str, Any], gemini_key: str, output_dir: Path,
+              enrich: bool, recorder) -> Dict[str, Any]:
+    from streamlit_app.core_functions import generate_deck_progressive
+    from streamlit_app.word_data_fetcher import enrich_word_data
+
+    enrichment_seconds, succeeded, sentences = 0.0, 0, 0
+    for word in words:
+        enriched = None
+        if enrich:
+            start = time.perf_counter()
+            enriched = enrich_word_data(word, meta["language"])
+            enrichment_seconds += time.perf_counter() - start
+        result = generate_deck_progressive(
+            word=word,
+            language=meta["language"],
+            gemini_api_key=gemini_key,
+            output_dir=str(output_dir),
+            num_sentences=meta.get("num_sentences", 10),
+            min_length=meta.get("min_length", 5),
+            max_length=meta.get("max_length", 20),
+            difficulty=meta.get("difficulty", "intermediate"),
+            topics=meta.get("topics"),
+            enriched_word_data=enriched,
+        )
+        if result['success']:
+            succeeded += 1
+            sentences += len(result['word_data']['sentences'])
+
+    stage_seconds = {stage: 0.0 for stage in STAGES}
+    stage_seconds["enrichment"] = enrichment_seconds
+    for word_telemetry in recorder.words:
+        for stage, seconds in word_telemetry.stage_seconds.items():
+            stage_seconds[stage] = stage_seconds.get(stage, 0.0) + seconds
+    return {"words_succeeded": succeeded, "sentences": sentences,
+            "stage_seconds": {stage: round(seconds, 3) for stage, seconds in stage_seconds.items()}}
+
+
+def run_deck(store: ResponseStore, size: int, faults: Optional[Dict[str, ServiceFaults]] = None,
+             seed: int = 0, enrich: bool = False, requests_per_minute: Optional[int] = None,
+             output_dir: Optional[Path] = None) -> Dict[str, Any]:
+    """
+    Replay one deck of `size` words in this process.
+
+    Returns:
+        words, words_succeeded, sentences, wall_seconds, words_per_minute,
+        sentences_per_second, stage_seconds, peak_rss_mib and replay stats per service
+    """
+    meta = store.meta
+    words = deck_words(meta["words"], size)
+    session_state = _session_state(meta.get("difficulty", "intermediate"), *REPLAY_KEYS)
+    with tempfile.TemporaryDirectory() as tmp, \
+         RecordedResponses(store, mode="replay", faults=faults, seed=seed) as replay, \
+         _pipeline(meta, session_state, requests_per_minute) as recorder:
+        start = time.perf_counter()
+        result = _generate(words, meta, REPLAY_KEYS[0], Path(output_dir or tmp), enrich, recorder)
+        wall = time.perf_counter() - start
+
+    return {
+        "words": size,
+        **result,
+        "wall_seconds": round(wall, 3),
+        "words_per_minute": round(size / wall * 60, 1) if wall else 0.0,
+        "sentences_per_second": round(result["sentences"] / wall, 2) if wall else 0.0,
+        # ru_maxrss is KiB on Linux
+        "peak_rss_mib": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        "replay": replay.stats,
+    }
+
+
+def run_deck_isolated(store_path: Optional[Path], language: str, size: int, args: List[str]) -> Dict[str, Any]:
+    """run_deck in a fresh process with an empty working directory (per-run peak RSS, cold caches)."""
+    with tempfile.TemporaryDirectory() as workdir:
+        out = Path(workdir) / "result.json"
+        command = [sys.executable, "-m", "tests.benchmarks.full_deck", "--language", language,
+                   "--single", str(size), "--json-out", str(out)] + args
+        if store_path:
+            command += ["--store", str(Path(store_path).resolve())]
+        env = {**os.environ, "PYTHONPATH": os.pathsep.join(filter(None, [str(PROJECT_ROOT), os.environ.get("PYTHONPATH")]))}
+        completed = subprocess.run(command, cwd=workdir, env=env, capture_output=True, text=True)
+        if completed.returncode != 0 or not out.exists():
+            raise RuntimeError(f"{size}-word deck failed:\n{completed.stderr[-2000:]}")
+        return json.loads(out.read_text(encoding="utf-8"))
+
+
+def record_deck(language: str, words: List[str], path: Path, num_sentences: int = 10,
+                difficulty: str = "intermediate", topics: Optional[List[str]] = None) -> ResponseStore:
+    """Generate a deck against the live APIs and save every response to `path`."""
+    keys = {name: os.environ.get(name, "") for name in ("GOOGLE_API_KEY", "GOOGLE_TTS_API_KEY", "PIXABAY_API_KEY")}
+    missing = [name for name, value in keys.items() if not value]
+    if missing:
+        raise ValueError(f"Recording needs live API keys; set {', '.join(missing)}")
+
+    store = ResponseStore(path, meta={
+        "language": language,
+        "words": words,
+        "num_sentences": num_sentences,
+        "difficulty": difficulty,
+        "topics": topics,
+        "recorded_at": round(time.time()),
+    })
+    session_state = _session_state(difficulty, keys["GOOGLE_API_KEY"], keys["GOOGLE_TTS_API_KEY"], keys["PIXABAY_API_KEY"])
+    with tempfile.TemporaryDirectory() as tmp, \
+         RecordedResponses(store, mode="record"), \
+         _pipeline(store.meta, session_state, None) as recorder:
+        # Enrichment is recorded too, so replays may use --enrich
+        _generate(words, store.meta, keys["GOOGLE_API_KEY"], Path(tmp), True, recorder)
+    return store
+
+
+def format_report(results: List[Dict[str, Any]]) -> str:
+    """Table of deck results, then replay counters per run."""
+    lines = [f"{'words':>6}{'ok':>6}{'wall s':>10}{'words/min':>11}{'sent/s':>9}{'RSS MiB':>9}"
+             + "".join(f"{stage:>12}" for stage in STAGES)]
+    for result in results:
+        lines.append(
+            f"{result['words']:>6}{result['words_succeeded']:>6}{result['wall_seconds']:>10}"
+            f"{result['words_per_minute']:>11}{result['sentences_per_second']:>9}{result['peak_rss_mib']:>9}"
+            + "".join(f"{result['stage_seconds'].get(stage, 0.0):>12}" for stage in STAGES)
+        )
+    for result in results:
+        counters = ", ".join(
+            f"{service} {int(stats['hits'])} hit/{int(stats['fallbacks'])} fallback/{int(stats['misses'])} miss"
+            + (f"/{int(stats['injected_errors'])} injected" if stats['injected_errors'] else "")
+            for service, stats in sorted(result["replay"].items())
+        )
+        lines.append(f"{result['words']}-word replay: {counters}")
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark full-deck generation against recorded API responses")
+    parser.add_argument("--language", required=True, help="Language name or mock-data key (e.g. japanese)")
+    parser.add_argument("--store", type=Path, help="Recording to use (default: recordings/<language>.json, else synthetic)")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES), help="Deck sizes in words")
+    parser.add_argument("--latency", action="append", default=[], metavar="SERVICE=MS[:JITTER]",
+                        help="Synthetic latency per replayed call, e.g. gemini=1500:400 (repeatable)")
+    parser.add_argument("--errors", action="append", default=[], metavar="SERVICE=RATE",
+                        help="Fraction of replayed calls that fail, e.g. tts=0.05 (repeatable)")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for jitter and error injection")
+    parser.add_argument("--enrich", action="store_true", help="Enrich each word from Wiktionary first")
+    parser.add_argument("--requests-per-minute", type=int,
+                        help="Override the Gemini rate limit (0 disables spacing between calls)")
+    parser.add_argument("--json-out", type=Path, help="Also write the results as JSON")
+    parser.add_argument("--record", action="store_true", help="Record --words against the live APIs instead")
+    parser.add_argument("--words", nargs="+", help="Words to record")
+    parser.add_argument("--num-sentences", type=int, default=10, help="Sentences per word when recording")
+    parser.add_argument("--single", type=int, help=argparse.SUPPRESS)  # One in-process run (used by the isolated runner)
+    args = parser.parse_args(argv)
+
+    if args.record:
+        if not args.words:
+            parser.error("--record needs --words")
+        path = args.store or RECORDINGS_DIR / f"{args.language.lower()}.json"
+        store = record_deck(args.language, args.words, path, args.num_sentences)
+        print(f"Recorded {sum(store.summary().values())} responses to {store.path}: {store.summary()}")
+        return 0
+
+    faults = parse_faults(args.latency, args.errors)
+
+    if args.single is not None:
+        store = load_store(args.language, args.store)
+        logging.disable(logging.CRITICAL)
+        # The pipeline prints progress (e.g. Pixabay queries); keep the output to the report
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = run_deck(store, args.single, faults, args.seed, args.enrich, args.requests_per_minute)
+        args.json_out.write_text(json.dumps(result, indent=2), encoding="utf-8")
+        return 0
+
+    passthrough = ["--seed", str(args.seed)]
+    passthrough += [item for spec in args.latency for item in ("--latency", spec)]
+    passthrough += [item for spec in args.errors for item in ("--errors", spec)]
+    if args.enrich:
+        passthrough.append("--enrich")
+    if args.requests_per_minute is not None:
+        passthrough += ["--requests-per-minute", str(args.requests_per_minute)]
+
+    results = [run_deck_isolated(args.store, args.language, size, passthrough) for size in args.sizes]
+    print(format_report(results))
+    if args.json_out:
+        args.json_out.write_text(json.dumps(results, indent=2), encoding="utf-8")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
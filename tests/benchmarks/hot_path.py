@@ -0,0 +1,280 @@
+"""
+Offline benchmark of the per-language grammar hot path.
+
+Replays recorded Gemini grammar responses through every analyzer's
+batch_analyze_grammar with _call_ai answered from the recording, so each
+round runs prompt building, parse_batch_response, validation and
+_generate_html_output exactly as a live batch would, minus the network.
+
+Recordings come from the mock_grammar_batch_response entries in
+tests/test_end_to_end_pipeline.py (one batch per language) and from
+languages/arabic/tests/fixtures/mock_responses.json.
+
+Per case it reports ops/sec (batches per second), mean and p95 latency,
+peak bytes allocated during one batch, and how many sentences came back
+as fallbacks. Results are compared with hot_path_baseline.json; a case
+regresses when its p95 exceeds the baseline by more than the time
+tolerance (and by over a millisecond), its peak allocation by more than the allocation tolerance, or
+when it returns more fallbacks than recorded.
+
+Usage:
+    python -m tests.benchmarks.hot_path                     # compare with the baseline
+    python -m tests.benchmarks.hot_path --only arabic       # cases whose name contains "arabic"
+    python -m tests.benchmarks.hot_path --update-baseline   # record a new baseline
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import logging
+import math
+import os
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from unittest.mock import patch
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(PROJECT_ROOT))
+sys.path.insert(0, str(PROJECT_ROOT / "streamlit_app"))
+
+from streamlit_app.language_analyzers.analyzer_registry import get_analyzer
+from streamlit_app.language_analyzers.grammar_cache import MIN_CACHEABLE_CONFIDENCE
+
+BASELINE_PATH = Path(__file__).resolve().parent / "hot_path_baseline.json"
+ARABIC_FIXTURES = PROJECT_ROOT / "languages" / "arabic" / "tests" / "fixtures" / "mock_responses.json"
+
+DEFAULT_ROUNDS = 200
+WARMUP_ROUNDS = 5
+# Timings vary between machines and under load; allocations barely move
+DEFAULT_TIME_TOLERANCE = float(os.environ.get("HOT_PATH_TIME_TOLERANCE", "3.0"))
+DEFAULT_ALLOC_TOLERANCE = float(os.environ.get("HOT_PATH_ALLOC_TOLERANCE", "1.5"))
+# Sub-millisecond batches jitter by more than their own length; ignore smaller slowdowns
+MIN_TIME_REGRESSION_MS = 1.0
+
+
+@dataclass
+class ReplayCase:
+    """One recorded grammar batch and the request that produced it."""
+    name: str
+    language_code: str
+    sentences: List[str]
+    target_word: str
+    complexity: str
+    response: str
+
+
+def _pipeline_cases() -> List[ReplayCase]:
+    from tests.test_end_to_end_pipeline import LANGUAGE_MOCK_DATA
+
+    cases = []
+    for name, data in LANGUAGE_MOCK_DATA.items():
+        response = data["mock_grammar_batch_response"]
+        sentences = [item.get("sentence", "") for item in json.loads(response)]
+        cases.append(ReplayCase(
+            name=name,
+            language_code=data["language_code"],
+            sentences=sentences,
+            target_word=data["word"],
+            complexity=data["difficulty"],
+            response=response,
+        ))
+    return cases
+
+
+def _arabic_fixture_cases() -> List[ReplayCase]:
+    fixtures = json.loads(ARABIC_FIXTURES.read_text(encoding="utf-8"))
+
+    def sentence_of(result: Dict[str, Any]) -> str:
+        # The fixtures carry no sentence text; the analyzed words spell it out
+        return " ".join(word["word"] for word in result.get("words", []))
+
+    cases = []
+    for complexity in ("beginner", "intermediate", "advanced"):
+        key = "valid_response" if complexity == "beginner" else f"{complexity}_response"
+        result = fixtures[key]
+        cases.append(ReplayCase(
+            name=f"arabic_fixture_{complexity}",
+            language_code="ar",
+            sentences=[sentence_of(result)],
+            target_word=result["words"][0]["word"],
+            complexity=complexity,
+            # Replayed through the batch path, so wrap the single result as a one-item batch
+            response=json.dumps({"batch_results": [result]}, ensure_ascii=False),
+        ))
+
+    batch = fixtures["batch_response"]
+    cases.append(ReplayCase(
+        name="arabic_fixture_batch",
+        language_code="ar",
+        sentences=[sentence_of(result) for result in batch["batch_results"]],
+        target_word=batch["batch_results"][0]["words"][0]["word"],
+        complexity="beginner",
+        response=json.dumps(batch, ensure_ascii=False),
+    ))
+    return cases
+
+
+def load_cases(only: Optional[str] = None) -> List[ReplayCase]:
+    """All replay cases, optionally only those whose name contains `only`."""
+    cases = _pipeline_cases() + _arabic_fixture_cases()
+    if only:
+        cases = [case for case in cases if only in case.name]
+    return cases
+
+
+@contextlib.contextmanager
+def _replaying(analyzer, response: str):
+    # A plain function instead of a Mock, so rounds do not accumulate call records
+    def replay_call_ai(self, prompt, gemini_api_key):
+        return response
+
+    with patch.object(type(analyzer), "_call_ai", replay_call_ai), \
+         contextlib.redirect_stdout(io.StringIO()):
+        yield
+
+
+def _percentile(sorted_values: List[float], fraction: float) -> float:
+    index = max(0, math.ceil(fraction * len(sorted_values)) - 1)
+    return sorted_values[index]
+
+
+def run_case(case: ReplayCase, rounds: int = DEFAULT_ROUNDS) -> Dict[str, Any]:
+    """
+    Benchmark one replay case.
+
+    Returns:
+        ops_per_sec, mean_ms, p95_ms, peak_alloc_bytes, sentences and fallbacks
+    """
+    analyzer = get_analyzer(case.language_code)
+    if analyzer is None:
+        raise ValueError(f"No analyzer registered for '{case.language_code}'")
+
+    def analyze():
+        return analyzer.batch_analyze_grammar(case.sentences, case.target_word, case.complexity, "offline")
+
+    with _replaying(analyzer, case.response):
+        for _ in range(WARMUP_ROUNDS):
+            results = analyze()
+
+        timings = []
+        for _ in range(rounds):
+            start = time.perf_counter()
+            analyze()
+            timings.append(time.perf_counter() - start)
+
+        tracemalloc.start()
+        try:
+            analyze()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+    timings.sort()
+    total = sum(timings)
+    return {
+        "language_code": case.language_code,
+        "sentences": len(case.sentences),
+        "ops_per_sec": round(rounds / total, 1) if total else 0.0,
+        "mean_ms": round(total / rounds * 1000, 3),
+        "p95_ms": round(_percentile(timings, 0.95) * 1000, 3),
+        "peak_alloc_bytes": peak,
+        "fallbacks": sum(1 for result in results if result.confidence_score < MIN_CACHEABLE_CONFIDENCE),
+    }
+
+
+def run_suite(cases: List[ReplayCase], rounds: int = DEFAULT_ROUNDS) -> Dict[str, Dict[str, Any]]:
+    """Benchmark every case. Analyzer logging is silenced while timing."""
+    previous = logging.root.manager.disable
+    logging.disable(logging.CRITICAL)
+    try:
+        return {case.name: run_case(case, rounds) for case in cases}
+    finally:
+        logging.disable(previous)
+
+
+def load_baseline(path: Path = BASELINE_PATH) -> Dict[str, Dict[str, Any]]:
+    """Recorded results per case ({} if no baseline exists)."""
+    if not path.exists():
+        return {}
+    return json.loads(path.read_text(encoding="utf-8")).get("cases", {})
+
+
+def save_baseline(results: Dict[str, Dict[str, Any]], path: Path = BASELINE_PATH) -> None:
+    """Record results as the new baseline, keeping entries for cases not run."""
+    cases = load_baseline(path)
+    cases.update(results)
+    payload = {
+        "python": sys.version.split()[0],
+        "cases": dict(sorted(cases.items())),
+    }
+    path.write_text(json.dumps(payload, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+
+
+def find_regressions(results: Dict[str, Dict[str, Any]], baseline: Dict[str, Dict[str, Any]],
+                     time_tolerance: float = DEFAULT_TIME_TOLERANCE,
+                     alloc_tolerance: float = DEFAULT_ALLOC_TOLERANCE) -> List[str]:
+    """
+    Compare results with the baseline.
+
+    Returns:
+        One message per regression; cases missing from the baseline are not compared
+    """
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if not base:
+            continue
+        if (result["p95_ms"] > base["p95_ms"] * time_tolerance
+                and result["p95_ms"] - base["p95_ms"] > MIN_TIME_REGRESSION_MS):
+            regressions.append(f"{name}: p95 {result['p95_ms']} ms > {time_tolerance}x baseline {base['p95_ms']} ms")
+        if result["peak_alloc_bytes"] > base["peak_alloc_bytes"] * alloc_tolerance:
+            regressions.append(f"{name}: peak allocation {result['peak_alloc_bytes']} B > "
+                               f"{alloc_tolerance}x baseline {base['peak_alloc_bytes']} B")
+        if result["fallbacks"] > base["fallbacks"]:
+            regressions.append(f"{name}: {result['fallbacks']} fallback sentences (baseline {base['fallbacks']})")
+    return regressions
+
+
+def format_report(results: Dict[str, Dict[str, Any]], baseline: Dict[str, Dict[str, Any]]) -> str:
+    """Table of results with the baseline p95 alongside."""
+    lines = [f"{'case':<34}{'ops/sec':>10}{'mean ms':>10}{'p95 ms':>10}{'base p95':>10}{'peak KiB':>10}{'fallbacks':>11}"]
+    for name, result in results.items():
+        base = baseline.get(name, {})
+        lines.append(
+            f"{name:<34}{result['ops_per_sec']:>10}{result['mean_ms']:>10}{result['p95_ms']:>10}"
+            f"{base.get('p95_ms', '-'):>10}{result['peak_alloc_bytes'] / 1024:>10.1f}{result['fallbacks']:>11}"
+        )
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the analyzer parse/validate/colorize hot path offline")
+    parser.add_argument("--rounds", type=int, default=DEFAULT_ROUNDS, help="Timed batches per case")
+    parser.add_argument("--only", help="Run only cases whose name contains this text")
+    parser.add_argument("--update-baseline", action="store_true", help="Record results as the new baseline")
+    parser.add_argument("--time-tolerance", type=float, default=DEFAULT_TIME_TOLERANCE,
+                        help="Allowed p95 slowdown factor before failing")
+    args = parser.parse_args(argv)
+
+    results = run_suite(load_cases(args.only), args.rounds)
+    baseline = load_baseline()
+    print(format_report(results, baseline))
+
+    if args.update_baseline:
+        save_baseline(results)
+        print(f"\nBaseline written to {BASELINE_PATH}")
+        return 0
+
+    regressions = find_regressions(results, baseline, args.time_tolerance)
+    for message in regressions:
+        print(f"REGRESSION {message}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
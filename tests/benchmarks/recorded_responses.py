@@ -0,0 +1,449 @@
+"""
+Record and replay Gemini, Google TTS, Pixabay and Wiktionary responses.
+
+RecordedResponses patches the two places every external call goes through:
+requests' Session.request (TTS, Pixabay searches and downloads, Wiktionary)
+and the google-genai Models.generate_content / generate_content_stream
+(every Gemini call, whichever client made it).
+
+    with RecordedResponses(store, mode="record"):   # live calls, responses saved
+        generate_deck_progressive(...)
+
+    with RecordedResponses(store, faults={"gemini": ServiceFaults(latency_ms=900)}):
+        generate_deck_progressive(...)              # no network at all
+
+Requests are keyed by service, URL or model, non-secret parameters and body,
+so API keys never reach the store. A request recorded several times replays
+its responses in order. On replay, a request with no exact recording is
+answered by another recording of the same route (e.g. any Gemini grammar
+batch) chosen deterministically from its key, so larger decks than were
+recorded still replay; with fallback=False it raises RecordingMissing
+instead. Unknown hosts are never contacted during replay.
+
+Each service can be given synthetic latency (with seeded jitter) and an
+error rate: injected errors are HTTP 503 responses for requests and
+google.genai ServerErrors for Gemini, so the app's own retry and
+degradation paths run. The Gemini context cache is switched off in both
+modes so recorded prompts are the full prompts sent on replay.
+"""
+
+import base64
+import contextlib
+import hashlib
+import importlib
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Dict, Iterator, List, Optional
+from unittest.mock import patch
+from urllib.parse import parse_qsl, urlsplit, urlunsplit
+
+import requests
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(PROJECT_ROOT))
+sys.path.insert(0, str(PROJECT_ROOT / "streamlit_app"))
+
+RECORDINGS_DIR = Path(__file__).resolve().parent / "recordings"
+STORE_VERSION = 1
+
+# Hosts are matched by suffix; anything else is service "http"
+SERVICE_HOSTS = (
+    ("texttospeech.googleapis.com", "tts"),
+    ("pixabay.com", "pixabay"),
+    ("wiktionary.org", "wiktionary"),
+)
+SERVICES = ("gemini", "tts", "pixabay", "wiktionary", "http")
+SECRET_PARAMS = {"key", "api_key", "apikey", "access_token"}
+
+
+class RecordingMissing(requests.exceptions.ConnectionError):
+    """A replayed request has no recording (and no fallback was allowed)."""
+
+
+@dataclass
+class ServiceFaults:
+    """Synthetic latency and errors added to one service's replayed responses."""
+    latency_ms: float = 0.0
+    jitter_ms: float = 0.0
+    error_rate: float = 0.0
+
+
+def _digest(payload: Any) -> str:
+    text = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:24]
+
+
+def _without_secrets(params: Any) -> List[List[str]]:
+    if isinstance(params, dict):
+        items = params.items()
+    elif isinstance(params, (list, tuple)):
+        items = params
+    else:
+        items = []
+    return sorted([str(k), str(v)] for k, v in items if str(k).lower() not in SECRET_PARAMS)
+
+
+def http_service(url: str) -> str:
+    """Service name for a URL ("http" for hosts that are not recorded services)."""
+    host = (urlsplit(url).hostname or "").lower()
+    for suffix, service in SERVICE_HOSTS:
+        if host == suffix or host.endswith("." + suffix):
+            return service
+    return "http"
+
+
+def http_route(method: str, url: str) -> str:
+    """Coarse request kind used to match fallbacks, e.g. "pixabay:search"."""
+    service = http_service(url)
+    path = urlsplit(url).path
+    if service == "tts":
+        return "tts:voices" if path.endswith("/voices") else "tts:synthesize"
+    if service == "pixabay":
+        return "pixabay:search" if path.startswith("/api") else "pixabay:download"
+    if service == "wiktionary":
+        return "wiktionary:definition" if "/api/rest_v1/" in path else "wiktionary:page"
+    return f"http:{method.upper()}"
+
+
+def http_request_key(method: str, url: str, params: Any = None, json_body: Any = None, data: Any = None) -> Dict[str, Any]:
+    """Key fields of an HTTP request, with secrets removed."""
+    parts = urlsplit(url)
+    query = _without_secrets(parse_qsl(parts.query))
+    if isinstance(data, bytes):
+        data = data.decode("utf-8", errors="replace")
+    return {
+        "method": method.upper(),
+        "url": urlunsplit((parts.scheme, parts.netloc, parts.path, "", "")),
+        "params": query + _without_secrets(params),
+        "body": json_body if json_body is not None else data,
+    }
+
+
+def gemini_route(contents: Any) -> str:
+    """
+    Coarse kind of Gemini call: "gemini:content" for sentence generation (and
+    its repair prompt, which repeats the same output format), "gemini:grammar"
+    for JSON grammar analysis, "gemini:other" for anything else.
+    """
+    text = str(contents)
+    if "SENTENCES:" in text and "TRANSLATIONS:" in text:
+        return "gemini:content"
+    if "json" in text.lower():
+        return "gemini:grammar"
+    return "gemini:other"
+
+
+def _config_fields(config: Any) -> Any:
+    if config is None:
+        return None
+    if hasattr(config, "model_dump"):
+        config = config.model_dump(exclude_none=True)
+    if isinstance(config, dict):
+        return {k: v for k, v in config.items() if k != "cached_content"}
+    return str(config)
+
+
+def gemini_request_key(model: str, contents: Any, config: Any = None) -> Dict[str, Any]:
+    """Key fields of a Gemini call."""
+    return {"model": model, "contents": str(contents), "config": _config_fields(config)}
+
+
+class ResponseStore:
+    """
+    Recorded responses on disk (JSON), keyed by request.
+
+    Each entry holds the service, route, a short description of the request
+    and the list of responses it received, in order.
+    """
+
+    def __init__(self, path: Optional[Path] = None, meta: Optional[Dict[str, Any]] = None):
+        self.path = Path(path) if path else None
+        self.meta: Dict[str, Any] = dict(meta or {})
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path: Path) -> "ResponseStore":
+        store = cls(path)
+        payload = json.loads(Path(path).read_text(encoding="utf-8"))
+        if payload.get("version") != STORE_VERSION:
+            raise ValueError(f"{path}: unsupported recording version {payload.get('version')}")
+        store.meta = payload.get("meta", {})
+        store.entries = payload.get("entries", {})
+        return store
+
+    def save(self, path: Optional[Path] = None) -> Path:
+        """Write the store atomically and return its path."""
+        path = Path(path or self.path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            payload = {"version": STORE_VERSION, "meta": self.meta, "entries": dict(sorted(self.entries.items()))}
+        fd, tmp = tempfile.mkstemp(dir=str(path.parent), suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(payload, f, ensure_ascii=False, indent=1)
+        os.replace(tmp, path)
+        self.path = path
+        return path
+
+    def add(self, key: str, service: str, route: str, request: Dict[str, Any], response: Dict[str, Any]) -> None:
+        with self._lock:
+            entry = self.entries.setdefault(key, {"service": service, "route": route, "request": request, "responses": []})
+            entry["responses"].append(response)
+
+    def keys_for_route(self, route: str) -> List[str]:
+        return sorted(key for key, entry in self.entries.items() if entry["route"] == route)
+
+    def summary(self) -> Dict[str, int]:
+        """Recorded responses per route."""
+        counts: Dict[str, int] = defaultdict(int)
+        for entry in self.entries.values():
+            counts[entry["route"]] += len(entry["responses"])
+        return dict(sorted(counts.items()))
+
+
+def _encode_body(content: bytes, content_type: str) -> Dict[str, Any]:
+    if "json" in content_type or content_type.startswith("text/"):
+        try:
+            return {"text": content.decode("utf-8")}
+        except UnicodeDecodeError:
+            pass
+    return {"base64": base64.b64encode(content).decode("ascii")}
+
+
+def _decode_body(recorded: Dict[str, Any]) -> bytes:
+    if "text" in recorded:
+        return recorded["text"].encode("utf-8")
+    return base64.b64decode(recorded.get("base64", ""))
+
+
+def _http_response(url: str, status: int, body: bytes, content_type: str) -> requests.Response:
+    response = requests.Response()
+    response.status_code = status
+    response.reason = "OK" if status < 400 else "Service Unavailable"
+    response.url = url
+    response.encoding = "utf-8"
+    response.headers["Content-Type"] = content_type
+    response._content = body
+    return response
+
+
+def _gemini_response(text: str, recorded: Dict[str, Any]) -> SimpleNamespace:
+    usage = SimpleNamespace(
+        prompt_token_count=recorded.get("prompt_token_count"),
+        candidates_token_count=recorded.get("candidates_token_count"),
+        total_token_count=recorded.get("total_token_count"),
+    )
+    return SimpleNamespace(
+        text=text,
+        usage_metadata=usage,
+        candidates=[SimpleNamespace(finish_reason=recorded.get("finish_reason"))],
+    )
+
+
+def _gemini_record(response: Any, text: Optional[str]) -> Dict[str, Any]:
+    usage = getattr(response, "usage_metadata", None)
+    candidates = getattr(response, "candidates", None) or []
+    finish_reason = getattr(candidates[0], "finish_reason", None) if candidates else None
+    return {
+        "text": text,
+        "prompt_token_count": getattr(usage, "prompt_token_count", None),
+        "candidates_token_count": getattr(usage, "candidates_token_count", None),
+        "total_token_count": getattr(usage, "total_token_count", None),
+        "finish_reason": str(finish_reason) if finish_reason is not None else None,
+    }
+
+
+class RecordedResponses:
+    """
+    Context manager that records live responses into a ResponseStore or
+    replays them from it.
+
+    Attributes:
+        stats: Per service: calls, recorded, hits, fallbacks, misses,
+               injected_errors and injected_latency_s
+    """
+
+    def __init__(self, store: ResponseStore, mode: str = "replay",
+                 faults: Optional[Dict[str, ServiceFaults]] = None,
+                 seed: int = 0, fallback: bool = True):
+        """
+        Args:
+            store: Where responses are recorded to or replayed from
+            mode: "record" (live calls) or "replay" (no network)
+            faults: Synthetic latency and errors per service, replay only
+            seed: Seed for jitter and error injection
+            fallback: Answer unrecorded requests from the same route
+        """
+        if mode not in ("record", "replay"):
+            raise ValueError(f"Unknown mode '{mode}' (use 'record' or 'replay')")
+        self.store = store
+        self.mode = mode
+        self.faults = faults or {}
+        self.fallback = fallback
+        self.stats: Dict[str, Dict[str, float]] = {}
+        self._random = random.Random(seed)
+        self._served: Dict[str, int] = defaultdict(int)
+        self._lock = threading.Lock()
+        self._stack: Optional[contextlib.ExitStack] = None
+
+    # ------------------------------------------------------------------ setup
+
+    def __enter__(self) -> "RecordedResponses":
+        from google.genai.models import Models
+
+        self._original_request = requests.sessions.Session.request
+        self._original_generate = Models.generate_content
+        self._original_stream = Models.generate_content_stream
+
+        recorder = self
+
+        def request(session, method, url, *args, **kwargs):
+            return recorder._http(session, method, url, *args, **kwargs)
+
+        def generate_content(models, *, model, contents, config=None):
+            return recorder._gemini(models, model, contents, config)
+
+        def generate_content_stream(models, *, model, contents, config=None):
+            return recorder._gemini_stream(models, model, contents, config)
+
+        self._stack = contextlib.ExitStack()
+        self._stack.enter_context(patch.object(requests.sessions.Session, "request", request))
+        self._stack.enter_context(patch.object(Models, "generate_content", generate_content))
+        self._stack.enter_context(patch.object(Models, "generate_content_stream", generate_content_stream))
+        # The app is imported both as a package and from streamlit_app/ on sys.path
+        for name in ("streamlit_app.shared_utils", "shared_utils"):
+            module = importlib.import_module(name)
+            self._stack.enter_context(patch.dict(module.GEMINI_CONTEXT_CACHE, {"enabled": False}))
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._stack.close()
+        if self.mode == "record" and self.store.path:
+            self.store.save()
+        return False
+
+    # ------------------------------------------------------------- bookkeeping
+
+    def _count(self, service: str, field: str, amount: float = 1) -> None:
+        with self._lock:
+            stats = self.stats.setdefault(service, {
+                "calls": 0, "recorded": 0, "hits": 0, "fallbacks": 0,
+                "misses": 0, "injected_errors": 0, "injected_latency_s": 0.0,
+            })
+            stats[field] += amount
+
+    def _lookup(self, service: str, route: str, key: str) -> Dict[str, Any]:
+        entry = self.store.entries.get(key)
+        if entry is not None:
+            self._count(service, "hits")
+        else:
+            candidates = self.store.keys_for_route(route) if self.fallback else []
+            if not candidates:
+                self._count(service, "misses")
+                raise RecordingMissing(f"No recording for {route} request {key}")
+            key = candidates[int(key[:8], 16) % len(candidates)]
+            entry = self.store.entries[key]
+            self._count(service, "fallbacks")
+        with self._lock:
+            index = self._served[key]
+            self._served[key] += 1
+        responses = entry["responses"]
+        return responses[index % len(responses)]
+
+    def _inject(self, service: str) -> bool:
+        """Sleep for the service's synthetic latency; True if this call should fail."""
+        faults = self.faults.get(service)
+        if not faults:
+            return False
+        with self._lock:
+            jitter = self._random.uniform(-faults.jitter_ms, faults.jitter_ms) if faults.jitter_ms else 0.0
+            fail = faults.error_rate > 0 and self._random.random() < faults.error_rate
+        delay = max(0.0, faults.latency_ms + jitter) / 1000
+        if delay:
+            time.sleep(delay)
+            self._count(service, "injected_latency_s", delay)
+        if fail:
+            self._count(service, "injected_errors")
+        return fail
+
+    # -------------------------------------------------------------------- HTTP
+
+    def _http(self, session, method, url, *args, **kwargs):
+        service = http_service(url)
+        route = http_route(method, url)
+        request = http_request_key(method, url, kwargs.get("params"), kwargs.get("json"), kwargs.get("data"))
+        key = _digest([service, request])
+        self._count(service, "calls")
+
+        if self.mode == "record":
+            response = self._original_request(session, method, url, *args, **kwargs)
+            content_type = response.headers.get("Content-Type", "")
+            self.store.add(key, service, route, {"method": request["method"], "url": request["url"]}, {
+                "status": response.status_code,
+                "content_type": content_type,
+                **_encode_body(response.content, content_type),
+            })
+            self._count(service, "recorded")
+            return response
+
+        if self._inject(service):
+            return _http_response(url, 503, b'{"error": "injected replay error"}', "application/json")
+        recorded = self._lookup(service, route, key)
+        return _http_response(url, recorded["status"], _decode_body(recorded), recorded.get("content_type", ""))
+
+    # ------------------------------------------------------------------ Gemini
+
+    def _gemini_key(self, model, contents, config):
+        return _digest(["gemini", gemini_request_key(model, contents, config)])
+
+    def _injected_gemini_error(self):
+        from google.genai import errors
+        return errors.ServerError(503, {"error": {"code": 503, "message": "Injected replay error", "status": "UNAVAILABLE"}})
+
+    def _gemini(self, models, model, contents, config):
+        route = gemini_route(contents)
+        key = self._gemini_key(model, contents, config)
+        self._count("gemini", "calls")
+
+        if self.mode == "record":
+            response = self._original_generate(models, model=model, contents=contents, config=config)
+            self.store.add(key, "gemini", route, {"model": model}, _gemini_record(response, response.text))
+            self._count("gemini", "recorded")
+            return response
+
+        if self._inject("gemini"):
+            raise self._injected_gemini_error()
+        recorded = self._lookup("gemini", route, key)
+        return _gemini_response(recorded.get("text") or "", recorded)
+
+    def _gemini_stream(self, models, model, contents, config) -> Iterator[Any]:
+        route = gemini_route(contents)
+        key = self._gemini_key(model, contents, config)
+        self._count("gemini", "calls")
+
+        if self.mode == "record":
+            chunks, response = [], None
+            for response in self._original_stream(models, model=model, contents=contents, config=config):
+                if response.text:
+                    chunks.append(response.text)
+                yield response
+            record = _gemini_record(response, "".join(chunks))
+            record["chunks"] = chunks
+            self.store.add(key, "gemini", route, {"model": model}, record)
+            self._count("gemini", "recorded")
+            return
+
+        if self._inject("gemini"):
+            raise self._injected_gemini_error()
+        recorded = self._lookup("gemini", route, key)
+        for chunk in recorded.get("chunks") or [recorded.get("text") or ""]:
+            yield _gemini_response(chunk, recorded)
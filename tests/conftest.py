@@ -28,4 +28,17 @@ def setup_test_environment():
     yield
 
     # Cleanup if needed
-    pass
\ No newline at end of file
+    pass
+
+
+@pytest.fixture(autouse=True)
+def in_memory_generation_stores(monkeypatch):
+    """
+    Keep the global adaptive batcher and generation telemetry in memory, so
+    tests never write learned statistics into ./cache, which production reads.
+    """
+    from streamlit_app.services.generation import adaptive_batcher, generation_telemetry
+
+    monkeypatch.setattr(adaptive_batcher, "_adaptive_batcher", adaptive_batcher.AdaptiveBatcher(stats_path=None))
+    monkeypatch.setattr(generation_telemetry, "_generation_telemetry",
+                        generation_telemetry.GenerationTelemetry(telemetry_path=None))
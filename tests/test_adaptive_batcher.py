@@ -0,0 +1,102 @@
+"""
+Unit tests for adaptive grammar batch sizing.
+Batches are packed to an output-token budget learned per language and complexity,
+and processes sharing the statistics file add up their batches.
+"""
+
+import os
+import sys
+import threading
+
+# Add the streamlit_app directory to the path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'streamlit_app'))
+
+from streamlit_app.services.generation.adaptive_batcher import AdaptiveBatcher
+
+SHORT = "我爱你。"                       # 4 characters
+LONG = "Obwohl der Zug wegen des starken Schneefalls erheblich verspätet war, " \
+       "erreichten wir den Flughafen gerade noch rechtzeitig."
+
+
+class TestBatchPlanning:
+    """Test batch planning before and after history exists."""
+
+    def test_default_size_without_history(self):
+        batcher = AdaptiveBatcher()
+        batches = batcher.plan_batches(["s"] * 20, "de", "advanced")
+        assert [len(b) for b in batches] == [8, 8, 4]
+        assert sum(batches, []) == list(range(20))
+
+    def test_learned_costs_pack_short_and_split_long_sentences(self):
+        batcher = AdaptiveBatcher(output_token_budget=4000)
+        # zh beginner: ~40 output tokens per 4-character sentence
+        batcher.record_batch("zh", "beginner", [SHORT] * 8, output_tokens=8 * 40)
+        # de advanced: ~1,500 output tokens per long sentence
+        batcher.record_batch("de", "advanced", [LONG] * 2, output_tokens=2 * 1500)
+
+        assert [len(b) for b in batcher.plan_batches([SHORT] * 30, "zh", "beginner")] == [20, 10]
+        assert [len(b) for b in batcher.plan_batches([LONG] * 8, "de", "advanced")] == [2, 2, 2, 2]
+
+    def test_truncation_shrinks_and_clean_batches_recover(self):
+        batcher = AdaptiveBatcher()
+        batcher.record_batch("ar", "advanced", ["s"] * 8, failed_indices=[6, 7], truncated=True)
+        assert [len(b) for b in batcher.plan_batches(["s"] * 8, "ar", "advanced")] == [4, 4]
+
+        for _ in range(4):
+            batcher.record_batch("ar", "advanced", ["s"] * 4)
+        assert [len(b) for b in batcher.plan_batches(["s"] * 8, "ar", "advanced")] == [8]
+
+
+class TestMetricsAndPersistence:
+    """Test exported metrics and persisted statistics."""
+
+    def test_metrics(self):
+        batcher = AdaptiveBatcher(output_token_budget=1000)
+        batcher.record_batch("es", "beginner", ["Hola amigo."] * 4, output_tokens=500)
+        batcher.record_batch("es", "beginner", ["Hola amigo."] * 2, output_tokens=300, failed_indices=[0])
+
+        metrics = batcher.get_metrics()["es:beginner"]
+        assert metrics["avg_batch_size"] == 3.0
+        assert metrics["last_batch_size"] == 2
+        assert metrics["fill_ratio"] == 0.4
+        assert metrics["retry_rate"] == round(1 / 6, 3)
+        assert metrics["truncation_rate"] == 0.0
+
+    def test_statistics_persist(self, tmp_path):
+        path = tmp_path / "batching.json"
+        first = AdaptiveBatcher(stats_path=str(path))
+        first.record_batch("zh", "beginner", [SHORT] * 8, output_tokens=320)
+
+        second = AdaptiveBatcher(stats_path=str(path))
+        assert second.get_metrics() == first.get_metrics()
+        assert second.plan_batches([SHORT] * 8, "zh", "beginner") == first.plan_batches([SHORT] * 8, "zh", "beginner")
+
+    def test_processes_sharing_the_file_add_up_their_batches(self, tmp_path):
+        path = tmp_path / "batching.json"
+        worker_a = AdaptiveBatcher(stats_path=str(path))
+        worker_b = AdaptiveBatcher(stats_path=str(path))
+        worker_a.record_batch("zh", "beginner", [SHORT] * 8, output_tokens=320)
+        worker_b.record_batch("zh", "beginner", [SHORT] * 4, output_tokens=160)
+        worker_a.record_batch("zh", "beginner", [SHORT] * 2, output_tokens=80)
+
+        metrics = AdaptiveBatcher(stats_path=str(path)).get_metrics()["zh:beginner"]
+        assert metrics["batches"] == 3 and metrics["sentences"] == 14
+        assert worker_b.get_metrics()["zh:beginner"] == metrics
+        assert not list(tmp_path.glob("*.tmp"))
+
+    def test_concurrent_writers_do_not_drop_each_others_batches(self, tmp_path):
+        path = tmp_path / "batching.json"
+
+        def worker():
+            batcher = AdaptiveBatcher(stats_path=str(path))
+            for _ in range(10):
+                batcher.record_batch("zh", "beginner", [SHORT] * 2, output_tokens=80)
+
+        threads = [threading.Thread(target=worker) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        metrics = AdaptiveBatcher(stats_path=str(path)).get_metrics()["zh:beginner"]
+        assert metrics["batches"] == 40 and metrics["sentences"] == 80
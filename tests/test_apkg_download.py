@@ -0,0 +1,99 @@
+"""
+Unit tests for file-backed APKG downloads.
+Decks are registered by path instead of being loaded into session state.
+"""
+
+import os
+import sys
+import tempfile
+import time
+from unittest.mock import Mock, patch
+
+# Add the streamlit_app directory to the path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'streamlit_app'))
+
+from streamlit_app.services.generation import file_manager as file_manager_module
+from streamlit_app.services.generation.file_manager import FileManager, get_apkg_download_data
+
+
+class _SessionState(dict):
+    """Minimal stand-in for st.session_state supporting attribute access."""
+
+    def __getattr__(self, name):
+        try:
+            return self[name]
+        except KeyError:
+            raise AttributeError(name)
+
+    def __setattr__(self, name, value):
+        self[name] = value
+
+    def __delattr__(self, name):
+        del self[name]
+
+
+class TestApkgDownload:
+    """Test APKG registration, download data and expiry cleanup."""
+
+    def setup_method(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.session_state = _SessionState(selected_lang="German")
+        self.st_patch = patch.object(file_manager_module, "st", Mock(session_state=self.session_state))
+        self.st_patch.start()
+        self.file_manager = FileManager(log_manager=Mock())
+        self.file_manager.output_dir = self.temp_dir.name
+
+    def teardown_method(self):
+        self.st_patch.stop()
+        self.temp_dir.cleanup()
+
+    def _write_apkg(self, name="German.apkg", content=b"deck-bytes"):
+        path = os.path.join(self.temp_dir.name, name)
+        with open(path, "wb") as f:
+            f.write(content)
+        return path
+
+    def test_registers_path_not_bytes(self):
+        source = self._write_apkg()
+        assert self.file_manager.load_apkg_file(source)
+
+        registered = self.file_manager.get_registered_apkg_path()
+        assert "apkg_file" not in self.session_state
+        assert not os.path.exists(source)
+        assert os.path.dirname(registered).endswith(file_manager_module.DOWNLOADS_SUBDIR)
+        assert self.session_state["apkg_size_bytes"] == len(b"deck-bytes")
+        assert self.session_state["apkg_filename"].startswith("German_")
+
+    def test_new_deck_replaces_previous_download(self):
+        self.file_manager.load_apkg_file(self._write_apkg())
+        first = self.file_manager.get_registered_apkg_path()
+        self.file_manager.load_apkg_file(self._write_apkg())
+
+        assert not os.path.exists(first)
+        assert os.path.exists(self.file_manager.get_registered_apkg_path())
+
+    def test_download_data_reads_from_disk(self):
+        self.file_manager.load_apkg_file(self._write_apkg(content=b"payload"))
+        data = get_apkg_download_data(self.file_manager.get_registered_apkg_path())
+        if callable(data):
+            data = data()
+        assert data == b"payload"
+
+    def test_download_data_without_deferred_downloads_is_bytes(self):
+        self.file_manager.load_apkg_file(self._write_apkg(content=b"payload"))
+        with patch("streamlit.runtime.media_file_manager.MediaFileManager", spec=[]):
+            data = get_apkg_download_data(self.file_manager.get_registered_apkg_path())
+        assert data == b"payload"
+
+    def test_expired_downloads_are_removed(self):
+        self.file_manager.load_apkg_file(self._write_apkg())
+        registered = self.file_manager.get_registered_apkg_path()
+        old = time.time() - file_manager_module.DOWNLOAD_EXPIRY_SECONDS - 60
+        os.utime(registered, (old, old))
+
+        assert self.file_manager.cleanup_expired_downloads() == 1
+        assert not os.path.exists(registered)
+
+    def test_missing_file_is_rejected(self):
+        assert not self.file_manager.load_apkg_file(os.path.join(self.temp_dir.name, "missing.apkg"))
+        assert self.file_manager.get_registered_apkg_path() is None
@@ -0,0 +1,56 @@
+"""
+Unit tests for batched IPA generation.
+All sentences go out in one request, and only invalid lines are re-requested
+together in a single follow-up.
+"""
+
+import os
+import sys
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+# Add the streamlit_app directory to the path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'streamlit_app'))
+
+from streamlit_app import generation_utils
+from streamlit_app.generation_utils import _parse_numbered_lines, batch_generate_ipa, generate_ipa_hybrid
+
+SENTENCES = ["Hola.", "Buenos días.", "Gracias.", "Adiós."]
+
+
+def _client(*responses):
+    client = MagicMock()
+    client.models.generate_content.side_effect = [SimpleNamespace(text=text) for text in responses]
+    return client
+
+
+class TestBatchGenerateIpa:
+    """Test call counts, validation and alignment."""
+
+    def test_one_call_when_every_line_is_valid(self):
+        client = _client("Sentence 1: /ˈola/\nSentence 2: ˈbwenos ˈdias\nSentence 3: [ˈɡɾasjas]\nSentence 4: aˈðjos")
+        with patch.object(generation_utils.genai, "Client", return_value=client):
+            result = batch_generate_ipa(SENTENCES, "es", "key")
+        assert result == ["ˈola", "ˈbwenos ˈdias", "ˈɡɾasjas", "aˈðjos"]
+        assert client.models.generate_content.call_count == 1
+
+    def test_only_invalid_lines_are_retried_in_one_call(self):
+        client = _client(
+            "Sentence 1: /ˈola/\nSentence 2: bwenos1 dias3\nSentence 4: aˈðjos",
+            "Sentence 1: ˈbwenos ˈdias\nSentence 2: ma1 ma2",
+        )
+        with patch.object(generation_utils.genai, "Client", return_value=client):
+            result = batch_generate_ipa(SENTENCES, "es", "key")
+
+        assert result == ["ˈola", "ˈbwenos ˈdias", "", "aˈðjos"]
+        assert client.models.generate_content.call_count == 2
+        retry_prompt = client.models.generate_content.call_args_list[1].kwargs["contents"]
+        assert "Sentence 1: Buenos días." in retry_prompt and "Sentence 2: Gracias." in retry_prompt
+        assert "Hola." not in retry_prompt
+
+    def test_single_sentence_and_missing_key(self):
+        client = _client("1. /ˈola/")
+        with patch.object(generation_utils.genai, "Client", return_value=client):
+            assert generate_ipa_hybrid("Hola.", "es", "key") == "ˈola"
+        assert batch_generate_ipa(SENTENCES, "es", "") == [""] * 4
+        assert _parse_numbered_lines("Sentence 2: b\n1) a\nnoise") == {2: "b", 1: "a"}
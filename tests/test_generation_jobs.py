@@ -0,0 +1,118 @@
+"""
+Unit tests for checkpointed, resumable deck generation.
+Jobs are found again by deck, stages and finished words round-trip through
+SQLite, expired jobs are purged, dedup plans survive serialization, and a
+word interrupted after some passes resumes without repeating the API calls
+of the passes it finished.
+"""
+
+from streamlit_app.services.generation.job_store import GenerationJobStore
+from streamlit_app.services.generation.sentence_dedup import DeckSentence, DedupPlan, MinHasher
+from tests.benchmarks.full_deck import (
+    REPLAY_KEYS, RecordedResponses, _pipeline, _session_state, synthetic_store,
+)
+
+PARAMS = {'sentences_per_word': 3, 'sentence_length_range': [6, 10], 'difficulty': 'intermediate'}
+
+
+def _store(tmp_path):
+    return GenerationJobStore(db_path=str(tmp_path / "jobs.db"), jobs_dir=str(tmp_path / "jobs"))
+
+
+def _generate_word(store, job_id, meta, output_dir):
+    """Generate the deck's first word against replayed APIs; returns the result and calls per service."""
+    from streamlit_app.core_functions import generate_deck_progressive
+
+    word = meta["words"][0]
+    session_state = _session_state(meta.get("difficulty", "intermediate"), *REPLAY_KEYS)
+    with RecordedResponses(synthetic_store(meta["language"].lower()), mode="replay") as replay, \
+            _pipeline(meta, session_state, 0):
+        result = generate_deck_progressive(
+            word=word,
+            language=meta["language"],
+            gemini_api_key=REPLAY_KEYS[0],
+            output_dir=output_dir,
+            num_sentences=meta.get("num_sentences", 10),
+            min_length=meta.get("min_length", 5),
+            max_length=meta.get("max_length", 20),
+            difficulty=meta.get("difficulty", "intermediate"),
+            checkpoint=store.checkpoint(job_id, 0, word),
+        )
+    return result, {service: stats['calls'] for service, stats in replay.stats.items()}
+
+
+class TestGenerationJobs:
+    """Test the job store and resuming generation from checkpoints."""
+
+    def test_job_round_trip_and_purge(self, tmp_path):
+        store = _store(tmp_path)
+        job_id = store.create_job("Spanish", ["comer", "beber"], PARAMS)
+        assert store.find_resumable("Spanish", ["comer", "beber"], PARAMS) == job_id
+        assert store.find_resumable("Spanish", ["beber", "comer"], PARAMS) is None
+        assert (store.job_dir(job_id) / "media").is_dir()
+
+        checkpoint = store.checkpoint(job_id, 0, "comer")
+        assert checkpoint.unique_id("first") == "first"
+        assert store.checkpoint(job_id, 0, "comer").unique_id("second") == "first"
+        checkpoint.save("audio", {'audio_files': ["comer_01_first.mp3"]})
+        assert store.load_stage(job_id, 0, "audio") == {'audio_files': ["comer_01_first.mp3"]}
+        assert store.load_stage(job_id, 1, "audio") is None
+
+        store.complete_word(job_id, 1, {'word': "beber", 'sentences': [{'sentence': "Bebo agua."}]})
+        store.complete_word(job_id, 0, {'word': "comer", 'sentences': []})
+        assert [w['word'] for w in store.words_data(job_id)] == ["comer", "beber"]
+        job = store.get_job(job_id)
+        assert job['completed_words'] == 2 and job['stages'] == {'audio': 1}
+        assert job['params'] == PARAMS
+
+        store.finish_job(job_id, "finalized", "/downloads/Spanish.apkg")
+        assert store.find_resumable("Spanish", ["comer", "beber"], PARAMS) is None
+        assert not (store.job_dir(job_id) / "media").exists()
+        assert store.purge(older_than_days=1) == 0
+        assert store.purge(older_than_days=-1) == 1
+        assert store.get_job(job_id) is None and not store.job_dir(job_id).exists()
+
+    def test_expired_finished_jobs_are_purged_automatically(self, tmp_path):
+        store = _store(tmp_path)
+        old, running = store.create_job("Spanish", ["comer"], PARAMS), store.create_job("Spanish", ["beber"], PARAMS)
+        store.finish_job(old, "failed")
+        with store._connect() as conn:
+            conn.execute("UPDATE jobs SET updated_at = 0")
+
+        reopened = _store(tmp_path)
+        assert reopened.get_job(old) is None and not reopened.job_dir(old).exists()
+        assert reopened.get_job(running)['status'] == "running"
+
+    def test_dedup_plan_serialization(self):
+        earlier = {'sentence': "Como pan.", 'grammar_summary': "Present tense"}
+        deck_sentence = DeckSentence("comer", "como pan", MinHasher(8).signature("como pan"), earlier,
+                                     "comer_01.mp3", "comer_01.jpg")
+        plan = DedupPlan(sentences=[{'sentence': "Como pan."}, {'sentence': "Bebo."}, {'sentence': "Bebo."}],
+                         shared_from={0: deck_sentence, 2: 1}, replaced=1)
+
+        restored = DedupPlan.from_dict(plan.to_dict())
+        assert restored == plan
+        assert restored.unique_indices() == [1] and restored.source_index(2) == 1
+
+    def test_interrupted_word_resumes_without_repeating_finished_passes(self, tmp_path):
+        store = _store(tmp_path)
+        meta = synthetic_store("spanish").meta
+        job_id = store.create_job(meta["language"], meta["words"][:1], PARAMS)
+        output_dir = str(store.job_dir(job_id))
+
+        first, first_calls = _generate_word(store, job_id, meta, output_dir)
+        assert first['success'] and first_calls.get("gemini") and first_calls.get("tts")
+
+        # Interrupted after the grammar pass: audio and images were never checkpointed
+        with store._connect() as conn:
+            conn.execute("DELETE FROM stages WHERE stage IN ('audio', 'images')")
+        second, second_calls = _generate_word(store, job_id, meta, output_dir)
+
+        assert second['success'] and not second_calls.get("gemini")
+        assert second_calls.get("tts")
+        assert second['word_data'] == first['word_data']
+
+        # Every pass checkpointed: nothing is called at all
+        third, third_calls = _generate_word(store, job_id, meta, output_dir)
+        assert not any(third_calls.values())
+        assert third['word_data'] == first['word_data']
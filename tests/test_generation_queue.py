@@ -0,0 +1,153 @@
+"""
+Unit tests for the background generation queue.
+Jobs run under the worker cap with per-user fairness, a worker that dies is
+retried, a worker's metrics reach the server's registry, and a worker
+generates a whole deck from a job (APIs replayed) while the page-facing
+progress API reports its messages and the result.
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from streamlit_app.services.generation import metrics
+from streamlit_app.services.generation.generation_queue import GenerationQueue, run_generation_job
+from streamlit_app.services.generation.job_store import GenerationJobStore
+from tests.benchmarks.full_deck import (
+    REPLAY_KEYS, RecordedResponses, _pipeline, _session_state, deck_words, synthetic_store,
+)
+
+PARAMS = {'sentences_per_word': 3, 'sentence_length_range': [5, 20], 'difficulty': 'intermediate',
+          'audio_speed': 0.8, 'selected_voice': None, 'enable_topics': False, 'selected_topics': []}
+
+
+class _BlockingRunner:
+    """Stands in for run_generation_job: records start order and finishes jobs when released."""
+
+    def __init__(self, fail_first=()):
+        self.started = []
+        self.release = {}
+        self.fail_first = set(fail_first)
+        self.lock = threading.Lock()
+        self.started_event = threading.Condition(self.lock)
+
+    def __call__(self, job_id, session_values, db_path, jobs_dir):
+        with self.lock:
+            self.started.append(job_id)
+            release = self.release.setdefault(job_id, threading.Event())
+            self.started_event.notify_all()
+            if job_id in self.fail_first:
+                self.fail_first.discard(job_id)
+                raise BrokenProcessPool("worker killed")
+        release.wait(10)
+        GenerationJobStore(db_path, jobs_dir).finish_job(job_id, "finalized")
+        change = {'name': "app_test_worker_calls_total", 'type': "counter", 'doc': "Worker calls",
+                  'labelnames': (), 'labels': (), 'amount': 1}
+        return {'usage': {'gemini_api_calls': 2}, 'metrics': [change], 'pid': -1}
+
+    def wait_started(self, count):
+        with self.lock:
+            assert self.started_event.wait_for(lambda: len(self.started) >= count, timeout=10), self.started
+
+    def finish(self, job_id):
+        with self.lock:
+            event = self.release.setdefault(job_id, threading.Event())
+        event.set()
+
+
+def _queue(tmp_path, runner, **kwargs):
+    store = GenerationJobStore(db_path=str(tmp_path / "jobs.db"), jobs_dir=str(tmp_path / "jobs"))
+    return store, GenerationQueue(store=store, runner=runner, executor_factory=ThreadPoolExecutor, **kwargs)
+
+
+class TestGenerationQueue:
+    """Test scheduling, retries and a worker run end to end."""
+
+    def test_worker_cap_and_per_user_fairness(self, tmp_path):
+        runner = _BlockingRunner()
+        store, queue = _queue(tmp_path, runner, max_workers=2, max_jobs_per_user=1)
+        calls_before = metrics.get_metrics_registry().counter("app_test_worker_calls_total", "Worker calls").get()
+        try:
+            jobs = {name: store.create_job("Spanish", [name], PARAMS) for name in ("a1", "a2", "a3", "b1")}
+            for name in ("a1", "a2", "a3", "b1"):
+                queue.submit(jobs[name], name[0], {})
+            runner.wait_started(2)
+
+            # a2 and a3 wait behind user a's running job even though b1 was submitted last
+            assert runner.started == [jobs["a1"], jobs["b1"]]
+            assert queue.progress(jobs["a2"])['queue_position'] == 0
+            assert queue.progress(jobs["a3"])['status'] == "queued"
+
+            runner.finish(jobs["b1"])
+            runner.finish(jobs["a1"])
+            runner.wait_started(3)
+            assert runner.started[2] == jobs["a2"]
+            runner.finish(jobs["a2"])
+            runner.wait_started(4)
+            # Cancelled while running: the worker finishing does not overwrite it
+            queue.cancel(jobs["a3"])
+            runner.finish(jobs["a3"])
+        finally:
+            queue.shutdown()
+
+        assert store.get_job(jobs["a3"])['status'] == "cancelled"
+
+        progress = queue.progress(jobs["a1"])
+        assert progress['status'] == "finalized" and progress['usage'] == {'gemini_api_calls': 2}
+        assert not progress['active'] and progress['queue_position'] is None
+        # Each worker's metric changes were merged into this process's registry
+        assert metrics.get_metrics_registry().counter(
+            "app_test_worker_calls_total", "Worker calls").get() - calls_before == 4
+        assert [e['message'] for e in progress['events']][:2] == [
+            "<b>⏳ Queued for a background worker</b>", "<b>⚙️ Started on a background worker</b>"]
+
+    def test_dead_worker_is_retried_and_queued_jobs_can_be_cancelled(self, tmp_path):
+        store = GenerationJobStore(db_path=str(tmp_path / "jobs.db"), jobs_dir=str(tmp_path / "jobs"))
+        job_id = store.create_job("Spanish", ["comer"], PARAMS)
+        cancelled = store.create_job("Spanish", ["beber"], PARAMS)
+        runner = _BlockingRunner(fail_first={job_id})
+        store, queue = _queue(tmp_path, runner, max_workers=1)
+        try:
+            queue.submit(job_id, "a", {})
+            queue.submit(cancelled, "b", {})
+            queue.cancel(cancelled)
+            runner.wait_started(2)
+            runner.finish(job_id)
+        finally:
+            queue.shutdown()
+
+        assert runner.started == [job_id, job_id]
+        assert store.get_job(job_id)['status'] == "finalized"
+        assert store.get_job(cancelled)['status'] == "cancelled"
+        assert any("resuming on a new one" in e['message'] for e in store.events(job_id))
+
+    def test_worker_generates_the_deck_and_reports_progress(self, tmp_path):
+        meta = synthetic_store("spanish").meta
+        words = deck_words(meta["words"], 2)
+        params = {**PARAMS, 'sentences_per_word': meta["num_sentences"], 'difficulty': meta["difficulty"],
+                  'sentence_length_range': [meta["min_length"], meta["max_length"]]}
+        store = GenerationJobStore(db_path=str(tmp_path / "jobs.db"), jobs_dir=str(tmp_path / "jobs"))
+        job_id = store.create_job(meta["language"], words, params)
+        session_values = {'google_api_key': REPLAY_KEYS[0], 'google_tts_api_key': REPLAY_KEYS[1],
+                          'pixabay_api_key': REPLAY_KEYS[2]}
+
+        with RecordedResponses(synthetic_store("spanish"), mode="replay"), \
+                _pipeline(meta, _session_state(meta["difficulty"], *REPLAY_KEYS), 0):
+            result = run_generation_job(job_id, session_values, str(store.db_path), str(store.jobs_dir))
+
+        job = store.get_job(job_id)
+        assert job['status'] == "finalized" and job['completed_words'] == 2
+        assert result['usage']['gemini_api_calls'] > 0
+        assert any(change['name'] == "app_pipeline_stage_duration_seconds" for change in result['metrics'])
+        messages = [e['message'] for e in store.events(job_id)]
+        assert f"<b>🔤 Processing word 2/2: '{words[1]}'</b>" in messages
+        assert messages[-1] == "<b>✅ Deck assembly completed successfully!</b>"
+        assert (store.job_dir(job_id) / f"{meta['language']}.apkg").exists()
+        assert (store.job_dir(job_id) / "trace.jsonl").exists()
+
+        # A finished or cancelled job is not generated again
+        assert run_generation_job(job_id, session_values, str(store.db_path), str(store.jobs_dir)) == {}
+        cancelled = store.create_job(meta["language"], words[:1], params)
+        store.finish_job(cancelled, "cancelled")
+        assert run_generation_job(cancelled, session_values, str(store.db_path), str(store.jobs_dir)) == {}
+        assert store.set_status(cancelled, "running") is False and store.get_job(cancelled)['status'] == "cancelled"
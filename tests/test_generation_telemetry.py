@@ -0,0 +1,94 @@
+"""
+Unit tests for generation telemetry and the deck estimator.
+Estimates fall back from the language's own records to the model, to all
+records and finally to the static defaults, and scale per sentence.
+Processes sharing the telemetry file see and keep each other's records.
+"""
+
+import os
+import sys
+from unittest.mock import patch
+
+# Add the streamlit_app directory to the path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'streamlit_app'))
+
+from streamlit_app.services.generation import generation_telemetry
+from streamlit_app.services.generation.generation_telemetry import (
+    GenerationTelemetry, WordTelemetry, format_duration_range,
+)
+
+
+def _word(language, seconds, tokens=400, chars=900, num_sentences=10, model="gemini-2.5-flash"):
+    word = WordTelemetry(language, model, num_sentences)
+    word.stage_seconds = {"sentences": seconds / 2, "grammar": seconds / 2}
+    word.gemini_calls, word.gemini_tokens = 3, tokens
+    word.tts_chars, word.pixabay_calls = chars, num_sentences
+    return word
+
+
+class TestGenerationTelemetry:
+    """Test recording, percentiles, fallbacks and persistence."""
+
+    def test_defaults_match_the_old_static_estimate(self):
+        estimate = GenerationTelemetry().estimate(5, 10, "Spanish")
+        assert estimate['source'] == 'default'
+        assert estimate['gemini_tokens_p50'] == 5 * 400
+        assert estimate['google_tts_chars_p50'] == 50 * 90
+        assert estimate['pixabay_calls_p50'] == 50
+
+    def test_percentiles_scale_per_sentence_and_prefer_the_language(self, tmp_path):
+        path = tmp_path / "telemetry.json"
+        telemetry = GenerationTelemetry(telemetry_path=str(path))
+        for seconds in (10, 20, 30, 40, 100):
+            telemetry.record_word(_word("Spanish", seconds))
+        for _ in range(3):
+            telemetry.record_word(_word("Arabic", 300, tokens=2000))
+
+        estimate = telemetry.estimate(2, 20, "Spanish")
+        assert estimate['source'] == 'language' and estimate['samples'] == 5
+        # Per sentence: p50 3 s and p90 10 s, for 40 sentences
+        assert estimate['wall_seconds_p50'] == 120.0
+        assert estimate['wall_seconds_p90'] == 400.0
+        assert estimate['gemini_tokens_p50'] == 1600
+        assert estimate['stage_seconds_p50'] == {"grammar": 60.0, "sentences": 60.0}
+
+        # Too few German words: every record for the model is used instead
+        assert GenerationTelemetry(telemetry_path=str(path)).estimate(1, 10, "German")['source'] == 'model'
+
+    def test_processes_sharing_the_file_see_and_keep_each_others_words(self, tmp_path):
+        path = tmp_path / "telemetry.json"
+        server = GenerationTelemetry(telemetry_path=str(path))
+        worker_a = GenerationTelemetry(telemetry_path=str(path))
+        worker_b = GenerationTelemetry(telemetry_path=str(path))
+        worker_a.record_word(_word("Spanish", 10))
+        worker_b._records["Spanish:gemini-2.5-flash"] = [_word("Spanish", 20).to_record()]
+        with worker_b._lock:
+            worker_b._save()   # written without reloading first: the file's word is merged in
+        worker_a.record_word(_word("Spanish", 10))
+
+        assert server.get_summary()["Spanish:gemini-2.5-flash"]['words'] == 3
+        assert not list(tmp_path.glob("*.tmp"))
+
+    def test_word_telemetry_marks_stages_and_old_samples_are_dropped(self):
+        word = WordTelemetry("Spanish", "m", 4)
+        word.mark("sentences")
+        word.mark("grammar")
+        word.mark("grammar")
+        assert set(word.to_record()['stage_seconds']) == {"sentences", "grammar"}
+
+        telemetry = GenerationTelemetry(max_samples=2)
+        for seconds in (1, 2, 3):
+            telemetry.record_word(_word("Spanish", seconds))
+        assert telemetry.get_summary()["Spanish:gemini-2.5-flash"]['words'] == 2
+
+    def test_estimate_api_costs_and_batch_labels_use_telemetry(self):
+        from streamlit_app.frequency_utils import format_batch_option
+        from streamlit_app.generation_utils import estimate_api_costs
+
+        telemetry = GenerationTelemetry(min_samples=1)
+        telemetry.record_word(_word("Spanish", 60))
+        with patch.object(generation_telemetry, "_generation_telemetry", telemetry):
+            costs = estimate_api_costs(10, 10, "Spanish")
+            assert costs['wall_seconds_est'] == 600.0 and costs['gemini_tokens_est'] == 4000
+            assert format_batch_option(10, 10, "Spanish") == "🟡 10 words (10 minutes)"
+        assert format_duration_range(600, 900) == "10-15 minutes"
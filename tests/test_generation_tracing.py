@@ -0,0 +1,78 @@
+"""
+Unit tests for generation tracing.
+Spans nest and record errors, nothing is recorded without an active tracer,
+the summary and OTLP export add up, and a replayed deck is traced from the
+passes down to the individual API calls.
+"""
+
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from streamlit_app.services.generation.tracing import (
+    NOOP_SPAN, Tracer, current_span, in_current_context, load_jsonl, span,
+)
+from tests.benchmarks.full_deck import run_deck, synthetic_store
+
+
+def _child(i):
+    with span("gemini.generate", kind="client", index=i, thread=threading.current_thread().name):
+        pass
+
+
+class TestTracing:
+    """Test span nesting, summaries and export."""
+
+    def test_spans_nest_across_threads_and_record_errors(self, tmp_path):
+        with span("untraced") as untraced:
+            assert untraced is NOOP_SPAN and current_span() is NOOP_SPAN
+
+        tracer = Tracer(jsonl_path=tmp_path / "deck.trace.jsonl", attributes={"language": "Spanish"})
+        with tracer.activate():
+            with span("word", word="comer") as word:
+                with ThreadPoolExecutor(max_workers=2) as executor:
+                    list(executor.map(in_current_context(_child), range(2)))
+                with pytest.raises(ValueError):
+                    with span("parse.content", bytes=10):
+                        raise ValueError("bad json")
+
+        by_name = {s.name: s for s in tracer.spans}
+        assert {s.parent_id for s in tracer.spans if s.name != "word"} == {word.span_id}
+        assert by_name["parse.content"].error == "ValueError: bad json"
+        assert by_name["word"].duration_s >= by_name["parse.content"].duration_s
+        assert [s.name for s in load_jsonl(tmp_path / "deck.trace.jsonl")] == [s.name for s in tracer.spans]
+
+    def test_summary_and_otlp_export(self, tmp_path):
+        tracer = Tracer(attributes={"language": "Spanish"})
+        with tracer.activate():
+            with span("word"):
+                for tokens in (100, 50):
+                    with span("gemini.generate", kind="client") as call:
+                        call.set("tokens", tokens)
+
+        rows = {row['span']: row for row in tracer.summary()}
+        assert rows['gemini.generate']['count'] == 2 and rows['gemini.generate']['tokens'] == 150
+        assert rows['word']['share'] == 1.0 and 'tokens' not in rows['word']
+
+        payload = json.loads(tracer.export_otlp(str(tmp_path / "deck.otlp.json")).read_text(encoding="utf-8"))
+        resource = payload['resourceSpans'][0]
+        assert {"key": "language", "value": {"stringValue": "Spanish"}} in resource['resource']['attributes']
+        spans = resource['scopeSpans'][0]['spans']
+        assert len(spans) == 3 and all(s['traceId'] == tracer.trace_id for s in spans)
+        assert {s['kind'] for s in spans if s['name'] == "gemini.generate"} == {3}
+
+    def test_replayed_deck_is_traced_per_pass_and_call(self, tmp_path):
+        tracer = Tracer()
+        with tracer.activate():
+            run_deck(synthetic_store("spanish"), 1, requests_per_minute=0, output_dir=tmp_path)
+
+        rows = {row['span']: row for row in tracer.summary()}
+        for name in ("pass.sentences", "pass.grammar", "pass.audio", "pass.images", "pass.assembly",
+                     "gemini.generate", "parse.content", "validate.content", "tts.synthesize"):
+            assert rows[name]['count'] >= 1, name
+        assert rows['gemini.generate']['tokens'] > 0
+        by_id = {s.span_id: s for s in tracer.spans}
+        parents = {by_id[s.parent_id].name for s in tracer.spans if s.name == "tts.synthesize"}
+        assert parents == {"pass.audio"}
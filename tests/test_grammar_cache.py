@@ -0,0 +1,87 @@
+"""
+Unit tests for the grammar result cache.
+Repeated sentences are answered without an API call, fallbacks are never
+stored, and prompt changes invalidate entries.
+"""
+
+import json
+import os
+import sys
+from unittest.mock import MagicMock, patch
+
+# Add the streamlit_app directory to the path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'streamlit_app'))
+
+from streamlit_app.language_analyzers.analyzer_registry import get_analyzer
+from streamlit_app.language_analyzers.grammar_cache import GrammarResultCache
+from streamlit_app.services.generation import grammar_processor as grammar_processor_module
+from streamlit_app.services.generation.adaptive_batcher import AdaptiveBatcher
+from streamlit_app.services.generation.grammar_processor import GrammarProcessor
+
+SENTENCES = ["Cats sleep.", "Dogs bark."]
+RESPONSE = json.dumps([
+    {"sentence": s, "words": [{"word": w, "grammatical_role": "noun", "individual_meaning": f"{w} as a thing"}
+                              for w in s.rstrip(".").split()],
+     "overall_structure": "Simple sentence"}
+    for s in SENTENCES
+])
+
+
+class TestGrammarResultCache:
+    """Test keys, storage rules and invalidation."""
+
+    def test_fallbacks_are_not_stored(self):
+        analyzer = get_analyzer("en")
+        cache = GrammarResultCache(cache_dir=None)
+        fallback = analyzer._create_fallback_analysis("Cats sleep.", "cats", "beginner")
+        assert not cache.store(analyzer, "Cats sleep.", "cats", "beginner", fallback)
+        assert cache.get(analyzer, "Cats sleep.", "cats", "beginner") is None
+
+    def test_prompt_change_invalidates_entries(self):
+        analyzer = get_analyzer("en")
+        with patch.object(type(analyzer), "_call_ai", return_value=RESPONSE):
+            analysis = analyzer.batch_analyze_grammar(SENTENCES[:1], "cats", "beginner", "key")[0]
+
+        cache = GrammarResultCache(cache_dir=None)
+        assert cache.store(analyzer, "Cats sleep.", "cats", "beginner", analysis)
+        assert cache.get(analyzer, "Cats sleep.", "cats", "beginner").html_output == analysis.html_output
+
+        edited = GrammarResultCache(cache_dir=None)
+        edited._memory = cache._memory
+        with patch.object(type(analyzer), "_build_streaming_batch_prompt", return_value="a new prompt"):
+            assert edited.get(analyzer, "Cats sleep.", "cats", "beginner") is None
+
+    def test_persists_across_instances(self, tmp_path):
+        analyzer = get_analyzer("en")
+        with patch.object(type(analyzer), "_call_ai", return_value=RESPONSE):
+            analysis = analyzer.batch_analyze_grammar(SENTENCES[:1], "cats", "beginner", "key")[0]
+        GrammarResultCache(cache_dir=str(tmp_path)).store(analyzer, "Cats sleep.", "cats", "beginner", analysis)
+
+        reloaded = GrammarResultCache(cache_dir=str(tmp_path)).get(analyzer, "Cats sleep.", "cats", "beginner")
+        assert reloaded.word_explanations == analysis.word_explanations
+
+
+class TestGrammarProcessorCache:
+    """Test that only cache misses are sent to the API."""
+
+    def _run(self, processor, sentences, call_ai):
+        analyzer = get_analyzer("en")
+        with patch.object(grammar_processor_module, "get_analyzer", return_value=analyzer), \
+             patch.object(GrammarProcessor, "_get_complexity", return_value="beginner"), \
+             patch.object(type(analyzer), "_call_ai", call_ai), \
+             patch.dict(sys.modules, {"streamlit": MagicMock(session_state={})}):
+            return processor.batch_analyze_grammar_and_color(
+                sentences, ["cats"] * len(sentences), "English", "key", language_code="en"
+            )
+
+    def test_second_run_uses_no_api_calls(self):
+        processor = GrammarProcessor(batcher=AdaptiveBatcher(), result_cache=GrammarResultCache(cache_dir=None))
+
+        first_call = MagicMock(return_value=RESPONSE)
+        first = self._run(processor, SENTENCES, first_call)
+        assert first_call.call_count == 1
+
+        second_call = MagicMock(side_effect=AssertionError("no API call expected"))
+        second = self._run(processor, SENTENCES, second_call)
+        assert second == first
+        assert processor.result_cache.get_stats()["hits"] == 2
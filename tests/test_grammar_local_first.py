@@ -0,0 +1,107 @@
+"""
+Unit tests for the local-first grammar tier.
+Confident rule-based analyses are used directly; the rest still go to the API.
+"""
+
+import os
+import sys
+from unittest.mock import MagicMock, patch
+
+# Add the streamlit_app directory to the path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'streamlit_app'))
+
+from streamlit_app.language_analyzers.base_analyzer import GrammarAnalysis
+from streamlit_app.services.generation import grammar_processor as grammar_processor_module
+from streamlit_app.services.generation.grammar_processor import (
+    GrammarProcessor,
+    is_local_analysis_confident,
+)
+
+
+def _analysis(sentence, word_explanations, confidence=0.95):
+    return GrammarAnalysis(
+        sentence=sentence,
+        target_word="",
+        language_code="xx",
+        complexity_level="beginner",
+        grammatical_elements={},
+        explanations={},
+        color_scheme={},
+        html_output=sentence,
+        confidence_score=confidence,
+        word_explanations=word_explanations,
+    )
+
+
+CONFIDENT = [
+    ["Ela", "pronoun", "#FF4444", "Ela (personal pronoun)"],
+    ["é", "copula", "#AA44FF", "é (ser — inherent copula)"],
+    [".", "other", "#AAAAAA", "."],
+]
+HEDGED = [
+    ["Ela", "pronoun", "#FF4444", "Ela (personal pronoun)"],
+    ["livro", "noun", "#FFAA00", "likely an open-class noun"],
+]
+
+
+class _FakeAnalyzer:
+    """Analyzer double: local results are confident for sentences starting with 'local'."""
+
+    def __init__(self):
+        self.batch_calls = []
+
+    def analyze_grammar_locally(self, sentence, target_word, complexity):
+        return _analysis(sentence, CONFIDENT if sentence.startswith("local") else HEDGED)
+
+    def batch_analyze_grammar(self, sentences, target_word, complexity, gemini_api_key):
+        self.batch_calls.append(list(sentences))
+        return [_analysis(sentence, CONFIDENT, confidence=0.99) for sentence in sentences]
+
+
+class TestLocalAnalysisGate:
+    """Test the confidence gate."""
+
+    def test_confident_analysis_passes(self):
+        assert is_local_analysis_confident(_analysis("Ela é.", CONFIDENT), 0.9)
+
+    def test_low_confidence_rejected(self):
+        assert not is_local_analysis_confident(_analysis("Ela é.", CONFIDENT, confidence=0.5), 0.9)
+
+    def test_hedged_or_generic_explanations_rejected(self):
+        assert not is_local_analysis_confident(_analysis("Ela livro", HEDGED), 0.9)
+        generic = [["a", "verb", "#0F0", "an action"], ["b", "verb", "#0F0", "an action"]]
+        assert not is_local_analysis_confident(_analysis("a b", generic), 0.9)
+        bare = [["triste", "adjective", "#0F0", "triste"]]
+        assert not is_local_analysis_confident(_analysis("triste", bare), 0.9)
+
+
+class TestLocalFirstBatch:
+    """Test local-first routing in batch analysis."""
+
+    def _run(self, processor, sentences):
+        analyzer = _FakeAnalyzer()
+        with patch.object(grammar_processor_module, "get_analyzer", return_value=analyzer), \
+             patch.object(GrammarProcessor, "_get_complexity", return_value="beginner"), \
+             patch.dict(sys.modules, {"streamlit": MagicMock(session_state={})}):
+            results = processor.batch_analyze_grammar_and_color(
+                sentences, ["w"] * len(sentences), "Test", "key", language_code="xx"
+            )
+        return analyzer, results
+
+    def test_disabled_sends_everything_to_api(self):
+        sentences = ["local one", "remote two"]
+        analyzer, results = self._run(GrammarProcessor(), sentences)
+        assert analyzer.batch_calls == [sentences]
+        assert len(results) == 2
+
+    def test_only_unconfident_sentences_go_to_api(self):
+        sentences = [f"local {i}" for i in range(8)] + ["remote a", "remote b"]
+        processor = GrammarProcessor(local_first=True)
+        analyzer, results = self._run(processor, sentences)
+
+        assert analyzer.batch_calls == [["remote a", "remote b"]]
+        assert [r["colored_sentence"] for r in results] == sentences
+        stats = processor.get_local_first_stats()
+        assert stats["local"] == 8
+        assert stats["api"] == 2
+        assert stats["api_calls_avoided"] == 1
@@ -0,0 +1,40 @@
+"""
+Offline regression gate for the analyzer hot path.
+Replays every recorded grammar batch and fails when a case is slower,
+allocates more, or returns more fallbacks than tests/benchmarks/hot_path_baseline.json.
+
+The per-case regression tests are marked slow and deselected by default
+(see pytest.ini); run them with:
+    python -m pytest -m slow tests/test_hot_path_benchmark.py
+
+Run the full benchmark or refresh the baseline with:
+    python -m tests.benchmarks.hot_path [--update-baseline]
+"""
+
+import pytest
+
+from tests.benchmarks.hot_path import find_regressions, load_baseline, load_cases, run_suite
+
+BENCHMARK_ROUNDS = 50
+CASES = {case.name: case for case in load_cases()}
+
+
+def test_every_case_has_a_baseline():
+    assert set(CASES) <= set(load_baseline())
+
+
+@pytest.mark.slow
+@pytest.mark.parametrize("name", sorted(CASES))
+def test_no_regression_against_baseline(name):
+    results = run_suite([CASES[name]], rounds=BENCHMARK_ROUNDS)
+    assert find_regressions(results, load_baseline()) == []
+
+
+def test_slowdowns_and_new_fallbacks_are_reported():
+    baseline = {"case": {"p95_ms": 2.0, "peak_alloc_bytes": 1000, "fallbacks": 0}}
+    slower = {"case": {"p95_ms": 9.0, "peak_alloc_bytes": 1000, "fallbacks": 1}}
+    regressions = find_regressions(slower, baseline, time_tolerance=3.0)
+    assert len(regressions) == 2
+    # Jitter on sub-millisecond batches is not a regression
+    jitter = {"case": {"p95_ms": 0.3, "peak_alloc_bytes": 1000, "fallbacks": 0}}
+    assert find_regressions(jitter, {"case": {"p95_ms": 0.05, "peak_alloc_bytes": 1000, "fallbacks": 0}}) == []
@@ -0,0 +1,140 @@
+"""
+Unit tests for the incremental APKG writer.
+Notes and media are appended per word and sealed into a valid .apkg at the end.
+"""
+
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+import zipfile
+
+# Add the streamlit_app directory to the path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'streamlit_app'))
+
+from streamlit_app.deck_exporter import IncrementalApkgWriter, create_apkg_export
+
+
+def _make_row(word, audio, image):
+    return {
+        'file_name': f"{word}_01",
+        'word': word,
+        'meaning': f"meaning of {word}",
+        'sentence': f"A sentence with {word}.",
+        'ipa': '',
+        'english': f"English for {word}",
+        'audio': f"[sound:{audio}]",
+        'image': f'<img src="{image}">',
+        'image_keywords': '',
+        'colored_sentence': '',
+        'word_explanations': '',
+        'grammar_summary': '',
+        'tags': '',
+    }
+
+
+def _write_media(media_dir, name, content):
+    with open(os.path.join(media_dir, name), 'wb') as f:
+        f.write(content)
+
+
+def _read_apkg(apkg_path, tmp_dir):
+    with zipfile.ZipFile(apkg_path) as zf:
+        media = json.loads(zf.read('media'))
+        zf.extract('collection.anki2', tmp_dir)
+        infos = {info.filename: info for info in zf.infolist()}
+    conn = sqlite3.connect(os.path.join(tmp_dir, 'collection.anki2'))
+    flds = [row[0] for row in conn.execute("SELECT flds FROM notes ORDER BY id")]
+    conn.close()
+    return media, infos, flds
+
+
+class TestIncrementalApkgWriter:
+    """Test incremental APKG construction."""
+
+    def setup_method(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.media_dir = os.path.join(self.tmp.name, 'media')
+        os.makedirs(self.media_dir)
+        self.output = os.path.join(self.tmp.name, 'Spanish.apkg')
+
+    def teardown_method(self):
+        self.tmp.cleanup()
+
+    def test_finalize_produces_valid_package(self):
+        """Rows added across calls end up as notes with their media."""
+        _write_media(self.media_dir, 'a.mp3', b'audio-a')
+        _write_media(self.media_dir, 'a.jpg', b'image-a')
+        _write_media(self.media_dir, 'b.mp3', b'audio-b')
+        _write_media(self.media_dir, 'b.jpg', b'image-b')
+
+        with IncrementalApkgWriter(self.output, self.media_dir, 'Spanish', resume=False) as writer:
+            writer.add_rows([_make_row('uno', 'a.mp3', 'a.jpg')])
+            writer.add_rows([_make_row('dos', 'b.mp3', 'b.jpg')])
+            assert writer.note_count == 2
+            assert writer.finalize()
+
+        media, infos, flds = _read_apkg(self.output, self.tmp.name)
+        assert sorted(media.values()) == ['a.jpg', 'a.mp3', 'b.jpg', 'b.mp3']
+        assert len(flds) == 2
+        assert not os.path.exists(self.output + '.partial')
+
+    def test_precompressed_media_is_stored(self):
+        """Audio and images are stored, the collection is deflated."""
+        _write_media(self.media_dir, 'a.mp3', b'x' * 4096)
+        _write_media(self.media_dir, 'a.jpg', b'y' * 4096)
+
+        writer = IncrementalApkgWriter(self.output, self.media_dir, 'Spanish', resume=False)
+        writer.add_rows([_make_row('uno', 'a.mp3', 'a.jpg')])
+        assert writer.finalize()
+
+        media, infos, _ = _read_apkg(self.output, self.tmp.name)
+        for idx in media:
+            assert infos[idx].compress_type == zipfile.ZIP_STORED
+        assert infos['collection.anki2'].compress_type == zipfile.ZIP_DEFLATED
+
+    def test_duplicate_media_is_deduplicated(self):
+        """Files with identical content are stored once and notes point at the first copy."""
+        _write_media(self.media_dir, 'a.mp3', b'same-audio')
+        _write_media(self.media_dir, 'copy.mp3', b'same-audio')
+        _write_media(self.media_dir, 'a.jpg', b'image-a')
+
+        writer = IncrementalApkgWriter(self.output, self.media_dir, 'Spanish', resume=False)
+        writer.add_rows([_make_row('uno', 'a.mp3', 'a.jpg'), _make_row('dos', 'copy.mp3', 'a.jpg')])
+        assert writer.finalize()
+
+        media, _, flds = _read_apkg(self.output, self.tmp.name)
+        assert sorted(media.values()) == ['a.jpg', 'a.mp3']
+        assert '[sound:a.mp3]' in flds[1]
+
+    def test_resume_after_interruption(self):
+        """A new writer picks up notes and media committed by an earlier one."""
+        _write_media(self.media_dir, 'a.mp3', b'audio-a')
+        _write_media(self.media_dir, 'b.mp3', b'audio-b')
+        _write_media(self.media_dir, 'img.jpg', b'image')
+
+        first = IncrementalApkgWriter(self.output, self.media_dir, 'Spanish', resume=False)
+        first.add_rows([_make_row('uno', 'a.mp3', 'img.jpg')])
+        first.close()
+
+        second = IncrementalApkgWriter(self.output, self.media_dir, resume=True)
+        assert second.note_count == 1
+        second.add_rows([_make_row('dos', 'b.mp3', 'img.jpg')])
+        assert second.finalize()
+
+        media, _, flds = _read_apkg(self.output, self.tmp.name)
+        assert sorted(media.values()) == ['a.mp3', 'b.mp3', 'img.jpg']
+        assert len(media) == len(set(media))
+        assert len(flds) == 2
+
+    def test_missing_media_is_skipped(self):
+        """Missing media files do not abort the export."""
+        _write_media(self.media_dir, 'a.mp3', b'audio-a')
+
+        assert create_apkg_export(
+            [_make_row('uno', 'a.mp3', 'missing.jpg')], self.media_dir, self.output, 'Spanish'
+        )
+        media, _, flds = _read_apkg(self.output, self.tmp.name)
+        assert list(media.values()) == ['a.mp3']
+        assert len(flds) == 1
@@ -0,0 +1,84 @@
+"""
+Unit tests for the shared language data cache.
+Data files are parsed once per process and handed out as frozen, shared objects.
+"""
+
+import copy
+import os
+import sys
+import tempfile
+import threading
+
+import pytest
+
+# Add the streamlit_app directory to the path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'streamlit_app'))
+
+from streamlit_app.language_analyzers import language_data_cache
+from streamlit_app.language_analyzers.language_data_cache import (
+    build_binary_cache,
+    clear_language_data_cache,
+    load_language_data,
+)
+
+
+class TestLanguageDataCache:
+    """Test process-wide caching of analyzer data files."""
+
+    def setup_method(self):
+        clear_language_data_cache()
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'roles.yaml')
+        with open(self.path, 'w', encoding='utf-8') as f:
+            f.write("roles:\n  noun: [naming, word]\n  verb: {color: '#4ECDC4'}\n")
+
+    def teardown_method(self):
+        clear_language_data_cache()
+        self.tmp.cleanup()
+
+    def test_parsed_once_and_shared(self):
+        """Repeated loads return the same object without reparsing."""
+        first = load_language_data(self.path)
+        with open(self.path, 'w', encoding='utf-8') as f:
+            f.write("roles: {}\n")
+        assert load_language_data(self.path) is first
+        assert isinstance(first, dict) and isinstance(first['roles']['noun'], list)
+
+    def test_shared_data_is_read_only(self):
+        """Mutation raises; deepcopy gives a private mutable copy."""
+        data = load_language_data(self.path)
+        with pytest.raises(TypeError):
+            data['roles']['adverb'] = {}
+        with pytest.raises(TypeError):
+            data['roles']['noun'].append('x')
+
+        private = copy.deepcopy(data)
+        private['roles']['noun'].append('x')
+        assert type(private) is dict
+        assert data['roles']['noun'] == ['naming', 'word']
+
+    def test_missing_file_returns_none(self):
+        assert load_language_data(os.path.join(self.tmp.name, 'missing.json')) is None
+
+    def test_binary_cache_used_only_while_fresh(self):
+        """Pre-serialized data is read back, and ignored once the source changes."""
+        assert build_binary_cache([self.path]) == 1
+        hit, data = language_data_cache._read_binary_cache(language_data_cache.Path(self.path))
+        assert hit and data['roles']['verb'] == {'color': '#4ECDC4'}
+
+        with open(self.path, 'w', encoding='utf-8') as f:
+            f.write("roles: {adjective: []}\n")
+        hit, _ = language_data_cache._read_binary_cache(language_data_cache.Path(self.path))
+        assert not hit
+        assert 'adjective' in load_language_data(self.path)['roles']
+
+    def test_concurrent_loads_share_one_object(self):
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(load_language_data(self.path)))
+                   for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert len(results) == 8
+        assert all(result is results[0] for result in results)
@@ -0,0 +1,57 @@
+"""
+Unit tests for the language test matrix.
+Suite files resolve per language, missing suites are reported rather than
+generated, and one pytest session is tallied back per (language, suite).
+"""
+
+import pytest
+
+from language_grammar_generator._lang_helpers import implemented_language_codes
+from language_grammar_generator.test_matrix import MatrixReporter, collect_matrix
+
+
+def _write(path, body):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(body, encoding="utf-8")
+
+
+@pytest.fixture
+def languages_dir(tmp_path):
+    base = tmp_path / "languages" / "spanish"
+    _write(base / "tests" / "test_es_config.py", "def test_ok():\n    pass\n\ndef test_also_ok():\n    pass\n")
+    _write(base / "tests" / "test_regression.py", "def test_broken():\n    assert False\n")
+    _write(base / "tests" / "test_es_extra.py", "import pytest\n\n@pytest.mark.skip\ndef test_later():\n    pass\n")
+    _write(base / "test_es_batch.py", "def test_batch():\n    pass\n")
+    return tmp_path / "languages"
+
+
+class TestLanguageTestMatrix:
+    """Test suite resolution and per-suite reporting."""
+
+    def test_suites_resolve_per_language(self, languages_dir):
+        matrix = {entry.suite: entry for entry in collect_matrix(["es"], languages_dir=languages_dir)}
+        assert [p.name for p in matrix['unit'].paths] == ["test_es_config.py"]
+        assert "tests/test_es_validator.py" in matrix['unit'].missing
+        assert [p.name for p in matrix['batch_processing'].paths] == ["test_es_batch.py"]
+        assert [p.name for p in matrix['other'].paths] == ["test_es_extra.py"]
+        assert not matrix['system'].paths
+
+        only = collect_matrix(["es"], suites=["regression"], languages_dir=languages_dir)
+        assert [entry.suite for entry in only] == ["regression"]
+
+    def test_one_session_is_tallied_per_suite(self, languages_dir):
+        matrix = collect_matrix(["es"], suites=["unit", "regression", "other", "system"], languages_dir=languages_dir)
+        reporter = MatrixReporter(matrix)
+        paths = [str(path) for entry in matrix for path in entry.paths]
+        pytest.main(paths + ["-q", "-p", "no:cacheprovider", f"--rootdir={languages_dir.parent}"], plugins=[reporter])
+
+        suites = reporter.to_dict()['languages']['es']
+        assert suites['unit']['passed'] == 2 and suites['unit']['status'] == 'failed'  # Three unit files are missing
+        assert suites['regression']['failed'] == 1 and suites['regression']['status'] == 'failed'
+        assert suites['other']['skipped'] == 1 and suites['other']['status'] == 'passed'
+        assert suites['system']['status'] == 'missing'
+
+    def test_implemented_languages_have_analyzers(self):
+        codes = implemented_language_codes()
+        assert {"en", "es", "zh", "zh-tw", "ar"} <= set(codes)
+        assert "it" not in codes
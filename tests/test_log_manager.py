@@ -0,0 +1,76 @@
+"""
+Unit tests for the bounded, structured generation log manager.
+"""
+
+import os
+import sys
+import tempfile
+
+# Add the streamlit_app directory to the path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'streamlit_app'))
+
+from streamlit_app.services.generation.log_manager import LogManager, BoundedLogStream
+
+
+class TestLogManager:
+    """Test ring-buffer storage and incremental reads."""
+
+    def test_ring_buffer_is_bounded(self):
+        log_manager = LogManager(max_records=50, display_lines=10)
+        for i in range(500):
+            log_manager.log_message(f"message {i}")
+
+        assert log_manager.get_log_count() == 50
+        assert log_manager.last_seq == 500
+        display = log_manager.get_display_logs().splitlines()
+        assert len(display) == 10
+        assert display[-1].endswith("message 499")
+
+    def test_records_since(self):
+        log_manager = LogManager(max_records=5)
+        for i in range(8):
+            log_manager.log_message(f"message {i}")
+
+        assert [r.seq for r in log_manager.get_records_since(6)] == [7, 8]
+        # Evicted records are skipped, not resurrected
+        assert [r.seq for r in log_manager.get_records_since(0)] == [4, 5, 6, 7, 8]
+        assert log_manager.get_records_since(8) == []
+
+    def test_structured_fields(self):
+        log_manager = LogManager()
+        log_manager.set_context(stage="PASS 3", word="haus")
+        log_manager.log_message("<b>❌ Grammar analysis failed</b>")
+        log_manager.log_message("[DEBUG] batch size 8", word="katze")
+
+        error, debug = log_manager.get_records_since(0)
+        assert error.level == "ERROR"
+        assert error.message == "❌ Grammar analysis failed"
+        assert (error.stage, error.word) == ("PASS 3", "haus")
+        assert debug.level == "DEBUG"
+        assert debug.word == "katze"
+        assert debug.elapsed >= error.elapsed
+
+    def test_spill_to_rotating_file(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            spill_path = os.path.join(temp_dir, "generation.log")
+            log_manager = LogManager(max_records=2, spill_path=spill_path)
+            for i in range(5):
+                log_manager.log_message(f"message {i}")
+            log_manager.close()
+
+            with open(spill_path, encoding="utf-8") as f:
+                lines = f.read().splitlines()
+            assert len(lines) == 5
+            assert lines[0].startswith("1\tINFO")
+
+
+class TestBoundedLogStream:
+    """Test the bounded replacement for the session StringIO."""
+
+    def test_keeps_recent_lines(self):
+        stream = BoundedLogStream(max_lines=3)
+        for i in range(10):
+            stream.write(f"line {i}\n")
+        stream.write("partial")
+
+        assert stream.getvalue() == "line 7\nline 8\nline 9\npartial"
@@ -0,0 +1,74 @@
+"""
+Unit tests for the concurrent media stage.
+IPA, audio and images overlap, stay aligned with their sentences, and
+failures come back as empty strings.
+"""
+
+import asyncio
+import os
+import sys
+import time
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+# Add the streamlit_app directory to the path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'streamlit_app'))
+
+from streamlit_app.services.generation import media_processor as media_processor_module
+from streamlit_app.services.generation.media_processor import MediaProcessor
+
+SENTENCES = ["Uno.", "Dos.", "Tres.", "Cuatro."]
+KEYWORDS = ["one", "two", "three", "four"]
+DELAY = 0.2
+
+
+async def fake_audio(text, voice, output_path):
+    await asyncio.sleep(DELAY)
+    return text != "Tres."
+
+
+def fake_pixabay(queries, output_dir, batch_name, num_images, pixabay_api_key, exact_filenames):
+    time.sleep(DELAY)
+    # Like the real function, a query without hits is skipped rather than padded
+    return [name for name, query in zip(exact_filenames, queries) if query != "two"], set()
+
+
+def slow_ipa(self, text, language, ai_ipa=""):
+    time.sleep(DELAY / 4)
+    if text == "Cuatro.":
+        raise RuntimeError("epitran failed")
+    return f"/{text.lower()}/"
+
+
+class TestProcessMediaForSentences:
+    """Test overlap, alignment and failure handling."""
+
+    def _run(self, tmp_path, pixabay=None):
+        processor = MediaProcessor()
+        processor.audio_output_dir = str(tmp_path / "audio")
+        processor.image_output_dir = str(tmp_path / "images")
+        pixabay = pixabay or MagicMock(side_effect=fake_pixabay)
+        with patch("audio_generator.generate_audio_async", fake_audio), \
+             patch("image_generator.generate_images_pixabay", pixabay), \
+             patch.object(MediaProcessor, "generate_ipa_hybrid", slow_ipa), \
+             patch.object(media_processor_module, "st", SimpleNamespace(session_state=SimpleNamespace(pixabay_api_key="k"))):
+            start = time.perf_counter()
+            result = processor.process_media_for_sentences(SENTENCES, KEYWORDS, "Spanish", "es-ES-Standard-A", "uno", "x1")
+            return result, time.perf_counter() - start, pixabay
+
+    def test_results_stay_aligned_with_failures_as_empty_strings(self, tmp_path):
+        result, _, pixabay = self._run(tmp_path)
+        assert result['ipa'] == ["/uno./", "/dos./", "/tres./", ""]
+        assert result['audio'] == ["uno_01_x1.mp3", "uno_02_x1.mp3", "", "uno_04_x1.mp3"]
+        assert result['images'] == ["uno_01_x1.jpg", "", "uno_03_x1.jpg", "uno_04_x1.jpg"]
+        assert pixabay.call_count == 1
+
+    def test_stages_overlap(self, tmp_path):
+        _, elapsed, _ = self._run(tmp_path)
+        # Sequential stages would take at least 2 * DELAY plus the IPA time
+        assert elapsed < 2 * DELAY
+
+    def test_image_stage_failure_keeps_alignment(self, tmp_path):
+        result, _, _ = self._run(tmp_path, pixabay=MagicMock(side_effect=ValueError("quota")))
+        assert result['images'] == ["", "", "", ""]
+        assert len(result['audio']) == len(SENTENCES)
@@ -0,0 +1,110 @@
+"""
+Unit tests for the process metrics registry.
+Metrics render in the Prometheus text format, worker changes merge into the
+server's registry, client and pass spans feed
+request and pipeline metrics with or without a tracer, caches report their
+stats and bytes on disk, and the side-port exporter serves /metrics.
+"""
+
+import urllib.request
+
+import pytest
+import requests
+
+from streamlit_app.persistent_cache import PersistentCache
+from streamlit_app.services.generation import metrics
+from streamlit_app.services.generation.metrics import MetricsRegistry, start_metrics_server
+from streamlit_app.services.generation.tracing import span
+
+
+def _response(status):
+    response = requests.Response()
+    response.status_code = status
+    response.url = "https://pixabay.com/api/"
+    return response
+
+
+class TestMetrics:
+    """Test rendering, span-fed metrics, cache collection and export."""
+
+    def test_text_format(self):
+        registry = MetricsRegistry()
+        calls = registry.counter("app_calls_total", "Calls made", ["provider"])
+        calls.inc(provider='say "hi"')
+        calls.inc(2, provider='say "hi"')
+        latency = registry.histogram("app_latency_seconds", "Latency", buckets=(0.1, 1.0))
+        for value in (0.05, 0.5, 3.0):
+            latency.observe(value)
+
+        text = registry.render()
+        assert '# TYPE app_calls_total counter\napp_calls_total{provider="say \\"hi\\""} 3\n' in text
+        assert 'app_latency_seconds_bucket{le="0.1"} 1' in text
+        assert 'app_latency_seconds_bucket{le="1"} 2' in text
+        assert 'app_latency_seconds_bucket{le="+Inf"} 3' in text
+        assert "app_latency_seconds_sum 3.55" in text and "app_latency_seconds_count 3" in text
+        with pytest.raises(ValueError):
+            registry.gauge("app_calls_total", "Same name, other type")
+        with pytest.raises(ValueError):
+            calls.inc(model="x")
+
+    def test_worker_changes_merge_into_another_registry(self):
+        worker, server = MetricsRegistry(), MetricsRegistry()
+        calls = worker.counter("app_calls_total", "Calls made", ["provider"])
+        latency = worker.histogram("app_latency_seconds", "Latency", buckets=(0.1, 1.0))
+        worker.gauge("app_in_flight", "In flight").set(3)
+        calls.inc(provider="gemini")
+        latency.observe(0.05)
+        before = worker.snapshot()
+        calls.inc(2, provider="gemini")
+        calls.inc(provider="tts")
+        latency.observe(0.5)
+
+        changes = worker.delta(before)
+        server.merge(changes)
+        server.merge(changes)
+        assert server.counter("app_calls_total", "Calls made", ["provider"]).get(provider="gemini") == 4
+        assert server.counter("app_calls_total", "Calls made", ["provider"]).get(provider="tts") == 2
+        merged = server.histogram("app_latency_seconds", "Latency", buckets=(0.1, 1.0)).get()
+        assert merged['count'] == 2 and merged['sum'] == 1.0 and merged['buckets'][0.1] == 0
+        assert "app_in_flight" not in server.render()
+
+    def test_client_and_pass_spans_feed_metrics_without_a_tracer(self):
+        ok_before = metrics.REQUESTS.get(provider="pixabay", outcome="ok")
+        limited_before = metrics.RATE_LIMITED.get(provider="pixabay")
+        calls_before = metrics.REQUEST_DURATION.get(provider="pixabay", operation="search")['count']
+        stages_before = metrics.STAGE_DURATION.get(stage="images")['count']
+
+        with span("pass.images"):
+            assert metrics.PIPELINE_IN_FLIGHT.get(stage="images") >= 1
+            with span("pixabay.search", kind="client"):
+                assert metrics.REQUESTS_IN_FLIGHT.get(provider="pixabay") >= 1
+            with pytest.raises(requests.HTTPError):
+                with span("pixabay.search", kind="client"):
+                    _response(429).raise_for_status()
+
+        assert metrics.REQUESTS.get(provider="pixabay", outcome="ok") == ok_before + 1
+        assert metrics.RATE_LIMITED.get(provider="pixabay") == limited_before + 1
+        assert metrics.REQUEST_DURATION.get(provider="pixabay", operation="search")['count'] == calls_before + 2
+        assert metrics.STAGE_DURATION.get(stage="images")['count'] == stages_before + 1
+        assert metrics.PIPELINE_IN_FLIGHT.get(stage="images") == 0
+
+    def test_caches_and_http_exporter(self, tmp_path):
+        cache = PersistentCache(cache_dir=str(tmp_path / "wiktionary"), cleanup_interval=3600)
+        cache.set("comer", {"definition": "to eat"})
+        cache.get("comer")
+        cache.get("beber")
+
+        server = start_metrics_server(0)
+        try:
+            url = f"http://127.0.0.1:{server.server_address[1]}/metrics"
+            with urllib.request.urlopen(url, timeout=5) as response:
+                assert response.headers["Content-Type"].startswith("text/plain; version=0.0.4")
+                text = response.read().decode("utf-8")
+        finally:
+            server.shutdown()
+            server.server_close()
+
+        label = f'{{cache="{tmp_path / "wiktionary"}"}}'
+        assert f"app_cache_hits_total{label} 1" in text and f"app_cache_misses_total{label} 1" in text
+        bytes_line = next(line for line in text.splitlines() if line.startswith(f"app_cache_bytes{label}"))
+        assert int(bytes_line.split()[-1]) > 0
@@ -0,0 +1,144 @@
+"""
+Unit tests for batch-prompt prefix factoring and context caching.
+The stable prefix is registered once and only the variable suffix is resent.
+"""
+
+import os
+import sys
+import threading
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+
+# Add the streamlit_app directory to the path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'streamlit_app'))
+
+from streamlit_app.language_analyzers.prompt_cache import (
+    CacheablePrompt,
+    ContextCache,
+    LocalContextCache,
+    cacheable_batch_prompt,
+    compile_template,
+)
+from streamlit_app.services.generation.tracing import in_current_context
+from streamlit_app.shared_utils import GeminiAPI, GeminiRateLimiter
+
+
+class _Builder:
+    """Prompt builder double with the sentences rendered last."""
+
+    @cacheable_batch_prompt
+    def build_batch_prompt(self, sentences, target_word, complexity):
+        numbered = "\n".join(f"{i+1}. {s}" for i, s in enumerate(sentences))
+        return (f"Instructions for {complexity}.\nRoles and schema.\n\n"
+                f"SENTENCES ({len(sentences)}):\n{numbered}\nTarget word: {target_word}\n")
+
+
+def _fake_api(cache):
+    api = GeminiAPI()
+    api.api_type = 'new'
+    api.client = MagicMock()
+    api.client.models.generate_content.return_value = SimpleNamespace(text="[]")
+    api.context_cache = cache
+    return api
+
+
+class TestPromptFactoring:
+    """Test the stable prefix / variable suffix split."""
+
+    def test_prefix_is_stable_across_batches(self):
+        builder = _Builder()
+        first = builder.build_batch_prompt(["Hola.", "Adiós."], "hola", "beginner")
+        second = builder.build_batch_prompt(["Buenos días."], "días", "beginner")
+
+        assert isinstance(first, CacheablePrompt)
+        assert first.prefix == second.prefix == "Instructions for beginner.\nRoles and schema.\n\n"
+        assert first == first.prefix + first.suffix
+        assert "Hola." in first.suffix and "hola" in first.suffix
+
+    def test_prefix_depends_on_complexity(self):
+        builder = _Builder()
+        beginner = builder.build_batch_prompt(["Hola."], "hola", "beginner")
+        advanced = builder.build_batch_prompt(["Hola."], "hola", "advanced")
+        assert beginner.prefix != advanced.prefix
+
+    def test_templates_compiled_once(self):
+        assert compile_template("{{ x }}!") is compile_template("{{ x }}!")
+        assert compile_template("{{ x }}!").render(x="hi") == "hi!"
+
+
+class TestContextCache:
+    """Test that GeminiAPI sends only the suffix once the prefix is cached."""
+
+    def test_prefix_registered_once_and_reused(self):
+        cache = LocalContextCache()
+        api = _fake_api(cache)
+        builder = _Builder()
+
+        for sentences in (["Hola."], ["Adiós.", "Gracias."], ["Buenas."]):
+            prompt = builder.build_batch_prompt(sentences, "hola", "beginner")
+            api.generate_content(model="m", contents=prompt, config={'max_output_tokens': 10})
+
+        assert cache.registrations == 1
+        assert cache.hits == 2
+        for call in api.client.models.generate_content.call_args_list:
+            assert call.kwargs['contents'].startswith("SENTENCES")
+            assert call.kwargs['config'] == {'max_output_tokens': 10, 'cached_content': 'local/1'}
+
+    def test_plain_prompts_and_failures_send_full_text(self):
+        cache = LocalContextCache()
+        api = _fake_api(cache)
+        api.generate_content(model="m", contents="plain prompt")
+        assert api.client.models.generate_content.call_args.kwargs['contents'] == "plain prompt"
+
+        prompt = _Builder().build_batch_prompt(["Hola."], "hola", "beginner")
+        api.client.models.generate_content.side_effect = [RuntimeError("expired"), SimpleNamespace(text="[]")]
+        api.generate_content(model="m", contents=prompt)
+        retry = api.client.models.generate_content.call_args.kwargs
+        assert retry['contents'] == str(prompt)
+        assert 'config' not in retry
+        assert cache.prefixes == {}
+
+    def test_context_cache_requires_get_handle(self):
+        with pytest.raises(TypeError):
+            ContextCache()
+
+
+class TestStreamingRateLimit:
+    """A stream holds a rate-limiter slot only while its request starts."""
+
+    def test_slot_is_released_once_the_first_chunk_arrives(self):
+        api = _fake_api(None)
+        api.rate_limiter = GeminiRateLimiter(max_concurrent=1, requests_per_minute=0)
+        api.client.models.generate_content_stream.return_value = iter(
+            [SimpleNamespace(text="[1"), SimpleNamespace(text="]")])
+
+        stream = api.generate_content_stream(model="m", contents="prompt")
+        assert next(stream) == "[1"
+        assert api.rate_limiter._slots.acquire(blocking=False)
+        api.rate_limiter._slots.release()
+        assert list(stream) == ["]"]
+
+
+class TestUsageMeasurement:
+    """Usage is counted per measure_usage() block, not read off the shared client."""
+
+    def test_only_calls_inside_the_block_are_counted(self):
+        api = GeminiAPI()
+        truncated = SimpleNamespace(usage_metadata=SimpleNamespace(candidates_token_count=7),
+                                    candidates=[SimpleNamespace(finish_reason="MAX_TOKENS")])
+        api._record_usage(truncated, "ignored", "m")
+        with api.measure_usage() as usage:
+            api._record_usage(truncated, "counted", "m")
+            other = threading.Thread(target=api._record_usage, args=(truncated, "other thread", "m"))
+            other.start()
+            other.join()
+            inherited = threading.Thread(target=in_current_context(api._record_usage),
+                                         args=(truncated, "pool thread", "m"))
+            inherited.start()
+            inherited.join()
+        api._record_usage(truncated, "ignored", "m")
+
+        assert usage.output_tokens == 14
+        assert usage.truncated_responses == 2
@@ -0,0 +1,108 @@
+"""
+Unit tests for the recorded-response harness and the full-deck benchmark.
+Live responses are recorded without API keys and replay in order, unknown
+requests fall back by route, injected faults surface as the services'
+own errors, and a small synthetic deck replays end to end.
+"""
+
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+import requests
+from google.genai import errors
+from google.genai.models import Models
+
+from tests.benchmarks.full_deck import deck_words, parse_faults, run_deck, synthetic_store
+from tests.benchmarks.recorded_responses import (
+    RecordedResponses, RecordingMissing, ResponseStore, ServiceFaults, gemini_route,
+)
+
+
+def _live_response(url, body, content_type="application/json"):
+    response = requests.Response()
+    response.status_code = 200
+    response.url = url
+    response.headers["Content-Type"] = content_type
+    response._content = body
+    return response
+
+
+class TestRecordedResponses:
+    """Test recording, replay order, fallbacks and fault injection."""
+
+    def test_http_and_gemini_round_trip_without_secrets(self, tmp_path):
+        bodies = iter([b'{"hits": [1]}', b'{"hits": [2]}', b"\xff\xd8jpeg"])
+
+        def live_request(session, method, url, **kwargs):
+            return _live_response(url, next(bodies), "image/jpeg" if "cdn" in url else "application/json")
+
+        def live_generate(models, *, model, contents, config=None):
+            return SimpleNamespace(text=f"answer to {contents}", candidates=[],
+                                   usage_metadata=SimpleNamespace(candidates_token_count=7, total_token_count=9,
+                                                                  prompt_token_count=2))
+
+        store = ResponseStore(tmp_path / "store.json")
+        with patch.object(requests.sessions.Session, "request", live_request), \
+             patch.object(Models, "generate_content", live_generate), \
+             RecordedResponses(store, mode="record"):
+            search = {"key": "SECRET", "q": "red apple"}
+            requests.get("https://pixabay.com/api/", params=search)
+            requests.get("https://pixabay.com/api/", params=search)
+            requests.get("https://cdn.pixabay.com/photo/1.jpg")
+            Models.generate_content(None, model="m", contents="hello")
+
+        assert "SECRET" not in (tmp_path / "store.json").read_text(encoding="utf-8")
+        replayed = ResponseStore.load(tmp_path / "store.json")
+        assert replayed.summary() == {"gemini:other": 1, "pixabay:download": 1, "pixabay:search": 2}
+
+        with RecordedResponses(replayed, fallback=False) as replay:
+            other_key = {"key": "OTHER", "q": "red apple"}
+            assert requests.get("https://pixabay.com/api/", params=other_key).json() == {"hits": [1]}
+            assert requests.get("https://pixabay.com/api/", params=other_key).json() == {"hits": [2]}
+            assert requests.get("https://cdn.pixabay.com/photo/1.jpg").content == b"\xff\xd8jpeg"
+            response = Models.generate_content(None, model="m", contents="hello")
+            assert response.text == "answer to hello"
+            assert response.usage_metadata.candidates_token_count == 7
+            with pytest.raises(RecordingMissing):
+                requests.get("https://example.com/")
+        assert replay.stats["pixabay"]["hits"] == 3 and replay.stats["http"]["misses"] == 1
+
+    def test_fallbacks_streams_and_injected_faults(self):
+        store = ResponseStore()
+        store.add("k1", "gemini", "gemini:grammar", {}, {"text": '{"a": 1}', "chunks": ['{"a"', ': 1}']})
+        store.add("k2", "tts", "tts:synthesize", {}, {"status": 200, "content_type": "application/json", "text": "{}"})
+
+        prompt = "Respond with valid JSON only"
+        assert gemini_route(prompt) == "gemini:grammar"
+        faults = {"tts": ServiceFaults(latency_ms=5, error_rate=1.0)}
+        with RecordedResponses(store, faults=faults) as replay:
+            chunks = [chunk.text for chunk in Models.generate_content_stream(None, model="m", contents=prompt)]
+            assert chunks == ['{"a"', ': 1}']
+            response = requests.post("https://texttospeech.googleapis.com/v1/text:synthesize", json={"input": {}})
+            with pytest.raises(requests.HTTPError):
+                response.raise_for_status()
+        assert replay.stats["gemini"]["fallbacks"] == 1
+        assert replay.stats["tts"]["injected_errors"] == 1 and replay.stats["tts"]["injected_latency_s"] > 0
+
+        with RecordedResponses(store, faults={"gemini": ServiceFaults(error_rate=1.0)}):
+            with pytest.raises(errors.ServerError):
+                Models.generate_content(None, model="m", contents=prompt)
+
+
+class TestFullDeckBenchmark:
+    """Test deck construction and a short synthetic replay."""
+
+    def test_options_and_deck_words(self):
+        assert deck_words(["a", "b"], 5) == ["a", "b", "a2", "b2", "a3"]
+        faults = parse_faults(["gemini=1500:400"], ["gemini=0.1", "tts=0.05"])
+        assert faults["gemini"] == ServiceFaults(latency_ms=1500, jitter_ms=400, error_rate=0.1)
+        with pytest.raises(ValueError):
+            parse_faults(["openai=10"], [])
+
+    def test_synthetic_deck_replays_every_stage(self, tmp_path):
+        result = run_deck(synthetic_store("spanish"), 2, requests_per_minute=0, output_dir=tmp_path)
+        assert result["words_succeeded"] == 2 and result["sentences"] == 8
+        assert result["stage_seconds"]["grammar"] > 0 and result["peak_rss_mib"] > 0
+        assert all(stats["misses"] == 0 for stats in result["replay"].values())
+        assert {"gemini", "tts", "pixabay"} <= set(result["replay"])
@@ -0,0 +1,127 @@
+"""
+Unit tests for concurrent bisecting retries.
+Failed batch sentences are retried as halves before singles, under the shared
+Gemini rate limiter, and the retry tree is recorded.
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+from unittest.mock import patch
+
+# Add the streamlit_app directory to the path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'streamlit_app'))
+
+from streamlit_app.language_analyzers.analyzer_registry import get_analyzer
+from streamlit_app.language_analyzers.retry_fanout import (
+    bisect_retry,
+    format_retry_tree,
+    run_concurrently,
+)
+from streamlit_app.services.generation.adaptive_batcher import FALLBACK_CONFIDENCE_CEILING
+from streamlit_app.shared_utils import GeminiRateLimiter
+
+
+class TestBisectRetry:
+    """Test bisection of failed sentence sets."""
+
+    def test_one_bad_sentence_is_isolated_in_few_calls(self):
+        bad = 5
+        batch_calls, single_calls = [], []
+
+        def retry_batch(indices):
+            batch_calls.append(indices)
+            # A sentence that breaks parsing spoils every batch it is part of
+            return {} if bad in indices else {i: f"ok {i}" for i in indices}
+
+        def retry_single(i):
+            single_calls.append(i)
+            return None if i == bad else f"ok {i}"
+
+        results, tree = bisect_retry(list(range(8)), retry_batch, retry_single)
+
+        assert sorted(results) == [0, 1, 2, 3, 4, 6, 7]
+        assert tree.failed == [bad]
+        # Only the pair holding the bad sentence is split into single calls
+        assert sorted(single_calls) == [4, bad]
+        # Fewer calls than retrying all eight sentences one by one
+        assert tree.calls == len(batch_calls) + len(single_calls) < 8
+
+        lines = format_retry_tree(tree)
+        assert lines[0].startswith("retry sentences [1-8]: 7 recovered, 1 failed")
+        assert any("single [6]: failed" in line for line in lines)
+
+    def test_raising_batch_counts_as_failed_subset(self):
+        def retry_batch(indices):
+            raise RuntimeError("quota exceeded")
+
+        results, tree = bisect_retry([0, 1], retry_batch, lambda i: f"ok {i}")
+        assert results == {0: "ok 0", 1: "ok 1"}
+        assert [child.kind for child in tree.children] == ["single", "single"]
+
+    def test_run_concurrently_preserves_order(self):
+        def worker(n):
+            time.sleep(0.01 * (5 - n))
+            return n * n
+
+        assert run_concurrently(list(range(5)), worker) == [0, 1, 4, 9, 16]
+
+
+class TestGeminiRateLimiter:
+    """Test the shared limiter every Gemini call goes through."""
+
+    def test_caps_concurrent_calls(self):
+        limiter = GeminiRateLimiter(max_concurrent=2, requests_per_minute=0)
+        active, peak = [0], [0]
+        lock = threading.Lock()
+
+        def call(_):
+            with limiter:
+                with lock:
+                    active[0] += 1
+                    peak[0] = max(peak[0], active[0])
+                time.sleep(0.02)
+                with lock:
+                    active[0] -= 1
+
+        run_concurrently(list(range(6)), call, max_workers=6)
+        assert peak[0] == 2
+
+
+class TestLanguageAnalyzerRetries:
+    """Test that sentences a per-language batch response left unanswered are recovered by bisection."""
+
+    SENTENCES = ["Cats sleep.", "Dogs bark.", "Birds sing.", "Fish swim."]
+
+    def test_only_the_sentence_that_breaks_the_response_falls_back(self):
+        analyzer = get_analyzer("en")
+        prompts = []
+
+        def call_ai(prompt, api_key):
+            prompts.append(prompt)
+            response = json.dumps([
+                {"sentence": s, "words": [{"word": w, "grammatical_role": "noun", "individual_meaning": f"{w} as a thing"}
+                                          for w in s.rstrip(".").split()],
+                 "overall_structure": "Simple sentence"}
+                for s in self.SENTENCES if s in prompt
+            ])
+            # The model cannot answer any batch holding this sentence
+            return "I cannot analyze this." if "Dogs bark." in prompt else response
+
+        with patch.object(type(analyzer), "_call_ai", side_effect=call_ai):
+            analyses = analyzer.batch_analyze_grammar(self.SENTENCES, "cats", "beginner", "key")
+
+        assert [a.sentence for a in analyses] == self.SENTENCES
+        fell_back = [i for i, a in enumerate(analyses) if a.confidence_score < FALLBACK_CONFIDENCE_CEILING]
+        assert fell_back == [1]
+        # Whole batch, both halves, then the two singles of the failing half
+        assert len(prompts) == 5
+
+    def test_failed_api_call_is_not_retried(self):
+        analyzer = get_analyzer("en")
+        with patch.object(type(analyzer), "_call_ai", side_effect=RuntimeError("API key not valid")) as call_ai:
+            analyses = analyzer.batch_analyze_grammar(self.SENTENCES, "cats", "beginner", "key")
+
+        assert len(analyses) == 4 and call_ai.call_count == 1
@@ -0,0 +1,92 @@
+"""
+Unit tests for deck-level sentence deduplication.
+Repeats are replaced in one batched call or share the earlier sentence's
+audio and image, and its grammar only when it was analyzed for the same word.
+"""
+
+import os
+import sys
+
+# Add the streamlit_app directory to the path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'streamlit_app'))
+
+from streamlit_app.services.generation.sentence_dedup import (
+    MinHasher,
+    SentenceDeduplicator,
+    apply_shared_grammar,
+    expand_shared_files,
+    normalize_sentence,
+)
+
+
+def _sentence(text):
+    return {'sentence': text, 'english_translation': text, 'image_keywords': text}
+
+
+class TestNormalization:
+    """Test text normalization and near-duplicate similarity."""
+
+    def test_normalize_folds_case_punctuation_and_composition(self):
+        assert normalize_sentence("  Café,  noir! ") == normalize_sentence("café noir")
+        assert normalize_sentence("¿Dónde está?") == "dónde está"
+
+    def test_minhash_separates_near_and_distinct_sentences(self):
+        hasher = MinHasher()
+        base = hasher.signature(normalize_sentence("The cat is sleeping on the warm sofa."))
+        near = hasher.signature(normalize_sentence("The cat is sleeping on the warm sofa now."))
+        other = hasher.signature(normalize_sentence("We bought fresh bread at the market."))
+        assert hasher.similarity(base, near) >= 0.8
+        assert hasher.similarity(base, other) < 0.3
+
+
+class TestSentenceDeduplicator:
+    """Test replacement and artifact sharing across a deck."""
+
+    def test_in_word_duplicates_replaced_in_one_call(self):
+        dedup = SentenceDeduplicator()
+        calls = []
+
+        def request_replacements(n):
+            calls.append(n)
+            return [_sentence("I drink tea every morning."), _sentence("She reads books at night.")]
+
+        plan = dedup.deduplicate("tea", [
+            _sentence("I like green tea."),
+            _sentence("I like green tea!"),
+            _sentence("Tea grows on hills."),
+        ], request_replacements)
+
+        assert len(calls) == 1
+        assert plan.replaced == 1
+        assert plan.sentences[1]['sentence'] == "I drink tea every morning."
+        assert plan.unique_indices() == [0, 1, 2]
+
+    def test_deck_repeat_shares_audio_and_image_but_grammar_only_within_a_word(self):
+        dedup = SentenceDeduplicator()
+        first = _sentence("The dog runs in the park.")
+        first.update({'colored_sentence': '<span>The dog</span>', 'word_explanations': [['dog']],
+                      'grammar_summary': 'SVO'})
+        dedup.register("dog", [first], ["dog_01.mp3"], ["dog_01.jpg"])
+
+        plan = dedup.deduplicate("park", [_sentence("The dog runs in the park"), _sentence("Parks are green.")])
+        assert plan.unique_indices() == [1]
+        # Analyzed for "dog": "park" needs its own highlighting and explanations
+        assert plan.grammar_indices() == [0, 1]
+
+        apply_shared_grammar(plan)
+        assert 'grammar_summary' not in plan.sentences[0]
+        assert expand_shared_files(plan, ["park_02.mp3"], 'audio') == ["dog_01.mp3", "park_02.mp3"]
+        assert expand_shared_files(plan, [], 'image') == ["dog_01.jpg", ""]
+
+        same_word = dedup.deduplicate("dog", [_sentence("The dog runs in the park!"), _sentence("Dogs bark.")])
+        assert same_word.grammar_indices() == [1]
+        apply_shared_grammar(same_word)
+        assert same_word.sentences[0]['grammar_summary'] == 'SVO'
+
+    def test_unfixable_in_word_repeat_shares_earlier_position(self):
+        dedup = SentenceDeduplicator()
+        plan = dedup.deduplicate("sun", [_sentence("The sun is hot."), _sentence("The sun is hot.")],
+                                 request_replacements=lambda n: [_sentence("The sun is hot.")])
+        assert plan.replaced == 0
+        assert plan.source_index(1) == 0
+        assert expand_shared_files(plan, ["sun_01.mp3"], 'audio') == ["sun_01.mp3", "sun_01.mp3"]
@@ -0,0 +1,118 @@
+"""
+Unit tests for streamed batch grammar responses.
+Result objects are used as soon as they close; truncated tails are salvaged
+and only the missing sentences are retried.
+"""
+
+import json
+import os
+import sys
+from unittest.mock import patch
+
+# Add the streamlit_app directory to the path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'streamlit_app'))
+
+from streamlit_app.language_analyzers.analyzer_registry import get_analyzer
+from streamlit_app.language_analyzers.streaming_json import (
+    IncrementalBatchParser,
+    salvage_batch_items,
+)
+
+
+def _item(sentence, words):
+    return {
+        "sentence": sentence,
+        "words": [{"word": w, "grammatical_role": "noun", "individual_meaning": f"{w} as a thing"}
+                  for w in words],
+        "overall_structure": "Simple sentence with {curly} text and \"quotes\" ]",
+    }
+
+
+SENTENCES = ["Cats sleep.", "Dogs bark.", "Birds sing."]
+ITEMS = [_item(s, s.rstrip(".").split()) for s in SENTENCES]
+
+
+class TestIncrementalBatchParser:
+    """Test incremental extraction of result objects."""
+
+    def test_envelope_fed_one_character_at_a_time(self):
+        text = "```json\n" + json.dumps({"batch_results": ITEMS}, indent=2) + "\n```"
+        parser = IncrementalBatchParser()
+        completed = []
+        for char in text:
+            completed.extend(parser.feed(char))
+
+        assert completed == ITEMS
+        assert parser.envelope_key == "batch_results"
+        assert parser.complete
+        assert json.loads(parser.wrap(ITEMS[:1])) == {"batch_results": ITEMS[:1]}
+
+    def test_items_are_returned_as_soon_as_they_close(self):
+        text = json.dumps(ITEMS)
+        cut = text.index("}", text.index("Dogs"))  # inside the second object
+        parser = IncrementalBatchParser()
+        assert parser.feed(text[:cut]) == ITEMS[:1]
+        assert parser.feed(text[cut:]) == ITEMS[1:]
+        assert parser.envelope_key is None
+
+    def test_truncated_tail_is_salvaged(self):
+        text = json.dumps({"batch_results": ITEMS})
+        items, parser = salvage_batch_items(text[:text.index("Birds") + 3])
+        assert items == ITEMS[:2]
+        assert not parser.complete
+
+
+class TestStreamBatchAnalyze:
+    """Test streaming analysis with a real analyzer and a truncated stream."""
+
+    def test_truncated_stream_retries_only_missing_sentences(self):
+        analyzer = get_analyzer("en")
+        text = json.dumps(ITEMS)
+        chunks = [text[i:i + 40] for i in range(0, text.index("Birds"), 40)]
+        streamed = []
+
+        with patch.object(type(analyzer), "_stream_ai_model", return_value=iter(chunks)), \
+             patch.object(type(analyzer), "_call_ai", side_effect=AssertionError("no API call expected")):
+            results = analyzer.stream_batch_analyze_grammar(
+                SENTENCES[:2], "cats", "beginner", "key",
+                on_result=lambda index, analysis: streamed.append(index),
+            )
+            assert streamed == [0, 1]
+            assert "Cats" in results[0].html_output
+            assert [w[0] for w in results[1].word_explanations] == ["Dogs", "bark"]
+
+        streamed.clear()
+        retry_response = json.dumps(ITEMS[2:])
+        with patch.object(type(analyzer), "_stream_ai_model", return_value=iter(chunks)), \
+             patch.object(type(analyzer), "_call_ai", return_value=retry_response) as call_ai:
+            results = analyzer.stream_batch_analyze_grammar(
+                SENTENCES, "cats", "beginner", "key",
+                on_result=lambda index, analysis: streamed.append(index),
+            )
+
+        assert [r.sentence for r in results] == SENTENCES
+        assert streamed == [0, 1, 2]
+        assert [w[0] for w in results[2].word_explanations] == ["Birds", "sing"]
+        # One retry call, for the sentence cut off by the truncation only
+        assert call_ai.call_count == 1
+        retry_prompt = call_ai.call_args.args[0]
+        assert "Birds sing." in retry_prompt and "Cats sleep." not in retry_prompt
+
+
+class TestTruncatedBatchResponse:
+    """Test that a language analyzer keeps what a truncated batch response did answer."""
+
+    def test_only_sentences_after_the_cut_are_re_requested(self):
+        analyzer = get_analyzer("en")
+        text = json.dumps(ITEMS)
+        responses = [text[:text.index("Birds") + 3], json.dumps(ITEMS[2:])]
+
+        with patch.object(type(analyzer), "_call_ai", side_effect=responses) as call_ai:
+            results = analyzer.batch_analyze_grammar(SENTENCES, "cats", "beginner", "key")
+
+        assert [r.sentence for r in results] == SENTENCES
+        assert [[w[0] for w in r.word_explanations] for r in results] == [["Cats", "sleep"], ["Dogs", "bark"],
+                                                                        ["Birds", "sing"]]
+        assert call_ai.call_count == 2
+        retry_prompt = call_ai.call_args.args[0]
+        assert "Birds sing." in retry_prompt and "Dogs bark." not in retry_prompt
@@ -0,0 +1,60 @@
+"""
+Unit tests for compact word explanations.
+TokenAnnotations must stay interchangeable with the list-of-rows form it
+replaces: equality, copying, pickling, card HTML and TSV JSON.
+"""
+
+import copy
+import json
+import os
+import pickle
+import sys
+
+# Add the streamlit_app directory to the path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'streamlit_app'))
+
+from streamlit_app.language_analyzers.token_annotations import TokenAnnotations, explanations_html
+
+ROWS = [
+    ["Der", "article", "#FFEAA7", "definite article"],
+    ["Hund", "noun", "#FF6B6B", "dog"],
+    ["bellt", "verb", "#4ECDC4", "barks"],
+]
+
+
+def _old_html(explanations):
+    # The card HTML core_functions built before TokenAnnotations
+    items = []
+    for exp in explanations:
+        if len(exp) >= 4:
+            items.append(f'<div class="explanation-item"><span class="word-highlight" style="color: {exp[2]};">'
+                         f'<strong>{exp[0]}</strong></span> ({exp[1]}): {exp[3]}</div>')
+    if not items:
+        return ""
+    return '<div class="word-explanations"><strong>Grammar Explanations:</strong><br>' + ''.join(items) + '</div>'
+
+
+class TestTokenAnnotations:
+    """Test that TokenAnnotations behaves like the rows it stores."""
+
+    def test_behaves_like_rows(self):
+        annotations = TokenAnnotations.from_rows(ROWS + [["short", "row"]])
+        assert annotations == ROWS
+        assert len(annotations) == 3
+        assert annotations[1] == ("Hund", "noun", "#FF6B6B", "dog")
+        assert [word for word, _, _, _ in annotations] == ["Der", "Hund", "bellt"]
+        assert annotations[1:] == ROWS[1:]
+        assert TokenAnnotations.from_rows(annotations) is annotations
+
+    def test_copies_share_and_pickle_round_trips(self):
+        annotations = TokenAnnotations.from_rows(ROWS)
+        assert copy.deepcopy(annotations) is annotations
+        assert copy.deepcopy({'word_explanations': annotations})['word_explanations'] is annotations
+        assert pickle.loads(pickle.dumps(annotations)) == annotations
+
+    def test_views_match_list_rendering(self):
+        annotations = TokenAnnotations.from_rows(ROWS)
+        assert annotations.to_html() == _old_html(ROWS)
+        assert explanations_html(ROWS) == _old_html(ROWS)
+        assert explanations_html([]) == ""
+        assert json.loads(annotations.to_json()) == ROWS
@@ -0,0 +1,129 @@
+"""
+Unit tests for the TSV export/import round-trip.
+All 13 note fields must survive create_anki_tsv -> read_tsv_rows unchanged.
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+import pytest
+
+# Add the streamlit_app directory to the path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'streamlit_app'))
+
+from streamlit_app.deck_exporter import (
+    NOTE_FIELD_KEYS,
+    TSV_SCHEMA_HEADER,
+    create_anki_tsv,
+    iter_tsv_rows,
+    read_tsv_rows,
+)
+
+
+def _make_rows(count):
+    return [
+        {
+            'file_name': f"palabra_{i:02d}",
+            'word': f"palabra{i}",
+            'meaning': "word; term, expression used for a long enough meaning to wrap",
+            'sentence': f"Esta es la palabra {i}.",
+            'ipa': "ˈes.ta",
+            'english': f"This is word {i}.",
+            'audio': f"[sound:palabra_{i:02d}.mp3]",
+            'image': f'<img src="palabra_{i:02d}.jpg">',
+            'image_keywords': "word, book",
+            'colored_sentence': '<span style="color: #FF0000;">Esta</span> es',
+            'word_explanations': '<div class="word-explanations">Esta: pronoun</div>',
+            'grammar_summary': "Line one\nLine two\twith tab",
+            'tags': "spanish",
+        }
+        for i in range(count)
+    ]
+
+
+class TestTsvRoundTrip:
+    """Test lossless TSV export and import."""
+
+    def setup_method(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'ANKI_IMPORT.tsv')
+
+    def teardown_method(self):
+        self.tmp.cleanup()
+
+    def test_all_fields_round_trip(self):
+        """Every field, including newlines, tabs and quotes, comes back as written."""
+        rows = _make_rows(3)
+        rows[0]['word'] = 'null'
+        rows[1]['sentence'] = 'He said "hola"'
+        rows[2]['meaning'] = ''
+
+        assert create_anki_tsv(rows, self.path)
+        assert read_tsv_rows(self.path) == rows
+
+    def test_structured_explanations_round_trip(self):
+        """Raw word explanation lists are JSON-encoded and decoded back."""
+        rows = _make_rows(1)
+        rows[0]['word_explanations'] = [["Esta", "pronoun", "#FF4444", "this"]]
+
+        assert create_anki_tsv(rows, self.path)
+        assert read_tsv_rows(self.path)[0]['word_explanations'] == rows[0]['word_explanations']
+
+    def test_schema_header_written(self):
+        """The file declares Anki's header lines and the schema version."""
+        assert create_anki_tsv(_make_rows(1), self.path)
+        with open(self.path, encoding='utf-8') as f:
+            content = f.read()
+        assert content.startswith('#separator:tab\n#html:true\n#columns:File Name\t')
+        assert f"{TSV_SCHEMA_HEADER}:1\n" in content
+
+    def test_legacy_file_without_header(self):
+        """Headerless 10-column files still load, with missing fields empty."""
+        with open(self.path, 'w', encoding='utf-8') as f:
+            f.write("a_01\ta\tmeaning\tsentence\tipa\tenglish\t[sound:a.mp3]\t\tkw\ttag\n")
+
+        rows = read_tsv_rows(self.path)
+        assert rows[0]['word'] == 'a'
+        assert rows[0]['image'] == ''
+        assert rows[0]['grammar_summary'] == ''
+        assert set(rows[0]) == set(NOTE_FIELD_KEYS)
+
+    def test_data_row_starting_with_hash_is_not_header(self):
+        """Only known header keys are consumed; a '#...:...' data row is kept."""
+        rows = _make_rows(2)
+        rows[0]['file_name'] = '#1: first'
+        assert create_anki_tsv(rows, self.path)
+        assert read_tsv_rows(self.path) == rows
+
+    def test_chunked_streaming(self):
+        """Generators can be written and files read back in chunks."""
+        rows = _make_rows(25)
+        assert create_anki_tsv((row for row in rows), self.path, chunk_size=10)
+
+        chunks = list(iter_tsv_rows(self.path, chunk_size=10))
+        assert [len(chunk) for chunk in chunks] == [10, 10, 5]
+        assert [row for chunk in chunks for row in chunk] == rows
+
+    def test_newer_schema_rejected(self):
+        """Files from a newer schema are not silently misread."""
+        with open(self.path, 'w', encoding='utf-8') as f:
+            f.write(f"{TSV_SCHEMA_HEADER}:99\n")
+        assert read_tsv_rows(self.path) == []
+
+    @pytest.mark.slow
+    def test_benchmark_50k_rows(self):
+        """Round-trip a 50k-row deck and report timings."""
+        rows = _make_rows(50000)
+
+        start = time.perf_counter()
+        assert create_anki_tsv(rows, self.path)
+        write_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        result = read_tsv_rows(self.path)
+        read_seconds = time.perf_counter() - start
+
+        assert result == rows
+        print(f"\n50k-row TSV: write {write_seconds:.2f}s, read {read_seconds:.2f}s")
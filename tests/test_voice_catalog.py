@@ -0,0 +1,93 @@
+"""
+Unit tests for the cached Google TTS voice catalog.
+Lookups never wait on the network: the bundled snapshot answers on a cold
+start, a stale catalog keeps answering while it refreshes, and failed
+refreshes are not retried until a cooldown has passed.
+"""
+
+import json
+import os
+import sys
+import threading
+from unittest.mock import MagicMock
+
+# Add the streamlit_app directory to the path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'streamlit_app'))
+
+from streamlit_app.voice_catalog import SNAPSHOT_PATH, VoiceCatalog, voice_family
+
+LIVE_VOICES = [
+    {'name': 'es-ES-Standard-A', 'language_codes': ['es-ES'], 'ssml_gender': 'FEMALE', 'natural_sample_rate_hertz': 24000},
+    {'name': 'es-ES-Neural2-B', 'language_codes': ['es-ES'], 'ssml_gender': 'MALE', 'natural_sample_rate_hertz': 24000},
+    {'name': 'es-ES-Chirp3-HD-Aoede', 'language_codes': ['es-ES'], 'ssml_gender': 'FEMALE', 'natural_sample_rate_hertz': 24000},
+    {'name': 'cmn-CN-Standard-A', 'language_codes': ['cmn-CN'], 'ssml_gender': 'FEMALE', 'natural_sample_rate_hertz': 24000},
+]
+
+
+class TestVoiceCatalog:
+    """Test cold start, indexing, persistence and background refresh."""
+
+    def test_cold_start_uses_bundled_snapshot_without_fetching(self, tmp_path):
+        fetch = MagicMock(side_effect=AssertionError("no fetch expected"))
+        catalog = VoiceCatalog(cache_path=str(tmp_path / "voices.json"), fetch=fetch)
+        assert catalog.source == "snapshot"
+        assert not catalog.is_fresh()
+        assert catalog.voices_for("es-ES")
+        assert json.loads(SNAPSHOT_PATH.read_text(encoding="utf-8"))["voices"]
+
+    def test_refresh_indexes_by_code_and_family_and_persists(self, tmp_path):
+        path = tmp_path / "voices.json"
+        catalog = VoiceCatalog(cache_path=str(path), snapshot_path=None, fetch=lambda key: LIVE_VOICES)
+        assert catalog.refresh("key")
+
+        assert voice_family("es-ES-Chirp3-HD-Aoede") == "Chirp3-HD"
+        assert [v['name'] for v in catalog.voices_for("es-ES", family="Neural2")] == ["es-ES-Neural2-B"]
+        assert catalog.families("es-ES") == ["Chirp3-HD", "Neural2", "Standard"]
+        assert catalog.voices_for("zh-TW") == catalog.voices_for("cmn-CN")
+
+        reloaded = VoiceCatalog(cache_path=str(path), snapshot_path=None,
+                                fetch=MagicMock(side_effect=AssertionError("no fetch expected")))
+        assert reloaded.source == "cache" and reloaded.is_fresh()
+        assert len(reloaded.voices_for("es-ES")) == 3
+
+    def test_stale_catalog_answers_while_one_background_refresh_runs(self, tmp_path):
+        release = threading.Event()
+        calls = []
+
+        def slow_fetch(key):
+            calls.append(key)
+            release.wait(5)
+            return LIVE_VOICES
+
+        catalog = VoiceCatalog(cache_path=str(tmp_path / "voices.json"), fetch=slow_fetch)
+        snapshot_voices = catalog.voices_for("es-ES")
+        assert catalog.refresh_if_stale("key")
+        assert not catalog.refresh_if_stale("key")
+        assert catalog.voices_for("es-ES") == snapshot_voices
+
+        release.set()
+        catalog.wait_for_refresh(5)
+        assert calls == ["key"]
+        assert catalog.source == "live"
+        assert len(catalog.voices_for("es-ES")) == 3
+
+    def test_failed_fetch_keeps_snapshot_and_reports_failure(self, tmp_path):
+        catalog = VoiceCatalog(cache_path=str(tmp_path / "voices.json"),
+                               fetch=MagicMock(side_effect=ConnectionError("offline")))
+        assert not catalog.refresh("key")
+        assert catalog.refresh_failed
+        assert catalog.voices_for("es-ES")
+
+    def test_failed_refresh_is_not_retried_until_the_cooldown_passes(self, tmp_path):
+        fetch = MagicMock(side_effect=ConnectionError("offline"))
+        catalog = VoiceCatalog(cache_path=str(tmp_path / "voices.json"), fetch=fetch, failure_cooldown=60)
+        assert catalog.refresh_if_stale("key")
+        catalog.wait_for_refresh(5)
+        assert not catalog.refresh_if_stale("key")
+        assert fetch.call_count == 1
+
+        catalog.last_failed_at -= 61
+        fetch.side_effect, fetch.return_value = None, LIVE_VOICES
+        assert catalog.refresh_if_stale("key")
+        catalog.wait_for_refresh(5)
+        assert catalog.source == "live" and catalog.last_failed_at == 0.0
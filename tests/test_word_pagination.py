@@ -0,0 +1,119 @@
+"""
+Unit tests for keyset pagination and the completed-word cache used by the
+word-select page.
+"""
+
+import os
+import sqlite3
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+
+# Add the streamlit_app directory to the path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'streamlit_app'))
+
+import frequency_utils
+import word_manager
+
+
+@pytest.fixture
+def word_db(monkeypatch):
+    """Temporary words table with a rank gap, wired in as db_manager."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        db_path = Path(temp_dir) / "words.db"
+        conn = sqlite3.connect(db_path)
+        conn.execute("""
+            CREATE TABLE words (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                language TEXT NOT NULL,
+                word TEXT NOT NULL,
+                rank INTEGER NOT NULL,
+                times_generated INTEGER DEFAULT 0,
+                last_generated TIMESTAMP,
+                completed BOOLEAN DEFAULT 0,
+                UNIQUE(language, word)
+            )
+        """)
+        conn.execute("CREATE INDEX idx_language_rank ON words(language, rank)")
+        # Ranks 1..5 and 8..12: ranks 6 and 7 were dropped as duplicates on import
+        ranks = list(range(1, 6)) + list(range(8, 13))
+        conn.executemany(
+            "INSERT INTO words (language, word, rank) VALUES (?, ?, ?)",
+            [("Testish", f"w{rank}", rank) for rank in ranks]
+        )
+        conn.commit()
+        conn.close()
+
+        monkeypatch.setattr(word_manager, "DB_PATH", db_path)
+        monkeypatch.setitem(sys.modules, "db_manager", word_manager)
+        word_manager.invalidate_completed_cache()
+        word_manager.invalidate_rank_index()
+        frequency_utils.clear_page_cache()
+        yield db_path
+        word_manager.invalidate_completed_cache()
+        word_manager.invalidate_rank_index()
+        frequency_utils.clear_page_cache()
+
+
+class TestKeysetPagination:
+    """Test keyset pagination on (language, rank)."""
+
+    def test_words_after_rank(self, word_db):
+        words = word_manager.get_words_after_rank("Testish", after_rank=4, limit=3)
+        assert [w["word"] for w in words] == ["w5", "w8", "w9"]
+
+    def test_rank_at_position_skips_gaps(self, word_db):
+        assert word_manager.get_rank_at_position("Testish", 5) == 8
+        assert word_manager.get_rank_at_position("Testish", 50) is None
+
+    def test_rank_at_position_seeks_from_sparse_index(self, word_db, monkeypatch):
+        monkeypatch.setattr(word_manager, "RANK_INDEX_STRIDE", 3)
+        ranks = [word_manager.get_rank_at_position("Testish", position) for position in range(11)]
+        assert ranks == [1, 2, 3, 4, 5, 8, 9, 10, 11, 12, None]
+        assert word_manager._rank_index["Testish"] == [1, 4, 9, 12]
+
+    def test_sequential_and_jumped_pages_match(self, word_db):
+        df_page1, total = frequency_utils.get_words_with_ranks("Testish", page=1, page_size=4)
+        df_page2, _ = frequency_utils.get_words_with_ranks("Testish", page=2, page_size=4)
+        assert total == 10
+        assert list(df_page1["Word"]) == ["w1", "w2", "w3", "w4"]
+        assert list(df_page2["Word"]) == ["w5", "w8", "w9", "w10"]
+
+        frequency_utils.clear_page_cache()
+        df_jump, _ = frequency_utils.get_words_with_ranks("Testish", page=3, page_size=4)
+        assert list(df_jump["Word"]) == ["w11", "w12"]
+        assert list(df_jump["Rank"]) == [9, 10]
+
+    def test_pages_are_cached(self, word_db, monkeypatch):
+        frequency_utils.get_words_with_ranks("Testish", page=1, page_size=4)
+
+        def fail(*args, **kwargs):
+            raise AssertionError("page should have been served from cache")
+
+        monkeypatch.setattr(word_manager, "get_words_after_rank", fail)
+        df, _ = frequency_utils.get_words_with_ranks("Testish", page=1, page_size=4)
+        assert list(df["Word"]) == ["w1", "w2", "w3", "w4"]
+
+
+class TestCompletedCache:
+    """Test the write-through invalidated completed-rank cache."""
+
+    def test_completion_updates_are_visible(self, word_db):
+        df, _ = frequency_utils.get_words_with_ranks("Testish", page=1, page_size=4)
+        assert list(df["Completed"]) == ["", "", "", ""]
+
+        word_manager.mark_words_completed("Testish", ["w2", "w4"])
+        df, _ = frequency_utils.get_words_with_ranks("Testish", page=1, page_size=4)
+        assert list(df["Completed"]) == ["", "✓", "", "✓"]
+
+        word_manager.mark_word_completed("Testish", "w2", completed=False)
+        assert word_manager.get_completed_ranks("Testish") == frozenset({4})
+
+    def test_completion_updates_clear_cached_pages(self, word_db):
+        frequency_utils.get_words_with_ranks("Testish", page=1, page_size=4)
+        word_manager.mark_word_completed("Testish", "w3")
+
+        words = frequency_utils._get_page_words("Testish", 1, 4)
+        assert [w["completed"] for w in words] == [0, 0, 1, 0]